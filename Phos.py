@@ -130,6 +130,7 @@ from film_models import (
 
 # 導入顆粒生成策略（P1-2: Strategy Pattern）
 from grain_strategies import generate_grain
+from phos_core import PerformanceMonitor, channels_run_parallel, get_thread_budget, map_channels, profile_stage
 
 # ==================== v0.8.0: 模組化導入 ====================
 # 
@@ -151,7 +152,15 @@ from grain_strategies import generate_grain
 
 # Phos.py 內部使用的模組化函數（不對外導出）
 from modules.optical_core import standardize, spectral_response, average_response, linear_to_srgb
-from modules.tone_mapping import apply_reinhard, apply_filmic
+from modules.image_io import decode_image, image_buffer, standardize_decoded
+from phos_output import display_image, get_output_service, new_render_id
+from phos_cache import CachedRender, get_render_cache, input_digest, render_key
+from modules.tone_mapping import (
+    apply_reinhard,
+    apply_filmic,
+    apply_reinhard_to_channel,
+    apply_filmic_to_channel
+)
 from modules.image_processing import apply_hd_curve, combine_layers_for_channel
 from modules.wavelength_effects import (
     apply_halation, 
@@ -488,7 +497,9 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
                       film: FilmProfile, grain_style: str, tone_style: str,
                       use_film_spectra: bool = False, film_spectra_name: str = 'Portra400',
                       film_illuminant: str = 'flat',
-                      exposure_time: float = 1.0) -> np.ndarray:
+                      exposure_time: float = 1.0,
+                      profiler: Optional[PerformanceMonitor] = None,
+                      parallel_channels: Optional[bool] = None) -> np.ndarray:
     """
     光學處理主函數
     
@@ -512,40 +523,53 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
         film_spectra_name: 膠片光譜名稱 ('Portra400', 'Velvia50', 'Cinestill800T', 'HP5Plus400')
         film_illuminant: 光源 SPD 類型（'flat' 或 'D65'）
         exposure_time: 曝光時間（秒），用於互易律失效計算（預設 1.0s，即無效應）
+        profiler: 階段剖析器（可選）。提供時於每個階段邊界記錄 wall/CPU 時間與
+            記憶體配置（reciprocity, grain, bloom_*/halation_*, combine, hd_curve,
+            tone_mapping, film_spectra, encode），以 profiler.to_dict() 取得報告。
+            彩色膠片的通道鏈階段（bloom_*/halation_*, combine, hd_curve, tone_mapping）
+            每通道一筆；並行時巢狀於 channels 階段之下（仍逐階段記錄記憶體，
+            見 PerformanceMonitor.stage）
+        parallel_channels: 彩色膠片的 R/G/B 通道鏈是否在常駐通道執行器上並行
+            （None 使用 phos_core.parallel_channels_default()，即環境變數
+            PHOS_PARALLEL_CHANNELS，預設啟用）；並行與循序結果逐位元一致
         
     Returns:
         處理後的圖像 (0-255 uint8)
     """
+    # 依核心預算設定 OpenCV / BLAS / 通道執行緒（每個行程首次呼叫時生效）
+    get_thread_budget()
+
     # 0. 應用互易律失效（Reciprocity Failure, TASK-014）
     # 在所有其他處理之前應用，模擬長曝光時的膠片非線性響應
     if (hasattr(film, 'reciprocity_params') and 
         film.reciprocity_params is not None and 
         film.reciprocity_params.enabled and 
         exposure_time != 1.0):
-        try:
-            from reciprocity_failure import apply_reciprocity_failure
+        with profile_stage(profiler, "reciprocity"):
+            try:
+                from reciprocity_failure import apply_reciprocity_failure
             
-            # 對彩色膠片應用通道獨立的互易律失效
-            if film.color_type == "color" and all([response_r is not None, response_g is not None, response_b is not None]):
-                # 組合 RGB 通道為 3D 陣列
-                rgb_stack = np.stack([response_r, response_g, response_b], axis=2)
-                rgb_stack = apply_reciprocity_failure(rgb_stack, exposure_time, film.reciprocity_params)
-                response_r = rgb_stack[:, :, 0]
-                response_g = rgb_stack[:, :, 1]
-                response_b = rgb_stack[:, :, 2]
-            else:
-                # 對黑白膠片應用單一通道互易律失效
-                response_total = apply_reciprocity_failure(
-                    response_total[:, :, np.newaxis],  # 轉為 3D
-                    exposure_time,
-                    film.reciprocity_params
-                )[:, :, 0]  # 轉回 2D
-        except ImportError:
-            import warnings
-            warnings.warn("reciprocity_failure 模組未找到，跳過互易律失效處理")
-        except Exception as e:
-            import warnings
-            warnings.warn(f"互易律失效處理失敗，跳過: {str(e)}")
+                # 對彩色膠片應用通道獨立的互易律失效
+                if film.color_type == "color" and all([response_r is not None, response_g is not None, response_b is not None]):
+                    # 組合 RGB 通道為 3D 陣列
+                    rgb_stack = np.stack([response_r, response_g, response_b], axis=2)
+                    rgb_stack = apply_reciprocity_failure(rgb_stack, exposure_time, film.reciprocity_params)
+                    response_r = rgb_stack[:, :, 0]
+                    response_g = rgb_stack[:, :, 1]
+                    response_b = rgb_stack[:, :, 2]
+                else:
+                    # 對黑白膠片應用單一通道互易律失效
+                    response_total = apply_reciprocity_failure(
+                        response_total[:, :, np.newaxis],  # 轉為 3D
+                        exposure_time,
+                        film.reciprocity_params
+                    )[:, :, 0]  # 轉回 2D
+            except ImportError:
+                import warnings
+                warnings.warn("reciprocity_failure 模組未找到，跳過互易律失效處理")
+            except Exception as e:
+                import warnings
+                warnings.warn(f"互易律失效處理失敗，跳過: {str(e)}")
     
     # 1. 計算自適應參數
     avg_response = average_response(response_total)
@@ -554,9 +578,10 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
     # 2. 應用顆粒（如果需要）
     use_grain = (grain_style != "不使用")
     if use_grain:
-        grain_r, grain_g, grain_b, grain_total_noise = apply_grain(
-            response_r, response_g, response_b, response_total, film, sens
-        )
+        with profile_stage(profiler, "grain"):
+            grain_r, grain_g, grain_b, grain_total_noise = apply_grain(
+                response_r, response_g, response_b, response_total, film, sens
+            )
     else:
         grain_r = grain_g = grain_b = grain_total_noise = None
     
@@ -587,34 +612,17 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
             # Functions: apply_wavelength_bloom() + apply_bloom_with_psf()
             # Note: Kept for backward compatibility with existing configs
             # 步驟 1: 波長依賴 Bloom 散射（η(λ) 與 σ(λ) 解耦）
-            bloom_r, bloom_g, bloom_b = apply_wavelength_bloom(
-                response_r, response_g, response_b,
-                film.wavelength_bloom_params,
-                film.bloom_params
-            )
-            
-            # 步驟 2: Halation 背層反射（波長依賴）
-            bloom_r = apply_halation(bloom_r, film.halation_params, wavelength=650.0)
-            bloom_g = apply_halation(bloom_g, film.halation_params, wavelength=550.0)
-            bloom_b = apply_halation(bloom_b, film.halation_params, wavelength=450.0)
-            
-        elif use_medium_physics:
-            # ============ Path 2: Legacy Medium Physics (Separated) ============
-            # Phase 2: 僅 Bloom + Halation 分離（無波長依賴）
-            bloom_r, bloom_g, bloom_b = apply_optical_effects_separated(
-                response_r, response_g, response_b,
-                film.bloom_params, film.halation_params,
-                blur_scale_r=3, blur_scale_g=2, blur_scale_b=1
-            )
-        elif use_physical_bloom:
-            # ============ Path 3: New Physical Mode (Strategy Pattern) ============
-            # Uses strategy pattern (bloom_strategies.py)
-            # Recommended for new code
-            # 物理模式：僅 Bloom（能量守恆）
-            bloom_r = apply_bloom(response_r, film.bloom_params)
-            bloom_g = apply_bloom(response_g, film.bloom_params)
-            bloom_b = apply_bloom(response_b, film.bloom_params)
+            # 光譜模式的跨通道混合需要三個通道，故在通道鏈之前一次計算
+            with profile_stage(profiler, "wavelength_bloom"):
+                blooms = apply_wavelength_bloom(
+                    response_r, response_g, response_b,
+                    film.wavelength_bloom_params,
+                    film.bloom_params
+                )
         else:
+            blooms = (None, None, None)
+        
+        if not use_physical_bloom:
             # 藝術模式：現有行為
             artistic_params = BloomParams(
                 mode="artistic",
@@ -623,23 +631,6 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
                 artistic_strength=strg,
                 artistic_base=base
             )
-            bloom_r = apply_bloom(response_r, artistic_params)
-            bloom_g = apply_bloom(response_g, artistic_params)
-            bloom_b = apply_bloom(response_b, artistic_params)
-        
-        # 組合各層
-        response_r_final = combine_layers_for_channel(
-            bloom_r, response_r, film.red_layer, grain_r, grain_g, grain_b, 
-            film.panchromatic_layer.grain_intensity, use_grain
-        )
-        response_g_final = combine_layers_for_channel(
-            bloom_g, response_g, film.green_layer, grain_r, grain_g, grain_b,
-            film.panchromatic_layer.grain_intensity, use_grain
-        )
-        response_b_final = combine_layers_for_channel(
-            bloom_b, response_b, film.blue_layer, grain_r, grain_g, grain_b,
-            film.panchromatic_layer.grain_intensity, use_grain
-        )
         
         # 3.5. 應用 H&D 曲線（膠片特性曲線）
         # 注意：H&D 曲線模擬膠片的非線性響應，與 tone mapping（顯示轉換）不同
@@ -647,62 +638,112 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
         use_hd_curve = (hasattr(film, 'hd_curve_params') and
                         film.hd_curve_params.enabled)
         
-        if use_hd_curve:
-            response_r_final = apply_hd_curve(response_r_final, film.hd_curve_params)
-            response_g_final = apply_hd_curve(response_g_final, film.hd_curve_params)
-            response_b_final = apply_hd_curve(response_b_final, film.hd_curve_params)
+        # (通道索引, 名稱, 響應, 波長 nm, 乳劑層)
+        channels = (
+            (0, "r", response_r, 650.0, film.red_layer),
+            (1, "g", response_g, 550.0, film.green_layer),
+            (2, "b", response_b, 450.0, film.blue_layer),
+        )
         
-        # 4. Tone mapping
-        if tone_style == "filmic":
-            result_r, result_g, result_b, _ = apply_filmic(response_r_final, response_g_final, response_b_final, response_total, film)
-        else:
-            result_r, result_g, result_b, _ = apply_reinhard(response_r_final, response_g_final, response_b_final, response_total, film)
+        def process_channel(channel):
+            """單通道鏈：bloom / halation → 組合 → H&D 曲線 → tone mapping"""
+            index, name, response, wavelength, layer = channel
+            if use_wavelength_bloom:
+                # 步驟 2: Halation 背層反射（波長依賴）
+                with profile_stage(profiler, f"halation_{name}"):
+                    bloom = apply_halation(blooms[index], film.halation_params, wavelength=wavelength)
+            elif use_medium_physics:
+                # ============ Path 2: Legacy Medium Physics (Separated) ============
+                # Phase 2: 僅 Bloom + Halation 分離（無波長依賴）
+                with profile_stage(profiler, "bloom_halation_separated"):
+                    separated_input = [None, None, None]
+                    separated_input[index] = response
+                    bloom = apply_optical_effects_separated(
+                        *separated_input,
+                        film.bloom_params, film.halation_params,
+                        blur_scale_r=3, blur_scale_g=2, blur_scale_b=1
+                    )[index]
+            elif use_physical_bloom:
+                # ============ Path 3: New Physical Mode (Strategy Pattern) ============
+                # Uses strategy pattern (bloom_strategies.py)
+                # Recommended for new code
+                # 物理模式：僅 Bloom（能量守恆）
+                with profile_stage(profiler, f"bloom_{name}"):
+                    bloom = apply_bloom(response, film.bloom_params)
+            else:
+                with profile_stage(profiler, f"bloom_{name}"):
+                    bloom = apply_bloom(response, artistic_params)
+            
+            # 組合各層
+            with profile_stage(profiler, "combine"):
+                response_final = combine_layers_for_channel(
+                    bloom, response, layer, grain_r, grain_g, grain_b,
+                    film.panchromatic_layer.grain_intensity, use_grain
+                )
+            
+            if use_hd_curve:
+                with profile_stage(profiler, "hd_curve"):
+                    response_final = apply_hd_curve(response_final, film.hd_curve_params)
+            
+            # 4. Tone mapping
+            with profile_stage(profiler, "tone_mapping"):
+                if tone_style == "filmic":
+                    return apply_filmic_to_channel(response_final, film)
+                return apply_reinhard_to_channel(response_final, film.tone_params.gamma, color_mode=True)
+        
+        # 三條通道鏈彼此獨立：並行模式在常駐通道執行器上同時執行（結果與循序模式逐位元一致）。
+        # 並行時各通道鏈階段巢狀於 channels 階段；循序時維持為頂層階段
+        parallel = channels_run_parallel(parallel_channels)
+        with profile_stage(profiler if parallel else None, "channels"):
+            result_r, result_g, result_b = map_channels(process_channel, channels, parallel=parallel)
         
         # 4.5. 應用膠片光譜敏感度（Phase 4，優化版）
         if use_film_spectra:
-            try:
-                from phos_core import (
-                    rgb_to_spectrum, 
-                    apply_film_spectral_sensitivity,
-                    load_film_sensitivity,
-                    get_illuminant_d65
-                )
+            with profile_stage(profiler, "film_spectra"):
+                try:
+                    from phos_core import (
+                        rgb_to_spectrum, 
+                        apply_film_spectral_sensitivity,
+                        load_film_sensitivity,
+                        get_illuminant_d65
+                    )
                 
-                # 合併 RGB 為影像陣列（0-1 範圍）
-                lux_combined = np.stack([result_r, result_g, result_b], axis=2)
+                    # 合併 RGB 為影像陣列（0-1 範圍）
+                    lux_combined = np.stack([result_r, result_g, result_b], axis=2)
                 
-                # RGB → Spectrum → Film RGB (optimized pipeline)
-                spectrum = rgb_to_spectrum(lux_combined, use_tiling=True, tile_size=512)
-                film_curves = load_film_sensitivity(film_spectra_name)
-                illuminant_spd = get_illuminant_d65() if film_illuminant == "D65" else None
-                rgb_with_film = apply_film_spectral_sensitivity(
-                    spectrum, 
-                    film_curves,
-                    normalize=True,
-                    illuminant_spd=illuminant_spd
-                )
+                    # RGB → Spectrum → Film RGB (optimized pipeline)
+                    spectrum = rgb_to_spectrum(lux_combined, use_tiling=True, tile_size=512)
+                    film_curves = load_film_sensitivity(film_spectra_name)
+                    illuminant_spd = get_illuminant_d65() if film_illuminant == "D65" else None
+                    rgb_with_film = apply_film_spectral_sensitivity(
+                        spectrum, 
+                        film_curves,
+                        normalize=True,
+                        illuminant_spd=illuminant_spd
+                    )
                 
-                # 拆分回通道
-                result_r = rgb_with_film[:, :, 0]
-                result_g = rgb_with_film[:, :, 1]
-                result_b = rgb_with_film[:, :, 2]
+                    # 拆分回通道
+                    result_r = rgb_with_film[:, :, 0]
+                    result_g = rgb_with_film[:, :, 1]
+                    result_b = rgb_with_film[:, :, 2]
                 
-            except Exception as e:
-                # 膠片光譜處理失敗時回退到原始結果
-                import warnings
-                warnings.warn(f"膠片光譜處理失敗，使用原始結果: {str(e)}")
+                except Exception as e:
+                    # 膠片光譜處理失敗時回退到原始結果
+                    import warnings
+                    warnings.warn(f"膠片光譜處理失敗，使用原始結果: {str(e)}")
         
         # 5. 合成最終圖像
         # v0.8.2.3: 添加 Linear RGB → sRGB gamma 編碼（輸出）
         # 完整色彩管理流程: sRGB 輸入 → Linear RGB 處理 → sRGB 輸出
-        result_r_srgb = linear_to_srgb(result_r)
-        result_g_srgb = linear_to_srgb(result_g)
-        result_b_srgb = linear_to_srgb(result_b)
-        
-        combined_r = (result_r_srgb * 255).astype(np.uint8)
-        combined_g = (result_g_srgb * 255).astype(np.uint8)
-        combined_b = (result_b_srgb * 255).astype(np.uint8)
-        final_image = cv2.merge([combined_b, combined_g, combined_r])
+        with profile_stage(profiler, "encode"):
+            result_r_srgb = linear_to_srgb(result_r)
+            result_g_srgb = linear_to_srgb(result_g)
+            result_b_srgb = linear_to_srgb(result_b)
+            
+            combined_r = (result_r_srgb * 255).astype(np.uint8)
+            combined_g = (result_g_srgb * 255).astype(np.uint8)
+            combined_b = (result_b_srgb * 255).astype(np.uint8)
+            final_image = cv2.merge([combined_b, combined_g, combined_r])
         
     else:
         # 黑白胶片：僅處理全色通道
@@ -713,17 +754,19 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
             artistic_strength=strg,
             artistic_base=base
         )
-        bloom = apply_bloom(response_total, artistic_params)
+        with profile_stage(profiler, "bloom_total"):
+            bloom = apply_bloom(response_total, artistic_params)
         
         # 組合層
         # v0.8.2 HOTFIX: 暫時禁用 response_curve 運算（因輸入已是 Linear RGB）
-        if use_grain and grain_total_noise is not None:
-            lux_final = (bloom * film.panchromatic_layer.diffuse_weight + 
-                        response_total * film.panchromatic_layer.direct_weight +
-                        grain_total_noise * film.panchromatic_layer.grain_intensity)
-        else:
-            lux_final = (bloom * film.panchromatic_layer.diffuse_weight + 
-                        response_total * film.panchromatic_layer.direct_weight)
+        with profile_stage(profiler, "combine"):
+            if use_grain and grain_total_noise is not None:
+                lux_final = (bloom * film.panchromatic_layer.diffuse_weight + 
+                            response_total * film.panchromatic_layer.direct_weight +
+                            grain_total_noise * film.panchromatic_layer.grain_intensity)
+            else:
+                lux_final = (bloom * film.panchromatic_layer.diffuse_weight + 
+                            response_total * film.panchromatic_layer.direct_weight)
         
         # 應用 H&D 曲線（黑白膠片，檢查是否啟用）
         # v0.7.0: 所有膠片固定使用 PHYSICAL 模式，只需檢查 hd_curve_params.enabled
@@ -731,18 +774,21 @@ def optical_processing(response_r: Optional[np.ndarray], response_g: Optional[np
                         film.hd_curve_params.enabled)
         
         if use_hd_curve:
-            lux_final = apply_hd_curve(lux_final, film.hd_curve_params)
+            with profile_stage(profiler, "hd_curve"):
+                lux_final = apply_hd_curve(lux_final, film.hd_curve_params)
         
         # Tone mapping
-        if tone_style == "filmic":
-            _, _, _, result_total = apply_filmic(None, None, None, lux_final, film)
-        else:
-            _, _, _, result_total = apply_reinhard(None, None, None, lux_final, film)
+        with profile_stage(profiler, "tone_mapping"):
+            if tone_style == "filmic":
+                _, _, _, result_total = apply_filmic(None, None, None, lux_final, film)
+            else:
+                _, _, _, result_total = apply_reinhard(None, None, None, lux_final, film)
         
         # 合成最終圖像
         # v0.8.2.3: 添加 Linear RGB → sRGB gamma 編碼（輸出）
-        result_total_srgb = linear_to_srgb(result_total)
-        final_image = (result_total_srgb * 255).astype(np.uint8)
+        with profile_stage(profiler, "encode"):
+            result_total_srgb = linear_to_srgb(result_total)
+            final_image = (result_total_srgb * 255).astype(np.uint8)
     
     return final_image
 
@@ -788,10 +834,77 @@ def adjust_grain_intensity(film: FilmProfile, grain_style: str) -> FilmProfile:
         )
 
 
+def prepare_film_profile(film_type: str, grain_style: str,
+                         physics_params: Optional[dict] = None) -> FilmProfile:
+    """
+    取得胶片配置並套用物理參數與顆粒風格
+    
+    Args:
+        film_type: 胶片類型
+        grain_style: 顆粒風格
+        physics_params: 物理模式參數字典（可選，見 process_image()）
+        
+    Returns:
+        FilmProfile: 處理用的胶片配置
+    """
+    # 1. 獲取胶片配置（使用快取）
+    film = get_cached_film_profile(film_type)
+    
+    # 2. 應用物理參數（如有提供）
+    if physics_params:
+        from dataclasses import replace
+        
+        # v0.7.0: physics_mode 固定為 PHYSICAL，無需設定
+        # film.physics_mode = physics_params.get('physics_mode', film.physics_mode)
+        
+        # Bloom 參數
+        film.bloom_params.mode = physics_params.get('bloom_mode', 'artistic')
+        film.bloom_params.threshold = physics_params.get('bloom_threshold', 0.8)
+        film.bloom_params.scattering_ratio = physics_params.get('bloom_scattering_ratio', 0.1)
+        
+        # H&D 曲線參數
+        film.hd_curve_params.enabled = physics_params.get('hd_enabled', False)
+        if film.hd_curve_params.enabled:
+            film.hd_curve_params.gamma = physics_params.get('hd_gamma', 0.65)
+            film.hd_curve_params.toe_strength = physics_params.get('hd_toe_strength', 2.0)
+            film.hd_curve_params.shoulder_strength = physics_params.get('hd_shoulder_strength', 1.5)
+        
+        # 顆粒參數
+        film.grain_params.mode = physics_params.get('grain_mode', 'artistic')
+        film.grain_params.grain_size = physics_params.get('grain_size', 1.5)
+        film.grain_params.intensity = physics_params.get('grain_intensity', 0.8)
+        
+        # 互易律失效參數 (TASK-014)
+        if 'reciprocity_enabled' in physics_params:
+            film.reciprocity_params.enabled = physics_params.get('reciprocity_enabled', False)
+    
+    # 3. 調整顆粒強度（傳統 grain_style）
+    return adjust_grain_intensity(film, grain_style)
+
+
+def output_filename(film_type: str, physics_params: Optional[dict] = None) -> str:
+    """
+    生成輸出文件名（含時間戳）
+    
+    Args:
+        film_type: 胶片類型
+        physics_params: 物理模式參數字典（可選）
+        
+    Returns:
+        str: 輸出文件名
+    """
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    mode_suffix = physics_params.get('physics_mode').name.lower() if physics_params else "artistic"
+    return f"phos_{film_type.lower()}_{mode_suffix}_{timestamp}.jpg"
+
+
 def process_image(uploaded_image, film_type: str, grain_style: str, tone_style: str, 
                  physics_params: Optional[dict] = None,
                  use_film_spectra: bool = False, film_spectra_name: str = 'Portra400',
-                 film_illuminant: str = 'flat') -> Tuple[np.ndarray, float, str, np.ndarray]:
+                 film_illuminant: str = 'flat',
+                 profiler: Optional[PerformanceMonitor] = None,
+                 parallel_channels: Optional[bool] = None,
+                 seed: Optional[int] = None) -> Tuple[np.ndarray, float, str, np.ndarray, Tuple[int, int]]:
     """
     處理上傳的圖像
     
@@ -804,7 +917,7 @@ def process_image(uploaded_image, film_type: str, grain_style: str, tone_style:
     6. 應用光學效果
     
     Args:
-        uploaded_image: 上傳的圖像文件
+        uploaded_image: 上傳的圖像文件（檔案物件、檔案路徑或 bytes，見 modules.image_io.image_buffer）
         film_type: 胶片類型
         grain_style: 顆粒風格
         tone_style: Tone mapping 風格
@@ -821,9 +934,13 @@ def process_image(uploaded_image, film_type: str, grain_style: str, tone_style:
             - grain_size: float
             - grain_intensity: float
         film_illuminant: 光源 SPD 類型（'flat' 或 'D65'）
+        profiler: 階段剖析器（可選），額外記錄 decode / standardize / spectral_response，
+            並傳遞給 optical_processing()
+        parallel_channels: 是否並行處理 R/G/B 通道鏈（傳遞給 optical_processing()）
+        seed: 隨機種子（可選；設定 numpy 全域亂數，顆粒樣式可重現）
         
     Returns:
-        (處理後的圖像, 處理時間, 輸出文件名, 原始圖像)
+        (處理後的圖像, 處理時間, 輸出文件名, 原始圖像（顯示尺寸）, 原始圖像尺寸 (寬, 高))
         
     Raises:
         ValueError: 圖像讀取失敗或胶片類型無效
@@ -832,79 +949,127 @@ def process_image(uploaded_image, film_type: str, grain_style: str, tone_style:
     
     try:
         # 1. 讀取上傳的文件
-        file_bytes = np.asarray(bytearray(uploaded_image.read()), dtype=np.uint8)
-        image = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-        
-        if image is None:
-            raise ValueError("無法讀取圖像文件，請確保上傳的是有效的圖像格式")
+        with profile_stage(profiler, "decode"):
+            # 直接解碼上傳緩衝區（不複製）；大型 JPEG 以降解析度解碼（短邊仍 ≥ 標準尺寸），
+            # 見 modules.image_io
+            with image_buffer(uploaded_image) as file_bytes:
+                image, source_size = decode_image(file_bytes, STANDARD_IMAGE_SIZE)
         
-        # 保存原始圖片（用於對比顯示）
-        original_image = image.copy()
-        
-        # 2. 獲取胶片配置（使用快取）
-        film = get_cached_film_profile(film_type)
-        
-        # 3. 應用物理參數（如有提供）
-        if physics_params:
-            from dataclasses import replace
-            
-            # v0.7.0: physics_mode 固定為 PHYSICAL，無需設定
-            # film.physics_mode = physics_params.get('physics_mode', film.physics_mode)
-            
-            # Bloom 參數
-            film.bloom_params.mode = physics_params.get('bloom_mode', 'artistic')
-            film.bloom_params.threshold = physics_params.get('bloom_threshold', 0.8)
-            film.bloom_params.scattering_ratio = physics_params.get('bloom_scattering_ratio', 0.1)
-            
-            # H&D 曲線參數
-            film.hd_curve_params.enabled = physics_params.get('hd_enabled', False)
-            if film.hd_curve_params.enabled:
-                film.hd_curve_params.gamma = physics_params.get('hd_gamma', 0.65)
-                film.hd_curve_params.toe_strength = physics_params.get('hd_toe_strength', 2.0)
-                film.hd_curve_params.shoulder_strength = physics_params.get('hd_shoulder_strength', 1.5)
-            
-            # 顆粒參數
-            film.grain_params.mode = physics_params.get('grain_mode', 'artistic')
-            film.grain_params.grain_size = physics_params.get('grain_size', 1.5)
-            film.grain_params.intensity = physics_params.get('grain_intensity', 0.8)
-            
-            # 互易律失效參數 (TASK-014)
-            if 'reciprocity_enabled' in physics_params:
-                film.reciprocity_params.enabled = physics_params.get('reciprocity_enabled', False)
+        # 保存原始圖片（僅對比顯示用的縮小副本；全尺寸解碼結果於標準化後釋放）
+        original_image = display_image(image)
         
-        # 4. 調整顆粒強度（傳統 grain_style）
-        film = adjust_grain_intensity(film, grain_style)
+        # 2-4. 胶片配置（物理參數 + 顆粒強度）
+        film = prepare_film_profile(film_type, grain_style, physics_params)
         
         # 5. 標準化圖像尺寸
-        image = standardize(image)
+        with profile_stage(profiler, "standardize"):
+            image = standardize_decoded(image, source_size)
         
         # 6. 計算光度響應
-        response_r, response_g, response_b, response_total = spectral_response(image, film)
+        with profile_stage(profiler, "spectral_response"):
+            response_r, response_g, response_b, response_total = spectral_response(image, film)
         
         # 7. 應用光學處理
+        if seed is not None:
+            np.random.seed(seed)
         final_image = optical_processing(
             response_r, response_g, response_b, response_total, 
             film, grain_style, tone_style,
             use_film_spectra=use_film_spectra,
             film_spectra_name=film_spectra_name,
             film_illuminant=film_illuminant,
-            exposure_time=physics_params.get('exposure_time', 1.0) if physics_params else 1.0
+            exposure_time=physics_params.get('exposure_time', 1.0) if physics_params else 1.0,
+            profiler=profiler,
+            parallel_channels=parallel_channels
         )
         
         # 8. 生成輸出文件名
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        mode_suffix = physics_params.get('physics_mode').name.lower() if physics_params else "artistic"
-        output_path = f"phos_{film_type.lower()}_{mode_suffix}_{timestamp}.jpg"
+        output_path = output_filename(film_type, physics_params)
         
         process_time = time.time() - start_time
         
-        return final_image, process_time, output_path, original_image
+        return final_image, process_time, output_path, original_image, source_size
         
     except ValueError as e:
         raise e
     except Exception as e:
         raise ValueError(f"處理圖像時發生錯誤: {str(e)}")
 
+
+def render_uploaded_image(uploaded_image, film_type: str, grain_style: str, tone_style: str,
+                          physics_params: Optional[dict], physics_mode: PhysicsMode,
+                          seed: Optional[int] = None, profile_stages: bool = False,
+                          profile_memory: bool = False) -> str:
+    """
+    單張處理：查詢渲染快取或處理圖像，並顯示結果
+    
+    渲染快取以輸入雜湊 + 胶片配置 + 設定 + 種子為鍵（見 phos_cache），在解碼前查詢。
+    未固定種子時顆粒樣式每次不同，要求階段剖析時快取結果沒有剖析數據：
+    這兩種情況都重新處理，並以新的渲染 ID 編碼（不重用先前的編碼結果、不寫入快取）。
+    
+    Args:
+        uploaded_image: 上傳的圖像文件（見 process_image）
+        film_type: 胶片類型
+        grain_style: 顆粒風格
+        tone_style: Tone mapping 風格
+        physics_params: 物理模式參數字典（可選）
+        physics_mode: 物理模式（顯示用）
+        seed: 隨機種子（None = 未固定，不使用渲染快取）
+        profile_stages: 收集各階段剖析數據
+        profile_memory: 剖析時以 tracemalloc 追蹤記憶體
+        
+    Returns:
+        str: 渲染 ID（phos_output 服務中的編碼結果）
+    """
+    params = physics_params or {}
+    render_cache = get_render_cache()
+    with image_buffer(uploaded_image) as file_bytes:
+        digest = input_digest(file_bytes)
+    cache_key = render_key(
+        digest, prepare_film_profile(film_type, grain_style, physics_params),
+        {'film_type': film_type, 'grain_style': grain_style, 'tone_style': tone_style,
+         'physics_params': physics_params},
+        seed
+    )
+    use_cache = seed is not None and not profile_stages
+    cached = render_cache.get(cache_key) if use_cache else None
+    
+    if cached is not None:
+        get_output_service().put(cached.output)
+        st.caption(f"⚡ 相同照片、設定與顆粒種子（{seed}）的渲染快取（未重新處理）")
+        render_single_image_result(None, cached.process_time, physics_mode,
+                                   output_filename(film_type, physics_params),
+                                   render_id=cache_key, original_size=cached.original_size)
+        return cache_key
+    
+    # 處理圖像（側邊欄啟用診斷時收集各階段剖析數據）
+    profiler = None
+    if profile_stages:
+        profiler = PerformanceMonitor(track_memory=profile_memory,
+                                      label=getattr(uploaded_image, 'name', None))
+    try:
+        film_image, process_time, output_path, original_image, original_size = process_image(
+            uploaded_image, film_type, grain_style, tone_style, physics_params,
+            use_film_spectra=params.get('use_film_spectra', False),
+            film_spectra_name=params.get('film_spectra_name', 'Portra400'),
+            film_illuminant=params.get('film_illuminant', 'flat'),
+            profiler=profiler, seed=seed
+        )
+    finally:
+        if profiler is not None:
+            profiler.close()
+    
+    # 顯示結果（傳入原始圖片用於對比）
+    render_id = cache_key if use_cache else new_render_id()
+    render_single_image_result(film_image, process_time, physics_mode, output_path, original_image,
+                               profile=profiler.to_dict() if profiler is not None else None,
+                               render_id=render_id, original_size=original_size)
+    if use_cache:
+        render_cache.put(cache_key, CachedRender(get_output_service().get(cache_key),
+                                                 original_size, process_time))
+    return render_id
+
+
 # ==================== Streamlit 主界面 ====================
 
 # 初始化 session state
@@ -920,11 +1085,14 @@ sidebar_params = render_sidebar()
 processing_mode = sidebar_params['processing_mode']
 film_type = sidebar_params['film_type']
 grain_style = sidebar_params['grain_style']
+seed = sidebar_params['seed']
 tone_style = sidebar_params['tone_style']
 physics_mode = sidebar_params['physics_mode']
 physics_params = sidebar_params['physics_params']
 uploaded_image = sidebar_params['uploaded_image']
 uploaded_images = sidebar_params['uploaded_images']
+profile_stages = sidebar_params['profile_stages']
+profile_memory = sidebar_params['profile_memory']
 
 # 更新 session state
 st.session_state.processing_mode = processing_mode
@@ -934,16 +1102,9 @@ st.session_state.processing_mode = processing_mode
 # 單張處理模式
 if processing_mode == "單張處理" and uploaded_image is not None:
     try:
-        # 處理圖像
-        film_image, process_time, output_path, original_image = process_image(
-            uploaded_image, film_type, grain_style, tone_style, physics_params,
-            use_film_spectra=physics_params.get('use_film_spectra', False),
-            film_spectra_name=physics_params.get('film_spectra_name', 'Portra400'),
-            film_illuminant=physics_params.get('film_illuminant', 'flat')
-        )
-        
-        # 顯示結果（傳入原始圖片用於對比）
-        render_single_image_result(film_image, process_time, physics_mode, output_path, original_image)
+        render_uploaded_image(uploaded_image, film_type, grain_style, tone_style, physics_params,
+                              physics_mode, seed=seed, profile_stages=profile_stages,
+                              profile_memory=profile_memory)
         
     except ValueError as e:
         st.error(f"❌ 錯誤: {str(e)}")
@@ -960,7 +1121,9 @@ elif processing_mode == "批量處理" and uploaded_images is not None and len(u
         'use_film_spectra': physics_params.get('use_film_spectra', False),
         'film_spectra_name': physics_params.get('film_spectra_name', 'Portra400'),
         'film_illuminant': physics_params.get('film_illuminant', 'flat'),
-        'exposure_time': physics_params.get('exposure_time', 1.0)
+        'exposure_time': physics_params.get('exposure_time', 1.0),
+        'profile_stages': profile_stages,
+        'profile_memory': profile_memory
     }
 
     # 渲染批量處理 UI
@@ -0,0 +1,306 @@
+"""
+Phos - 數據資產包（Asset Pack）
+
+將 data/*.npz 光譜與查表數據（Smits 基底、CIE 1931、膠片光譜敏感度、
+Mie 查表）打包為單一未壓縮、帶版本與清單（manifest）的檔案，
+以記憶體映射（np.memmap）載入：
+
+- 無解壓縮：陣列直接是映射頁面上的唯讀視圖
+- 跨行程共享：批次 worker 與 UI 行程共用作業系統頁面快取
+- 與工作目錄無關：所有路徑以專案根目錄解析
+
+檔案格式（小端序）：
+    [0:8)    magic b"PHOSPAK\\0"
+    [8:12)   uint32 格式版本
+    [12:16)  保留
+    [16:24)  uint64 manifest 長度
+    [24:..)  manifest（UTF-8 JSON）
+    其後     各陣列原始位元組（64 位元組對齊，offset 記錄於 manifest）
+
+資產包為建構產物（已列入 .gitignore），以
+`python scripts/build_asset_pack.py` 產生；不存在或來源 npz 已更新時，
+load_asset() 自動退回直接讀取 npz。
+
+Version: 0.8.4
+"""
+
+import hashlib
+import json
+import os
+import struct
+import warnings
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+__all__ = [
+    'DATA_DIR',
+    'ASSET_PACK_PATH',
+    'ASSET_PACK_FORMAT_VERSION',
+    'ASSET_SOURCES',
+    'AssetPack',
+    'build_asset_pack',
+    'get_asset_pack',
+    'load_asset',
+    'resolve_data_path',
+]
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DATA_DIR = PROJECT_ROOT / "data"
+ASSET_PACK_PATH = DATA_DIR / "phos_assets.pack"
+
+ASSET_PACK_MAGIC = b"PHOSPAK\0"
+ASSET_PACK_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+_ALIGNMENT = 64
+
+# 資產名稱（= 來源 npz 檔名主幹）
+ASSET_SOURCES = (
+    'smits_basis_spectra',
+    'cie_1931_31points',
+    'film_spectral_sensitivity',
+    'mie_lookup_table_v2',
+    'mie_lookup_table_v3',
+)
+
+
+def resolve_data_path(path: Union[str, Path]) -> Path:
+    """
+    解析數據檔路徑（相對路徑不存在於工作目錄時，改以專案根目錄解析）
+
+    Args:
+        path: 檔案路徑（如 "data/mie_lookup_table_v3.npz"）
+
+    Returns:
+        Path: 解析後的路徑（兩者皆不存在時返回原路徑）
+    """
+    path = Path(path)
+    if path.is_absolute() or path.exists():
+        return path
+    candidate = PROJECT_ROOT / path
+    return candidate if candidate.exists() else path
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+# ============================================================
+# 建構
+# ============================================================
+
+def build_asset_pack(output: Union[str, Path] = ASSET_PACK_PATH,
+                     data_dir: Union[str, Path] = DATA_DIR,
+                     sources=ASSET_SOURCES) -> dict:
+    """
+    將 npz 數據打包為單一記憶體映射資產包
+
+    object 陣列（如 Mie 查表的 metadata 字典）無法映射，不打包，
+    記錄於 manifest 的 'skipped'。
+
+    Args:
+        output: 輸出路徑
+        data_dir: 來源 npz 目錄
+        sources: 資產名稱（npz 檔名主幹）
+
+    Returns:
+        dict: 寫入的 manifest
+
+    Raises:
+        FileNotFoundError: 來源 npz 不存在
+    """
+    output, data_dir = Path(output), Path(data_dir)
+    arrays = []
+    manifest = {
+        'format_version': ASSET_PACK_FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'sources': {},
+        'assets': {},
+    }
+
+    for name in sources:
+        npz_path = data_dir / f"{name}.npz"
+        raw = npz_path.read_bytes()
+        stat = npz_path.stat()
+        manifest['sources'][name] = {
+            'file': npz_path.name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': hashlib.sha256(raw).hexdigest(),
+        }
+        entries, skipped = {}, []
+        with np.load(npz_path, allow_pickle=True) as data:
+            for key in data.files:
+                array = data[key]
+                if array.dtype.hasobject:
+                    skipped.append(key)
+                    continue
+                array = np.ascontiguousarray(array)
+                entries[key] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+                arrays.append((entries[key], array))
+        manifest['assets'][name] = {'arrays': entries, 'skipped': skipped}
+
+    # 內容版本：所有來源雜湊的雜湊
+    digest = hashlib.sha256()
+    for name in sources:
+        digest.update(manifest['sources'][name]['sha256'].encode())
+    manifest['pack_version'] = digest.hexdigest()[:16]
+
+    # manifest 含各陣列 offset，其長度又決定資料起點：迭代至起點不再變動
+    data_start = 0
+    for _ in range(4):
+        offset = data_start
+        for entry, array in arrays:
+            offset = _align(offset)
+            entry['offset'] = offset
+            offset += array.nbytes
+        manifest_bytes = json.dumps(manifest, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        new_start = _align(_HEADER.size + len(manifest_bytes))
+        if new_start == data_start:
+            break
+        data_start = new_start
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(ASSET_PACK_MAGIC, ASSET_PACK_FORMAT_VERSION, 0, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        for entry, array in arrays:
+            f.write(b"\0" * (entry['offset'] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, output)
+    get_asset_pack.cache_clear()
+    return manifest
+
+
+# ============================================================
+# 載入
+# ============================================================
+
+class AssetPack:
+    """
+    已開啟的資產包（唯讀記憶體映射）
+
+    Args:
+        path: 資產包路徑
+
+    Raises:
+        ValueError: 檔案格式或版本不符
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            magic, version, _, manifest_len = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != ASSET_PACK_MAGIC:
+                raise ValueError(f"不是 Phos 資產包: {self.path}")
+            if version != ASSET_PACK_FORMAT_VERSION:
+                raise ValueError(
+                    f"資產包格式版本不符: {version}（需要 {ASSET_PACK_FORMAT_VERSION}），"
+                    f"請重新執行 scripts/build_asset_pack.py"
+                )
+            self.manifest = json.loads(f.read(manifest_len).decode('utf-8'))
+        self._map = np.memmap(self.path, dtype=np.uint8, mode='r')
+        self._stale_warned = set()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.manifest['assets']
+
+    @property
+    def version(self) -> str:
+        return self.manifest['pack_version']
+
+    def is_fresh(self, name: str, source: Optional[Path] = None) -> bool:
+        """
+        資產是否可代替來源 npz
+
+        來源路徑須指向打包時的同一檔案；來源仍存在時以大小與修改時間
+        檢查是否已更新（更新後發出一次警告並返回 False）。
+        """
+        if name not in self:
+            return False
+        info = self.manifest['sources'][name]
+        expected = self.path.parent / info['file']
+        if source is not None and Path(source).resolve() != expected.resolve():
+            return False
+        try:
+            stat = expected.stat()
+        except FileNotFoundError:
+            return True  # 僅部署資產包
+        if stat.st_size != info['size'] or stat.st_mtime_ns != info['mtime_ns']:
+            if name not in self._stale_warned:
+                self._stale_warned.add(name)
+                warnings.warn(
+                    f"資產包中的 {name} 已過期（來源 {info['file']} 已更新），改讀取 npz；"
+                    f"請重新執行 scripts/build_asset_pack.py"
+                )
+            return False
+        return True
+
+    def arrays(self, name: str) -> Dict[str, np.ndarray]:
+        """
+        取得資產的所有陣列（唯讀記憶體映射視圖，不複製）
+
+        Raises:
+            KeyError: 資產不存在
+        """
+        if name not in self:
+            raise KeyError(f"資產包中沒有 {name}. 可用: {', '.join(self.manifest['assets'])}")
+        return {
+            key: np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']),
+                            buffer=self._map, offset=entry['offset'])
+            for key, entry in self.manifest['assets'][name]['arrays'].items()
+        }
+
+
+@lru_cache(maxsize=4)
+def get_asset_pack(path: Union[str, Path] = ASSET_PACK_PATH) -> Optional[AssetPack]:
+    """
+    開啟資產包（每個行程每個路徑僅開啟一次）
+
+    Returns:
+        Optional[AssetPack]: 不存在或格式不符時為 None（後者發出警告）
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        return AssetPack(path)
+    except (OSError, ValueError, json.JSONDecodeError, struct.error) as e:
+        warnings.warn(f"無法開啟資產包 {path}，改讀取 npz: {e}")
+        return None
+
+
+def load_asset(name: str, path: Optional[Union[str, Path]] = None,
+               pack_path: Union[str, Path] = ASSET_PACK_PATH) -> Dict[str, np.ndarray]:
+    """
+    載入一組數據陣列（優先使用資產包）
+
+    Args:
+        name: 資產名稱（npz 檔名主幹，如 'cie_1931_31points'）
+        path: 來源 npz 路徑（預設 data/<name>.npz；相對路徑依 resolve_data_path 解析）
+        pack_path: 資產包路徑
+
+    Returns:
+        Dict[str, np.ndarray]: 陣列名稱 → 陣列（來自資產包時為唯讀視圖）；
+        object 陣列不包含在內
+
+    Raises:
+        FileNotFoundError: 資產包不可用且 npz 不存在
+    """
+    source = resolve_data_path(path) if path is not None else DATA_DIR / f"{name}.npz"
+    pack = get_asset_pack(pack_path)
+    if pack is not None and pack.is_fresh(name, source):
+        return pack.arrays(name)
+
+    arrays = {}
+    with np.load(source, allow_pickle=True) as data:
+        for key in data.files:
+            array = data[key]
+            if not array.dtype.hasobject:
+                arrays[key] = array
+    return arrays
@@ -20,6 +20,7 @@ import cv2
 import warnings
 
 from film_models import BloomParams
+from modules.pointwise import pointwise
 
 
 # ==================== 抽象基類 ====================
@@ -123,8 +124,7 @@ class ArtisticBloomStrategy(BloomStrategy):
         
         # 1. 創建權重（高光區域權重更高）
         # 假設：lux² 讓高光響應非線性增強
-        weights = (base + lux ** 2) * sens
-        weights = np.clip(weights, 0, 1)
+        weights = pointwise('artistic_weights', x=lux, base=base, sensitivity=sens)
         
         # 2. 計算模糊核大小（必須為奇數）
         ksize = rads * blur_scale
@@ -138,10 +138,7 @@ class ArtisticBloomStrategy(BloomStrategy):
         )
         
         # 4. 應用光暈（避免過曝）
-        bloom_effect = bloom_layer * weights * strg
-        bloom_effect = bloom_effect / (1.0 + bloom_effect)
-        
-        return bloom_effect
+        return pointwise('artistic_glow', bloom=bloom_layer, weights=weights, strength=strg)
 
 
 # ==================== Physical 策略 ====================
@@ -190,14 +187,12 @@ class PhysicalBloomStrategy(BloomStrategy):
             4. 能量守恆正規化
             5. 重組：lux - E_scatter + PSF(E_scatter)
         """
-        # 1. 提取高光區域（超過閾值才散射）
-        threshold = self.params.threshold
-        highlights = np.maximum(lux - threshold, 0)
-        
-        # 2. 計算散射能量（比例）
+        # 1-2. 提取高光區域（超過閾值才散射）並計算散射能量（比例）
         # 假設：散射比例恆定（不隨亮度變化）
-        scattering_ratio = self.params.scattering_ratio
-        scattered_energy = highlights * scattering_ratio
+        scattered_energy = pointwise(
+            'scatter_highlights', x=lux,
+            threshold=self.params.threshold, eta=self.params.scattering_ratio
+        )
         
         # 3. 應用點擴散函數（PSF）
         ksize = self.params.radius * blur_scale
@@ -215,9 +210,7 @@ class PhysicalBloomStrategy(BloomStrategy):
             self._verify_energy_conservation(lux, scattered_energy, bloom_layer)
         
         # 5. 能量重分配：原始 - 散射 + 重新分布
-        result = lux - scattered_energy + bloom_layer
-        
-        return np.clip(result, 0, 1)
+        return pointwise('bloom_recombine', x=lux, scattered=scattered_energy, bloom=bloom_layer)
     
     def _apply_psf(
         self, 
@@ -360,9 +353,8 @@ class MieCorrectedBloomStrategy(BloomStrategy):
         # 3. 確定核心/尾部能量分配 ρ(λ)
         ρ = self._compute_core_fraction(wavelength)
         
-        # 4. 提取高光區域
-        highlights = np.maximum(lux - self.params.threshold, 0)
-        scattered_energy = highlights * η_λ
+        # 4. 提取高光區域並計算散射能量
+        scattered_energy = pointwise('scatter_highlights', x=lux, threshold=self.params.threshold, eta=η_λ)
         
         # 5. 應用雙段 PSF
         if self.params.psf_dual_segment:
@@ -392,9 +384,7 @@ class MieCorrectedBloomStrategy(BloomStrategy):
                 bloom_layer = bloom_layer * (total_in / total_out)
         
         # 7. 能量重分配
-        result = lux - scattered_energy + bloom_layer
-        
-        return np.clip(result, 0, 1)
+        return pointwise('bloom_recombine', x=lux, scattered=scattered_energy, bloom=bloom_layer)
     
     def _compute_energy_fraction(self, wavelength: float) -> float:
         """
@@ -6,6 +6,7 @@
 2. Spectrum ↔ XYZ 轉換（CIE 1931）
 3. XYZ ↔ RGB 轉換（sRGB/AdobeRGB）
 4. 光譜積分運算
+5. CIELAB / CIEDE2000 色差
 
 Version: 0.4.0
 Author: Phos Development Team
@@ -96,13 +97,11 @@ def _load_cie_data():
     if _CIE_DATA_LOADED:
         return  # 已載入，跳過
     
-    from pathlib import Path
-    
-    # 嘗試載入 NPZ
-    npz_path = Path(__file__).parent / "data" / "cie_1931_31points.npz"
+    from asset_pack import load_asset
     
+    # 嘗試載入（資產包優先，否則 NPZ）
     try:
-        data = np.load(npz_path)
+        data = load_asset('cie_1931_31points')
         
         # 載入 CIE 色彩匹配函數
         CIE_X_BAR = data['x_bar'].astype(np.float32)
@@ -155,13 +154,11 @@ def _load_basis_spectra():
     if _BASIS_SPECTRA_LOADED:
         return  # 已載入，跳過
     
-    from pathlib import Path
-    
-    # 嘗試載入 NPZ
-    npz_path = Path(__file__).parent / "data" / "smits_basis_spectra.npz"
+    from asset_pack import load_asset
     
+    # 嘗試載入（資產包優先，否則 NPZ）
     try:
-        data = np.load(npz_path)
+        data = load_asset('smits_basis_spectra')
         
         # 載入 7 個基底
         BASIS_SPECTRA['white'] = data['white']
@@ -231,13 +228,11 @@ def _load_film_spectra():
     if _FILM_SPECTRA_LOADED:
         return  # 已載入，跳過
     
-    from pathlib import Path
-    
-    # 嘗試載入 NPZ
-    npz_path = Path(__file__).parent / "data" / "film_spectral_sensitivity.npz"
+    from asset_pack import load_asset
     
+    # 嘗試載入（資產包優先，否則 NPZ）
     try:
-        data = np.load(npz_path)
+        data = load_asset('film_spectral_sensitivity')
         
         # 載入 4 款膠片的光譜敏感度曲線
         films = ['Portra400', 'Velvia50', 'Cinestill800T', 'HP5Plus400']
@@ -779,7 +774,125 @@ def get_basis_spectra() -> Dict[str, np.ndarray]:
 
 
 # ============================================================
-# 9. 模組資訊
+# 9. 色差（CIELAB / CIEDE2000）
+# ============================================================
+
+# D65 參考白點（Y = 1 尺度，與 rgb_to_xyz 輸出一致）
+D65_WHITE_XYZ = np.array([0.95047, 1.0, 1.08883], dtype=np.float64)
+
+
+def xyz_to_lab(xyz: np.ndarray, white: np.ndarray = D65_WHITE_XYZ) -> np.ndarray:
+    """
+    將 XYZ 轉換為 CIELAB
+    
+    Args:
+        xyz: XYZ 色彩 (..., 3)，Y = 1 尺度
+        white: 參考白點 XYZ (3,)
+    
+    Returns:
+        lab: CIELAB (..., 3)，L* 範圍 0-100
+    """
+    t = np.asarray(xyz, dtype=np.float64) / white
+    delta = 6.0 / 29.0
+    f = np.where(t > delta ** 3, np.cbrt(t), t / (3 * delta ** 2) + 4.0 / 29.0)
+    
+    lab = np.empty_like(f)
+    lab[..., 0] = 116.0 * f[..., 1] - 16.0
+    lab[..., 1] = 500.0 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200.0 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """
+    將 sRGB（0-1，含 Gamma）轉換為 CIELAB（D65）
+    
+    Args:
+        rgb: sRGB 色彩 (..., 3)，範圍 0-1
+    
+    Returns:
+        lab: CIELAB (..., 3)
+    """
+    rgb = np.asarray(rgb, dtype=np.float64)
+    xyz = rgb_to_xyz(rgb.reshape(-1, 1, 3)).reshape(rgb.shape)
+    return xyz_to_lab(xyz)
+
+
+def delta_e_ciede2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """
+    計算 CIEDE2000 色差（kL = kC = kH = 1）
+    
+    Args:
+        lab1: CIELAB (..., 3)
+        lab2: CIELAB (..., 3)
+    
+    Returns:
+        delta_e: ΔE00 (...)
+    
+    參考：
+        Sharma, Wu & Dalal (2005), "The CIEDE2000 Color-Difference Formula:
+        Implementation Notes, Supplementary Test Data, and Mathematical Observations"
+    """
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+    
+    # a' 修正（中性軸附近的藍色區域補償）
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0
+    C_bar7 = C_bar ** 7
+    G = 0.5 * (1.0 - np.sqrt(C_bar7 / (C_bar7 + 25.0 ** 7)))
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360.0
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360.0
+    
+    # 明度、彩度、色相差
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    chroma_zero = (C1p * C2p) == 0
+    dh = h2p - h1p
+    dh = np.where(dh > 180.0, dh - 360.0, np.where(dh < -180.0, dh + 360.0, dh))
+    dh = np.where(chroma_zero, 0.0, dh)
+    dHp = 2.0 * np.sqrt(C1p * C2p) * np.sin(np.radians(dh) / 2.0)
+    
+    # 平均值
+    Lp_bar = (L1 + L2) / 2.0
+    Cp_bar = (C1p + C2p) / 2.0
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        np.abs(h1p - h2p) <= 180.0,
+        h_sum / 2.0,
+        np.where(h_sum < 360.0, (h_sum + 360.0) / 2.0, (h_sum - 360.0) / 2.0)
+    )
+    hp_bar = np.where(chroma_zero, h_sum, hp_bar)
+    
+    # 權重函數
+    T = (1.0
+         - 0.17 * np.cos(np.radians(hp_bar - 30.0))
+         + 0.24 * np.cos(np.radians(2.0 * hp_bar))
+         + 0.32 * np.cos(np.radians(3.0 * hp_bar + 6.0))
+         - 0.20 * np.cos(np.radians(4.0 * hp_bar - 63.0)))
+    d_theta = 30.0 * np.exp(-(((hp_bar - 275.0) / 25.0) ** 2))
+    Cp_bar7 = Cp_bar ** 7
+    R_C = 2.0 * np.sqrt(Cp_bar7 / (Cp_bar7 + 25.0 ** 7))
+    S_L = 1.0 + 0.015 * (Lp_bar - 50.0) ** 2 / np.sqrt(20.0 + (Lp_bar - 50.0) ** 2)
+    S_C = 1.0 + 0.045 * Cp_bar
+    S_H = 1.0 + 0.015 * Cp_bar * T
+    R_T = -np.sin(np.radians(2.0 * d_theta)) * R_C
+    
+    return np.sqrt(
+        (dLp / S_L) ** 2
+        + (dCp / S_C) ** 2
+        + (dHp / S_H) ** 2
+        + R_T * (dCp / S_C) * (dHp / S_H)
+    )
+
+
+# ============================================================
+# 10. 模組資訊
 # ============================================================
 
 __version__ = '0.4.1'
@@ -797,6 +910,9 @@ __all__ = [
     # 積分工具
     'integrate_spectrum',
     
+    # 色差
+    'D65_WHITE_XYZ', 'xyz_to_lab', 'srgb_to_lab', 'delta_e_ciede2000',
+    
     # 測試工具
     'test_roundtrip_error', 'test_film_color_shift',
     
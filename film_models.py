@@ -10,9 +10,18 @@ Version: 0.2.1 (Physical Improvements)
 - 新增顆粒參數擴展（GrainParams）
 """
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, List
 from enum import Enum
+import dataclasses
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import tomllib
 import warnings
 import numpy as np
 
@@ -927,6 +936,14 @@ class WavelengthBloomParams:
     mie_lookup_path: Optional[str] = "data/mie_lookup_table_v3.npz"  # 查表路徑
     iso_value: int = 400  # ISO 值（用於查表插值）
     
+    # === 連續光譜散射（v0.8.4+）===
+    # "rgb": 僅在 lambda_r/g/b 三個波長散射（預設，向後相容）
+    # "spectral": 在 400-700nm 多個波長 bin 積分，PSF 相近的 bin 聚類為少數代表核
+    spectral_mode: str = "rgb"
+    spectral_bins: int = 31  # 波長 bin 數（與 31 點光譜一致）
+    channel_bandwidth_nm: float = 35.0  # 各通道光譜帶寬（高斯 σ，nm）
+    psf_cluster_tolerance: float = 0.02  # 聚類容差（成員 PSF 與代表核的 L1 距離上限）
+    
     def __post_init__(self):
         """
         驗證波長依賴散射參數的物理合理性
@@ -966,6 +983,16 @@ class WavelengthBloomParams:
         if self.use_mie_lookup:
             assert 25 <= self.iso_value <= 6400, \
                 f"iso_value = {self.iso_value} 超出範圍 [25, 6400]（Mie 查表插值範圍）"
+        
+        # 假設 7：連續光譜模式參數
+        assert self.spectral_mode in ("rgb", "spectral"), \
+            f"spectral_mode = {self.spectral_mode!r} 無效（可用: 'rgb', 'spectral'）"
+        assert 2 <= self.spectral_bins <= 301, \
+            f"spectral_bins = {self.spectral_bins} 超出範圍 [2, 301]"
+        assert 5.0 <= self.channel_bandwidth_nm <= 150.0, \
+            f"channel_bandwidth_nm = {self.channel_bandwidth_nm:.1f}nm 超出範圍 [5, 150]nm"
+        assert 0.0 <= self.psf_cluster_tolerance <= 2.0, \
+            f"psf_cluster_tolerance = {self.psf_cluster_tolerance:.3f} 超出範圍 [0, 2]（L1 距離上限為 2）"
 
 
 @dataclass
@@ -1892,1115 +1919,355 @@ def create_film_profile_from_iso(
     return profile
 
 
-def create_film_profiles() -> dict:
+# ==================== 胶片數據檔（data/films/*.toml）====================
+# 每款胶片一個 TOML 數據檔（格式見 data/films/README.md）。
+# 變體以 `extends = "<基礎胶片>"` 繼承並覆蓋欄位；編譯結果（已解析繼承的
+# 規格表）以數據檔雜湊為鍵快取於 data/films/__cache__/，啟動時直接載入。
+
+FILM_DATA_DIR = Path(__file__).resolve().parent / "data" / "films"
+FILM_CACHE_DIR = FILM_DATA_DIR / "__cache__"
+
+# 規格格式版本（變更編譯邏輯或欄位語意時遞增，使舊快取失效）
+FILM_SPEC_FORMAT_VERSION = 1
+
+# 頂層純量欄位（對應 FilmProfile 同名欄位）
+_FILM_SPEC_SCALARS = (
+    'name', 'color_type', 'sensitivity_factor', 'physics_mode',
+    'display_name', 'brand', 'film_type', 'iso_rating', 'description', 'features', 'best_for',
+)
+
+# 表格欄位 → 參數類
+_FILM_SPEC_TABLES = {
+    'red_layer': EmulsionLayer,
+    'green_layer': EmulsionLayer,
+    'blue_layer': EmulsionLayer,
+    'panchromatic_layer': EmulsionLayer,
+    'tone_params': ToneMappingParams,
+    'hd_curve_params': HDCurveParams,
+    'bloom_params': BloomParams,
+    'grain_params': GrainParams,
+    'halation_params': HalationParams,
+    'wavelength_bloom_params': WavelengthBloomParams,
+    'reciprocity_params': ReciprocityFailureParams,
+}
+
+# 推導表格 → 推導函數（同檔案中的顯式表格優先於推導結果）
+_FILM_SPEC_FACTORIES = {
+    'medium_physics': create_default_medium_physics_params,
+    'bw_hd_curve': create_bw_hd_curve_params,
+}
+
+# 繼承指令（編譯後移除）
+_FILM_SPEC_DIRECTIVES = ('extends', 'reset')
+
+
+def _validate_film_spec(name: str, spec: dict, source: str):
+    """檢查數據檔欄位（未知欄位、表格內未知參數）"""
+    for key, value in spec.items():
+        if key in _FILM_SPEC_SCALARS or key in _FILM_SPEC_DIRECTIVES:
+            continue
+        if key in _FILM_SPEC_TABLES:
+            allowed = {f.name for f in dataclasses.fields(_FILM_SPEC_TABLES[key])}
+        elif key in _FILM_SPEC_FACTORIES:
+            allowed = set(inspect.signature(_FILM_SPEC_FACTORIES[key]).parameters) - {'film_name'}
+        else:
+            raise ValueError(f"胶片數據檔 {source} 含未知欄位: {key}")
+        if not isinstance(value, dict):
+            raise ValueError(f"胶片數據檔 {source} 的 {key} 必須是表格")
+        unknown = sorted(set(value) - allowed)
+        if unknown:
+            raise ValueError(f"胶片數據檔 {source} 的 [{key}] 含未知參數: {', '.join(unknown)}")
+
+
+def _merge_film_spec(parent: dict, child: dict) -> dict:
+    """合併繼承：純量覆蓋，表格逐參數覆蓋"""
+    merged = {key: dict(value) if isinstance(value, dict) else value for key, value in parent.items()}
+    for key, value in child.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def compile_film_specs(data_dir: Path = FILM_DATA_DIR) -> Dict[str, dict]:
     """
-    創建所有胶片配置
+    讀取並編譯所有胶片數據檔（解析繼承、驗證欄位）
     
+    Args:
+        data_dir: 數據檔目錄
+        
     Returns:
-        包含所有可用胶片配置的字典
+        Dict[str, dict]: 胶片名稱 → 已解析的規格（依名稱排序）
+        
+    Raises:
+        ValueError: 欄位錯誤、名稱與檔名不符、繼承目標不存在或循環繼承
     """
-    profiles = {}
-    
-    # NC200 - 彩色負片（靈感來自富士 C200）
-    # P1-2: 傳統顆粒，standard 類型
-    bloom_params_nc, halation_params_nc, wavelength_params_nc = create_default_medium_physics_params(
-        film_name="NC200", has_ah_layer=True, iso=200, film_type="standard"
-    )
-    
-    profiles["NC200"] = FilmProfile(
-        name="NC200",
-        display_name="NC200",
-        brand="Fujifilm C200 風格",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 200",
-        description="經典富士色調，萬用平衡底片。色彩自然清新，適合日常拍攝。",
-        features=["✓ 平衡色彩", "✓ 適中顆粒", "✓ 萬用場景"],
-        best_for="日常記錄、旅行、人像",
-        color_type="color",
-        sensitivity_factor=1.20,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.762, g_response_weight=0.095, b_response_weight=0.143,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.48, direct_weight=0.95, response_curve=1.18, grain_intensity=0.18
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.059, g_response_weight=0.773, b_response_weight=0.169,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.02, direct_weight=0.80, response_curve=1.02, grain_intensity=0.18
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.062, g_response_weight=0.070, b_response_weight=0.867,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.02, direct_weight=0.88, response_curve=0.78, grain_intensity=0.18
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.25, g_response_weight=0.35, b_response_weight=0.35,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.08
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.05, shoulder_strength=0.15, linear_strength=0.50,
-            linear_angle=0.10, toe_strength=0.20, toe_numerator=0.02, toe_denominator=0.30
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_nc,
-        halation_params=halation_params_nc,
-        wavelength_bloom_params=wavelength_params_nc
-    )
-    
-    # FS200 - 黑白正片（靈感來自 Fomapan 200）
-    hd_fs200 = create_bw_hd_curve_params(film_name="FS200", contrast="normal")
-    
-    profiles["FS200"] = FilmProfile(
-        name="FS200",
-        display_name="FS200",
-        brand="實驗性",
-        film_type="⚫ 黑白正片",
-        iso_rating="ISO 200",
-        description="高對比度黑白正片。實驗性模型，強烈對比效果。",
-        features=["✓ 超高對比", "✓ 實驗風格", "✓ 正片特性"],
-        best_for="實驗性創作、高對比場景",
-        color_type="single",
-        sensitivity_factor=1.0,
-        red_layer=None,
-        green_layer=None,
-        blue_layer=None,
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.15, g_response_weight=0.35, b_response_weight=0.45,
-            diffuse_weight=2.33, direct_weight=0.85, response_curve=1.15, grain_intensity=0.20
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.2, shoulder_strength=0.15, linear_strength=0.50,
-            linear_angle=0.10, toe_strength=0.20, toe_numerator=0.02, toe_denominator=0.30
-        ),
-        # 黑白物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        hd_curve_params=hd_fs200
-    )
-    
-    # AS100 - 黑白膠片（靈感來自富士 ACROS 100）
-    hd_as100 = create_bw_hd_curve_params(film_name="AS100", contrast="low")  # 低對比，適合後製
-    
-    profiles["AS100"] = FilmProfile(
-        name="AS100",
-        display_name="ACROS 100",
-        brand="Fujifilm",
-        film_type="⚫ 黑白負片",
-        iso_rating="ISO 100",
-        description="灰階細膩，顆粒柔和。富士經典黑白片，中間調豐富。",
-        features=["✓ 細膩灰階", "✓ 柔和顆粒", "✓ 豐富層次"],
-        best_for="風景、建築、靜物",
-        color_type="single",
-        sensitivity_factor=1.28,
-        red_layer=None,
-        green_layer=None,
-        blue_layer=None,
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.30, g_response_weight=0.12, b_response_weight=0.45,
-            diffuse_weight=1.0, direct_weight=1.05, response_curve=1.25, grain_intensity=0.10
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.0, shoulder_strength=0.15, linear_strength=0.50,
-            linear_angle=0.25, toe_strength=0.35, toe_numerator=0.02, toe_denominator=0.35
-        ),
-        # 黑白物理模式（低對比）
-        physics_mode=PhysicsMode.PHYSICAL,
-        hd_curve_params=hd_as100
-    )
-    
-    # Portra400 - 人像王者（靈感來自 Kodak Portra 400）
-    # P1-2: T-Grain 技術，fine-grain 類型
-    bloom_params_p400, halation_params_p400, wavelength_params_p400 = create_default_medium_physics_params(
-        film_name="Portra400", has_ah_layer=True, iso=400, film_type="fine_grain"
-    )
-    
-    profiles["Portra400"] = FilmProfile(
-        name="Portra400",
-        display_name="Portra 400",
-        brand="Kodak",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 400",
-        description="人像攝影之王。細膩膚色還原，極低顆粒，柔和色調。",
-        features=["✓ 細膩膚色", "✓ 超低顆粒", "✓ 柔和色調"],
-        best_for="人像、婚禮、時尚攝影",
-        color_type="color",
-        sensitivity_factor=1.35,
-        # v0.4.2 校正光譜響應係數（混合策略：行歸一化 + 適度增強對角線）
-        # 效果：灰階偏差從 0.110 降至 0.000，對角主導從 4.06 提升至 5.00
-        red_layer=EmulsionLayer(
-            r_response_weight=0.801, g_response_weight=0.079, b_response_weight=0.119,
-            diffuse_weight=1.25, direct_weight=1.00, response_curve=1.12, grain_intensity=0.12
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.045, g_response_weight=0.806, b_response_weight=0.149,
-            diffuse_weight=0.95, direct_weight=0.90, response_curve=1.05, grain_intensity=0.12
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.041, g_response_weight=0.066, b_response_weight=0.893,
-            diffuse_weight=0.90, direct_weight=0.92, response_curve=0.85, grain_intensity=0.12
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.286, g_response_weight=0.408, b_response_weight=0.306,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.06
-        ),
-        tone_params=ToneMappingParams(
-            gamma=1.95, shoulder_strength=0.12, linear_strength=0.55,
-            linear_angle=0.15, toe_strength=0.18, toe_numerator=0.01, toe_denominator=0.28
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_p400,
-        halation_params=halation_params_p400,
-        wavelength_bloom_params=wavelength_params_p400,
-        # TASK-014: Reciprocity Failure 參數（Kodak Portra 400）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,  # 預設關閉，UI 手動啟用
-            p_red=0.93,     # 紅色層 Schwarzschild 指數
-            p_green=0.90,   # 綠色層
-            p_blue=0.87,    # 藍色層（失效最嚴重）
-            t_critical_high=1.0,      # 1秒後開始顯著失效
-            failure_strength=0.8,     # 中等失效強度
-            decay_coefficient=0.04    # 衰減係數
-        )
-    )
-    
-    # Ektar100 - 風景利器（靈感來自 Kodak Ektar 100）
-    # P1-2: 極細顆粒，fine-grain 類型
-    bloom_params_e100, halation_params_e100, wavelength_params_e100 = create_default_medium_physics_params(
-        film_name="Ektar100", has_ah_layer=True, iso=100, film_type="fine_grain"
-    )
-    
-    profiles["Ektar100"] = FilmProfile(
-        name="Ektar100",
-        display_name="Ektar 100",
-        brand="Kodak",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 100",
-        description="風景攝影利器。極高飽和度，超細顆粒，色彩鮮豔飽滿。",
-        features=["✓ 極高飽和", "✓ 極細顆粒", "✓ 高銳度"],
-        best_for="風景、建築、產品攝影",
-        color_type="color",
-        sensitivity_factor=1.10,
-        # v0.4.2 校正光譜響應係數（混合策略）
-        # 效果：灰階偏差從 0.080 降至 0.000，對角主導從 5.09 提升至 6.21
-        red_layer=EmulsionLayer(
-            r_response_weight=0.838, g_response_weight=0.065, b_response_weight=0.097,
-            diffuse_weight=1.15, direct_weight=1.10, response_curve=1.25, grain_intensity=0.08
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.038, g_response_weight=0.827, b_response_weight=0.135,
-            diffuse_weight=0.88, direct_weight=0.95, response_curve=1.15, grain_intensity=0.08
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.032, g_response_weight=0.049, b_response_weight=0.919,
-            diffuse_weight=0.85, direct_weight=1.00, response_curve=0.90, grain_intensity=0.08
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.300, g_response_weight=0.380, b_response_weight=0.320,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.04
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.15, shoulder_strength=0.18, linear_strength=0.52,
-            linear_angle=0.12, toe_strength=0.22, toe_numerator=0.015, toe_denominator=0.32
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_e100,
-        halation_params=halation_params_e100,
-        wavelength_bloom_params=wavelength_params_e100,
-        # TASK-014: Reciprocity Failure 參數（Kodak Ektar 100）
-        # 註：Ektar 100 採用 T-Grain 技術，失效特性與 Portra 類似但略低
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.94,     # ISO 100 失效較低
-            p_green=0.91,
-            p_blue=0.88,
-            t_critical_high=2.0,      # ISO 100 臨界時間較長
-            failure_strength=0.7,     # 失效強度較低
-            decay_coefficient=0.03
-        )
-    )
-    
-    # HP5Plus400 - 經典黑白（靈感來自 Ilford HP5 Plus 400）
-    hd_hp5 = create_bw_hd_curve_params(film_name="HP5Plus400", contrast="normal")
-    
-    profiles["HP5Plus400"] = FilmProfile(
-        name="HP5Plus400",
-        display_name="HP5 Plus 400",
-        brand="Ilford",
-        film_type="⚫ 黑白負片",
-        iso_rating="ISO 400",
-        description="經典黑白片。明顯顆粒，高對比，街拍常青樹。",
-        features=["✓ 明顯顆粒", "✓ 高對比度", "✓ 經典風格"],
-        best_for="街拍、紀實、人文攝影",
-        color_type="single",
-        sensitivity_factor=1.42,
-        red_layer=None,
-        green_layer=None,
-        blue_layer=None,
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.28, g_response_weight=0.32, b_response_weight=0.38,
-            diffuse_weight=1.35, direct_weight=0.98, response_curve=1.18, grain_intensity=0.22
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.1, shoulder_strength=0.16, linear_strength=0.48,
-            linear_angle=0.22, toe_strength=0.30, toe_numerator=0.025, toe_denominator=0.33
-        ),
-        # 黑白物理模式 (Phase 1)
-        physics_mode=PhysicsMode.PHYSICAL,
-        hd_curve_params=hd_hp5,
-        # TASK-014: Reciprocity Failure 參數（Ilford HP5 Plus 400）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_mono=0.87,              # 傳統黑白膠片，中高失效
-            t_critical_high=1.0,
-            failure_strength=1.0,
-            decay_coefficient=0.05
-        )
-    )
-    
-    # Cinestill800T - 電影感（靈感來自 CineStill 800T）
-    # 特色：移除 Anti-Halation 層，產生極端紅色光暈
-    # P1-2: 高速膠片，high-speed 類型
-    bloom_params_c800t, halation_params_c800t, wavelength_params_c800t = create_default_medium_physics_params(
-        film_name="Cinestill800T", has_ah_layer=False, iso=800, film_type="high_speed"  # 無 AH 層！
-    )
-    
-    profiles["Cinestill800T"] = FilmProfile(
-        name="Cinestill800T",
-        display_name="CineStill 800T",
-        brand="CineStill",
-        film_type="🎨 電影負片",
-        iso_rating="ISO 800",
-        description="電影感鎢絲燈片。強光暈效果，溫暖色調，夜景氛圍絕佳。",
-        features=["✓ 強烈光暈", "✓ 電影色調", "✓ 夜景專用"],
-        best_for="夜景、霓虹燈、電影感",
-        color_type="color",
-        sensitivity_factor=1.55,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.741, g_response_weight=0.111, b_response_weight=0.148,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.65, direct_weight=0.90, response_curve=1.10, grain_intensity=0.25
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.071, g_response_weight=0.731, b_response_weight=0.198,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.18, direct_weight=0.75, response_curve=0.95, grain_intensity=0.25
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.089, g_response_weight=0.111, b_response_weight=0.800,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.35, direct_weight=0.82, response_curve=0.70, grain_intensity=0.25
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.22, g_response_weight=0.30, b_response_weight=0.42,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.15
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.0, shoulder_strength=0.14, linear_strength=0.48,
-            linear_angle=0.08, toe_strength=0.25, toe_numerator=0.03, toe_denominator=0.28
-        ),
-        # 中階物理模式（無 AH 層，極端 Halation）
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_c800t,
-        halation_params=halation_params_c800t,
-        wavelength_bloom_params=wavelength_params_c800t,
-        # TASK-014: Reciprocity Failure 參數（CineStill 800T）
-        # 註：基於 Kodak Vision3 電影膠片，中等失效
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.91,               # ISO 800 中等失效
-            p_green=0.88,
-            p_blue=0.85,
-            t_critical_high=0.5,      # 高速膠片臨界時間短
-            failure_strength=0.9,
-            decay_coefficient=0.05
-        )
-    )
-    
-    # === Phase 1: 經典底片新增 (2025-12-19) ===
-    
-    # Velvia50 - 風景之王（靈感來自 Fujifilm Velvia 50）
-    # P1-2: 極低 ISO，極細顆粒，fine-grain 類型
-    bloom_params_v50, halation_params_v50, wavelength_params_v50 = create_default_medium_physics_params(
-        film_name="Velvia50", has_ah_layer=True, iso=50, film_type="fine_grain"
-    )
-    profiles["Velvia50"] = FilmProfile(
-        name="Velvia50",
-        display_name="Velvia 50",
-        brand="Fujifilm",
-        film_type="🎨 彩色反轉片",
-        iso_rating="ISO 50",
-        description="⭐ 風景之王。極致飽和度，深邃藍天，鮮豔花卉。富士經典正片。",
-        features=["✓ 極致飽和", "✓ 冷調偏向", "✓ 超細顆粒"],
-        best_for="風景、藍天、花卉攝影",
-        color_type="color",
-        sensitivity_factor=0.95,  # 低感光度，光暈較少
-        # v0.4.2 校正光譜響應係數（混合策略）
-        # 效果：灰階偏差從 0.070 降至 0.000，對角主導從 7.13 提升至 8.62
-        red_layer=EmulsionLayer(
-            r_response_weight=0.876, g_response_weight=0.041, b_response_weight=0.083,
-            diffuse_weight=0.75, direct_weight=1.15, response_curve=1.45, grain_intensity=0.05
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.023, g_response_weight=0.861, b_response_weight=0.116,
-            diffuse_weight=0.70, direct_weight=1.10, response_curve=1.40, grain_intensity=0.05
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.016, g_response_weight=0.033, b_response_weight=0.951,
-            diffuse_weight=0.65, direct_weight=1.20, response_curve=1.50, grain_intensity=0.05
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.250, g_response_weight=0.400, b_response_weight=0.350,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.03
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.25, shoulder_strength=0.22, linear_strength=0.58,
-            linear_angle=0.18, toe_strength=0.28, toe_numerator=0.01, toe_denominator=0.35
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_v50,
-        halation_params=halation_params_v50,
-        wavelength_bloom_params=wavelength_params_v50,
-        # TASK-014: Reciprocity Failure 參數（Fujifilm Velvia 50）
-        # 註：反轉片失效最嚴重，色偏最明顯
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.88,               # 反轉片高失效
-            p_green=0.85,
-            p_blue=0.82,              # 藍色層失效最嚴重
-            t_critical_high=0.5,      # 0.5秒後即開始失效
-            failure_strength=1.0,     # 高強度失效
-            decay_coefficient=0.06
-        )
-    )
-    
-    # Gold200 - 陽光金黃（靈感來自 Kodak Gold 200）
-    # P1-2: 傳統顆粒，standard 類型
-    bloom_params_g200, halation_params_g200, wavelength_params_g200 = create_default_medium_physics_params(
-        film_name="Gold200", has_ah_layer=True, iso=200, film_type="standard"
-    )
-    profiles["Gold200"] = FilmProfile(
-        name="Gold200",
-        display_name="Gold 200",
-        brand="Kodak",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 200",
-        description="⭐ 陽光金黃。溫暖色調，柔和高光，街拍最愛。性價比經典。",
-        features=["✓ 溫暖色調", "✓ 柔和高光", "✓ 金黃偏向"],
-        best_for="街拍、日常、陽光場景",
-        color_type="color",
-        sensitivity_factor=1.25,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.797, g_response_weight=0.109, b_response_weight=0.094,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.35, direct_weight=0.98, response_curve=1.15, grain_intensity=0.16
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.089, g_response_weight=0.776, b_response_weight=0.134,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.05, direct_weight=0.85, response_curve=1.00, grain_intensity=0.16
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.077, g_response_weight=0.093, b_response_weight=0.830,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=0.95, direct_weight=0.85, response_curve=0.75, grain_intensity=0.16
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.32, g_response_weight=0.38, b_response_weight=0.28,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.09
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.00, shoulder_strength=0.13, linear_strength=0.52,
-            linear_angle=0.12, toe_strength=0.16, toe_numerator=0.02, toe_denominator=0.27
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_g200,
-        halation_params=halation_params_g200,
-        wavelength_bloom_params=wavelength_params_g200
-    )
-    
-    # TriX400 - 街拍傳奇（靈感來自 Kodak Tri-X 400）
-    hd_trix = create_bw_hd_curve_params(film_name="TriX400", contrast="high")
-    
-    profiles["TriX400"] = FilmProfile(
-        name="TriX400",
-        display_name="Tri-X 400",
-        brand="Kodak",
-        film_type="⚫ 黑白負片",
-        iso_rating="ISO 400",
-        description="⭐ 街拍傳奇。標誌性顆粒，經典對比，紀實攝影首選。",
-        features=["✓ 標誌顆粒", "✓ 高對比度", "✓ 經典S曲線"],
-        best_for="街拍、紀實、報導攝影",
-        color_type="single",
-        sensitivity_factor=1.48,
-        red_layer=None,
-        green_layer=None,
-        blue_layer=None,
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.35, g_response_weight=0.30, b_response_weight=0.32,
-            diffuse_weight=1.45, direct_weight=0.95, response_curve=1.28, grain_intensity=0.28
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.35, shoulder_strength=0.20, linear_strength=0.45,
-            linear_angle=0.28, toe_strength=0.38, toe_numerator=0.03, toe_denominator=0.36
-        ),
-        # 黑白物理模式 (Phase 1)
-        physics_mode=PhysicsMode.PHYSICAL,
-        hd_curve_params=hd_trix,
-        # TASK-014: Reciprocity Failure 參數（Kodak Tri-X 400）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_mono=0.88,              # 傳統黑白，中等失效
-            t_critical_high=1.0,
-            failure_strength=1.0,
-            decay_coefficient=0.05
-        )
-    )
-    
-    # === Phase 2: 日常經典底片 (2025-12-19) ===
-    
-    # ProImage100 - 日常柯達（靈感來自 Kodak ProImage 100）
-    # P1-2: fine-grain 類型（Kodak 經濟型 T-Grain）
-    bloom_params_pi100, halation_params_pi100, wavelength_params_pi100 = create_default_medium_physics_params(
-        film_name="ProImage100", has_ah_layer=True, iso=100, film_type="fine_grain"
-    )
-    profiles["ProImage100"] = FilmProfile(
-        name="ProImage100",
-        display_name="ProImage 100",
-        brand="Kodak",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 100",
-        description="⭐ 日常經典。色彩平衡，適中飽和，萬用底片。性價比之選。",
-        features=["✓ 平衡色彩", "✓ 穩定曝光", "✓ 性價比高"],
-        best_for="日常、旅行、萬用場景",
-        color_type="color",
-        sensitivity_factor=1.05,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.792, g_response_weight=0.096, b_response_weight=0.112,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.20, direct_weight=1.02, response_curve=1.08, grain_intensity=0.14
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.060, g_response_weight=0.791, b_response_weight=0.149,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=0.98, direct_weight=0.88, response_curve=1.00, grain_intensity=0.14
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.063, g_response_weight=0.079, b_response_weight=0.858,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=0.92, direct_weight=0.90, response_curve=0.80, grain_intensity=0.14
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.30, g_response_weight=0.38, b_response_weight=0.30,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.07
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.08, shoulder_strength=0.14, linear_strength=0.53,
-            linear_angle=0.14, toe_strength=0.18, toe_numerator=0.015, toe_denominator=0.29
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_pi100,
-        halation_params=halation_params_pi100,
-        wavelength_bloom_params=wavelength_params_pi100
-    )
-    
-    # Business100 - 富士業務用（靈感來自 Fujifilm 業務用 100）
-    # P1-2: fine-grain 類型（經濟型但顆粒細緻）
-    bloom_params_b100, halation_params_b100, wavelength_params_b100 = create_default_medium_physics_params(
-        film_name="Business100", has_ah_layer=True, iso=100, film_type="fine_grain"
-    )
-    profiles["Business100"] = FilmProfile(
-        name="Business100",
-        display_name="業務用 100",
-        brand="Fujifilm",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 100",
-        description="⭐ 富士經濟之選。平實色調，穩定表現，商業攝影入門首選。性價比極佳。",
-        features=["✓ 平實色調", "✓ 穩定曝光", "✓ 經濟實惠"],
-        best_for="商業攝影、證件照、日常記錄",
-        color_type="color",
-        sensitivity_factor=1.08,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.772, g_response_weight=0.102, b_response_weight=0.126,  # 富士特色：綠層略增強
-            diffuse_weight=1.22, direct_weight=1.00, response_curve=1.06, grain_intensity=0.13
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.068, g_response_weight=0.785, b_response_weight=0.147,  # 綠層增強（富士經典）
-            diffuse_weight=1.00, direct_weight=0.87, response_curve=0.98, grain_intensity=0.13
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.065, g_response_weight=0.082, b_response_weight=0.853,  # 藍層標準
-            diffuse_weight=0.93, direct_weight=0.89, response_curve=0.79, grain_intensity=0.13
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.28, g_response_weight=0.39, b_response_weight=0.31,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.065
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.06, shoulder_strength=0.13, linear_strength=0.53,
-            linear_angle=0.13, toe_strength=0.17, toe_numerator=0.016, toe_denominator=0.28
-        ),
-        # 物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_b100,
-        halation_params=halation_params_b100,
-        wavelength_bloom_params=wavelength_params_b100,
-        # 互易律失效參數（Fujifilm 業務用 100）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.93,     # ISO 100 低失效
-            p_green=0.90,
-            p_blue=0.87,
-            t_critical_high=1.5,  # ISO 100 臨界時間較長
-            failure_strength=0.75,
-            decay_coefficient=0.035
-        )
-    )
-    
-    # Superia400 - 富士日常（靈感來自 Fujifilm Superia 400）
-    # P1-2: 傳統顆粒，high-speed 類型（相比 Portra 更粗糙）
-    bloom_params_s400, halation_params_s400, wavelength_params_s400 = create_default_medium_physics_params(
-        film_name="Superia400", has_ah_layer=True, iso=400, film_type="high_speed"
-    )
-    profiles["Superia400"] = FilmProfile(
-        name="Superia400",
-        display_name="Superia 400",
-        brand="Fujifilm",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 400",
-        description="⭐ 清新綠調。富士日常膠卷，高寬容度，自然風光表現優異。",
-        features=["✓ 清新色調", "✓ 綠色偏向", "✓ 高寬容度"],
-        best_for="日常、自然、風光攝影",
-        color_type="color",
-        sensitivity_factor=1.38,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.748, g_response_weight=0.110, b_response_weight=0.142,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.30, direct_weight=0.92, response_curve=1.10, grain_intensity=0.20
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.069, g_response_weight=0.758, b_response_weight=0.173,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.10, direct_weight=0.82, response_curve=1.08, grain_intensity=0.20
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.076, g_response_weight=0.091, b_response_weight=0.833,  # v0.4.2 校正光譜響應係數（消除灰階色偏）
-            diffuse_weight=1.00, direct_weight=0.86, response_curve=0.78, grain_intensity=0.20
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.24, g_response_weight=0.38, b_response_weight=0.36,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.10
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.02, shoulder_strength=0.14, linear_strength=0.51,
-            linear_angle=0.11, toe_strength=0.19, toe_numerator=0.02, toe_denominator=0.29
-        ),
-        # 中階物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_s400,
-        halation_params=halation_params_s400,
-        wavelength_bloom_params=wavelength_params_s400
-    )
-    
-    # C400 - 富士日常之王（靈感來自 Fujifilm C400）
-    # P1-2: standard 類型，平衡顆粒
-    bloom_params_c400, halation_params_c400, wavelength_params_c400 = create_default_medium_physics_params(
-        film_name="C400", has_ah_layer=True, iso=400, film_type="standard"
-    )
-    profiles["C400"] = FilmProfile(
-        name="C400",
-        display_name="C400",
-        brand="Fujifilm",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 400",
-        description="⭐ 富士日常之王。平衡色彩，自然清新，萬用街拍膠卷。性價比極高。",
-        features=["✓ 平衡色彩", "✓ 清新綠調", "✓ 性價比高"],
-        best_for="街拍、日常、旅行攝影",
-        color_type="color",
-        sensitivity_factor=1.30,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.765, g_response_weight=0.105, b_response_weight=0.130,  # 富士特色：紅層略弱，綠層增強
-            diffuse_weight=1.28, direct_weight=0.95, response_curve=1.08, grain_intensity=0.18
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.072, g_response_weight=0.771, b_response_weight=0.157,  # 綠層增強（富士典型）
-            diffuse_weight=1.08, direct_weight=0.85, response_curve=1.02, grain_intensity=0.18
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.078, g_response_weight=0.095, b_response_weight=0.827,  # 藍層標準
-            diffuse_weight=0.98, direct_weight=0.88, response_curve=0.76, grain_intensity=0.18
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.26, g_response_weight=0.40, b_response_weight=0.32,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.09
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.03, shoulder_strength=0.13, linear_strength=0.52,
-            linear_angle=0.13, toe_strength=0.20, toe_numerator=0.018, toe_denominator=0.29
-        ),
-        # 物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_c400,
-        halation_params=halation_params_c400,
-        wavelength_bloom_params=wavelength_params_c400,
-        # 互易律失效參數（Fujifilm C400）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.91,     # 富士彩色負片，中等失效
-            p_green=0.88,
-            p_blue=0.85,    # 藍色層失效較明顯
-            t_critical_high=1.0,
-            failure_strength=0.9,
-            decay_coefficient=0.045
-        )
-    )
+    raw = {}
+    for path in sorted(Path(data_dir).glob("*.toml")):
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+        if spec.get('name') != path.stem:
+            raise ValueError(f"胶片數據檔 {path.name} 的 name 必須與檔名相同: {spec.get('name')}")
+        _validate_film_spec(path.stem, spec, path.name)
+        raw[path.stem] = spec
+    
+    resolved = {}
+    
+    def resolve(name: str, chain: Tuple[str, ...]) -> dict:
+        if name in resolved:
+            return resolved[name]
+        if name in chain:
+            raise ValueError(f"胶片數據檔循環繼承: {' → '.join(chain + (name,))}")
+        if name not in raw:
+            raise ValueError(f"胶片數據檔 {chain[-1]}.toml 繼承的胶片不存在: {name}")
+        spec = raw[name]
+        if 'extends' in spec:
+            spec = _merge_film_spec(resolve(spec['extends'], chain + (name,)), spec)
+        for key in spec.get('reset', ()):
+            spec.pop(key, None)
+        resolved[name] = {k: v for k, v in spec.items() if k not in _FILM_SPEC_DIRECTIVES}
+        return resolved[name]
+    
+    for name in raw:
+        resolve(name, ())
+    return {name: resolved[name] for name in raw}
+
+
+def film_data_hash(data_dir: Path = FILM_DATA_DIR) -> str:
+    """
+    數據檔內容雜湊（快取鍵）
     
-    # UltraMax400 - Kodak 經濟王者（靈感來自 Kodak UltraMax 400）
-    # P1-2: standard 類型，經濟實惠顆粒
-    bloom_params_um400, halation_params_um400, wavelength_params_um400 = create_default_medium_physics_params(
-        film_name="UltraMax400", has_ah_layer=True, iso=400, film_type="standard"
-    )
-    profiles["UltraMax400"] = FilmProfile(
-        name="UltraMax400",
-        display_name="UltraMax 400",
-        brand="Kodak",
-        film_type="🎨 彩色負片",
-        iso_rating="ISO 400",
-        description="⭐ 經濟實惠王者。溫暖飽和，高寬容度，街拍與旅行首選。性價比無敵。",
-        features=["✓ 溫暖飽和", "✓ 高寬容度", "✓ 經濟實惠"],
-        best_for="街拍、旅行、日常攝影",
-        color_type="color",
-        sensitivity_factor=1.32,
-        red_layer=EmulsionLayer(
-            r_response_weight=0.785, g_response_weight=0.098, b_response_weight=0.117,  # Kodak 特色：紅層增強
-            diffuse_weight=1.32, direct_weight=0.96, response_curve=1.12, grain_intensity=0.19
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.068, g_response_weight=0.780, b_response_weight=0.152,  # 綠層平衡
-            diffuse_weight=1.02, direct_weight=0.86, response_curve=1.00, grain_intensity=0.19
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.070, g_response_weight=0.087, b_response_weight=0.843,  # 藍層標準
-            diffuse_weight=0.96, direct_weight=0.90, response_curve=0.78, grain_intensity=0.19
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.31, g_response_weight=0.37, b_response_weight=0.30,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.095
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.05, shoulder_strength=0.14, linear_strength=0.51,
-            linear_angle=0.12, toe_strength=0.19, toe_numerator=0.02, toe_denominator=0.28
-        ),
-        # 物理模式
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=bloom_params_um400,
-        halation_params=halation_params_um400,
-        wavelength_bloom_params=wavelength_params_um400,
-        # 互易律失效參數（Kodak UltraMax 400）
-        reciprocity_params=ReciprocityFailureParams(
-            enabled=False,
-            p_red=0.92,     # Kodak 彩色負片，中等失效（略優於 Fuji）
-            p_green=0.89,
-            p_blue=0.86,
-            t_critical_high=1.2,  # 臨界時間略長
-            failure_strength=0.85,
-            decay_coefficient=0.04
-        )
-    )
+    Returns:
+        str: SHA-256（涵蓋格式版本、檔名與內容）
+    """
+    digest = hashlib.sha256(f"film-spec-v{FILM_SPEC_FORMAT_VERSION}".encode())
+    for path in sorted(Path(data_dir).glob("*.toml")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_film_specs(data_dir: Path = FILM_DATA_DIR, cache_dir: Optional[Path] = FILM_CACHE_DIR) -> Dict[str, dict]:
+    """
+    載入胶片規格表（優先使用編譯快取）
     
-    # FP4Plus125 - 細膩灰階（靈感來自 Ilford FP4 Plus 125）
-    hd_fp4 = create_bw_hd_curve_params(film_name="FP4Plus125", contrast="low")
-    
-    profiles["FP4Plus125"] = FilmProfile(
-        name="FP4Plus125",
-        display_name="FP4 Plus 125",
-        brand="Ilford",
-        film_type="⚫ 黑白負片",
-        iso_rating="ISO 125",
-        description="⭐ 細膩灰階。低速精細，豐富中間調，適合慢速攝影。",
-        features=["✓ 低速精細", "✓ 低顆粒", "✓ 豐富中調"],
-        best_for="風景、靜物、慢速攝影",
-        color_type="single",
-        sensitivity_factor=1.15,
-        red_layer=None,
-        green_layer=None,
-        blue_layer=None,
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.26, g_response_weight=0.36, b_response_weight=0.36,
-            diffuse_weight=0.95, direct_weight=1.08, response_curve=1.22, grain_intensity=0.12
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.05, shoulder_strength=0.14, linear_strength=0.52,
-            linear_angle=0.20, toe_strength=0.32, toe_numerator=0.018, toe_denominator=0.34
-        ),
-        # 黑白物理模式 (Phase 1)
-        physics_mode=PhysicsMode.PHYSICAL,
-        hd_curve_params=hd_fp4
-    )
+    快取檔名含數據檔雜湊；任一數據檔變更即重新編譯並覆寫快取。
+    快取目錄不可寫入時僅發出警告，不影響載入。
     
-    # === TASK-003: 中等物理測試配置 (2025-12-19) ===
-    
-    # CineStill 800T - 中等物理模式（測試配置）
-    # 用途：驗證 Bloom + Halation 分離建模
-    profiles["Cinestill800T_MediumPhysics"] = FilmProfile(
-        name="Cinestill800T_MediumPhysics",
-        display_name="Cinestill 800T (Medium Physics)",
-        brand="Cinestill",
-        film_type="🔬 物理增強",
-        iso_rating="ISO 800",
-        description="⚗️ 中等物理模式：極端 Halation（無 AH 層）+ 波長散射。",
-        features=["✓ 極端 Halation", "✓ 高穿透率", "✓ 波長依賴"],
-        best_for="測試極端光暈、夜景創作",
-        color_type="color",
-        sensitivity_factor=1.55,
-        # 乳劑層配置（複製自 Cinestill800T）
-        red_layer=EmulsionLayer(
-            r_response_weight=0.80, g_response_weight=0.15, b_response_weight=0.20,
-            diffuse_weight=1.65, direct_weight=0.90, response_curve=1.10, grain_intensity=0.25
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.10, g_response_weight=0.82, b_response_weight=0.28,
-            diffuse_weight=1.18, direct_weight=0.75, response_curve=0.95, grain_intensity=0.25
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.12, g_response_weight=0.15, b_response_weight=0.88,
-            diffuse_weight=1.35, direct_weight=0.82, response_curve=0.70, grain_intensity=0.25
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.22, g_response_weight=0.30, b_response_weight=0.42,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.15
-        ),
-        tone_params=ToneMappingParams(
-            gamma=2.0, shoulder_strength=0.14, linear_strength=0.48,
-            linear_angle=0.08, toe_strength=0.25, toe_numerator=0.03, toe_denominator=0.28
-        ),
-        # === 關鍵：啟用中等物理模式 ===
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=BloomParams(
-            mode="physical",           # 物理模式 Bloom（乳劑內散射）
-            threshold=0.8,
-            scattering_ratio=0.08,     # 8% 能量散射
-            psf_type="gaussian",
-            energy_conservation=True
-        ),
-        halation_params=HalationParams(
-            enabled=True,
-            # Beer-Lambert 雙程參數 (TASK-011)
-            emulsion_transmittance_r=0.93,  # CineStill 極端特性：紅光強穿透
-            emulsion_transmittance_g=0.90,  # 綠光中等穿透
-            emulsion_transmittance_b=0.85,  # 藍光較弱穿透
-            base_transmittance=0.98,        # 片基透過率（TAC/PET）
-            ah_layer_transmittance_r=1.0,   # 無 AH 層（T_AH = 1.0）
-            ah_layer_transmittance_g=1.0,
-            ah_layer_transmittance_b=1.0,
-            backplate_reflectance=0.35,     # 修正：降低至 0.35 以符合能量守恆（原 0.8 導致 61% Halation）
-            psf_radius=200,                 # 極大光暈半徑（2x 標準）
-            psf_type="exponential",         # 指數拖尾
-            energy_fraction=0.15            # 15% 能量（3x 標準）
-        ),
-        # === Phase 1: 波長依賴 Bloom 散射 ===
-        wavelength_bloom_params=WavelengthBloomParams(
-            enabled=True,
-            reference_wavelength=550.0, # 綠光基準
-            lambda_r=650.0,             # 紅光中心波長
-            lambda_g=550.0,             # 綠光中心波長
-            lambda_b=450.0,             # 藍光中心波長
-            core_fraction_r=0.70,       # 紅光核心占比（70% 核心，30% 拖尾）
-            core_fraction_g=0.75,
-            core_fraction_b=0.80,       # 藍光更多能量在核心
-            tail_decay_rate=0.1         # 拖尾衰減率（κ = σ / 0.1）
-        )
-    )
+    Args:
+        data_dir: 數據檔目錄
+        cache_dir: 編譯快取目錄（None 表示不使用快取）
+        
+    Returns:
+        Dict[str, dict]: 胶片名稱 → 已解析的規格
+    """
+    if cache_dir is None:
+        return compile_film_specs(data_dir)
+    
+    cache_dir = Path(cache_dir)
+    cache_path = cache_dir / f"film_specs_{film_data_hash(data_dir)[:16]}.pickle"
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        warnings.warn(f"胶片編譯快取損毀，重新編譯: {cache_path} ({e})")
+    
+    specs = compile_film_specs(data_dir)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(specs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        for stale in cache_dir.glob("film_specs_*.pickle"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        warnings.warn(f"無法寫入胶片編譯快取 {cache_dir}: {e}")
+    return specs
+
+
+def build_film_profile(spec: dict) -> FilmProfile:
+    """
+    由已解析的規格建構 FilmProfile
     
-    # === Phase 5: Portra400 + Mie 查表版本（實驗性）===
-    # 用途：驗證 Mie 散射理論 vs 經驗公式的視覺差異
-    # 注意：P1-1 開發中，僅供研究使用
-    profiles["Portra400_MediumPhysics_Mie"] = FilmProfile(
-        name="Portra400_MediumPhysics_Mie",
-        display_name="Portra 400 (Mie v2)",
-        brand="Kodak",
-        film_type="🔬 Mie 散射（v2 高密度表）",
-        iso_rating="ISO 400",
-        description="🔬 Mie 散射查表 v2：200 點高密度網格，η 插值誤差 2.16%（v1: 155%）。AgBr 粒子精確 Mie 共振。",
-        features=["✓ Mie 理論", "✓ AgBr 共振", "✓ η 誤差 2.16%"],
-        best_for="研究級驗證、與經驗公式對比",
-        color_type="color",
-        sensitivity_factor=1.35,
-        # 乳劑層配置（複製自 Portra400_MediumPhysics）
-        red_layer=EmulsionLayer(
-            r_response_weight=0.82, g_response_weight=0.10, b_response_weight=0.15,
-            diffuse_weight=1.25, direct_weight=1.00, response_curve=1.12, grain_intensity=0.12
-        ),
-        green_layer=EmulsionLayer(
-            r_response_weight=0.06, g_response_weight=0.88, b_response_weight=0.20,
-            diffuse_weight=0.95, direct_weight=0.90, response_curve=1.05, grain_intensity=0.12
-        ),
-        blue_layer=EmulsionLayer(
-            r_response_weight=0.05, g_response_weight=0.08, b_response_weight=0.90,
-            diffuse_weight=0.90, direct_weight=0.92, response_curve=0.85, grain_intensity=0.12
-        ),
-        panchromatic_layer=EmulsionLayer(
-            r_response_weight=0.28, g_response_weight=0.40, b_response_weight=0.30,
-            diffuse_weight=0.0, direct_weight=0.0, response_curve=0.0, grain_intensity=0.06
-        ),
-        tone_params=ToneMappingParams(
-            gamma=1.95, shoulder_strength=0.12, linear_strength=0.55,
-            linear_angle=0.15, toe_strength=0.18, toe_numerator=0.01, toe_denominator=0.28
-        ),
-        # === 啟用中等物理模式 ===
-        physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=BloomParams(
-            mode="physical",
-            threshold=0.8,
-            scattering_ratio=0.08,
-            psf_type="gaussian",
-            energy_conservation=True
-        ),
-        halation_params=HalationParams(
-            enabled=True,
-            # Beer-Lambert 雙程參數 (TASK-011)
-            emulsion_transmittance_r=0.92,  # 標準乳劑層透過率
-            emulsion_transmittance_g=0.87,
-            emulsion_transmittance_b=0.78,
-            base_transmittance=0.98,        # 片基透過率
-            ah_layer_transmittance_r=0.30,  # Portra 強 AH 層（紅光）
-            ah_layer_transmittance_g=0.10,  # 綠光強吸收
-            ah_layer_transmittance_b=0.05,  # 藍光極強吸收（α·L ≈ 3.0）
-            backplate_reflectance=0.3,      # 標準反射率
-            psf_radius=100,
-            psf_type="exponential",
-            energy_fraction=0.05
-        ),
-        # === Phase 5: 使用 Mie 散射查表（與經驗公式版本唯一差異）===
-        wavelength_bloom_params=WavelengthBloomParams(
-            enabled=True,
-            reference_wavelength=550.0,
-            lambda_r=650.0,
-            lambda_g=550.0,
-            lambda_b=450.0,
-            core_fraction_r=0.70,
-            core_fraction_g=0.75,
-            core_fraction_b=0.80,
-            tail_decay_rate=0.1,
-            # 啟用 Mie 查表
-            use_mie_lookup=True,
-            mie_lookup_path="data/mie_lookup_table_v3.npz",
-            iso_value=400
+    Args:
+        spec: compile_film_specs() 產生的單一胶片規格
+        
+    Returns:
+        FilmProfile: 胶片配置對象
+    """
+    kwargs = {'red_layer': None, 'green_layer': None, 'blue_layer': None}
+    kwargs.update({key: spec[key] for key in _FILM_SPEC_SCALARS if key in spec})
+    if 'physics_mode' in kwargs:
+        kwargs['physics_mode'] = PhysicsMode(kwargs['physics_mode'])
+    if 'features' in kwargs:
+        kwargs['features'] = list(kwargs['features'])
+    
+    if 'medium_physics' in spec:
+        bloom, halation, wavelength = create_default_medium_physics_params(
+            film_name=spec['name'], **spec['medium_physics']
         )
-    )
-    
-    # ============================================================================
-    # Mie 散射查表變體 (Phase 5.5, v2 lookup table - Decision #019)
-    # 
-    # 為所有彩色底片創建 _Mie 後綴版本，使用 v2 高密度 Mie 查表
-    # 與標準版本唯一差異：wavelength_bloom_params.use_mie_lookup = True
-    # 
-    # v2 查表優勢：
-    #   - η 插值誤差：155% (v1) → 2.16% (v2)
-    #   - 網格密度：21 點 (v1) → 200 點 (v2)
-    #   - 更準確的 AgBr 顆粒 Mie 共振特徵
-    # ============================================================================
-    
-    # === NC200_Mie ===
-    base_config = profiles["NC200"]
-    wavelength_params_nc200_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=200
-    )
-    profiles["NC200_Mie"] = FilmProfile(
-        name="NC200_Mie", color_type=base_config.color_type,
-        display_name="NC200 (Mie v2)",
-        brand="Fujifilm C200 風格",
-        film_type="🔬 Mie 散射",
-        iso_rating="ISO 200",
-        description="經典富士色調 + Mie 散射查表。精確波長依賴散射（v2 高密度表）。",
-        features=["✓ Mie 理論", "✓ 平衡色彩", "✓ 精確散射"],
-        best_for="日常記錄、Mie 效果驗證",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_nc200_mie
-    )
-    
-    # === Ektar100_Mie ===
-    base_config = profiles["Ektar100"]
-    wavelength_params_ektar100_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=100
-    )
-    profiles["Ektar100_Mie"] = FilmProfile(
-        name="Ektar100_Mie", color_type=base_config.color_type,
-        display_name="Ektar 100 (Mie v2)",
-        brand="Kodak",
-        film_type="🔬 Mie 散射",
-        iso_rating="ISO 100",
-        description="風景利器 + Mie 散射。極高飽和度，精確 AgBr 粒子 Mie 共振特徵。",
-        features=["✓ Mie 理論", "✓ 極高飽和", "✓ 極細顆粒"],
-        best_for="風景攝影、物理驗證",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_ektar100_mie
-    )
-    
-    # === Gold200_Mie ===
-    base_config = profiles["Gold200"]
-    wavelength_params_gold200_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=200
-    )
-    profiles["Gold200_Mie"] = FilmProfile(
-        name="Gold200_Mie", color_type=base_config.color_type,
-        display_name="Gold 200 (Mie v2)",
-        brand="Kodak",
-        film_type="🔬 Mie 散射",
-        iso_rating="ISO 200",
-        description="陽光金黃 + Mie 散射。溫暖色調，精確波長散射特徵。",
-        features=["✓ Mie 理論", "✓ 溫暖色調", "✓ 柔和高光"],
-        best_for="街拍、陽光場景、Mie 對比",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_gold200_mie
-    )
-    
-    # === ProImage100_Mie ===
-    base_config = profiles["ProImage100"]
-    wavelength_params_proimage100_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=100
-    )
-    profiles["ProImage100_Mie"] = FilmProfile(
-        name="ProImage100_Mie", color_type=base_config.color_type,
-        display_name="ProImage 100 (Mie v2)",
-        brand="Kodak",
-        film_type="🔬 Mie 散射",
-        iso_rating="ISO 100",
-        description="日常經典 + Mie 散射。色彩平衡，精確低 ISO 散射特性。",
-        features=["✓ Mie 理論", "✓ 平衡色彩", "✓ 穩定曝光"],
-        best_for="日常拍攝、Mie 效果驗證",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_proimage100_mie
-    )
+        kwargs.update(bloom_params=bloom, halation_params=halation, wavelength_bloom_params=wavelength)
+    if 'bw_hd_curve' in spec:
+        kwargs['hd_curve_params'] = create_bw_hd_curve_params(film_name=spec['name'], **spec['bw_hd_curve'])
     
-    # === Superia400_Mie ===
-    base_config = profiles["Superia400"]
-    wavelength_params_superia400_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=400
-    )
-    profiles["Superia400_Mie"] = FilmProfile(
-        name="Superia400_Mie", color_type=base_config.color_type,
-        display_name="Superia 400 (Mie v2)",
-        brand="Fujifilm",
-        film_type="🔬 Mie 散射",
-        iso_rating="ISO 400",
-        description="清新綠調 + Mie 散射。富士日常膠卷，精確 AgBr 散射模型。",
-        features=["✓ Mie 理論", "✓ 清新色調", "✓ 高寬容度"],
-        best_for="自然風光、Mie 對比測試",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_superia400_mie
-    )
+    for key, params_cls in _FILM_SPEC_TABLES.items():
+        if key in spec:
+            kwargs[key] = params_cls(**spec[key])
     
-    # === Cinestill800T_Mie ===
-    base_config = profiles["Cinestill800T"]
-    wavelength_params_cinestill800t_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=800
-    )
-    profiles["Cinestill800T_Mie"] = FilmProfile(
-        name="Cinestill800T_Mie", color_type=base_config.color_type,
-        display_name="CineStill 800T (Mie v2)",
-        brand="CineStill",
-        film_type="🔬 Mie 散射 + 極端 Halation",
-        iso_rating="ISO 800",
-        description="電影感 + Mie 散射。無 AH 層極端光暈，精確高 ISO Mie 特徵。",
-        features=["✓ Mie 理論", "✓ 極端光暈", "✓ 高 ISO 散射"],
-        best_for="夜景霓虹、極端光暈研究",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_cinestill800t_mie
-    )
+    return FilmProfile(**kwargs)
+
+
+# ==================== 胶片註冊表（延遲建構）====================
+
+@dataclass(frozen=True)
+class FilmInfo:
+    """
+    胶片顯示用元數據（不需建構 FilmProfile）
     
-    # === Velvia50_Mie ===
-    base_config = profiles["Velvia50"]
-    wavelength_params_velvia50_mie = WavelengthBloomParams(
-        enabled=True,
-        reference_wavelength=550.0,
-        lambda_r=650.0, lambda_g=550.0, lambda_b=450.0,
-        core_fraction_r=0.70, core_fraction_g=0.75, core_fraction_b=0.80,
-        tail_decay_rate=0.1,
-        use_mie_lookup=True, mie_lookup_path="data/mie_lookup_table_v3.npz", iso_value=50
-    )
-    profiles["Velvia50_Mie"] = FilmProfile(
-        name="Velvia50_Mie", color_type=base_config.color_type,
-        display_name="Velvia 50 (Mie v2)",
-        brand="Fujifilm",
-        film_type="🔬 Mie 散射 + 極致飽和",
-        iso_rating="ISO 50",
-        description="風景之王 + Mie 散射。極致飽和度，精確低 ISO AgBr 散射。",
-        features=["✓ Mie 理論", "✓ 極致飽和", "✓ 超細顆粒"],
-        best_for="風景攝影、低 ISO Mie 驗證",
-        sensitivity_factor=base_config.sensitivity_factor,
-        red_layer=base_config.red_layer, green_layer=base_config.green_layer,
-        blue_layer=base_config.blue_layer, panchromatic_layer=base_config.panchromatic_layer,
-        tone_params=base_config.tone_params, physics_mode=PhysicsMode.PHYSICAL,
-        bloom_params=base_config.bloom_params, halation_params=base_config.halation_params,
-        wavelength_bloom_params=wavelength_params_velvia50_mie
+    供 UI 選單與說明卡片使用；欄位與 FilmProfile 同名欄位一致
+    （由 tests_refactored/test_film_profiles.py 驗證）。
+    """
+    name: str
+    display_name: str
+    brand: str
+    film_type: str
+    iso_rating: str
+    color_type: str
+    description: str = ""
+    features: Tuple[str, ...] = ()
+    best_for: str = ""
+
+
+_FILM_SPECS: Optional[Dict[str, dict]] = None
+_FILM_PROFILE_CACHE: Dict[str, FilmProfile] = {}
+_FILM_REGISTRY_LOCK = threading.Lock()
+
+
+def _film_specs() -> Dict[str, dict]:
+    """已載入的胶片規格表（首次呼叫時載入）"""
+    global _FILM_SPECS
+    if _FILM_SPECS is None:
+        with _FILM_REGISTRY_LOCK:
+            if _FILM_SPECS is None:
+                _FILM_SPECS = load_film_specs()
+    return _FILM_SPECS
+
+
+class _LazyFilmMapping(Mapping):
+    """以胶片名稱為鍵的唯讀映射，存取時才建構值"""
+    
+    def __init__(self, factory: Callable[[str], object]):
+        self._factory = factory
+    
+    def __getitem__(self, film_type: str):
+        if film_type not in _film_specs():
+            raise KeyError(film_type)
+        return self._factory(film_type)
+    
+    def __iter__(self):
+        return iter(_film_specs())
+    
+    def __len__(self) -> int:
+        return len(_film_specs())
+    
+    def __contains__(self, film_type) -> bool:
+        return film_type in _film_specs()
+
+
+def _film_info_from_spec(film_type: str) -> FilmInfo:
+    spec = _film_specs()[film_type]
+    return FilmInfo(
+        name=spec['name'],
+        display_name=spec.get('display_name', spec['name']),
+        brand=spec.get('brand', ""),
+        film_type=spec.get('film_type', ""),
+        iso_rating=spec.get('iso_rating', ""),
+        color_type=spec['color_type'],
+        description=spec.get('description', ""),
+        features=tuple(spec.get('features', ())),
+        best_for=spec.get('best_for', ""),
     )
+
+
+def list_film_names() -> List[str]:
+    """
+    列出所有可用胶片名稱（不建構任何配置）
     
-    return profiles
+    Returns:
+        List[str]: 胶片名稱（依名稱排序）
+    """
+    return list(_film_specs())
 
 
-# 創建全局胶片配置字典
-FILM_PROFILES = create_film_profiles()
+def get_film_info(film_type: str) -> FilmInfo:
+    """
+    獲取胶片顯示用元數據（不建構 FilmProfile）
+    
+    Args:
+        film_type: 胶片類型名稱
+        
+    Returns:
+        FilmInfo: 顯示名稱、品牌、ISO、類型等
+        
+    Raises:
+        ValueError: 如果胶片類型不存在
+    """
+    if film_type not in _film_specs():
+        available = ", ".join(_film_specs().keys())
+        raise ValueError(f"未知的胶片類型: {film_type}. 可用類型: {available}")
+    return _film_info_from_spec(film_type)
 
 
 def get_film_profile(film_type: str) -> FilmProfile:
     """
-    獲取指定胶片的配置
+    獲取指定胶片的配置（首次請求時建構並快取）
     
     Args:
         film_type: 胶片類型名稱 ("NC200", "FS200", "AS100")
         
     Returns:
-        FilmProfile: 胶片配置對象
+        FilmProfile: 胶片配置對象（同名請求返回同一實例）
         
     Raises:
         ValueError: 如果胶片類型不存在
     """
-    if film_type not in FILM_PROFILES:
-        available = ", ".join(FILM_PROFILES.keys())
+    profile = _FILM_PROFILE_CACHE.get(film_type)
+    if profile is not None:
+        return profile
+    
+    specs = _film_specs()
+    if film_type not in specs:
+        available = ", ".join(specs.keys())
         raise ValueError(f"未知的胶片類型: {film_type}. 可用類型: {available}")
-    return FILM_PROFILES[film_type]
+    
+    with _FILM_REGISTRY_LOCK:
+        profile = _FILM_PROFILE_CACHE.get(film_type)
+        if profile is None:
+            profile = build_film_profile(specs[film_type])
+            _FILM_PROFILE_CACHE[film_type] = profile
+    return profile
+
+
+# 全局胶片配置映射（延遲建構，向後相容）
+FILM_PROFILES = _LazyFilmMapping(get_film_profile)
+
+# 胶片名稱 → 顯示用元數據（UI 不需建構任何 FilmProfile）
+FILM_CATALOG = _LazyFilmMapping(_film_info_from_spec)
+
+
+def create_film_profiles() -> dict:
+    """
+    創建所有胶片配置
+    
+    注意：會建構全部胶片；UI 或只需單一胶片時請使用
+    get_film_profile() / get_film_info()。
+    
+    Returns:
+        包含所有可用胶片配置的字典
+    """
+    return {name: get_film_profile(name) for name in _film_specs()}
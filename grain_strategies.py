@@ -16,6 +16,7 @@ from typing import Optional
 import numpy as np
 import cv2
 from film_models import GrainParams
+from modules.pointwise import pointwise
 
 # Constants (從 film_models.py 導入)
 from film_models import (
@@ -114,20 +115,18 @@ class ArtisticGrainStrategy(GrainStrategy):
         
         # 1. 創建正負噪聲（使用平方正態分佈產生更自然的顆粒）
         noise = np.random.normal(0, 1, lux_channel.shape).astype(np.float32)
-        noise = noise ** 2  # 平方增強顆粒質感
-        # v0.8.2 HOTFIX: 標準化平方噪聲以避免極端值
-        # Chi-squared(1) 分布的期望值是 1，標準差是 sqrt(2)
-        noise = (noise - 1.0) / np.sqrt(2.0)  # 標準化到 mean=0, std=1
-        noise = noise * np.random.choice([-1, 1], lux_channel.shape)  # 正負對稱
+        sign = np.random.choice([-1, 1], lux_channel.shape)  # 正負對稱
         
-        # 2. 創建權重圖（中等亮度區域權重最高）
-        # 模擬胶片顆粒在中間調最明顯的特性
-        weights = (0.5 - np.abs(lux_channel - 0.5)) * 2
-        weights = np.clip(weights, GRAIN_WEIGHT_MIN, GRAIN_WEIGHT_MAX)
-        
-        # 3. 應用權重和敏感度
+        # 2-3. 單次逐點運算（modules.pointwise 'grain_weighting'）：
+        #   - 平方增強顆粒質感；v0.8.2 HOTFIX: 標準化平方噪聲以避免極端值
+        #     Chi-squared(1) 分布的期望值是 1，標準差是 sqrt(2) → mean=0, std=1
+        #   - 權重圖：中等亮度區域權重最高（模擬胶片顆粒在中間調最明顯的特性）
+        #   - 應用權重和敏感度
         sens_grain = np.clip(sens, GRAIN_SENS_MIN, GRAIN_SENS_MAX)
-        weighted_noise = noise * weights * sens_grain
+        weighted_noise = pointwise(
+            'grain_weighting', noise=noise, sign=sign, x=lux_channel,
+            sensitivity=sens_grain, weight_min=GRAIN_WEIGHT_MIN, weight_max=GRAIN_WEIGHT_MAX
+        )
         
         # 4. 添加輕微模糊使顆粒更柔和
         weighted_noise = cv2.GaussianBlur(
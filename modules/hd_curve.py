@@ -0,0 +1,213 @@
+"""
+H&D 曲線數學與預計算查表
+
+負責：
+1. H&D 曲線的精確計算（對數曝光量 → 透射率）
+2. 依 HDCurveParams 預計算的稠密 1D 查表（log 曝光量均勻取樣 + 線性插值）
+
+H&D 曲線是固定的一維函數（每組 HDCurveParams 一條），全幅影像逐像素
+計算 log10 / toe、shoulder 遮罩 / exp / 10^(-D) 的成本可由查表取代：
+每通道只需一次 log10 與一次向量化插值，不再產生遮罩索引的暫存陣列。
+
+查表範圍 log10(H) ∈ [-10, 1]：下限即 apply_hd_curve 的曝光量裁切值
+（1e-10），超出上限的像素（H > 10）以精確公式計算（精確尾段）。
+
+Version: 0.8.4
+"""
+
+import numpy as np
+from dataclasses import astuple, dataclass, is_dataclass
+from functools import lru_cache
+
+from modules.performance_modes import fast_path_enabled, register_fast_path
+from modules.row_bands import row_banded
+
+# 查表範圍（log10 曝光量）與取樣點數
+HD_LUT_LOG_RANGE = (-10.0, 1.0)
+HD_LUT_SIZE = 32768
+
+HD_CURVE_LUT = register_fast_path(
+    'hd_curve_lut',
+    "H&D 曲線：log 曝光量上的稠密 1D 查表 + 線性插值（關閉時逐像素精確計算）",
+)
+
+
+# ==================== 精確計算 ====================
+
+def hd_curve_transmittance(log_exposure: np.ndarray, hd_params) -> np.ndarray:
+    """
+    H&D 曲線精確計算：對數曝光量 → 正規化透射率
+
+    Args:
+        log_exposure: log10 曝光量（曝光量已裁切至 ≥ 1e-10）
+        hd_params: HDCurveParams 實例
+
+    Returns:
+        正規化透射率（0-1 範圍）
+    """
+    # 線性區段：D = gamma * log10(H) + D_fog
+    # 標準化：以中性曝光量（exposure=1.0, log=0）為參考點
+    # 基線密度：提供視覺/物理兩種基準（向後相容）
+    use_visual_baseline = getattr(hd_params, "use_visual_baseline", True)
+    if use_visual_baseline:
+        # 視覺基準：置中密度，適合藝術模式
+        D_baseline = hd_params.D_min + (hd_params.D_max - hd_params.D_min) * 0.33
+    else:
+        # 物理基準：使用 D_min/D_fog
+        D_baseline = hd_params.D_min
+    density = hd_params.gamma * log_exposure + D_baseline
+
+    # Toe（趾部）：低曝光量的壓縮
+    # 使用平滑函數：當 log_exposure < toe_end 時，密度增長變慢
+    if hd_params.toe_enabled:
+        toe_mask = log_exposure < hd_params.toe_end
+        if np.any(toe_mask):
+            # Toe 過渡函數：使用 soft clip（類似 tanh）
+            # 計算相對於 toe_end 的距離
+            toe_distance = (hd_params.toe_end - log_exposure[toe_mask]) / (hd_params.toe_end + 1e-6)
+            # 應用壓縮（越遠離 toe_end，壓縮越強）
+            toe_compression = 1.0 - hd_params.toe_strength * (1.0 - np.exp(-toe_distance))
+            density[toe_mask] *= toe_compression
+
+    # Shoulder（肩部）：高曝光量的壓縮
+    # 當 log_exposure > shoulder_start 時，密度增長變慢，逐漸飽和至 D_max
+    if hd_params.shoulder_enabled:
+        shoulder_mask = log_exposure > hd_params.shoulder_start
+        if np.any(shoulder_mask):
+            # Shoulder 過渡函數：漸近至 D_max
+            # 計算相對於 shoulder_start 的距離
+            shoulder_distance = (log_exposure[shoulder_mask] - hd_params.shoulder_start)
+            # 應用壓縮（越遠離 shoulder_start，越接近 D_max）
+            shoulder_compression = hd_params.shoulder_strength * shoulder_distance
+            # 軟飽和：使用指數衰減逼近 D_max
+            density[shoulder_mask] = (hd_params.D_max -
+                                      (hd_params.D_max - density[shoulder_mask]) *
+                                      np.exp(-shoulder_compression))
+
+    # 限制在有效動態範圍內
+    density = np.clip(density, hd_params.D_min, hd_params.D_max)
+
+    # 轉換為透射率：T = 10^(-D)
+    # 透射率：光線透過膠片的比例（0 = 完全阻擋，1 = 完全透過）
+    transmittance = 10 ** (-density)
+
+    # 正規化到 [0, 1] 範圍（考慮 D_min 對應的基礎透射率）
+    T_min = 10 ** (-hd_params.D_max)  # 最小透射率（對應最大密度）
+    T_max = 10 ** (-hd_params.D_min)  # 最大透射率（對應最小密度）
+    transmittance_normalized = (transmittance - T_min) / (T_max - T_min + 1e-6)
+
+    return np.clip(transmittance_normalized, 0, 1)
+
+
+# ==================== 查表 ====================
+
+@dataclass(frozen=True)
+class HDCurveLUT:
+    """
+    H&D 曲線查表（log 曝光量均勻取樣）
+
+    Attributes:
+        log_min / log_max: 查表範圍（log10 曝光量）
+        values: 各取樣點的精確透射率 (N,)，float64 與 float32 兩份
+        slopes: 相鄰取樣點差值 (N-1,)（插值斜率），float64 與 float32 兩份
+    """
+    log_min: float
+    log_max: float
+    values: dict
+    slopes: dict
+
+    @property
+    def size(self) -> int:
+        return len(self.values[np.float64])
+
+
+@lru_cache(maxsize=32)
+def _build_hd_curve_lut(params_type, params_values: tuple) -> HDCurveLUT:
+    hd_params = params_type(*params_values)
+    log_min, log_max = HD_LUT_LOG_RANGE
+    knots = np.linspace(log_min, log_max, HD_LUT_SIZE)
+    values = hd_curve_transmittance(knots, hd_params)
+    slopes = np.diff(values)
+    tables = {}
+    for name, array in (('values', values), ('slopes', slopes)):
+        tables[name] = {np.float64: array, np.float32: array.astype(np.float32)}
+        for table in tables[name].values():
+            table.flags.writeable = False
+    return HDCurveLUT(log_min=log_min, log_max=log_max, **tables)
+
+
+def get_hd_curve_lut(hd_params) -> HDCurveLUT:
+    """
+    取得 H&D 曲線查表（LRU 快取，每組參數只建構一次）
+
+    Args:
+        hd_params: HDCurveParams 實例（dataclass，以欄位值為快取鍵）
+
+    Returns:
+        HDCurveLUT: 唯讀查表
+
+    Raises:
+        TypeError: hd_params 不是 dataclass 實例
+    """
+    if not is_dataclass(hd_params):
+        raise TypeError(f"hd_params 必須是 HDCurveParams 實例，收到 {type(hd_params).__name__}")
+    return _build_hd_curve_lut(type(hd_params), astuple(hd_params))
+
+
+@row_banded
+def apply_hd_curve_lut(exposure: np.ndarray, hd_params) -> np.ndarray:
+    """
+    以查表計算 H&D 曲線（線性插值，超出查表上限的像素精確計算）
+
+    float32 輸入全程以 float32 計算（與精確路徑的輸出 dtype 一致），
+    其餘輸入以 float64 計算。取樣間距 log10 ≈ 3.4e-4：平滑區段插值誤差
+    < 1e-7，toe_end / 密度裁切處的折點附近 < 3e-4（透射率，0-1）。
+    全幅輸入以列帶（modules.row_bands）在多核心上計算。
+    快速路徑 'hd_curve_lut' 關閉時改以精確公式計算。
+
+    Args:
+        exposure: 曝光量數據（0-1 範圍，相對值）
+        hd_params: HDCurveParams 實例
+
+    Returns:
+        透射率數據（0-1 範圍）
+    """
+    if not fast_path_enabled(HD_CURVE_LUT):
+        return hd_curve_transmittance(np.log10(np.clip(exposure, 1e-10, None)), hd_params)
+
+    lut = get_hd_curve_lut(hd_params)
+    dtype = np.float32 if exposure.dtype == np.float32 else np.float64
+    last = lut.size - 1
+    scale = last / (lut.log_max - lut.log_min)
+
+    # 取樣位置：(log10(H) - log_min) × scale（就地運算，僅一個暫存陣列）
+    position = np.maximum(exposure, dtype(10.0 ** lut.log_min), dtype=dtype)
+    np.log10(position, out=position)
+    position -= dtype(lut.log_min)
+    position *= dtype(scale)
+
+    index = position.astype(np.intp)
+    np.clip(index, 0, last - 1, out=index)
+    position -= index  # 區間內分數位置
+
+    result = np.take(lut.slopes[dtype], index)
+    result *= position
+    result += np.take(lut.values[dtype], index)
+
+    # 精確尾段：H > 10^log_max
+    tail = exposure > 10.0 ** lut.log_max
+    if np.any(tail):
+        result[tail] = hd_curve_transmittance(np.log10(exposure[tail].astype(dtype)), hd_params)
+
+    return result
+
+
+# ==================== Exports ====================
+
+__all__ = [
+    'HD_CURVE_LUT',
+    'hd_curve_transmittance',
+    'HDCurveLUT',
+    'get_hd_curve_lut',
+    'apply_hd_curve_lut',
+]
@@ -0,0 +1,293 @@
+"""
+圖像解碼與降解析度 JPEG 解碼
+
+管線會把輸入的短邊標準化為 STANDARD_IMAGE_SIZE（3000px）。大型 JPEG
+（例如短邊 8000px 的全片幅原檔）若先以全解析度解碼，再以 INTER_AREA 縮小，
+大部分解碼時間與記憶體都花在隨即丟棄的像素上。
+
+libjpeg 可在 IDCT 階段直接輸出 1/2、1/4、1/8 尺寸（OpenCV 的
+IMREAD_REDUCED_COLOR_N）。此模組在檔頭 SOF 標記讀出原始尺寸後，選擇
+縮小後短邊仍 ≥ 目標尺寸的最大倍率解碼，再以原始尺寸計算的標準化尺寸
+精確縮放，因此輸出尺寸與全解析度解碼 + standardize() 完全一致；
+像素值差異為 DCT 縮放與面積平均的差（由精度閘門把關）。
+
+非 JPEG、無損 JPEG 或尺寸不足兩倍目標時以全解析度解碼，結果與原流程逐位元相同。
+
+輸入以不複製的方式取得（image_buffer）：檔案路徑以唯讀 mmap 映射，
+記憶體檔案（io.BytesIO / Streamlit UploadedFile）共享其緩衝區，
+解碼器直接讀取 uint8 視圖。
+
+Functions:
+    - image_buffer: 以不複製的 uint8 視圖取得編碼後的檔案內容
+    - image_source_name: 輸入來源的檔名
+    - jpeg_size: 從 JPEG 檔頭讀取原始尺寸（不解碼）
+    - reduced_decode_factor: 選擇降解析度解碼倍率
+    - decode_image: 解碼圖像（BGR uint8），可指定短邊目標尺寸
+    - standardize_decoded: 以原始尺寸計算的標準化尺寸縮放解碼結果
+    - decode_standardized: 解碼並標準化
+
+Example:
+    >>> from modules.image_io import decode_standardized, image_buffer
+    >>> with image_buffer(uploaded_file) as data:
+    ...     image, decoded = decode_standardized(data)
+
+Version: 0.8.4
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from film_models import STANDARD_IMAGE_SIZE
+from modules.optical_core import standard_size
+from modules.performance_modes import fast_path_enabled, register_fast_path
+
+__all__ = [
+    'REDUCED_DECODE',
+    'image_buffer',
+    'image_source_name',
+    'jpeg_size',
+    'reduced_decode_factor',
+    'decode_image',
+    'standardize_decoded',
+    'decode_standardized',
+]
+
+REDUCED_DECODE = register_fast_path(
+    'reduced_decode',
+    "JPEG 短邊 ≥ 2× 目標尺寸時以 libjpeg DCT 縮放（1/2、1/4、1/8）解碼後精確縮放"
+    "（參考：全解析度解碼 + INTER_AREA）",
+)
+
+# 倍率 → OpenCV 解碼旗標（皆套用 EXIF 方向，與 IMREAD_COLOR 相同）
+_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# 可於 IDCT 縮放的 SOF 標記（baseline / extended / progressive，Huffman 或算術編碼）
+_DCT_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC9, 0xCA))
+# 其餘 SOF 標記（無損 / 階層式），不可降解析度解碼
+_OTHER_SOF_MARKERS = frozenset((0xC3, 0xC5, 0xC6, 0xC7, 0xCB, 0xCD, 0xCE, 0xCF))
+# 無長度欄位的標記（TEM、RST0-7）
+_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xD8)))
+
+ImageData = Union[bytes, bytearray, memoryview, np.ndarray]
+ImageSource = Union[ImageData, str, os.PathLike, BinaryIO]
+
+
+def _as_buffer(data: ImageData) -> np.ndarray:
+    # 以 uint8 視圖包裝編碼資料（不複製）
+    if isinstance(data, np.ndarray):
+        return data.reshape(-1).view(np.uint8)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+# ==================== 輸入來源 ====================
+
+@contextmanager
+def image_buffer(source: ImageSource) -> Iterator[np.ndarray]:
+    """
+    以不複製的 uint8 視圖取得編碼後的檔案內容
+
+    - 檔案路徑：唯讀 mmap 映射，離開區塊時解除映射
+    - 具 getbuffer() 的記憶體檔案（io.BytesIO、Streamlit UploadedFile）：共享緩衝區
+    - 其他檔案物件：read()（一次複製）
+    - bytes / bytearray / memoryview / np.ndarray：直接包裝
+
+    視圖僅在區塊內有效。
+
+    Args:
+        source: 輸入來源
+
+    Yields:
+        np.ndarray: uint8 一維視圖
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # 空檔案無法映射
+                yield np.empty(0, dtype=np.uint8)
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield np.frombuffer(mapped, dtype=np.uint8)
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # 呼叫端仍持有視圖：映射於視圖釋放時解除
+    elif hasattr(source, 'getbuffer'):
+        yield np.frombuffer(source.getbuffer(), dtype=np.uint8)
+    elif hasattr(source, 'read'):
+        yield _as_buffer(source.read())
+    else:
+        yield _as_buffer(source)
+
+
+def image_source_name(source: ImageSource, default: str = "image") -> str:
+    """
+    輸入來源的檔名（路徑取 basename，檔案物件取 name 屬性）
+
+    Args:
+        source: 輸入來源
+        default: 無法取得檔名時的預設值
+
+    Returns:
+        str: 檔名
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    name = getattr(source, 'name', None)
+    return os.path.basename(name) if isinstance(name, str) and name else default
+
+
+# ==================== JPEG 檔頭 ====================
+
+def jpeg_size(data: ImageData) -> Optional[Tuple[int, int]]:
+    """
+    從 JPEG 檔頭讀取原始尺寸（不解碼，未套用 EXIF 方向）
+
+    僅回傳可於 IDCT 縮放的 DCT 編碼 JPEG 的尺寸。
+
+    Args:
+        data: 編碼後的檔案內容
+
+    Returns:
+        (寬度, 高度)；非 JPEG、無損 / 階層式 JPEG 或檔頭不完整時為 None
+    """
+    buffer = _as_buffer(data)
+    size = len(buffer)
+    if size < 4 or buffer[0] != 0xFF or buffer[1] != 0xD8:
+        return None
+
+    pos = 2
+    while pos + 4 <= size:
+        if buffer[pos] != 0xFF:
+            return None
+        marker = int(buffer[pos + 1])
+        if marker == 0xFF:  # 填充位元組
+            pos += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS 之前必須出現 SOF
+            return None
+        length = (int(buffer[pos + 2]) << 8) | int(buffer[pos + 3])
+        if marker in _DCT_SOF_MARKERS:
+            if pos + 9 > size:
+                return None
+            height = (int(buffer[pos + 5]) << 8) | int(buffer[pos + 6])
+            width = (int(buffer[pos + 7]) << 8) | int(buffer[pos + 8])
+            return (width, height) if width and height else None
+        if marker in _OTHER_SOF_MARKERS:
+            return None
+        pos += 2 + length
+    return None
+
+
+def reduced_decode_factor(width: int, height: int, target: int) -> int:
+    """
+    選擇降解析度解碼倍率
+
+    Args:
+        width: 原始寬度
+        height: 原始高度
+        target: 短邊目標尺寸
+
+    Returns:
+        int: 縮小後短邊（libjpeg 無條件進位）仍 ≥ target 的最大倍率（8、4、2），否則 1
+    """
+    short_side = min(width, height)
+    for factor in (8, 4, 2):
+        if -(-short_side // factor) >= target:
+            return factor
+    return 1
+
+
+# ==================== 解碼 ====================
+
+def decode_image(data: ImageData,
+                 target_short_side: Optional[int] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    解碼圖像（BGR uint8，套用 EXIF 方向）
+
+    指定 target_short_side 且啟用 'reduced_decode' 快速路徑時，大型 JPEG
+    以降解析度解碼（短邊仍 ≥ target_short_side）。
+
+    Args:
+        data: 編碼後的檔案內容
+        target_short_side: 後續處理所需的短邊尺寸（None = 全解析度）
+
+    Returns:
+        (解碼圖像, 全解析度解碼的 (寬度, 高度)，已套用 EXIF 方向)
+
+    Raises:
+        ValueError: 無法解碼
+    """
+    buffer = _as_buffer(data)
+    factor = 1
+    size = None
+    if target_short_side is not None and fast_path_enabled(REDUCED_DECODE):
+        size = jpeg_size(buffer)
+        if size is not None:
+            factor = reduced_decode_factor(*size, target_short_side)
+
+    image = cv2.imdecode(buffer, _DECODE_FLAGS[factor]) if buffer.size else None
+    if image is None:
+        raise ValueError("無法讀取圖像文件，請確保上傳的是有效的圖像格式")
+    if factor == 1:
+        return image, (image.shape[1], image.shape[0])
+
+    # EXIF 方向旋轉 90° 時，解碼結果的寬高與檔頭尺寸互換
+    width, height = size
+    if image.shape[:2] != (-(-height // factor), -(-width // factor)):
+        width, height = height, width
+    return image, (width, height)
+
+
+def standardize_decoded(image: np.ndarray, source_size: Tuple[int, int],
+                        target: int = STANDARD_IMAGE_SIZE) -> np.ndarray:
+    """
+    將解碼結果縮放至標準化尺寸
+
+    尺寸與插值方式依全解析度的 source_size 計算，因此降解析度解碼的
+    結果與全解析度解碼 + standardize() 尺寸相同；全解析度解碼且
+    target 為 STANDARD_IMAGE_SIZE 時與 standardize() 逐位元相同。
+
+    Args:
+        image: decode_image() 的解碼圖像
+        source_size: decode_image() 回傳的全解析度 (寬度, 高度)
+        target: 短邊目標尺寸
+
+    Returns:
+        調整後的圖像
+    """
+    new_width, new_height, scale_factor = standard_size(*source_size, target)
+    interpolation = cv2.INTER_AREA if scale_factor < 1 else cv2.INTER_LANCZOS4
+    return cv2.resize(image, (new_width, new_height), interpolation=interpolation)
+
+
+def decode_standardized(data: ImageData,
+                        target: int = STANDARD_IMAGE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    解碼並標準化圖像尺寸
+
+    Args:
+        data: 編碼後的檔案內容
+        target: 短邊目標尺寸
+
+    Returns:
+        (標準化圖像, 解碼圖像)
+
+    Raises:
+        ValueError: 無法解碼
+    """
+    image, source_size = decode_image(data, target)
+    return standardize_decoded(image, source_size, target), image
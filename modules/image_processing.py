@@ -46,6 +46,9 @@ from typing import Optional
 # 導入 film_models 中的類型
 import film_models
 from film_models import EmulsionLayer
+from modules.hd_curve import HD_CURVE_LUT, apply_hd_curve_lut, hd_curve_transmittance
+from modules.performance_modes import fast_path_enabled
+from modules.pointwise import pointwise
 
 # ==================== Linear RGB Grain Compensation ====================
 # v0.8.2 引入 sRGB → Linear RGB 後，顆粒強度需要重新校準
@@ -85,6 +88,8 @@ def apply_hd_curve(exposure: np.ndarray, hd_params: film_models.HDCurveParams) -
     - 負片：gamma ≈ 0.6-0.7（低對比度，留後製空間）
     - 正片：gamma ≈ 1.5-2.0（高對比度，直接觀看）
     - 基準密度由 use_visual_baseline 控制（視覺/物理模式）
+    - 預設以依參數快取的 log 曝光量查表計算（快速路徑 'hd_curve_lut'），
+      關閉時逐像素精確計算
     
     Args:
         exposure: 曝光量數據（0-1 範圍，相對值）
@@ -97,6 +102,11 @@ def apply_hd_curve(exposure: np.ndarray, hd_params: film_models.HDCurveParams) -
         # 未啟用 H&D 曲線，直接返回（保持向後相容）
         return exposure
     
+    # 預設：預計算查表（每組參數一條 1D 曲線，見 modules.hd_curve）
+    if fast_path_enabled(HD_CURVE_LUT):
+        return apply_hd_curve_lut(exposure, hd_params)
+    
+    # 精確參考實作
     # 0. 確保曝光量為正值（處理邊界條件）
     exposure_safe = np.clip(exposure, 1e-10, None)
     
@@ -104,58 +114,8 @@ def apply_hd_curve(exposure: np.ndarray, hd_params: film_models.HDCurveParams) -
     # 使用相對曝光量，假設 exposure=1.0 為正常曝光
     log_exposure = np.log10(exposure_safe)
     
-    # 2. 線性區段：D = gamma * log10(H) + D_fog
-    # 標準化：以中性曝光量（exposure=1.0, log=0）為參考點
-    # 基線密度：提供視覺/物理兩種基準（向後相容）
-    use_visual_baseline = getattr(hd_params, "use_visual_baseline", True)
-    if use_visual_baseline:
-        # 視覺基準：置中密度，適合藝術模式
-        D_baseline = hd_params.D_min + (hd_params.D_max - hd_params.D_min) * 0.33
-    else:
-        # 物理基準：使用 D_min/D_fog
-        D_baseline = hd_params.D_min
-    density = hd_params.gamma * log_exposure + D_baseline
-    
-    # 3. Toe（趾部）：低曝光量的壓縮
-    # 使用平滑函數：當 log_exposure < toe_end 時，密度增長變慢
-    if hd_params.toe_enabled:
-        toe_mask = log_exposure < hd_params.toe_end
-        if np.any(toe_mask):
-            # Toe 過渡函數：使用 soft clip（類似 tanh）
-            # 計算相對於 toe_end 的距離
-            toe_distance = (hd_params.toe_end - log_exposure[toe_mask]) / (hd_params.toe_end + 1e-6)
-            # 應用壓縮（越遠離 toe_end，壓縮越強）
-            toe_compression = 1.0 - hd_params.toe_strength * (1.0 - np.exp(-toe_distance))
-            density[toe_mask] *= toe_compression
-    
-    # 4. Shoulder（肩部）：高曝光量的壓縮
-    # 當 log_exposure > shoulder_start 時，密度增長變慢，逐漸飽和至 D_max
-    if hd_params.shoulder_enabled:
-        shoulder_mask = log_exposure > hd_params.shoulder_start
-        if np.any(shoulder_mask):
-            # Shoulder 過渡函數：漸近至 D_max
-            # 計算相對於 shoulder_start 的距離
-            shoulder_distance = (log_exposure[shoulder_mask] - hd_params.shoulder_start)
-            # 應用壓縮（越遠離 shoulder_start，越接近 D_max）
-            shoulder_compression = hd_params.shoulder_strength * shoulder_distance
-            # 軟飽和：使用指數衰減逼近 D_max
-            density[shoulder_mask] = (hd_params.D_max - 
-                                      (hd_params.D_max - density[shoulder_mask]) * 
-                                      np.exp(-shoulder_compression))
-    
-    # 5. 限制在有效動態範圍內
-    density = np.clip(density, hd_params.D_min, hd_params.D_max)
-    
-    # 6. 轉換為透射率：T = 10^(-D)
-    # 透射率：光線透過膠片的比例（0 = 完全阻擋，1 = 完全透過）
-    transmittance = 10 ** (-density)
-    
-    # 7. 正規化到 [0, 1] 範圍（考慮 D_min 對應的基礎透射率）
-    T_min = 10 ** (-hd_params.D_max)  # 最小透射率（對應最大密度）
-    T_max = 10 ** (-hd_params.D_min)  # 最大透射率（對應最小密度）
-    transmittance_normalized = (transmittance - T_min) / (T_max - T_min + 1e-6)
-    
-    return np.clip(transmittance_normalized, 0, 1)
+    # 2-7. 密度（線性區 + Toe / Shoulder）→ 透射率 → 正規化
+    return hd_curve_transmittance(log_exposure, hd_params)
 
 
 # ==================== PR #6: Layer Combination ====================
@@ -204,21 +164,19 @@ def combine_layers_for_channel(bloom: np.ndarray, lux: np.ndarray, layer: Emulsi
     # v0.8.2 HOTFIX: 暫時禁用 response_curve 運算（因輸入已是 Linear RGB）
     # TODO: 重新校準 response_curve 參數以適應 Linear space
     # result = bloom * w_diffuse + np.power(lux, layer.response_curve) * w_direct  # OLD
-    result = bloom * w_diffuse + lux * w_direct  # NEW (for Linear RGB input)
-    
     # 添加顆粒（作為加性噪聲，不參與能量守恆）
-    if use_grain:
-        # v0.8.2.2: Linear RGB 補償 - grain_intensity 在 Linear RGB 中需要縮小
-        grain_scale = layer.grain_intensity * GRAIN_LINEAR_RGB_COMPENSATION
-        
-        # 彩色胶片的顆粒有色彩相關性
-        if grain_r is not None and grain_g is not None and grain_b is not None:
-            result += (grain_r * grain_scale + 
-                      grain_g * grain_total + 
-                      grain_b * grain_total)
-        elif grain_r is not None:
-            result += grain_r * grain_scale
-    
+    # v0.8.2.2: Linear RGB 補償 - grain_intensity 在 Linear RGB 中需要縮小
+    grain_scale = layer.grain_intensity * GRAIN_LINEAR_RGB_COMPENSATION
+    if use_grain and grain_r is not None and grain_g is not None and grain_b is not None:
+        # 彩色胶片的顆粒有色彩相關性（層組合與顆粒疊加為單次逐點運算）
+        return pointwise('combine_layers_grain', bloom=bloom, lux=lux,
+                         grain_r=grain_r, grain_g=grain_g, grain_b=grain_b,
+                         w_diffuse=w_diffuse, w_direct=w_direct,
+                         grain_scale=grain_scale, grain_total=grain_total)
+
+    result = pointwise('combine_layers', bloom=bloom, lux=lux, w_diffuse=w_diffuse, w_direct=w_direct)
+    if use_grain and grain_r is not None:
+        result += grain_r * grain_scale
     return result
 
 
@@ -7,6 +7,7 @@ Functions:
     - spectral_response: 計算膠片感光層的光譜響應
     - average_response: 計算平均光譜響應
     - standardize: 標準化圖像尺寸
+    - standard_size: 標準化後的圖像尺寸
 
 Physics Foundation:
     - Beer-Lambert Law: 光吸收定律
@@ -37,14 +38,23 @@ Note:
 
 import numpy as np
 import cv2
+from functools import lru_cache
 from typing import Tuple, Optional
 
 # 從 film_models 導入必要的類型和常數
 from film_models import FilmProfile, STANDARD_IMAGE_SIZE
+from .performance_modes import register_fast_path, fast_path_enabled
+from .row_bands import row_banded
+
+FAST_PATH_INPUT_LUT = register_fast_path(
+    'input_lut',
+    "uint8 輸入以 256 項 sRGB 解碼查表 + 4×3 響應矩陣計算（參考：逐通道浮點解碼 + 純量乘加）"
+)
 
 
 # ==================== 色彩空間轉換 ====================
 
+@row_banded
 def srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
     """
     sRGB gamma 解碼（轉換至線性光空間）
@@ -135,35 +145,52 @@ def linear_to_srgb(rgb: np.ndarray) -> np.ndarray:
 
 # ==================== 圖像預處理 ====================
 
-def standardize(image: np.ndarray) -> np.ndarray:
+def standard_size(width: int, height: int, target: int = STANDARD_IMAGE_SIZE) -> Tuple[int, int, float]:
     """
-    標準化圖像尺寸
-    
-    將圖像的短邊調整為標準尺寸（3000px），保持寬高比
-    
+    計算標準化後的圖像尺寸
+
+    短邊縮放至 target，長邊等比例縮放，兩邊皆調整為偶數。
+
     Args:
-        image: 輸入圖像 (BGR 格式)
-        
+        width: 原始寬度
+        height: 原始高度
+        target: 短邊目標尺寸
+
     Returns:
-        調整後的圖像
+        (新寬度, 新高度, 縮放比例)
     """
-    height, width = image.shape[:2]
-    
     # 確定縮放比例
     if height < width:
         # 竖圖 - 高度為短邊
-        scale_factor = STANDARD_IMAGE_SIZE / height
-        new_height = STANDARD_IMAGE_SIZE
+        scale_factor = target / height
+        new_height = target
         new_width = int(width * scale_factor)
     else:
         # 橫圖 - 寬度為短邊
-        scale_factor = STANDARD_IMAGE_SIZE / width
-        new_width = STANDARD_IMAGE_SIZE
+        scale_factor = target / width
+        new_width = target
         new_height = int(height * scale_factor)
     
     # 確保新尺寸為偶數（避免某些處理問題）
     new_width = new_width + 1 if new_width % 2 != 0 else new_width
     new_height = new_height + 1 if new_height % 2 != 0 else new_height
+    return new_width, new_height, scale_factor
+
+
+def standardize(image: np.ndarray) -> np.ndarray:
+    """
+    標準化圖像尺寸
+    
+    將圖像的短邊調整為標準尺寸（3000px），保持寬高比
+    
+    Args:
+        image: 輸入圖像 (BGR 格式)
+        
+    Returns:
+        調整後的圖像
+    """
+    height, width = image.shape[:2]
+    new_width, new_height, scale_factor = standard_size(width, height)
     
     # 選擇適當的插值方法
     interpolation = cv2.INTER_AREA if scale_factor < 1 else cv2.INTER_LANCZOS4
@@ -174,6 +201,113 @@ def standardize(image: np.ndarray) -> np.ndarray:
 
 # ==================== 光度計算 ====================
 
+@lru_cache(maxsize=1)
+def _srgb_decode_lut() -> np.ndarray:
+    """
+    uint8 sRGB → Linear RGB 查表（256 項，float32）
+    
+    查表值與逐像素 srgb_to_linear(code / 255) 完全一致（同為 float32 運算），
+    因此查表路徑與原浮點路徑逐位元相同。
+    
+    Returns:
+        (256,) float32 查表
+    """
+    codes = np.arange(256, dtype=np.float32) / 255.0
+    lut = srgb_to_linear(codes).astype(np.float32)
+    lut.setflags(write=False)
+    return lut
+
+
+def _film_response_matrix(film: FilmProfile) -> np.ndarray:
+    """
+    將 FilmProfile.get_spectral_response() 整理為 4×3 色彩矩陣
+    
+    行順序為 (紅層, 綠層, 藍層, 全色層)，列順序為 (B, G, R)，
+    對應 OpenCV 交錯影像的通道排列，可直接交給 cv2.transform。
+    
+    Args:
+        film: 胶片配置對象
+        
+    Returns:
+        (4, 3) float32 矩陣
+    """
+    coeffs = np.asarray(film.get_spectral_response(), dtype=np.float32).reshape(4, 3)
+    return np.ascontiguousarray(coeffs[:, ::-1])
+
+
+def _spectral_response_float(image: np.ndarray, film: FilmProfile) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], np.ndarray]:
+    """
+    非 uint8 輸入的光譜響應（逐像素 sRGB 解碼）
+    
+    Args:
+        image: 輸入圖像 (BGR 格式，值域依 dtype 的最大值歸一化)
+        film: 胶片配置對象
+        
+    Returns:
+        與 spectral_response() 相同
+    """
+    scale = float(np.iinfo(image.dtype).max) if np.issubdtype(image.dtype, np.integer) else 1.0
+    linear = srgb_to_linear(image[..., :3].astype(np.float32) / scale).astype(np.float32)
+    return _apply_response_matrix(linear, film)
+
+
+def _spectral_response_reference(image: np.ndarray, film: FilmProfile) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], np.ndarray]:
+    """
+    光譜響應的逐通道參考實作（v0.8.2 原始演算法）
+    
+    逐通道浮點 sRGB 解碼 + 純量乘加；'input_lut' 快速路徑關閉時使用，
+    作為精度閘門的比較基準。
+    
+    Args:
+        image: 輸入圖像 (BGR 格式，uint8)
+        film: 胶片配置對象
+        
+    Returns:
+        與 spectral_response() 相同
+    """
+    b, g, r = cv2.split(image)
+    r_linear = srgb_to_linear(r.astype(np.float32) / 255.0)
+    g_linear = srgb_to_linear(g.astype(np.float32) / 255.0)
+    b_linear = srgb_to_linear(b.astype(np.float32) / 255.0)
+    
+    r_r, r_g, r_b, g_r, g_g, g_b, b_r, b_g, b_b, t_r, t_g, t_b = film.get_spectral_response()
+    response_total = t_r * r_linear + t_g * g_linear + t_b * b_linear
+    
+    if film.color_type != "color":
+        return None, None, None, response_total
+    
+    response_r = r_r * r_linear + r_g * g_linear + r_b * b_linear
+    response_g = g_r * r_linear + g_g * g_linear + g_b * b_linear
+    response_b = b_r * r_linear + b_g * g_linear + b_b * b_linear
+    return response_r, response_g, response_b, response_total
+
+
+def _apply_response_matrix(linear: np.ndarray, film: FilmProfile) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], np.ndarray]:
+    """
+    對交錯的 Linear BGR 影像套用乳劑層響應矩陣
+    
+    每個響應平面直接由矩陣的一行經 cv2.transform 輸出為連續記憶體，
+    實測比先輸出 4 通道交錯影像再 split 快約 2x（省去一次整幅重排）。
+    
+    Args:
+        linear: Linear RGB 影像 (H, W, 3)，BGR 通道順序，float32
+        film: 胶片配置對象
+        
+    Returns:
+        (response_r, response_g, response_b, response_total)
+    """
+    matrix = _film_response_matrix(film)
+    response_total = cv2.transform(linear, matrix[3:4])
+    
+    if film.color_type != "color":
+        return None, None, None, response_total
+    
+    response_r = cv2.transform(linear, matrix[0:1])
+    response_g = cv2.transform(linear, matrix[1:2])
+    response_b = cv2.transform(linear, matrix[2:3])
+    return response_r, response_g, response_b, response_total
+
+
 def spectral_response(image: np.ndarray, film: FilmProfile) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], np.ndarray]:
     """
     計算胶片感光層的光譜響應
@@ -204,39 +338,22 @@ def spectral_response(image: np.ndarray, film: FilmProfile) -> Tuple[Optional[np
     Note:
         v0.8.2 核心修正：新增 sRGB → Linear RGB gamma 解碼
         這確保所有光學計算在物理正確的線性光空間進行。
+        
+        uint8 輸入使用 256 項解碼查表 + 單一 4×3 響應矩陣（cv2.LUT/cv2.transform），
+        結果與逐通道浮點運算一致（float32 捨入誤差內）。
     """
-    # 分離 RGB 通道
-    b, g, r = cv2.split(image)
-    
-    # 轉換為浮點數 (0-1 範圍)
-    r_float = r.astype(np.float32) / 255.0
-    g_float = g.astype(np.float32) / 255.0
-    b_float = b.astype(np.float32) / 255.0
+    # 非 uint8 輸入（如 16-bit PNG 或已歸一化浮點）無法查表，走逐像素解碼
+    if image.dtype != np.uint8:
+        return _spectral_response_float(image, film)
     
-    # v0.8.2 新增：sRGB gamma 解碼 → Linear RGB
-    # 這是物理正確色彩處理的關鍵步驟
-    # Reference: IEC 61966-2-1:1999
-    r_linear = srgb_to_linear(r_float)
-    g_linear = srgb_to_linear(g_float)
-    b_linear = srgb_to_linear(b_float)
+    # 查表路徑關閉時（精度閘門參考）使用逐通道原始演算法
+    if not fast_path_enabled(FAST_PATH_INPUT_LUT):
+        return _spectral_response_reference(image, film)
     
-    # 獲取光譜響應係數（假設 Linear RGB 輸入）
-    r_r, r_g, r_b, g_r, g_g, g_b, b_r, b_g, b_b, t_r, t_g, t_b = film.get_spectral_response()
-    
-    # 模擬不同乳劑層的光譜響應（光譜敏感度的線性組合）
-    # 在線性光空間進行矩陣運算（物理正確）
-    if film.color_type == "color":
-        response_r = r_r * r_linear + r_g * g_linear + r_b * b_linear
-        response_g = g_r * r_linear + g_g * g_linear + g_b * b_linear
-        response_b = b_r * r_linear + b_g * g_linear + b_b * b_linear
-        response_total = t_r * r_linear + t_g * g_linear + t_b * b_linear
-    else:
-        response_total = t_r * r_linear + t_g * g_linear + t_b * b_linear
-        response_r = None
-        response_g = None
-        response_b = None
-
-    return response_r, response_g, response_b, response_total
+    # 融合輸入階段：uint8 → Linear RGB（256 項查表）→ 乳劑層響應（4×3 矩陣）
+    # 取代 split + 3 次浮點轉換 + 3 次 pow + 12 次純量乘加
+    linear = cv2.LUT(image, _srgb_decode_lut())
+    return _apply_response_matrix(linear, film)
 
 
 def average_response(response_total: np.ndarray) -> float:
@@ -259,6 +376,7 @@ __all__ = [
     'srgb_to_linear',     # v0.8.2: 新增 sRGB gamma 解碼
     'linear_to_srgb',     # v0.8.2.3: 新增 sRGB gamma 編碼（輸出）
     'standardize',
+    'standard_size',      # v0.8.4: 供降解析度解碼計算尺寸
     'spectral_response',
     'average_response'
 ]
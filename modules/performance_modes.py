@@ -0,0 +1,105 @@
+"""
+效能模式（快速路徑）開關
+
+每個近似或重排運算順序的快速路徑都在此註冊一個具名開關，
+預設值代表「已通過精度閘門、可預設啟用」。開關關閉時，對應函數
+必須退回精確參考實作，供 tools/accuracy_gate.py 在同一份輸入上
+比較精確路徑與快速路徑（PSNR、CIEDE2000、逐階段最大絕對誤差）。
+
+Functions:
+    - register_fast_path: 註冊快速路徑（模組導入時呼叫）
+    - fast_path_enabled: 查詢開關狀態（熱路徑中使用）
+    - set_fast_path: 設定開關
+    - fast_path: 暫時設定開關的 context manager
+    - list_fast_paths: 列出所有快速路徑與說明
+
+Example:
+    >>> from modules.performance_modes import fast_path
+    >>> with fast_path('input_lut', False):
+    ...     exact = spectral_response(image, film)
+
+Version: 0.8.4
+"""
+
+from contextlib import contextmanager
+from typing import Dict
+
+__all__ = [
+    'register_fast_path',
+    'fast_path_enabled',
+    'set_fast_path',
+    'fast_path',
+    'list_fast_paths',
+]
+
+# 名稱 → 是否啟用
+_ENABLED: Dict[str, bool] = {}
+# 名稱 → 說明
+_DESCRIPTIONS: Dict[str, str] = {}
+
+
+def register_fast_path(name: str, description: str, default: bool = True) -> str:
+    """
+    註冊快速路徑（重複註冊時保留目前狀態）
+
+    Args:
+        name: 開關名稱（例如 'input_lut'）
+        description: 說明（近似方式與參考實作）
+        default: 預設是否啟用
+
+    Returns:
+        str: 開關名稱（方便模組以常數保存）
+    """
+    _DESCRIPTIONS[name] = description
+    _ENABLED.setdefault(name, default)
+    return name
+
+
+def fast_path_enabled(name: str) -> bool:
+    """
+    查詢快速路徑是否啟用
+
+    Raises:
+        KeyError: 未註冊的名稱
+    """
+    if name not in _ENABLED:
+        raise KeyError(f"未註冊的快速路徑: {name}. 可用: {', '.join(sorted(_ENABLED))}")
+    return _ENABLED[name]
+
+
+def set_fast_path(name: str, enabled: bool) -> bool:
+    """
+    設定快速路徑開關
+
+    Returns:
+        bool: 設定前的狀態
+
+    Raises:
+        KeyError: 未註冊的名稱
+    """
+    previous = fast_path_enabled(name)
+    _ENABLED[name] = bool(enabled)
+    return previous
+
+
+@contextmanager
+def fast_path(name: str, enabled: bool):
+    """暫時設定快速路徑開關，離開時還原"""
+    previous = set_fast_path(name, enabled)
+    try:
+        yield
+    finally:
+        _ENABLED[name] = previous
+
+
+def list_fast_paths() -> Dict[str, dict]:
+    """
+    列出所有快速路徑
+
+    Returns:
+        Dict[str, dict]: {name: {'enabled': bool, 'description': str}}
+    """
+    return {
+        name: {'enabled': _ENABLED[name], 'description': _DESCRIPTIONS[name]}
+        for name in sorted(_ENABLED)
+    }
@@ -0,0 +1,468 @@
+"""
+逐點運算核心與可切換後端
+
+管線中的逐點（pointwise）階段 —— 互易律縮放、高光提取、藝術 Bloom 權重、
+顆粒加權、層組合、Filmic 曲線 —— 以 numpy 逐步運算時每一步都是一次
+全幅讀寫並產生暫存陣列。此模組將每個階段定義一次（PointwiseKernel），
+由可切換的後端執行：
+
+Backends:
+    - numpy: 參考實作（與原逐步運算逐位元相同）
+    - numexpr: 整個運算式單次、多執行緒、分塊計算（選用依賴）
+    - numba: 運算式編譯為 parallel @vectorize ufunc（選用依賴）
+    - opencv: cv2 多執行緒算術（僅部分核心提供實作，其餘退回 numpy）
+
+後端選擇：
+    - 環境變數 PHOS_POINTWISE_BACKEND（預設 "auto"：numexpr > numpy）
+    - set_pointwise_backend() / pointwise_backend() context manager
+    - 快速路徑 'pointwise_fused' 關閉時一律使用 numpy 參考實作
+      （tools/accuracy_gate.py 比較兩者）
+
+numpy 後端以列帶（modules.row_bands）在多核心上執行，結果逐位元不變。
+選用依賴缺少時發出一次警告並退回 numpy。非 numpy 後端的輸出 dtype
+與 numpy 參考實作一致，數值差異僅為浮點運算順序造成的捨入差。
+
+Example:
+    >>> from modules.pointwise import pointwise
+    >>> scattered = pointwise('scatter_highlights', x=lux, threshold=0.8, eta=0.1)
+
+Version: 0.8.4
+"""
+
+import importlib
+import importlib.util
+import os
+import threading
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from modules.performance_modes import fast_path_enabled, register_fast_path
+from modules.row_bands import apply_row_bands
+
+__all__ = [
+    'POINTWISE_BACKENDS',
+    'PointwiseKernel',
+    'KERNELS',
+    'register_kernel',
+    'pointwise',
+    'available_backends',
+    'get_pointwise_backend',
+    'set_pointwise_backend',
+    'pointwise_backend',
+]
+
+POINTWISE_BACKENDS = ('numpy', 'numexpr', 'numba', 'opencv')
+# "auto" 的優先順序，僅含無額外啟動成本的後端：
+# - numba：首次呼叫時每個核心 / dtype 需 JIT 編譯（數秒、數十 MB），
+#   且多執行緒呼叫須序列化（見 _numba_lock）→ 長時間批次處理時手動選擇
+# - opencv：不融合運算（每個算術仍是一次全幅讀寫）
+_AUTO_ORDER = ('numexpr', 'numpy')
+_BACKEND_ENV = 'PHOS_POINTWISE_BACKEND'
+
+POINTWISE_FUSED = register_fast_path(
+    'pointwise_fused',
+    "逐點階段以所選後端（numexpr / numba / opencv）融合執行（關閉時使用 numpy 逐步參考實作）",
+)
+
+
+# ============================================================
+# 核心定義
+# ============================================================
+
+@dataclass(frozen=True)
+class PointwiseKernel:
+    """
+    逐點運算核心（定義一次，各後端執行）
+
+    Attributes:
+        name: 核心名稱
+        arrays: 陣列參數名稱
+        scalars: 純量參數名稱
+        expression: numexpr 語法的運算式（numexpr / numba 後端使用）
+        reference: numpy 參考實作 f(**kwargs)（與原逐步運算相同）
+        opencv: OpenCV 實作 f(**kwargs)（None 表示退回 numpy）
+    """
+    name: str
+    arrays: Tuple[str, ...]
+    scalars: Tuple[str, ...]
+    expression: str
+    reference: Callable
+    opencv: Optional[Callable] = None
+
+
+KERNELS: Dict[str, PointwiseKernel] = {}
+
+
+def register_kernel(kernel: PointwiseKernel) -> PointwiseKernel:
+    """
+    註冊逐點運算核心
+
+    Raises:
+        ValueError: 名稱重複
+    """
+    if kernel.name in KERNELS:
+        raise ValueError(f"逐點核心已存在: {kernel.name}")
+    KERNELS[kernel.name] = kernel
+    return kernel
+
+
+def _clip01(expr: str) -> str:
+    """numexpr 沒有 clip：以 where 表示 clip(expr, 0, 1)"""
+    return f"where(({expr}) < 0, 0, where(({expr}) > 1, 1, ({expr})))"
+
+
+# --- 高光提取與能量守恆重組（physical bloom / 波長依賴 bloom）---
+
+def _scatter_highlights(x, threshold, eta):
+    highlights = np.maximum(x - threshold, 0)
+    return highlights * eta
+
+
+def _scatter_highlights_cv(x, threshold, eta):
+    import cv2
+    return cv2.multiply(cv2.max(cv2.subtract(x, threshold), 0.0), eta)
+
+
+register_kernel(PointwiseKernel(
+    name='scatter_highlights',
+    arrays=('x',), scalars=('threshold', 'eta'),
+    expression="where(x > threshold, x - threshold, 0) * eta",
+    reference=_scatter_highlights,
+    opencv=_scatter_highlights_cv,
+))
+
+
+def _bloom_recombine(x, scattered, bloom):
+    return np.clip(x - scattered + bloom, 0, 1)
+
+
+def _bloom_recombine_cv(x, scattered, bloom):
+    import cv2
+    return cv2.min(cv2.max(cv2.add(cv2.subtract(x, scattered), bloom), 0.0), 1.0)
+
+
+register_kernel(PointwiseKernel(
+    name='bloom_recombine',
+    arrays=('x', 'scattered', 'bloom'), scalars=(),
+    expression=_clip01("x - scattered + bloom"),
+    reference=_bloom_recombine,
+    opencv=_bloom_recombine_cv,
+))
+
+
+# --- 藝術模式 Bloom ---
+
+def _artistic_weights(x, base, sensitivity):
+    weights = (base + x ** 2) * sensitivity
+    return np.clip(weights, 0, 1)
+
+
+register_kernel(PointwiseKernel(
+    name='artistic_weights',
+    arrays=('x',), scalars=('base', 'sensitivity'),
+    expression=_clip01("(base + x * x) * sensitivity"),
+    reference=_artistic_weights,
+))
+
+
+def _artistic_glow(bloom, weights, strength):
+    bloom_effect = bloom * weights * strength
+    return bloom_effect / (1.0 + bloom_effect)
+
+
+register_kernel(PointwiseKernel(
+    name='artistic_glow',
+    arrays=('bloom', 'weights'), scalars=('strength',),
+    expression="bloom * weights * strength / (1 + bloom * weights * strength)",
+    reference=_artistic_glow,
+))
+
+
+# --- 藝術模式顆粒加權 ---
+
+def _grain_weighting(noise, sign, x, sensitivity, weight_min, weight_max):
+    noise = noise ** 2
+    noise = (noise - 1.0) / np.sqrt(2.0)
+    noise = noise * sign
+    weights = (0.5 - np.abs(x - 0.5)) * 2
+    weights = np.clip(weights, weight_min, weight_max)
+    return noise * weights * sensitivity
+
+
+register_kernel(PointwiseKernel(
+    name='grain_weighting',
+    arrays=('noise', 'sign', 'x'), scalars=('sensitivity', 'weight_min', 'weight_max'),
+    expression=(
+        "(noise * noise - 1) / sqrt(2.0) * sign"
+        " * where((0.5 - abs(x - 0.5)) * 2 < weight_min, weight_min,"
+        " where((0.5 - abs(x - 0.5)) * 2 > weight_max, weight_max, (0.5 - abs(x - 0.5)) * 2))"
+        " * sensitivity"
+    ),
+    reference=_grain_weighting,
+))
+
+
+# --- 層組合（散射光 + 直射光 + 顆粒）---
+
+def _combine_layers(bloom, lux, w_diffuse, w_direct):
+    return bloom * w_diffuse + lux * w_direct
+
+
+def _combine_layers_cv(bloom, lux, w_diffuse, w_direct):
+    import cv2
+    return cv2.addWeighted(bloom, w_diffuse, lux, w_direct, 0.0)
+
+
+register_kernel(PointwiseKernel(
+    name='combine_layers',
+    arrays=('bloom', 'lux'), scalars=('w_diffuse', 'w_direct'),
+    expression="bloom * w_diffuse + lux * w_direct",
+    reference=_combine_layers,
+    opencv=_combine_layers_cv,
+))
+
+
+def _combine_layers_grain(bloom, lux, grain_r, grain_g, grain_b, w_diffuse, w_direct,
+                          grain_scale, grain_total):
+    result = bloom * w_diffuse + lux * w_direct
+    result += (grain_r * grain_scale +
+               grain_g * grain_total +
+               grain_b * grain_total)
+    return result
+
+
+register_kernel(PointwiseKernel(
+    name='combine_layers_grain',
+    arrays=('bloom', 'lux', 'grain_r', 'grain_g', 'grain_b'),
+    scalars=('w_diffuse', 'w_direct', 'grain_scale', 'grain_total'),
+    expression=(
+        "bloom * w_diffuse + lux * w_direct"
+        " + (grain_r * grain_scale + grain_g * grain_total + grain_b * grain_total)"
+    ),
+    reference=_combine_layers_grain,
+))
+
+
+# --- Filmic 曲線 ---
+
+def _filmic_curve(lux, exposure_scale, a, b, cb, de, df, ef):
+    lux = np.maximum(lux, 0)
+    x = exposure_scale * lux
+    numerator = x * (a * x + cb) + de
+    denominator = x * (a * x + b) + df
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, (numerator / denominator) - ef, 0)
+
+
+register_kernel(PointwiseKernel(
+    name='filmic_curve',
+    arrays=('lux',), scalars=('exposure_scale', 'a', 'b', 'cb', 'de', 'df', 'ef'),
+    expression=(
+        "where((exposure_scale * where(lux > 0, lux, 0)) * (a * (exposure_scale * where(lux > 0, lux, 0)) + b) + df != 0,"
+        " ((exposure_scale * where(lux > 0, lux, 0)) * (a * (exposure_scale * where(lux > 0, lux, 0)) + cb) + de)"
+        " / ((exposure_scale * where(lux > 0, lux, 0)) * (a * (exposure_scale * where(lux > 0, lux, 0)) + b) + df)"
+        " - ef, 0)"
+    ),
+    reference=_filmic_curve,
+))
+
+
+# --- 互易律失效縮放 ---
+
+def _scale_clip(x, scale):
+    return np.clip(x * scale, 0, 1)
+
+
+def _scale_clip_cv(x, scale):
+    import cv2
+    return cv2.min(cv2.max(cv2.multiply(x, scale), 0.0), 1.0)
+
+
+register_kernel(PointwiseKernel(
+    name='scale_clip',
+    arrays=('x',), scalars=('scale',),
+    expression=_clip01("x * scale"),
+    reference=_scale_clip,
+    opencv=_scale_clip_cv,
+))
+
+# 彩色：(H, W, C) 整幅單次運算，scale 為 (1, 1, C) 逐通道係數（廣播；列帶不切分）
+register_kernel(PointwiseKernel(
+    name='scale_clip_channels',
+    arrays=('x', 'scale'), scalars=(),
+    expression=_clip01("x * scale"),
+    reference=_scale_clip,
+))
+
+
+# ============================================================
+# 後端
+# ============================================================
+
+_selected = os.environ.get(_BACKEND_ENV, 'auto')
+_warned = set()
+_numba_cache: Dict[tuple, Callable] = {}
+# numba 預設的 workqueue 執行緒層不支援多個執行緒同時啟動 parallel 核心
+# （如並行通道執行器），呼叫以鎖序列化
+_numba_lock = threading.Lock()
+
+
+def available_backends() -> Tuple[str, ...]:
+    """
+    列出目前環境可用的後端（選用依賴已安裝）
+
+    Returns:
+        Tuple[str, ...]: 可用後端名稱（numpy 永遠可用）
+    """
+    return tuple(
+        name for name in POINTWISE_BACKENDS
+        if name == 'numpy' or importlib.util.find_spec('cv2' if name == 'opencv' else name) is not None
+    )
+
+
+def get_pointwise_backend() -> str:
+    """
+    目前實際使用的後端（解析 "auto" 與不可用的選擇）
+
+    Returns:
+        str: 'numpy' / 'numexpr' / 'numba' / 'opencv'
+    """
+    if not fast_path_enabled(POINTWISE_FUSED):
+        return 'numpy'
+    available = available_backends()
+    if _selected == 'auto':
+        return next(name for name in _AUTO_ORDER if name in available)
+    if _selected not in available:
+        if _selected not in _warned:
+            _warned.add(_selected)
+            warnings.warn(f"逐點運算後端 {_selected} 不可用（未安裝選用依賴），改用 numpy")
+        return 'numpy'
+    return _selected
+
+
+def set_pointwise_backend(name: str) -> str:
+    """
+    選擇逐點運算後端
+
+    Args:
+        name: 'auto' 或 POINTWISE_BACKENDS 之一
+
+    Returns:
+        str: 設定前的選擇
+
+    Raises:
+        ValueError: 未知的後端名稱
+    """
+    global _selected
+    if name != 'auto' and name not in POINTWISE_BACKENDS:
+        raise ValueError(
+            f"未知的逐點運算後端: {name}. 可用: auto, {', '.join(POINTWISE_BACKENDS)}"
+        )
+    previous, _selected = _selected, name
+    return previous
+
+
+@contextmanager
+def pointwise_backend(name: str):
+    """暫時切換逐點運算後端，離開時還原"""
+    previous = set_pointwise_backend(name)
+    try:
+        yield
+    finally:
+        set_pointwise_backend(previous)
+
+
+def _result_dtype(arrays, scalars) -> np.dtype:
+    # 與 numpy 參考實作一致（NEP 50）：Python 純量不影響結果 dtype，numpy 純量參與提升
+    dtype = np.result_type(*arrays, *scalars)
+    return dtype if dtype.kind == 'f' else np.dtype(np.float64)
+
+
+def _run_numexpr(kernel: PointwiseKernel, arrays: dict, scalars: dict, dtype: np.dtype) -> np.ndarray:
+    import numexpr
+    local_dict = dict(arrays)
+    local_dict.update({name: dtype.type(value) for name, value in scalars.items()})
+    return numexpr.evaluate(kernel.expression, local_dict=local_dict)
+
+
+def _numba_ufunc(kernel: PointwiseKernel, array_dtypes: tuple, dtype: np.dtype) -> Callable:
+    key = (kernel.name, array_dtypes, dtype.str)
+    if key not in _numba_cache:
+        import math
+        import numba
+
+        @numba.njit(inline='always')
+        def where(condition, a, b):
+            return a if condition else b
+
+        args = kernel.arrays + kernel.scalars
+        source = f"def _kernel({', '.join(args)}):\n    return {kernel.expression}\n"
+        namespace = {'where': where, 'sqrt': math.sqrt}
+        exec(source, namespace)
+        to_numba = numba.from_dtype
+        signature = to_numba(dtype)(*(
+            [to_numba(np.dtype(d)) for d in array_dtypes] + [to_numba(dtype)] * len(kernel.scalars)
+        ))
+        _numba_cache[key] = numba.vectorize([signature], target='parallel')(namespace['_kernel'])
+    return _numba_cache[key]
+
+
+def _run_numba(kernel: PointwiseKernel, arrays: dict, scalars: dict, dtype: np.dtype) -> np.ndarray:
+    values = [np.asarray(arrays[name]) for name in kernel.arrays]
+    with _numba_lock:
+        ufunc = _numba_ufunc(kernel, tuple(v.dtype.str for v in values), dtype)
+        return ufunc(*values, *(dtype.type(scalars[name]) for name in kernel.scalars))
+
+
+def pointwise(name: str, **kwargs) -> np.ndarray:
+    """
+    以目前後端執行逐點運算核心
+
+    Args:
+        name: 核心名稱（見 KERNELS）
+        **kwargs: 核心的陣列與純量參數
+
+    Returns:
+        np.ndarray: 運算結果（dtype 與 numpy 參考實作相同）
+
+    Raises:
+        KeyError: 未註冊的核心
+        TypeError: 參數缺失或多餘
+    """
+    if name not in KERNELS:
+        raise KeyError(f"未註冊的逐點核心: {name}. 可用: {', '.join(sorted(KERNELS))}")
+    kernel = KERNELS[name]
+    expected = set(kernel.arrays) | set(kernel.scalars)
+    if set(kwargs) != expected:
+        raise TypeError(f"逐點核心 {name} 需要參數 {sorted(expected)}，收到 {sorted(kwargs)}")
+
+    backend = get_pointwise_backend()
+    if backend == 'numpy':
+        # numpy 逐步運算為單執行緒：以列帶在多核心上執行（其餘後端自行多執行緒）
+        return apply_row_bands(kernel.reference, **kwargs)
+
+    arrays = {key: kwargs[key] for key in kernel.arrays}
+    scalars = {key: kwargs[key] for key in kernel.scalars}
+    dtype = _result_dtype(arrays.values(), scalars.values())
+
+    if backend == 'opencv':
+        # OpenCV 僅處理同形狀的 float32 陣列；其餘退回 numpy
+        shape = next(iter(arrays.values())).shape if arrays else None
+        if kernel.opencv is None or any(
+            not isinstance(a, np.ndarray) or a.dtype != np.float32 or a.shape != shape
+            for a in arrays.values()
+        ) or len(shape) < 2:
+            return kernel.reference(**kwargs)
+        # cv2 將 (H, W, C) 視為 C 通道（純量只作用於第 0 通道、C = 1 時丟棄通道軸）：
+        # 攤平為單通道 2-D 計算後還原形狀
+        planar = {key: value.reshape(shape[0], -1) for key, value in arrays.items()}
+        result = kernel.opencv(**planar, **scalars).reshape(shape)
+    elif backend == 'numexpr':
+        result = _run_numexpr(kernel, arrays, scalars, dtype)
+    else:
+        result = _run_numba(kernel, arrays, scalars, dtype)
+    return result.astype(dtype, copy=False)
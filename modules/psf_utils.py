@@ -2,7 +2,7 @@
 PSF (Point Spread Function) 工具模組
 
 負責：
-1. Mie 散射參數查表與插值
+1. Mie 散射參數查表與插值（依路徑快取、向量化）與 PSF 快取
 2. PSF 核生成（雙段核、高斯核、指數核）
 3. 卷積運算（FFT 與空域自適應）
 
@@ -17,18 +17,47 @@ PR #4: Extracted from Phos.py (Lines 295-349, 481-522, 525-578, 583-624, 627-652
 import numpy as np
 import cv2
 from functools import lru_cache
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional, Tuple
 
-# ==================== Global Cache ====================
+from asset_pack import load_asset, resolve_data_path
 
-_MIE_LOOKUP_TABLE_CACHE = None
+# ==================== Mie Scattering ====================
 
+_MIE_TABLE_KEYS = ('wavelengths', 'iso_values', 'sigma', 'kappa', 'rho', 'eta')
+
+
+def _mie_table_key(path) -> Tuple[str, int]:
+    """
+    查表快取鍵：(解析後絕對路徑, 修改時間 ns)
+
+    Raises:
+        FileNotFoundError: 查表檔案不存在
+    """
+    resolved = resolve_data_path(path)
+    try:
+        mtime_ns = resolved.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Mie 查表檔案不存在: {path}\n"
+            f"請運行 'python3 scripts/generate_mie_lookup.py' 生成查表"
+        )
+    return str(resolved.resolve()), mtime_ns
+
+
+@lru_cache(maxsize=8)
+def _load_mie_lookup_table_cached(resolved_path: str, mtime_ns: int) -> dict:
+    table = load_asset(Path(resolved_path).stem, resolved_path)
+    return {key: table[key] for key in _MIE_TABLE_KEYS}
 
-# ==================== Mie Scattering ====================
 
 def load_mie_lookup_table(path: str = "data/mie_lookup_table_v1.npz"):
     """
-    載入 Mie 散射查表（帶快取）
+    載入 Mie 散射查表（依路徑快取）
+    
+    快取鍵為解析後的絕對路徑與檔案修改時間：不同查表（v2 / v3）各自快取，
+    重新生成查表後自動重新載入。
     
     查表結構:
         wavelengths: [450, 550, 650] (nm)
@@ -47,34 +76,54 @@ def load_mie_lookup_table(path: str = "data/mie_lookup_table_v1.npz"):
     Raises:
         FileNotFoundError: 查表檔案不存在
     """
-    global _MIE_LOOKUP_TABLE_CACHE
+    return _load_mie_lookup_table_cached(*_mie_table_key(path))
+
+
+def lookup_mie_params_batch(wavelength_nm, iso, table: dict) -> dict:
+    """
+    從 Mie 查表中向量化插值散射參數
     
-    if _MIE_LOOKUP_TABLE_CACHE is not None:
-        return _MIE_LOOKUP_TABLE_CACHE
+    與 lookup_mie_params 相同的雙線性插值（wavelength × ISO），
+    wavelength_nm 與 iso 可為任意可廣播的陣列，一次計算所有組合。
+    查表軸可為非等距（自適應加密查表），以 searchsorted 二分搜尋定位。
     
-    try:
-        table = np.load(path, allow_pickle=True)
-        _MIE_LOOKUP_TABLE_CACHE = {
-            'wavelengths': table['wavelengths'],
-            'iso_values': table['iso_values'],
-            'sigma': table['sigma'],
-            'kappa': table['kappa'],
-            'rho': table['rho'],
-            'eta': table['eta']
-        }
-        return _MIE_LOOKUP_TABLE_CACHE
-    except FileNotFoundError:
-        raise FileNotFoundError(
-            f"Mie 查表檔案不存在: {path}\n"
-            f"請運行 'python3 scripts/generate_mie_lookup.py' 生成查表"
-        )
+    Args:
+        wavelength_nm: 波長 (nm)，純量或陣列
+        iso: ISO 值，純量或陣列
+        table: load_mie_lookup_table() 返回的字典
+    
+    Returns:
+        dict: {'sigma', 'kappa', 'rho', 'eta'} → float64 陣列（廣播後形狀）
+    """
+    wavelengths = table['wavelengths']
+    iso_values = table['iso_values']
+    wavelength_nm, iso = np.broadcast_arrays(np.asarray(wavelength_nm), np.asarray(iso))
+    
+    # 1. 鄰近索引
+    wl_idx = np.clip(np.searchsorted(wavelengths, wavelength_nm), 1, len(wavelengths) - 1)
+    iso_idx = np.clip(np.searchsorted(iso_values, iso), 1, len(iso_values) - 1)
+    
+    # 2. 雙線性插值權重
+    wl_low, wl_high = wavelengths[wl_idx - 1], wavelengths[wl_idx]
+    iso_low, iso_high = iso_values[iso_idx - 1], iso_values[iso_idx]
+    
+    t_wl = (wavelength_nm - wl_low) / (wl_high - wl_low + 1e-10)
+    t_iso = (iso - iso_low) / (iso_high - iso_low + 1e-10)
+    
+    # 3. 插值四個參數
+    def interp_2d(arr):
+        v0 = arr[wl_idx - 1, iso_idx - 1] * (1 - t_iso) + arr[wl_idx - 1, iso_idx] * t_iso
+        v1 = arr[wl_idx, iso_idx - 1] * (1 - t_iso) + arr[wl_idx, iso_idx] * t_iso
+        return np.asarray(v0 * (1 - t_wl) + v1 * t_wl, dtype=np.float64)
+    
+    return {key: interp_2d(table[key]) for key in ('sigma', 'kappa', 'rho', 'eta')}
 
 
 def lookup_mie_params(wavelength_nm: float, iso: int, table: dict) -> tuple:
     """
     從 Mie 查表中插值獲取散射參數
     
-    使用雙線性插值（wavelength × ISO）
+    使用雙線性插值（wavelength × ISO）；多個波長 / ISO 請用 lookup_mie_params_batch
     
     Args:
         wavelength_nm: 波長 (nm)，通常為 450/550/650
@@ -88,42 +137,89 @@ def lookup_mie_params(wavelength_nm: float, iso: int, table: dict) -> tuple:
             rho: 核心能量占比（0-1）
             eta: 歸一化散射能量權重
     """
-    wavelengths = table['wavelengths']
-    iso_values = table['iso_values']
+    params = lookup_mie_params_batch(wavelength_nm, iso, table)
+    return tuple(float(params[key]) for key in ('sigma', 'kappa', 'rho', 'eta'))
+
+
+# ==================== Mie PSF Bank ====================
+
+@dataclass(frozen=True, eq=False)
+class MiePSFBank:
+    """
+    單一 (查表, ISO, 波長組) 的預計算 PSF
     
-    # 1. 找到波長的鄰近索引
-    wl_idx = np.searchsorted(wavelengths, wavelength_nm)
-    wl_idx = np.clip(wl_idx, 1, len(wavelengths) - 1)
+    以物件身分比較與雜湊（可作為下游快取鍵；同一組參數由快取返回同一物件）。
     
-    # 2. 找到 ISO 的鄰近索引
-    iso_idx = np.searchsorted(iso_values, iso)
-    iso_idx = np.clip(iso_idx, 1, len(iso_values) - 1)
+    Attributes:
+        wavelengths: 波長 (nm)
+        iso: ISO 值
+        sigma / kappa / rho / eta: 各波長散射參數（參數光譜，float64 唯讀陣列）
+        radius: 共用 PSF 半徑（4 × 最大 σ）
+        psfs: 各波長的雙段核 PSF（float32 唯讀，∑=1）
+    """
+    wavelengths: Tuple[float, ...]
+    iso: int
+    sigma: np.ndarray
+    kappa: np.ndarray
+    rho: np.ndarray
+    eta: np.ndarray
+    radius: int
+    psfs: Tuple[np.ndarray, ...]
+
+
+@lru_cache(maxsize=32)
+def _build_mie_psf_bank(resolved_path: str, mtime_ns: int, iso, wavelengths: Tuple[float, ...]) -> MiePSFBank:
+    table = _load_mie_lookup_table_cached(resolved_path, mtime_ns)
+    params = lookup_mie_params_batch(np.array(wavelengths), iso, table)
+    for array in params.values():
+        array.flags.writeable = False
+    
+    sigma, kappa, rho = (params[key].tolist() for key in ('sigma', 'kappa', 'rho'))
+    # PSF 半徑基於最大 sigma（通常是藍光），4σ 覆蓋 99.99% 能量
+    radius = int(max(sigma) * 4)
+    psfs = []
+    for s, k, r in zip(sigma, kappa, rho):
+        psf = create_dual_kernel_psf(s, k, r, radius=radius)
+        psf.flags.writeable = False
+        psfs.append(psf)
+    
+    return MiePSFBank(
+        wavelengths=wavelengths, iso=iso,
+        sigma=params['sigma'], kappa=params['kappa'], rho=params['rho'], eta=params['eta'],
+        radius=radius, psfs=tuple(psfs),
+    )
+
+
+def get_mie_psf_bank(path: str, iso, wavelengths) -> MiePSFBank:
+    """
+    取得預計算的 Mie PSF（LRU 快取，每組 (查表, ISO, 波長) 只建構一次）
     
-    # 3. 雙線性插值權重
-    wl_low, wl_high = wavelengths[wl_idx - 1], wavelengths[wl_idx]
-    iso_low, iso_high = iso_values[iso_idx - 1], iso_values[iso_idx]
+    同一膠片（相同查表 / ISO / 波長）重複渲染時直接重用 PSF，
+    不再每張影像重建雙段核。
     
-    t_wl = (wavelength_nm - wl_low) / (wl_high - wl_low + 1e-10)
-    t_iso = (iso - iso_low) / (iso_high - iso_low + 1e-10)
+    Args:
+        path: 查表 .npz 檔案路徑
+        iso: ISO 值
+        wavelengths: 波長序列 (nm)，如 (650, 550, 450)
     
-    # 4. 插值四個參數
-    def interp_2d(arr):
-        v00 = arr[wl_idx - 1, iso_idx - 1]
-        v01 = arr[wl_idx - 1, iso_idx]
-        v10 = arr[wl_idx, iso_idx - 1]
-        v11 = arr[wl_idx, iso_idx]
-        
-        v0 = v00 * (1 - t_iso) + v01 * t_iso
-        v1 = v10 * (1 - t_iso) + v11 * t_iso
-        
-        return v0 * (1 - t_wl) + v1 * t_wl
+    Returns:
+        MiePSFBank: 參數光譜與 PSF（唯讀，勿就地修改）
     
-    sigma = float(interp_2d(table['sigma']))
-    kappa = float(interp_2d(table['kappa']))
-    rho = float(interp_2d(table['rho']))
-    eta = float(interp_2d(table['eta']))
+    Raises:
+        FileNotFoundError: 查表檔案不存在
+    """
+    return _build_mie_psf_bank(*_mie_table_key(path), iso, tuple(float(w) for w in wavelengths))
+
+
+def clear_mie_caches() -> None:
+    """
+    清除 Mie 查表與 PSF 快取
     
-    return sigma, kappa, rho, eta
+    快取鍵已包含檔案修改時間，重新生成查表後無需手動清除；
+    主要供測試或需釋放記憶體時使用。
+    """
+    _load_mie_lookup_table_cached.cache_clear()
+    _build_mie_psf_bank.cache_clear()
 
 
 # ==================== PSF Generation ====================
@@ -366,6 +462,10 @@ def convolve_adaptive(image: np.ndarray, kernel: np.ndarray,
 __all__ = [
     'load_mie_lookup_table',
     'lookup_mie_params',
+    'lookup_mie_params_batch',
+    'MiePSFBank',
+    'get_mie_psf_bank',
+    'clear_mie_caches',
     'create_dual_kernel_psf',
     'get_gaussian_kernel',
     'get_exponential_kernel_approximation',
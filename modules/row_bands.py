@@ -0,0 +1,215 @@
+"""
+列帶（row-band）資料並行
+
+單通道的全幅逐點階段（sRGB 解碼、H&D 曲線、tone mapping、顆粒加權等）
+以 numpy 計算時只使用一個核心。此模組將逐點函數沿第 0 軸切成數個
+快取大小的水平列帶，在執行緒池中處理，結果直接寫入預先配置的輸出陣列；
+numpy ufunc 在大陣列上釋放 GIL，列帶可在多核心上同時執行。
+
+逐點函數輸出的第 i 列只依賴輸入的第 i 列，因此列帶結果與整幅計算逐位元相同。
+濾波、FFT 等鄰域運算不可使用列帶。
+
+列帶 worker 數由 phos_core.configure_threads() 依核心預算設定（預設 1 = 不切分）；
+已在並行區段中的執行緒（例如並行通道 worker）以 serial_row_bands() 暫停列帶，
+避免巢狀並行超額使用核心。
+
+Functions:
+    - apply_row_bands: 以列帶執行逐點函數
+    - row_banded: 將逐點函數包裝為列帶執行的裝飾器
+    - set_band_workers / get_band_workers: 列帶 worker 數
+    - band_rows: 單一列帶的列數
+    - serial_row_bands: 在目前執行緒暫停列帶並行
+
+Example:
+    >>> from modules.row_bands import row_banded
+    >>> @row_banded
+    ... def scale_clip(x, scale):
+    ...     return np.clip(x * scale, 0, 1)
+
+Version: 0.8.4
+"""
+
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+__all__ = [
+    'BAND_BYTES',
+    'MIN_BAND_PIXELS',
+    'apply_row_bands',
+    'row_banded',
+    'set_band_workers',
+    'get_band_workers',
+    'band_rows',
+    'serial_row_bands',
+]
+
+# 單一列帶的輸入位元組數（約一個核心的 L2 快取）
+BAND_BYTES = 512 * 1024
+# 像素數低於此值時直接整幅計算（執行緒排程成本大於收益）
+MIN_BAND_PIXELS = 1 << 18
+
+_band_workers = 1
+_band_executor: Optional[ThreadPoolExecutor] = None
+_band_lock = threading.Lock()
+_local = threading.local()
+
+
+def _reset_band_executor():
+    # fork 後子行程沒有父行程的 worker 執行緒：捨棄繼承的執行器，需要時重建
+    global _band_executor, _band_lock
+    _band_executor = None
+    _band_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_band_executor)
+
+
+def _mark_serial():
+    # 列帶 worker 內部不再切分列帶
+    _local.serial = True
+
+
+def set_band_workers(workers: int) -> int:
+    """
+    設定列帶 worker 數（數量改變時，舊執行器於目前工作完成後關閉）
+
+    Args:
+        workers: worker 數（1 = 不切分列帶）
+
+    Returns:
+        int: 設定前的 worker 數
+    """
+    global _band_workers, _band_executor
+    workers = max(int(workers), 1)
+    with _band_lock:
+        previous, _band_workers = _band_workers, workers
+        executor = _band_executor if workers != previous else None
+        if executor is not None:
+            _band_executor = None
+    if executor is not None:
+        executor.shutdown(wait=False)
+    return previous
+
+
+def get_band_workers() -> int:
+    """取得列帶 worker 數"""
+    return _band_workers
+
+
+def _get_band_executor() -> ThreadPoolExecutor:
+    global _band_executor
+    with _band_lock:
+        if _band_executor is None:
+            _band_executor = ThreadPoolExecutor(
+                max_workers=_band_workers, thread_name_prefix='phos-band', initializer=_mark_serial
+            )
+        return _band_executor
+
+
+@contextmanager
+def serial_row_bands():
+    """在目前執行緒暫停列帶並行（區塊內的逐點函數整幅計算）"""
+    previous = getattr(_local, 'serial', False)
+    _local.serial = True
+    try:
+        yield
+    finally:
+        _local.serial = previous
+
+
+def band_rows(array: np.ndarray) -> int:
+    """
+    單一列帶的列數（每個列帶約 BAND_BYTES 位元組）
+
+    Args:
+        array: 輸入陣列（至少 1 維）
+
+    Returns:
+        int: 列數（>= 1）
+    """
+    row_bytes = array.itemsize * (array.size // max(array.shape[0], 1))
+    return max(BAND_BYTES // max(row_bytes, 1), 1)
+
+
+def apply_row_bands(func: Callable, *args, **kwargs):
+    """
+    以列帶執行逐點函數
+
+    與第一個陣列參數形狀相同的陣列參數（位置或關鍵字）沿第 0 軸切分，
+    其餘參數原樣傳入。第一個列帶在呼叫端執行緒計算以決定輸出 dtype 與形狀，
+    其餘列帶由 worker 寫入輸出陣列。worker 數為 1、陣列過小或位於
+    serial_row_bands() 區塊內時直接呼叫 func。
+
+    Args:
+        func: 逐點函數（輸出第 0 軸與輸入對齊）
+        *args, **kwargs: 傳給 func 的參數
+
+    Returns:
+        np.ndarray: 與 func(*args, **kwargs) 逐位元相同的結果
+
+    Raises:
+        ValueError: func 的輸出未與輸入列對齊
+    """
+    first = next((a for a in (*args, *kwargs.values()) if isinstance(a, np.ndarray)), None)
+    if (
+        _band_workers < 2
+        or getattr(_local, 'serial', False)
+        or first is None
+        or first.ndim == 0
+        or first.size < MIN_BAND_PIXELS
+    ):
+        return func(*args, **kwargs)
+
+    rows = first.shape[0]
+    step = band_rows(first)
+    if step >= rows:
+        return func(*args, **kwargs)
+
+    def banded(value, start, stop):
+        if isinstance(value, np.ndarray) and value.shape == first.shape:
+            return value[start:stop]
+        return value
+
+    def run(start):
+        stop = min(start + step, rows)
+        return func(
+            *(banded(a, start, stop) for a in args),
+            **{key: banded(value, start, stop) for key, value in kwargs.items()},
+        )
+
+    head = np.asarray(run(0))
+    if head.ndim == 0 or head.shape[0] != step:
+        raise ValueError(f"{getattr(func, '__name__', func)} 的輸出未與輸入列對齊，無法以列帶執行")
+    out = np.empty((rows,) + head.shape[1:], dtype=head.dtype)
+    out[:step] = head
+
+    def write(start):
+        out[start:start + step] = run(start)
+
+    executor = _get_band_executor()
+    for future in [executor.submit(write, start) for start in range(step, rows, step)]:
+        future.result()
+    return out
+
+
+def row_banded(func: Callable) -> Callable:
+    """
+    將逐點函數包裝為列帶執行（見 apply_row_bands）
+
+    Args:
+        func: 逐點函數
+
+    Returns:
+        Callable: 包裝後的函數（簽名與結果不變）
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return apply_row_bands(func, *args, **kwargs)
+    return wrapper
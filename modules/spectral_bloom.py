@@ -0,0 +1,272 @@
+"""
+連續光譜 Bloom 模組（PSF 聚類）
+
+負責：
+1. PSF 聚類：形狀相近的 PSF 合併為少數代表核，群集數依誤差容差自動決定
+2. 連續光譜散射：在 400-700nm 多個波長 bin 上積分 Mie 散射，
+   每個群集只卷積一次（3 × 群集數 次卷積）
+
+物理背景：
+- 散射為線性運算：Σ_λ K_λ ⊛ x_λ 可將 PSF 相近的 bin 合併為 K_rep ⊛ Σ x_λ
+- RGB 通道視為以 lambda_r/g/b 為中心的高斯光譜帶，散射光依各通道
+  在該波長的相對靈敏度分回 RGB（能量守恆）
+
+由 wavelength_effects.apply_wavelength_bloom 在
+WavelengthBloomParams.spectral_mode == "spectral" 時呼叫。
+"""
+
+import numpy as np
+import cv2
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+from modules.psf_utils import MiePSFBank, get_mie_psf_bank
+from modules.performance_modes import fast_path_enabled, register_fast_path
+
+
+# ==================== PSF Clustering ====================
+
+@dataclass(frozen=True)
+class PSFClusters:
+    """
+    PSF 聚類結果
+    
+    Attributes:
+        labels: 各 PSF 所屬的群集索引 (n,)
+        kernels: 各群集的代表核（成員的加權平均，float32，∑=1）
+        errors: 各 PSF 與其代表核的 L1 距離 (n,)
+    """
+    labels: np.ndarray
+    kernels: Tuple[np.ndarray, ...]
+    errors: np.ndarray
+    
+    @property
+    def n_clusters(self) -> int:
+        return len(self.kernels)
+    
+    @property
+    def max_error(self) -> float:
+        return float(self.errors.max()) if self.errors.size else 0.0
+
+
+def _representative_kernel(stack: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    total = weights.sum()
+    if total <= 0:
+        return stack.mean(axis=0)
+    return np.tensordot(weights / total, stack, axes=1)
+
+
+def cluster_psfs(psfs, weights=None, tolerance: float = 0.02) -> PSFClusters:
+    """
+    將形狀相近的 PSF 聚類為少數代表核（群集數依容差自動決定）
+    
+    PSF 依二階矩（有效寬度）排序後貪婪分段：逐一加入目前群集，
+    若加入後任一成員與代表核（成員依 weights 加權平均）的 L1 距離
+    超過 tolerance，則開新群集。卷積為線性運算，因此
+    Σ_i K_i ⊛ x_i ≈ K_rep ⊛ Σ_i x_i，逐像素誤差不超過 tolerance × Σ_i |x_i|。
+    
+    Args:
+        psfs: 同尺寸的正規化 PSF 序列（∑=1）
+        weights: 各 PSF 的權重（如散射能量），None 表示等權
+        tolerance: 成員與代表核的 L1 距離上限（0 表示僅合併完全相同的 PSF）
+    
+    Returns:
+        PSFClusters: 群集標籤、代表核與各 PSF 誤差
+    
+    Raises:
+        ValueError: PSF 為空、尺寸不一致或 weights 長度不符
+    """
+    if len(psfs) == 0:
+        raise ValueError("psfs 不可為空")
+    stack = np.asarray(np.stack([np.asarray(p, dtype=np.float64) for p in psfs]))
+    n = stack.shape[0]
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    if weights.shape != (n,):
+        raise ValueError(f"weights 長度 ({weights.shape}) 與 PSF 數量 ({n}) 不符")
+    
+    # 依有效寬度排序：寬度相近者相鄰，貪婪分段即可得到緊湊群集
+    h, w = stack.shape[1:]
+    yy, xx = np.mgrid[:h, :w]
+    r2 = (yy - (h - 1) / 2) ** 2 + (xx - (w - 1) / 2) ** 2
+    order = np.argsort(np.tensordot(stack, r2, axes=2), kind='stable')
+    
+    groups = []
+    current = [order[0]]
+    for index in order[1:]:
+        candidate = current + [index]
+        rep = _representative_kernel(stack[candidate], weights[candidate])
+        # 1e-9：容許加權平均的浮點捨入（tolerance=0 時仍合併完全相同的 PSF）
+        if np.abs(stack[candidate] - rep).sum(axis=(1, 2)).max() <= tolerance + 1e-9:
+            current = candidate
+        else:
+            groups.append(current)
+            current = [index]
+    groups.append(current)
+    
+    labels = np.empty(n, dtype=np.int64)
+    errors = np.empty(n)
+    kernels = []
+    for label, members in enumerate(groups):
+        rep = _representative_kernel(stack[members], weights[members])
+        labels[members] = label
+        errors[members] = np.abs(stack[members] - rep).sum(axis=(1, 2))
+        kernel = (rep / rep.sum()).astype(np.float32)
+        kernel.flags.writeable = False
+        kernels.append(kernel)
+    
+    return PSFClusters(labels=labels, kernels=tuple(kernels), errors=errors)
+
+
+# ==================== Spectral Bloom (PSF Clustering) ====================
+
+# 連續光譜散射的波長範圍（與 31 點光譜 / Mie 查表一致）
+SPECTRAL_BLOOM_RANGE_NM = (400.0, 700.0)
+
+PSF_CLUSTERING = register_fast_path(
+    'psf_clustering',
+    "連續光譜 Bloom：PSF 相近的波長 bin 聚類為少數代表核（關閉時每個 bin 各自卷積，精確積分）",
+)
+
+
+@dataclass(frozen=True)
+class SpectralBloomPlan:
+    """
+    連續光譜散射的預計算計畫
+    
+    Attributes:
+        wavelengths: 波長 bin (nm)
+        removed: 各來源通道被散射移出的能量比例（未乘 scattering_ratio）(3,)
+        kernels: 代表核（每群集一個，∑=1）
+        mixing: 群集 k 中來源通道 c' → 接收通道 c 的能量 (k, 3, 3)
+        labels: 各 bin 的群集索引
+        max_error: 成員 PSF 與代表核的最大 L1 距離
+    """
+    wavelengths: np.ndarray
+    removed: np.ndarray
+    kernels: Tuple[np.ndarray, ...]
+    mixing: np.ndarray
+    labels: np.ndarray
+    max_error: float
+
+
+@lru_cache(maxsize=16)
+def _build_spectral_bloom_plan(
+    bank: MiePSFBank,
+    eta_reference: float,
+    centers: Tuple[float, float, float],
+    bandwidth: float,
+    tolerance: float,
+    clustered: bool,
+) -> SpectralBloomPlan:
+    wavelengths = np.asarray(bank.wavelengths)
+    
+    # 通道光譜帶：以 lambda_r/g/b 為中心的高斯 (3, n)
+    bands = np.exp(-0.5 * ((wavelengths[None, :] - np.asarray(centers)[:, None]) / bandwidth) ** 2)
+    source = bands / bands.sum(axis=1, keepdims=True)  # 來源通道能量在各 bin 的分布
+    receive = bands / bands.sum(axis=0, keepdims=True)  # 各 bin 散射光回到各通道的比例（能量守恆）
+    
+    # 各 bin 的散射能量權重（綠光中心為基準，與 RGB 模式一致）
+    efficiency = bank.eta / eta_reference
+    
+    # per_bin[i, c, c'] = 來源通道 c' 經 bin i 散射後落入通道 c 的能量
+    per_bin = np.einsum('ci,i,di->icd', receive, efficiency, source)
+    removed = (efficiency[None, :] * source).sum(axis=1)
+    
+    if clustered:
+        clusters = cluster_psfs(bank.psfs, weights=per_bin.sum(axis=(1, 2)), tolerance=tolerance)
+        labels, kernels, max_error = clusters.labels, clusters.kernels, clusters.max_error
+    else:
+        labels, kernels, max_error = np.arange(len(bank.psfs)), bank.psfs, 0.0
+    
+    mixing = np.zeros((len(kernels), 3, 3))
+    np.add.at(mixing, labels, per_bin)
+    for array in (removed, mixing, labels):
+        array.flags.writeable = False
+    
+    return SpectralBloomPlan(
+        wavelengths=wavelengths, removed=removed, kernels=tuple(kernels),
+        mixing=mixing, labels=labels, max_error=max_error,
+    )
+
+
+def get_spectral_bloom_plan(wavelength_params) -> SpectralBloomPlan:
+    """
+    取得連續光譜散射計畫（LRU 快取，同一膠片只聚類一次）
+    
+    Args:
+        wavelength_params: WavelengthBloomParams 實例
+    
+    Returns:
+        SpectralBloomPlan: 波長 bin、代表核與通道混合矩陣
+    
+    Raises:
+        FileNotFoundError: Mie 查表檔案不存在
+    """
+    path, iso = wavelength_params.mie_lookup_path, wavelength_params.iso_value
+    bins = np.linspace(*SPECTRAL_BLOOM_RANGE_NM, wavelength_params.spectral_bins)
+    bank = get_mie_psf_bank(path, iso, bins)
+    eta_reference = float(get_mie_psf_bank(path, iso, (wavelength_params.lambda_g,)).eta[0])
+    centers = (
+        float(wavelength_params.lambda_r),
+        float(wavelength_params.lambda_g),
+        float(wavelength_params.lambda_b),
+    )
+    return _build_spectral_bloom_plan(
+        bank, eta_reference, centers,
+        float(wavelength_params.channel_bandwidth_nm),
+        float(wavelength_params.psf_cluster_tolerance),
+        fast_path_enabled(PSF_CLUSTERING),
+    )
+
+
+def apply_spectral_bloom(responses, wavelength_params, bloom_params) -> tuple:
+    """
+    連續光譜 Bloom：在多個波長 bin 上積分 Mie 散射
+    
+    每個 RGB 通道視為以 lambda_c 為中心、帶寬 channel_bandwidth_nm 的高斯光譜帶；
+    bin λ 的散射光按各通道在 λ 的相對靈敏度分回 RGB（能量守恆）：
+    
+        bloom_c = R_c − s·ē_c·H_c + s·Σ_λ K_λ ⊛ (Σ_c' M_λ[c, c']·H_c')
+    
+    散射為線性運算，PSF 相近的 bin 共用代表核後只需 3 × 群集數 次卷積
+    （Mie 查表的 σ/κ/ρ 在可見光範圍幾乎不變，通常聚為 1-2 群）。
+    
+    Args:
+        responses: (response_r, response_g, response_b)，0-1 float32
+        wavelength_params: WavelengthBloomParams 實例（spectral_mode="spectral"）
+        bloom_params: BloomParams 實例（threshold、scattering_ratio）
+    
+    Returns:
+        (bloom_r, bloom_g, bloom_b): 散射後的 RGB 通道（0-1）
+    """
+    plan = get_spectral_bloom_plan(wavelength_params)
+    threshold = bloom_params.threshold
+    ratio = bloom_params.scattering_ratio
+    
+    highlights = [
+        np.where(response > threshold, response - threshold, 0.0).astype(np.float32)
+        for response in responses
+    ]
+    scattered = [np.zeros_like(h) for h in highlights]
+    for kernel, mixing in zip(plan.kernels, plan.mixing):
+        for c in range(3):
+            source = sum(float(mixing[c, d]) * highlights[d] for d in range(3) if mixing[c, d] != 0.0)
+            if isinstance(source, np.ndarray):
+                scattered[c] += cv2.filter2D(source, -1, kernel, borderType=cv2.BORDER_REFLECT)
+    
+    return tuple(
+        np.clip(response - ratio * float(plan.removed[c]) * highlights[c] + ratio * scattered[c], 0.0, 1.0)
+        for c, response in enumerate(responses)
+    )
+
+
+# ==================== Exports ====================
+
+__all__ = [
+    'PSFClusters',
+    'cluster_psfs',
+    'SpectralBloomPlan',
+    'get_spectral_bloom_plan',
+    'apply_spectral_bloom',
+]
@@ -37,10 +37,13 @@ from typing import Tuple, Optional
 
 # 從 film_models 導入必要的類型和常數
 from film_models import FilmProfile, REINHARD_GAMMA_ADJUSTMENT, FILMIC_EXPOSURE_SCALE
+from modules.pointwise import pointwise
+from modules.row_bands import row_banded
 
 
 # ==================== Reinhard Tone Mapping ====================
 
+@row_banded
 def apply_reinhard_to_channel(lux: np.ndarray, gamma: float, color_mode: bool = False) -> np.ndarray:
     """
     對單個通道應用 Reinhard tone mapping
@@ -121,17 +124,10 @@ def apply_filmic_to_channel(lux: np.ndarray, film: FilmProfile) -> np.ndarray:
         - Linear (線性段): 控制中間調響應
         - Toe (趾部): 控制陰影過渡，保留陰影細節
     """
-    # 確保非負值
-    lux = np.maximum(lux, 0)
-    
-    # 應用曝光和 gamma
     params = film.tone_params
     # v0.8.2 HOTFIX: 暫時禁用 gamma 運算（因輸入已是 Linear RGB）
     # TODO: 重新校準 tone mapping 參數以適應 Linear space
     # x = FILMIC_EXPOSURE_SCALE * np.power(lux, params.gamma)  # OLD (for sRGB input)
-    x = FILMIC_EXPOSURE_SCALE * lux  # NEW (for Linear RGB input)
-    
-    # Filmic curve: 分段曲線公式
     A, B, C, D, E, F = (
         params.shoulder_strength, 
         params.linear_strength,
@@ -141,18 +137,10 @@ def apply_filmic_to_channel(lux: np.ndarray, film: FilmProfile) -> np.ndarray:
         params.toe_denominator
     )
     
-    numerator = x * (A * x + C * B) + D * E
-    denominator = x * (A * x + B) + D * F
-    
-    # 避免除零
-    with np.errstate(divide='ignore', invalid='ignore'):
-        result = np.where(
-            denominator != 0,
-            (numerator / denominator) - E / F,
-            0
-        )
-    
-    return result
+    # 確保非負值 → x = FILMIC_EXPOSURE_SCALE * lux → 分段曲線（避免除零），
+    # 以單次逐點運算執行（modules.pointwise 'filmic_curve'）
+    return pointwise('filmic_curve', lux=lux, exposure_scale=FILMIC_EXPOSURE_SCALE,
+                     a=A, b=B, cb=C * B, de=D * E, df=D * F, ef=E / F)
 
 
 def apply_filmic(response_r: Optional[np.ndarray], response_g: Optional[np.ndarray], 
@@ -2,7 +2,7 @@
 波長依賴光學效果模組
 
 負責：
-1. 波長依賴的 Bloom 散射（Mie 散射修正）
+1. 波長依賴的 Bloom 散射（Mie 散射修正；RGB 三波長或連續光譜 + PSF 聚類）
 2. Halation（背層反射）效果
 3. 分離應用 Bloom + Halation 的完整光學鏈
 
@@ -20,12 +20,12 @@ from typing import Optional, Tuple
 
 # Import dependencies from other modules
 from modules.psf_utils import (
-    create_dual_kernel_psf,
-    load_mie_lookup_table,
-    lookup_mie_params,
+    get_mie_psf_bank,
     get_gaussian_kernel,
     convolve_adaptive
 )
+from modules.spectral_bloom import apply_spectral_bloom
+from modules.pointwise import pointwise
 
 # Import from main Phos module (bloom_strategies)
 # Note: This creates a dependency on Phos.py for apply_bloom
@@ -55,23 +55,17 @@ def apply_bloom_with_psf(
     Returns:
         bloom: 散射後的通道（0-1，能量守恆）
     """
-    # 1. 提取高光（超過閾值的部分才散射）
-    highlights = np.where(response > threshold, response - threshold, 0.0).astype(np.float32)
-    
-    # 2. 計算散射能量
-    scattered_energy = highlights * eta
+    # 1-2. 提取高光（超過閾值的部分才散射）並計算散射能量
+    scattered_energy = pointwise(
+        'scatter_highlights', x=response.astype(np.float32, copy=False), threshold=threshold, eta=eta
+    )
     
     # 3. PSF 卷積（已正規化，∑psf=1）
     scattered_light = cv2.filter2D(scattered_energy, -1, psf, borderType=cv2.BORDER_REFLECT)
     
-    # 4. 能量守恆重組
+    # 4-5. 能量守恆重組並安全裁切（數值穩定性）
     # output = 原始響應 - 被散射掉的能量 + 散射後的光
-    output = response - scattered_energy + scattered_light
-    
-    # 5. 安全裁切（數值穩定性）
-    output = np.clip(output, 0.0, 1.0)
-    
-    return output
+    return pointwise('bloom_recombine', x=response, scattered=scattered_energy, bloom=scattered_light)
 
 
 # ==================== Wavelength-Dependent Bloom ====================
@@ -96,6 +90,9 @@ def apply_wavelength_bloom(
         - 路燈核心黃色，外圈藍色（色散效應）
         - η_b/η_r ≈ 2.5x, σ_b/σ_r ≈ 1.35x
     
+    wavelength_params.spectral_mode == "spectral" 時改為連續光譜積分
+    （見 modules.spectral_bloom）；預設 "rgb" 僅在三個中心波長散射。
+    
     Args:
         response_r/g/b: RGB 通道的乳劑響應（0-1，float32）
         wavelength_params: WavelengthBloomParams 實例
@@ -112,19 +109,13 @@ def apply_wavelength_bloom(
     # 解決方式：確認 data/mie_lookup_table_v3.npz 存在，或執行 scripts/generate_mie_lookup.py
     
     try:
-        table = load_mie_lookup_table(wavelength_params.mie_lookup_path)
-        iso = wavelength_params.iso_value
-        
-        # 查表獲取各波長參數
-        sigma_r, kappa_r, rho_r, eta_r_raw = lookup_mie_params(
-            wavelength_params.lambda_r, iso, table
-        )
-        sigma_g, kappa_g, rho_g, eta_g_raw = lookup_mie_params(
-            wavelength_params.lambda_g, iso, table
-        )
-        sigma_b, kappa_b, rho_b, eta_b_raw = lookup_mie_params(
-            wavelength_params.lambda_b, iso, table
+        # 預計算 PSF 快取：同一膠片（查表 / ISO / 波長）只建構一次雙段核
+        bank = get_mie_psf_bank(
+            wavelength_params.mie_lookup_path,
+            wavelength_params.iso_value,
+            (wavelength_params.lambda_r, wavelength_params.lambda_g, wavelength_params.lambda_b),
         )
+        eta_r_raw, eta_g_raw, eta_b_raw = bank.eta.tolist()
         
         # 歸一化能量權重（綠光為基準）
         eta_r = eta_r_raw / eta_g_raw * bloom_params.scattering_ratio
@@ -142,13 +133,11 @@ def apply_wavelength_bloom(
             f"註: 經驗公式已移除（v0.4.2+），Mie 查表為唯一方法"
         ) from e
     
-    # 5. 創建各通道的雙段核 PSF
-    # PSF 半徑基於最大 sigma（通常是藍光）
-    psf_radius = int(max(sigma_r, sigma_g, sigma_b) * 4)  # 4σ 覆蓋 99.99% 能量
+    if getattr(wavelength_params, 'spectral_mode', 'rgb') == 'spectral':
+        return apply_spectral_bloom((response_r, response_g, response_b), wavelength_params, bloom_params)
     
-    psf_r = create_dual_kernel_psf(sigma_r, kappa_r, rho_r, radius=psf_radius)
-    psf_g = create_dual_kernel_psf(sigma_g, kappa_g, rho_g, radius=psf_radius)
-    psf_b = create_dual_kernel_psf(sigma_b, kappa_b, rho_b, radius=psf_radius)
+    # 5. 各通道的雙段核 PSF（半徑基於最大 sigma，見 get_mie_psf_bank）
+    psf_r, psf_g, psf_b = bank.psfs
     
     # 6. 能量守恆散射（每通道獨立）
     threshold = bloom_params.threshold
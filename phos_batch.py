@@ -8,15 +8,31 @@ Version: 0.2.0 (Development)
 """
 
 import io
+import multiprocessing
 import zipfile
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Tuple, Optional, Callable
 from dataclasses import dataclass
 from datetime import datetime
 import numpy as np
-from PIL import Image
 
-from film_models import FilmProfile
+from film_models import FilmProfile, STANDARD_IMAGE_SIZE
+from phos_core import (
+    PerformanceMonitor,
+    init_batch_worker,
+    plan_batch_workers,
+    profile_stage,
+    trace_events_from_profile,
+    trace_span,
+)
+from phos_output import THUMBNAIL_MAX_SIDE, encode_preview
+
+
+def _file_name(image_file) -> str:
+    """輸入的檔名（UploadedFile 的 name 或路徑的 basename）"""
+    from modules.image_io import image_source_name
+
+    return image_source_name(image_file)
 
 
 @dataclass
@@ -27,19 +43,44 @@ class BatchResult:
     image_data: Optional[np.ndarray] = None
     error_message: Optional[str] = None
     processing_time: float = 0.0
+    profile: Optional[dict] = None  # 階段剖析報告（PerformanceMonitor.to_dict()）
+    thumbnail: Optional[bytes] = None  # 預覽縮圖（JPEG，於 worker 中產生）
+
+
+def batch_worker_context():
+    """
+    批次 worker 行程的啟動方式（forkserver，不支援時為 spawn）
+
+    phos_core 的通道 / 列帶執行緒池與 numba 執行緒常駐於主行程；
+    從多執行緒行程 fork 可能繼承被持有的鎖（numba workqueue 於 fork 後
+    主行程結束時會卡住），因此 worker 由乾淨的 forkserver 行程產生。
+
+    Returns:
+        multiprocessing context
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
 
 
 class BatchProcessor:
     """批量處理器"""
     
-    def __init__(self, max_workers: Optional[int] = None):
+    def __init__(self, max_workers: Optional[int] = None, profile_stages: bool = False,
+                 profile_memory: bool = False):
         """
         初始化批量處理器
         
         Args:
-            max_workers: 最大並行工作數（None = CPU 核心數）
+            max_workers: 最大並行工作數上限（None = 核心預算）。實際 worker 數與
+                每個 worker 的核心預算由 phos_core.plan_batch_workers() 分配
+            profile_stages: 是否收集各階段剖析數據（附加於 BatchResult.profile）。
+                啟用時以 settings['profiler'] 傳遞 PerformanceMonitor 給處理函數
+            profile_memory: 剖析時是否以 tracemalloc 追蹤各階段記憶體（較慢，
+                僅 profile_stages=True 時有效）
         """
         self.max_workers = max_workers
+        self.profile_stages = profile_stages
+        self.profile_memory = profile_memory
         
     def process_single_image(
         self,
@@ -52,7 +93,8 @@ class BatchProcessor:
         處理單張圖像
         
         Args:
-            image_file: 上傳的圖像文件（Streamlit UploadedFile）
+            image_file: 上傳的圖像文件（Streamlit UploadedFile）或檔案路徑
+                （路徑以 mmap 映射讀取，並行模式下只傳送路徑給 worker）
             film_profile: 胶片配置
             process_func: 處理函數（來自 phos_core 或主程序）
             settings: 處理設定字典
@@ -62,32 +104,55 @@ class BatchProcessor:
         """
         import time
         start_time = time.time()
+        filename = _file_name(image_file)
+        
+        profiler = None
+        if self.profile_stages:
+            profiler = PerformanceMonitor(track_memory=self.profile_memory, label=filename)
+            settings = {**settings, 'profiler': profiler}
         
         try:
             # 讀取圖像
-            image = Image.open(image_file)
-            image_array = np.array(image)
+            # 直接解碼上傳緩衝區 / mmap（不複製）；大型 JPEG 以降解析度解碼
+            # （短邊仍 ≥ 標準尺寸）；處理函數接收 RGB 陣列
+            with profile_stage(profiler, "decode"):
+                import cv2
+                from modules.image_io import decode_image, image_buffer
+
+                with image_buffer(image_file) as file_bytes:
+                    image, _ = decode_image(file_bytes, STANDARD_IMAGE_SIZE)
+                image_array = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
             
             # 執行胶片模擬處理
             result_array = process_func(image_array, film_profile, settings)
             
+            # 預覽縮圖（通道順序與 ZIP 輸出相同），UI 只需傳送數十 KB
+            thumbnail = encode_preview(np.asarray(result_array).astype(np.uint8, copy=False),
+                                       THUMBNAIL_MAX_SIDE, channels="RGB")
+            
             processing_time = time.time() - start_time
             
             return BatchResult(
-                filename=image_file.name,
+                filename=filename,
                 success=True,
                 image_data=result_array,
-                processing_time=processing_time
+                thumbnail=thumbnail,
+                processing_time=processing_time,
+                profile=profiler.to_dict() if profiler is not None else None
             )
             
         except Exception as e:
             processing_time = time.time() - start_time
             return BatchResult(
-                filename=image_file.name,
+                filename=filename,
                 success=False,
                 error_message=str(e),
-                processing_time=processing_time
+                processing_time=processing_time,
+                profile=profiler.to_dict() if profiler is not None else None
             )
+        finally:
+            if profiler is not None:
+                profiler.close()
     
     def process_batch_sequential(
         self,
@@ -115,7 +180,7 @@ class BatchProcessor:
         
         for idx, image_file in enumerate(image_files, 1):
             if progress_callback:
-                progress_callback(idx, total, image_file.name)
+                progress_callback(idx, total, _file_name(image_file))
             
             result = self.process_single_image(
                 image_file, film_profile, process_func, settings
@@ -135,6 +200,10 @@ class BatchProcessor:
         """
         並行處理批量圖像（適合大批量，更快）
         
+        總核心預算（PHOS_THREADS 或可用 CPU 數）平均分給各 worker 行程，
+        每個 worker 啟動時以 init_batch_worker() 限制 OpenCV / BLAS / 通道執行緒，
+        避免 worker 數 × 內部執行緒數超額使用核心。
+        
         Args:
             image_files: 圖像文件列表
             film_profile: 胶片配置
@@ -151,7 +220,9 @@ class BatchProcessor:
         
         # 注意：ProcessPoolExecutor 可能在 Streamlit 中有問題
         # 可能需要改用 ThreadPoolExecutor
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+        workers, worker_budget = plan_batch_workers(self.max_workers, total)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=batch_worker_context(),
+                                 initializer=init_batch_worker, initargs=(worker_budget,)) as executor:
             # 提交所有任務
             future_to_file = {
                 executor.submit(
@@ -170,7 +241,7 @@ class BatchProcessor:
                 image_file = future_to_file[future]
                 
                 if progress_callback:
-                    progress_callback(completed, total, image_file.name)
+                    progress_callback(completed, total, _file_name(image_file))
                 
                 try:
                     result = future.result()
@@ -178,7 +249,7 @@ class BatchProcessor:
                 except Exception as e:
                     # 如果並行處理失敗，創建錯誤結果
                     results.append(BatchResult(
-                        filename=image_file.name,
+                        filename=_file_name(image_file),
                         success=False,
                         error_message=f"並行處理錯誤: {str(e)}"
                     ))
@@ -190,7 +261,8 @@ def create_zip_archive(
     results: List[BatchResult],
     film_name: str,
     output_format: str = "jpg",
-    quality: int = 95
+    quality: int = 95,
+    trace_events: Optional[list] = None
 ) -> bytes:
     """
     創建 ZIP 壓縮檔
@@ -200,10 +272,13 @@ def create_zip_archive(
         film_name: 胶片名稱（用於檔名）
         output_format: 輸出格式 ('jpg', 'png')
         quality: JPEG 質量 (1-100)
+        trace_events: Chrome trace_event 列表（可選），每張圖的編碼記錄為一個 span
         
     Returns:
         bytes: ZIP 檔案的二進制數據
     """
+    from PIL import Image  # 僅編碼時需要（延遲導入，縮短 worker 啟動時間）
+
     # 創建記憶體中的 ZIP 檔案
     zip_buffer = io.BytesIO()
     
@@ -214,15 +289,16 @@ def create_zip_archive(
                 base_name = result.filename.rsplit('.', 1)[0]
                 output_filename = f"{base_name}_{film_name}.{output_format}"
                 
-                # 將 NumPy 陣列轉換為圖像
-                image = Image.fromarray(result.image_data.astype(np.uint8))
-                
-                # 保存到記憶體緩衝區
-                img_buffer = io.BytesIO()
-                if output_format.lower() == 'jpg':
-                    image.save(img_buffer, format='JPEG', quality=quality)
-                else:
-                    image.save(img_buffer, format='PNG')
+                with trace_span(trace_events, f"{output_format.lower()}_encode", image=result.filename):
+                    # 將 NumPy 陣列轉換為圖像
+                    image = Image.fromarray(result.image_data.astype(np.uint8))
+                    
+                    # 保存到記憶體緩衝區
+                    img_buffer = io.BytesIO()
+                    if output_format.lower() == 'jpg':
+                        image.save(img_buffer, format='JPEG', quality=quality)
+                    else:
+                        image.save(img_buffer, format='PNG')
                 
                 # 添加到 ZIP
                 zip_file.writestr(output_filename, img_buffer.getvalue())
@@ -232,6 +308,26 @@ def create_zip_archive(
     return zip_buffer.getvalue()
 
 
+def batch_trace_events(results: List[BatchResult]) -> list:
+    """
+    從批量結果收集 Chrome trace_event（需以 profile_stages=True 處理）
+    
+    每張圖像保留其 worker 行程 / 執行緒的 pid / tid，
+    以 phos_core.write_chrome_trace() 寫出即可觀察 worker 間的重疊與空檔。
+    
+    Args:
+        results: 批量處理結果列表
+        
+    Returns:
+        list: trace_event 字典列表
+    """
+    events = []
+    for result in results:
+        if result.profile is not None:
+            events.extend(trace_events_from_profile(result.profile, label=result.filename))
+    return events
+
+
 def generate_zip_filename(film_name: str) -> str:
     """
     生成 ZIP 檔案名稱
@@ -0,0 +1,365 @@
+"""
+Phos Render Cache Module
+
+渲染快取 - 相同輸入與設定直接返回已編碼的結果
+
+Streamlit 每次互動都會重新執行腳本，同一張照片以相同胶片與設定重複渲染
+十分常見。RenderCache 以內容雜湊為鍵，將編碼結果（phos_output.EncodedOutput）
+存於磁碟；鍵涵蓋：
+
+    - 輸入檔案位元組（SHA-256）
+    - 胶片配置指紋（套用物理參數與顆粒風格後的 FilmProfile）
+    - 所有處理設定與隨機種子
+    - 引擎指紋（管線原始碼、胶片數據檔、快速路徑開關、逐點運算後端）
+
+查詢在解碼之前進行（僅需雜湊輸入緩衝區），命中時不解碼、不處理、不編碼。
+未指定種子的渲染不使用快取（否則重複請求會得到相同的顆粒樣式）。
+快取目錄有容量上限，超出時依最近使用時間（檔案 mtime，讀取時更新）移除最舊者。
+寫入採暫存檔 + os.replace，多個行程可共用同一目錄。
+
+環境變數：
+    PHOS_RENDER_CACHE_DIR: 快取目錄（預設 data/render_cache）
+    PHOS_RENDER_CACHE_MB: 容量上限（MB，預設 512；0 = 停用）
+
+Author: @LYCO6273
+Version: 0.8.4
+"""
+
+import dataclasses
+import enum
+import functools
+import hashlib
+import json
+import os
+import pickle
+import threading
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from phos_output import EncodedOutput
+
+__all__ = [
+    'RENDER_CACHE_DIR',
+    'RENDER_CACHE_DIR_ENV',
+    'RENDER_CACHE_MB_ENV',
+    'RENDER_CACHE_FORMAT_VERSION',
+    'CachedRender',
+    'RenderCache',
+    'input_digest',
+    'film_fingerprint',
+    'engine_fingerprint',
+    'render_key',
+    'get_render_cache',
+]
+
+PROJECT_ROOT = Path(__file__).parent
+RENDER_CACHE_DIR = PROJECT_ROOT / "data" / "render_cache"
+RENDER_CACHE_DIR_ENV = 'PHOS_RENDER_CACHE_DIR'
+RENDER_CACHE_MB_ENV = 'PHOS_RENDER_CACHE_MB'
+DEFAULT_RENDER_CACHE_MB = 512
+# 快取項目格式版本（CachedRender / EncodedOutput 欄位變更時遞增）
+RENDER_CACHE_FORMAT_VERSION = 1
+
+_ENTRY_SUFFIX = ".render"
+
+
+@dataclass(frozen=True)
+class CachedRender:
+    """快取的渲染結果（output.render_id 為快取鍵）"""
+    output: EncodedOutput
+    original_size: Optional[Tuple[int, int]] = None  # 原始圖像 (寬, 高)
+    process_time: float = 0.0  # 首次渲染的處理時間（秒）
+
+
+# ==================== 快取鍵 ====================
+
+def _json_default(value: Any) -> Any:
+    # 設定與胶片配置中的非 JSON 型別（PhysicsMode 等列舉、numpy 純量）
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, np.generic):
+        return value.item()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return repr(value)
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, default=_json_default, ensure_ascii=False).encode()
+
+
+def input_digest(data) -> str:
+    """
+    輸入檔案內容的 SHA-256
+
+    Args:
+        data: 編碼後的檔案內容（bytes-like 或 modules.image_io.image_buffer() 的視圖）
+
+    Returns:
+        str: 十六進位雜湊
+    """
+    return hashlib.sha256(memoryview(data).cast('B')).hexdigest()
+
+
+def film_fingerprint(film) -> str:
+    """
+    胶片配置指紋（所有欄位，含巢狀參數）
+
+    Args:
+        film: FilmProfile（套用物理參數與顆粒風格後）
+
+    Returns:
+        str: 十六進位雜湊
+    """
+    return hashlib.sha256(_canonical(dataclasses.asdict(film))).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _static_engine_digest() -> str:
+    # 管線原始碼與胶片數據檔（行程內不變，計算一次）
+    from film_models import film_data_hash
+
+    digest = hashlib.sha256(f"render-cache-v{RENDER_CACHE_FORMAT_VERSION}".encode())
+    sources = sorted(PROJECT_ROOT.glob("*.py")) + sorted((PROJECT_ROOT / "modules").rglob("*.py"))
+    for path in sources:
+        digest.update(path.relative_to(PROJECT_ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+    digest.update(film_data_hash().encode())
+    return digest.hexdigest()
+
+
+def engine_fingerprint() -> str:
+    """
+    引擎指紋
+
+    涵蓋快取格式版本、管線原始碼、胶片數據檔、模組版本，以及目前的
+    快速路徑開關與逐點運算後端（兩者影響輸出像素，可於執行期切換）。
+
+    Returns:
+        str: 十六進位雜湊
+    """
+    import modules
+    from modules.performance_modes import list_fast_paths
+    from modules.pointwise import get_pointwise_backend
+
+    state = {
+        'static': _static_engine_digest(),
+        'version': modules.__version__,
+        'fast_paths': {name: info['enabled'] for name, info in list_fast_paths().items()},
+        'pointwise_backend': get_pointwise_backend(),
+    }
+    return hashlib.sha256(_canonical(state)).hexdigest()
+
+
+def render_key(digest: str, film, settings: Dict[str, Any], seed: Optional[int] = None) -> str:
+    """
+    渲染快取鍵
+
+    seed 為 None 時管線使用未設定種子的全域亂數，每次渲染的顆粒樣式不同：
+    呼叫端不應以此鍵讀寫快取（鍵仍可作為渲染 ID）。
+
+    Args:
+        digest: input_digest() 的輸入雜湊
+        film: FilmProfile（套用物理參數與顆粒風格後）
+        settings: 所有處理設定（tone_style、physics_params 等）
+        seed: 隨機種子（None = 未指定）
+
+    Returns:
+        str: 十六進位雜湊（亦作為渲染 ID）
+    """
+    parts = {
+        'input': digest,
+        'film': film_fingerprint(film),
+        'settings': settings,
+        'seed': seed,
+        'engine': engine_fingerprint(),
+    }
+    return hashlib.sha256(_canonical(parts)).hexdigest()
+
+
+# ==================== 磁碟快取 ====================
+
+class RenderCache:
+    """
+    磁碟渲染快取（容量上限 + LRU 移除）
+
+    每個項目一個檔案（<key>.render，pickle 的 CachedRender）；讀取時更新 mtime，
+    寫入後依 mtime 由舊到新移除，直到總大小不超過 max_bytes。
+    """
+
+    def __init__(self, directory: Path = RENDER_CACHE_DIR,
+                 max_bytes: int = DEFAULT_RENDER_CACHE_MB * 1024 * 1024):
+        """
+        Args:
+            directory: 快取目錄（不存在時於首次寫入建立）
+            max_bytes: 容量上限（位元組；<= 0 時停用快取）
+        """
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """是否啟用"""
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        if not key or not all(c in '0123456789abcdef' for c in key):
+            raise ValueError(f"快取鍵必須是十六進位雜湊: {key!r}")
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+    def _entries(self):
+        # (mtime, 大小, 路徑)，已被其他行程移除的檔案略過
+        try:
+            paths = list(self.directory.glob(f"*{_ENTRY_SUFFIX}"))
+        except OSError:
+            return []
+        entries = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def get(self, key: str) -> Optional[CachedRender]:
+        """
+        查詢快取（命中時更新最近使用時間）
+
+        損毀的項目發出警告並移除。
+
+        Args:
+            key: render_key() 的快取鍵
+
+        Returns:
+            CachedRender；未命中或停用時為 None
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError) as e:
+            warnings.warn(f"渲染快取項目損毀，已移除: {path} ({e})")
+            path.unlink(missing_ok=True)
+            return None
+        if not isinstance(entry, CachedRender) or entry.output.render_id != key:
+            warnings.warn(f"渲染快取項目損毀，已移除: {path}")
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # 已被其他行程移除：本次結果仍有效
+        return entry
+
+    def put(self, key: str, entry: CachedRender) -> bool:
+        """
+        寫入快取並移除超出容量的最舊項目
+
+        目錄不可寫入時僅發出警告。
+
+        Args:
+            key: render_key() 的快取鍵
+            entry: 渲染結果（entry.output.render_id 必須等於 key）
+
+        Returns:
+            bool: 是否寫入（停用、項目超過容量上限或寫入失敗時為 False）
+
+        Raises:
+            ValueError: render_id 與快取鍵不符
+        """
+        if entry.output.render_id != key:
+            raise ValueError(f"render_id 與快取鍵不符: {entry.output.render_id} != {key}")
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return False
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            warnings.warn(f"無法寫入渲染快取 {self.directory}: {e}")
+            return False
+        self.evict()
+        return True
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        依最近使用時間移除最舊項目，直到總大小不超過上限
+
+        Args:
+            max_bytes: 容量上限（None = self.max_bytes）
+
+        Returns:
+            int: 移除的項目數
+        """
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def size_bytes(self) -> int:
+        """目前總大小（位元組）"""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        """清空快取"""
+        self.evict(0)
+
+    def __contains__(self, key: str) -> bool:
+        return self.enabled and self._path(key).exists()
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """
+    取得行程共用的渲染快取（目錄與容量由環境變數設定）
+
+    Returns:
+        RenderCache: 每個行程建立一次的快取
+
+    Raises:
+        ValueError: PHOS_RENDER_CACHE_MB 不是非負數
+    """
+    global _render_cache
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                value = os.environ.get(RENDER_CACHE_MB_ENV, '').strip()
+                try:
+                    megabytes = float(value) if value else DEFAULT_RENDER_CACHE_MB
+                except ValueError:
+                    megabytes = -1
+                if megabytes < 0:
+                    raise ValueError(f"{RENDER_CACHE_MB_ENV} 必須是非負數，收到: {value!r}")
+                directory = os.environ.get(RENDER_CACHE_DIR_ENV, '').strip() or RENDER_CACHE_DIR
+                _render_cache = RenderCache(Path(directory), int(megabytes * 1024 * 1024))
+    return _render_cache
@@ -8,9 +8,15 @@ import cv2  # type: ignore
 import numpy as np
 from typing import Optional, Tuple, Callable, Dict
 from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import lru_cache
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-import streamlit as st  # type: ignore
+import os
+import sys
+import threading
+
+from asset_pack import DATA_DIR, load_asset
 
 from film_models import (
     FilmProfile, 
@@ -34,6 +40,31 @@ from film_models import (
     FILMIC_EXPOSURE_SCALE
 )
 
+# ==================== UI 狀態（選用）====================
+
+def _ui_session_value(key: str, default=None):
+    """
+    讀取 Streamlit session_state 中的值（僅在 UI 已載入 streamlit 時）
+
+    核心模組不導入 streamlit：CLI / 批次 worker 不需要 UI 框架，
+    且 streamlit 導入約需 0.4 s。未在 UI 中執行時返回預設值。
+
+    Args:
+        key: session_state 鍵
+        default: 預設值
+
+    Returns:
+        session_state 中的值或預設值
+    """
+    st = sys.modules.get('streamlit')
+    if st is None:
+        return default
+    try:
+        return st.session_state.get(key, default)
+    except Exception:
+        return default
+
+
 # ==================== 快取 Gaussian Blur ====================
 
 @lru_cache(maxsize=32)
@@ -67,8 +98,383 @@ def cached_gaussian_blur(image: np.ndarray, ksize: int, sigma: float) -> np.ndar
     return cv2.GaussianBlur(image, kernel, sigma)
 
 
+# ==================== 執行緒預算 ====================
+
+# 每個行程的核心預算（未設定時為行程可用的 CPU 數）
+THREAD_BUDGET_ENV = 'PHOS_THREADS'
+# 彩色膠片的 R/G/B 通道鏈（bloom → halation → 組合 → H&D → tone mapping）
+# 彼此獨立；OpenCV 濾波與 numpy FFT 釋放 GIL，三條鏈可在執行緒中並行
+CHANNEL_WORKERS = 3
+
+# 未載入前以環境變數限制的執行緒池（載入時讀取）；已載入者改用各自的 API
+_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS', 'NUMBA_NUM_THREADS',
+)
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    """
+    單一行程的執行緒分配
+
+    OpenCV / BLAS / numba / numexpr 的內部執行緒池是行程全域的，平時使用整個預算
+    （解碼、縮放、顆粒模糊、FFT bloom、循序通道）。並行通道區段內（map_channels）
+    各通道 worker 同時呼叫這些函式庫，內部池暫時降為 channel_inner_threads
+    = budget // channel_workers，總數不超過預算，區段結束後還原。
+    numpy FFT（pocketfft）在呼叫端執行緒中單執行緒運算，其並行度即為通道 worker 數。
+    通道鏈之外的全幅逐點階段以 band_workers 個列帶 worker 執行（modules.row_bands）；
+    並行通道 worker 內不再切分列帶。
+
+    Attributes:
+        budget: 行程的核心預算
+        channel_workers: 通道執行器 worker 數
+        cv2_threads: cv2.setNumThreads 的值（並行通道區段外）
+        blas_threads: BLAS / OpenMP 執行緒數（並行通道區段外）
+        kernel_threads: numba / numexpr 執行緒數（並行通道區段外）
+        band_workers: 列帶 worker 數
+        channel_inner_threads: 並行通道區段內各內部執行緒池的執行緒數
+        role: 'process'（獨立行程）或 'batch_worker'（批次 worker 行程）
+    """
+    budget: int
+    channel_workers: int
+    cv2_threads: int
+    blas_threads: int
+    kernel_threads: int
+    band_workers: int
+    channel_inner_threads: int
+    role: str = 'process'
+
+
+def detect_core_budget() -> int:
+    """
+    偵測行程的核心預算
+
+    Returns:
+        int: 環境變數 PHOS_THREADS 的值；未設定時為行程 CPU 親和性中的核心數
+
+    Raises:
+        ValueError: PHOS_THREADS 不是正整數
+    """
+    value = os.environ.get(THREAD_BUDGET_ENV, '').strip()
+    if value:
+        try:
+            budget = int(value)
+        except ValueError:
+            budget = 0
+        if budget < 1:
+            raise ValueError(f"{THREAD_BUDGET_ENV} 必須是正整數，收到: {value!r}")
+        return budget
+    if hasattr(os, 'sched_getaffinity'):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def plan_thread_budget(budget: int, role: str = 'process') -> ThreadBudget:
+    """
+    將核心預算分配給通道 worker 與各函式庫的內部執行緒池
+
+    Args:
+        budget: 核心預算（>= 1）
+        role: 'process' 或 'batch_worker'
+
+    Returns:
+        ThreadBudget: 執行緒分配
+    """
+    budget = max(int(budget), 1)
+    channel_workers = min(CHANNEL_WORKERS, budget)
+    inner = max(budget // channel_workers, 1)
+    return ThreadBudget(
+        budget=budget,
+        channel_workers=channel_workers,
+        cv2_threads=budget,
+        blas_threads=budget,
+        kernel_threads=budget,
+        band_workers=budget,
+        channel_inner_threads=inner,
+        role=role,
+    )
+
+
+def plan_batch_workers(max_workers: Optional[int], num_jobs: int,
+                       budget: Optional[int] = None) -> Tuple[int, int]:
+    """
+    分配批次處理的 worker 行程數與每個 worker 的核心預算
+
+    Args:
+        max_workers: worker 數上限（None = 不另設上限）
+        num_jobs: 工作數量
+        budget: 總核心預算（None = detect_core_budget()）
+
+    Returns:
+        (workers, worker_budget): worker 行程數、每個 worker 的核心預算
+    """
+    if budget is None:
+        budget = detect_core_budget()
+    workers = min(max_workers or budget, budget, max(num_jobs, 1))
+    workers = max(workers, 1)
+    return workers, max(budget // workers, 1)
+
+
+_thread_budget: Optional[ThreadBudget] = None
+_blas_method: Optional[str] = None
+_blas_limiter = None  # threadpoolctl 的限制物件（重新設定時還原）
+_thread_budget_lock = threading.Lock()
+# 進行中的並行通道區段數（> 0 時內部執行緒池為 channel_inner_threads）
+_channel_regions = 0
+_channel_region_lock = threading.Lock()
+
+
+def _limit_blas_threads(threads: int) -> str:
+    # threadpoolctl（選用依賴）可限制已載入的 BLAS / OpenMP；否則只能設定環境變數，
+    # 對之後啟動的子行程（spawn）與尚未載入的函式庫生效
+    global _blas_limiter
+    try:
+        from threadpoolctl import ThreadpoolController
+    except ImportError:
+        for var in _THREAD_ENV_VARS[:4]:
+            os.environ[var] = str(threads)
+        return 'env'
+    if _blas_limiter is not None:
+        _blas_limiter.restore_original_limits()
+    _blas_limiter = ThreadpoolController().limit(limits=threads, user_api='blas')
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    return 'threadpoolctl'
+
+
+def _limit_numba_threads(threads: int):
+    # numba 的執行緒數是執行緒區域設定：須在呼叫 numba 核心的執行緒中設定
+    numba = sys.modules.get('numba')
+    if numba is not None:
+        numba.set_num_threads(min(threads, numba.config.NUMBA_NUM_THREADS))
+
+
+def _limit_kernel_threads(threads: int):
+    if 'numba' in sys.modules:
+        _limit_numba_threads(threads)
+    else:
+        os.environ['NUMBA_NUM_THREADS'] = str(threads)
+    numexpr = sys.modules.get('numexpr')
+    if numexpr is not None:
+        numexpr.set_num_threads(threads)
+    else:
+        os.environ['NUMEXPR_NUM_THREADS'] = str(threads)
+
+
+def _apply_library_threads(cv2_threads: int, blas_threads: int, kernel_threads: int) -> str:
+    cv2.setNumThreads(cv2_threads)
+    method = _limit_blas_threads(blas_threads)
+    _limit_kernel_threads(kernel_threads)
+    return method
+
+
+def configure_threads(budget: Optional[int] = None, role: str = 'process') -> ThreadBudget:
+    """
+    依核心預算設定本行程的所有執行緒池
+
+    設定 cv2.setNumThreads、BLAS / OpenMP、numba / numexpr 執行緒數（整個預算）、
+    列帶 worker 數與通道執行器大小；通道 worker 數改變時，舊執行器於目前工作完成後關閉。
+
+    Args:
+        budget: 核心預算（None = detect_core_budget()）
+        role: 'process' 或 'batch_worker'
+
+    Returns:
+        ThreadBudget: 生效的執行緒分配
+    """
+    global _thread_budget, _blas_method, _channel_executor
+    # 延遲導入：modules 套件會載入各物理模組，phos_core 導入時不需要
+    from modules.row_bands import set_band_workers
+
+    plan = plan_thread_budget(detect_core_budget() if budget is None else budget, role)
+    with _thread_budget_lock:
+        _blas_method = _apply_library_threads(plan.cv2_threads, plan.blas_threads, plan.kernel_threads)
+        set_band_workers(plan.band_workers)
+        previous, _thread_budget = _thread_budget, plan
+    if previous is not None and previous.channel_workers != plan.channel_workers:
+        with _channel_executor_lock:
+            executor, _channel_executor = _channel_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+    return plan
+
+
+def get_thread_budget() -> ThreadBudget:
+    """
+    取得本行程的執行緒分配（首次呼叫時以 detect_core_budget() 設定）
+
+    Returns:
+        ThreadBudget: 生效的執行緒分配
+    """
+    if _thread_budget is None:
+        return configure_threads()
+    return _thread_budget
+
+
+def thread_settings() -> dict:
+    """
+    目前生效的執行緒設定（附加於 PerformanceMonitor.to_dict()['threads']）
+
+    Returns:
+        dict: {'budget', 'role', 'channel_workers', 'cv2_threads', 'blas_threads',
+               'blas_method', 'kernel_threads', 'band_workers', 'channel_inner_threads'}；
+               cv2_threads 為 cv2.getNumThreads() 的實際值
+    """
+    plan = get_thread_budget()
+    return {
+        'budget': plan.budget,
+        'role': plan.role,
+        'channel_workers': plan.channel_workers,
+        'cv2_threads': cv2.getNumThreads(),
+        'blas_threads': plan.blas_threads,
+        'blas_method': _blas_method,
+        'kernel_threads': plan.kernel_threads,
+        'band_workers': plan.band_workers,
+        'channel_inner_threads': plan.channel_inner_threads,
+    }
+
+
+def init_batch_worker(budget: int):
+    """
+    批次 worker 行程的初始化函數（ProcessPoolExecutor initializer）
+
+    Args:
+        budget: 分配給此 worker 的核心預算（見 plan_batch_workers）
+    """
+    os.environ[THREAD_BUDGET_ENV] = str(budget)
+    configure_threads(budget, role='batch_worker')
+
+
 # ==================== 並行化工具 ====================
 
+# 預設是否並行處理通道（optical_processing(parallel_channels=None) 時使用）
+PARALLEL_CHANNELS_ENV = 'PHOS_PARALLEL_CHANNELS'
+
+_channel_executor: Optional[ThreadPoolExecutor] = None
+_channel_executor_lock = threading.Lock()
+
+
+def _reset_channel_executor():
+    # fork 後子行程沒有父行程的 worker 執行緒：捨棄繼承的執行器，需要時重建
+    global _channel_executor, _channel_executor_lock, _thread_budget_lock
+    global _channel_regions, _channel_region_lock
+    _channel_executor = None
+    _channel_executor_lock = threading.Lock()
+    _thread_budget_lock = threading.Lock()
+    _channel_regions = 0
+    _channel_region_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_channel_executor)
+
+
+def get_channel_executor() -> ThreadPoolExecutor:
+    """
+    取得常駐的通道執行器（每個行程建立一次，跨渲染重用執行緒）
+
+    Returns:
+        ThreadPoolExecutor: 執行緒預算的 channel_workers 個 worker 的執行器
+    """
+    global _channel_executor
+    if _channel_executor is None:
+        workers = get_thread_budget().channel_workers
+        with _channel_executor_lock:
+            if _channel_executor is None:
+                _channel_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix='phos-channel'
+                )
+    return _channel_executor
+
+
+def parallel_channels_default() -> bool:
+    """
+    通道並行的預設值（環境變數 PHOS_PARALLEL_CHANNELS，預設啟用）
+
+    Returns:
+        bool: 設為 0 / false / no / off 時為 False
+    """
+    return os.environ.get(PARALLEL_CHANNELS_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def channels_run_parallel(parallel: Optional[bool] = None) -> bool:
+    """
+    map_channels() 是否在通道執行器上並行執行
+
+    Args:
+        parallel: 明確指定（None 使用 parallel_channels_default()，
+            且執行緒預算只有一個通道 worker 時為循序）
+
+    Returns:
+        bool: 是否並行
+    """
+    if parallel is None:
+        return parallel_channels_default() and get_thread_budget().channel_workers > 1
+    return parallel
+
+
+@contextmanager
+def channel_thread_limits():
+    """
+    並行通道區段：OpenCV / BLAS / numexpr 執行緒池降為 channel_inner_threads，
+    最後一個進行中的區段結束時還原為整個預算（多個工作階段可同時渲染）
+
+    Yields:
+        ThreadBudget: 生效的執行緒分配
+    """
+    global _channel_regions, _blas_method
+    plan = get_thread_budget()
+    with _channel_region_lock:
+        _channel_regions += 1
+        if _channel_regions == 1:
+            inner = plan.channel_inner_threads
+            _apply_library_threads(inner, inner, inner)
+    try:
+        yield plan
+    finally:
+        with _channel_region_lock:
+            _channel_regions -= 1
+            if _channel_regions == 0:
+                plan = get_thread_budget()
+                _blas_method = _apply_library_threads(plan.cv2_threads, plan.blas_threads,
+                                                      plan.kernel_threads)
+
+
+def _run_channel_worker(func: Callable, item, inner_threads: int):
+    from modules.row_bands import serial_row_bands
+
+    _limit_numba_threads(inner_threads)
+    with serial_row_bands():
+        return func(item)
+
+
+def map_channels(func: Callable, items, parallel: Optional[bool] = None) -> list:
+    """
+    對各通道執行 func，依輸入順序返回結果
+
+    並行模式在常駐執行器上執行；每條通道鏈只讀共用輸入、寫入自己的輸出，
+    運算與循序模式完全相同，結果逐位元一致。worker 拋出的例外於此重新拋出。
+    並行模式下各通道鏈內的逐點階段不再切分列帶（通道已佔用核心預算），
+    函式庫執行緒池於區段內降為 channel_inner_threads（見 channel_thread_limits()）。
+
+    Args:
+        func: 單通道處理函數 func(item)
+        items: 各通道的輸入
+        parallel: 是否並行（None 見 channels_run_parallel()）
+
+    Returns:
+        list: 各通道的結果
+    """
+    items = list(items)
+    if not channels_run_parallel(parallel) or len(items) < 2:
+        return [func(item) for item in items]
+    executor = get_channel_executor()
+    with channel_thread_limits() as plan:
+        futures = [executor.submit(_run_channel_worker, func, item, plan.channel_inner_threads)
+                   for item in items]
+        return [future.result() for future in futures]
+
+
 def parallel_channel_process(
     func: Callable,
     r_data: Optional[np.ndarray],
@@ -78,7 +484,7 @@ def parallel_channel_process(
     **kwargs
 ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
     """
-    並行處理 RGB 三通道
+    並行處理 RGB 三通道（使用常駐通道執行器）
     
     Args:
         func: 處理函數
@@ -91,15 +497,9 @@ def parallel_channel_process(
     if any(data is None for data in [r_data, g_data, b_data]):
         return None, None, None
     
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        future_r = executor.submit(func, r_data, *args, **kwargs)
-        future_g = executor.submit(func, g_data, *args, **kwargs)
-        future_b = executor.submit(func, b_data, *args, **kwargs)
-        
-        result_r = future_r.result()
-        result_g = future_g.result()
-        result_b = future_b.result()
-    
+    result_r, result_g, result_b = map_channels(
+        lambda data: func(data, *args, **kwargs), (r_data, g_data, b_data), parallel=True
+    )
     return result_r, result_g, result_b
 
 
@@ -173,119 +573,36 @@ def apply_filmic_optimized(response: np.ndarray, film: FilmProfile) -> np.ndarra
     return result
 
 
-# ==================== 並行化的通道處理 ====================
+# ==================== 效能監控 ====================
 
-def process_color_channels_parallel(
-    response_r: np.ndarray,
-    response_g: np.ndarray,
-    response_b: np.ndarray,
-    film: FilmProfile,
-    bloom_params: Tuple[float, int, float, float],
-    grain_data: Optional[Tuple] = None,
-    tone_style: str = "filmic"
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+class PerformanceMonitor:
     """
-    並行處理彩色胶片的 RGB 三通道
-    
-    Args:
-        response_r, response_g, response_b: RGB 光譜響應數據
-        film: 胶片配置
-        bloom_params: (sens, rads, strg, base)
-        grain_data: 顆粒數據 (grain_r, grain_g, grain_b, grain_total)
-        tone_style: Tone mapping 風格
-        
-    Returns:
-        (result_r, result_g, result_b): 處理後的 RGB 數據
-    """
-    sens, rads, strg, base = bloom_params
-    
-    # 並行生成光暈
-    bloom_params_list = [
-        (sens, rads, strg, base, 3, 55),  # Red
-        (sens, rads, strg, base, 2, 35),  # Green
-        (sens, rads, strg, base, 1, 15),  # Blue
-    ]
-    
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # 並行計算光暈（內聯 artistic bloom 邏輯，避免循環導入）
-        # 對應 apply_bloom() 的 artistic 模式
-        def _apply_bloom_artistic(response, sens, rads, strg, base, blur_scale, blur_sigma_scale):
-            """內聯 artistic bloom 邏輯（避免循環導入 Phos.py）"""
-            # 創建權重（高光區域權重更高）
-            weights = (base + response ** 2) * sens
-            weights = np.clip(weights, 0, 1)
-            
-            # 計算模糊核大小（必須為奇數）
-            ksize = rads * blur_scale
-            ksize = ksize if ksize % 2 == 1 else ksize + 1
-            
-            # 創建光暈層（使用快取的高斯模糊）
-            bloom_input = response * weights
-            bloom_layer = cached_gaussian_blur(bloom_input, ksize, sens * blur_sigma_scale)
-            
-            # 應用光暈（避免過曝）
-            bloom_effect = bloom_layer * weights * strg
-            bloom_effect = bloom_effect / (1.0 + bloom_effect)
-            
-            return bloom_effect
-        
-        bloom_futures = [
-            executor.submit(_apply_bloom_artistic, response, *params)
-            for response, params in zip([response_r, response_g, response_b], bloom_params_list)
-        ]
-        
-        bloom_r, bloom_g, bloom_b = [f.result() for f in bloom_futures]
-        
-        # 組合層
-        def combine_layer(bloom, response, layer, grain_r, grain_g, grain_b, grain_total):
-            result = bloom * layer.diffuse_weight + np.power(response, layer.response_curve) * layer.direct_weight
-            if grain_data is not None:
-                result += (grain_r * layer.grain_intensity + 
-                          grain_g * grain_total + 
-                          grain_b * grain_total)
-            return result
-        
-        if grain_data is not None:
-            grain_r, grain_g, grain_b, grain_total = grain_data
-        else:
-            grain_r = grain_g = grain_b = grain_total = None
-        
-        # 並行組合層
-        combine_futures = [
-            executor.submit(combine_layer, bloom, response, layer, grain_r, grain_g, grain_b,
-                          film.panchromatic_layer.grain_intensity)
-            for bloom, response, layer in [
-                (bloom_r, response_r, film.red_layer),
-                (bloom_g, response_g, film.green_layer),
-                (bloom_b, response_b, film.blue_layer)
-            ]
-        ]
-        
-        response_r_final, response_g_final, response_b_final = [f.result() for f in combine_futures]
-        
-        # 並行 tone mapping
-        if tone_style == "filmic":
-            tone_func = lambda response: apply_filmic_optimized(response, film)
-        else:
-            tone_func = lambda response: apply_reinhard_optimized(response, film.tone_params.gamma, color_mode=True)
-        
-        tone_futures = [
-            executor.submit(tone_func, response)
-            for response in [response_r_final, response_g_final, response_b_final]
-        ]
-        
-        result_r, result_g, result_b = [f.result() for f in tone_futures]
-    
-    return result_r, result_g, result_b
-
+    效能監控器
 
-# ==================== 效能監控 ====================
+    兩種用法：
+    1. 整體計時：`with PerformanceMonitor() as m: ...` 後讀取 `m.elapsed`
+    2. 階段剖析：在各階段邊界使用 `with m.stage("grain"): ...`，
+       記錄 wall time、CPU time 與（可選）tracemalloc 配置量，
+       透過 `to_dict()` 取得結構化報告
 
-class PerformanceMonitor:
-    """效能監控器"""
+    Args:
+        track_memory: 是否以 tracemalloc 追蹤各階段記憶體配置（預設 True）。
+            若呼叫前 tracemalloc 未啟動，由監控器自行啟動，並於 `close()`
+            或離開 `with` 區塊時停止。
+        label: 報告標籤（例如圖像檔名），用於 Chrome trace 的圖像層級 span
+    """
     
-    def __init__(self):
+    def __init__(self, track_memory: bool = True, label: Optional[str] = None):
         self.timings = {}
+        self.stages = []
+        self.track_memory = track_memory
+        self.label = label
+        self._owns_tracemalloc = False
+        self._lock = threading.Lock()
+        self._open_stage = None  # 目前開啟的頂層階段
+        # 追蹤記憶體的巢狀階段互斥執行（tracemalloc 計數為行程全域）
+        self._memory_lock = threading.RLock()
+        self._nested_peak = 0  # 巢狀階段重設峰值前後觀察到的絕對峰值（歸入頂層階段）
     
     def __enter__(self):
         import time
@@ -295,11 +612,124 @@ class PerformanceMonitor:
     def __exit__(self, *args):
         import time
         self.elapsed = time.time() - self.start
+        self.close()
+    
+    def close(self):
+        """停止由監控器啟動的 tracemalloc（可重複呼叫）"""
+        if self._owns_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
     
     def record(self, name: str, elapsed: float):
         """記錄執行時間"""
         self.timings[name] = elapsed
     
+    @contextmanager
+    def stage(self, name: str):
+        """
+        剖析單一處理階段
+
+        頂層階段記錄 wall time、行程 CPU time（含所有執行緒）與記憶體配置。
+        在另一個階段開啟期間進入的階段（包括並行通道 worker 執行緒中的階段）
+        視為巢狀階段：記錄 wall time 與該執行緒的 CPU time，並標記 'parent'
+        （不計入 timings 與總計）。
+        
+        記憶體以 tracemalloc.reset_peak() 逐階段分段；tracemalloc 的計數為行程全域，
+        因此追蹤記憶體時巢狀階段以鎖互斥執行（各執行緒的階段輪流進行），
+        每個階段的配置量與峰值只來自該階段。僅計時（track_memory=False）時
+        巢狀階段照常並行。頂層階段的峰值包含其巢狀階段的峰值。
+
+        Args:
+            name: 階段名稱（例如 'grain', 'bloom_r', 'hd_curve'）
+        """
+        import time
+        import tracemalloc
+        
+        with self._lock:
+            parent = self._open_stage
+            if parent is None:
+                self._open_stage = name
+                self._nested_peak = 0
+        nested = parent is not None
+        
+        if not nested and self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing and nested:
+            self._memory_lock.acquire()
+            # 重設前保留頂層階段目前為止的峰值
+            self._nested_peak = max(self._nested_peak, tracemalloc.get_traced_memory()[1])
+        if tracing:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        
+        cpu_clock = time.thread_time if nested else time.process_time
+        start_us = time.time_ns() / 1000.0
+        wall_start = time.perf_counter()
+        cpu_start = cpu_clock()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = cpu_clock() - cpu_start
+            entry = {
+                'name': name,
+                'wall_ms': wall * 1000.0,
+                'cpu_ms': cpu * 1000.0,
+                # 跨行程可比較的起始時間戳（epoch µs）與執行緒，供 Chrome trace 使用
+                'start_us': start_us,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+            }
+            if nested:
+                entry['parent'] = parent
+            if tracing:
+                mem_end, mem_peak = tracemalloc.get_traced_memory()
+                if nested:
+                    self._nested_peak = max(self._nested_peak, mem_peak)
+                    self._memory_lock.release()
+                else:
+                    mem_peak = max(mem_peak, self._nested_peak)
+                # allocated: 階段內峰值相對起點的增量（暫存陣列也計入）
+                # retained: 階段結束後仍存活的淨增量
+                # peak_traced: 階段內的絕對追蹤峰值（用於整體峰值歸因）
+                entry['allocated_bytes'] = max(mem_peak - mem_start, 0)
+                entry['retained_bytes'] = mem_end - mem_start
+                entry['peak_traced_bytes'] = mem_peak
+            with self._lock:
+                self.stages.append(entry)
+                if not nested:
+                    self._open_stage = None
+                    self.timings[name] = self.timings.get(name, 0.0) + wall
+    
+    def to_dict(self) -> dict:
+        """
+        生成結構化的階段報告
+
+        Returns:
+            dict: {
+                'label': str | None,
+                'stages': [{'name', 'wall_ms', 'cpu_ms', 'allocated_bytes', 'retained_bytes',
+                            'peak_traced_bytes', 'start_us', 'pid', 'tid', 'parent'}, ...],
+                'total_wall_ms': float,       # 頂層階段合計（巢狀階段已含於其中）
+                'total_cpu_ms': float,
+                'peak_allocated_bytes': int | None,
+                'threads': dict               # 生效的執行緒設定（見 thread_settings()）
+            }
+        """
+        peaks = [s['allocated_bytes'] for s in self.stages if 'allocated_bytes' in s]
+        top_level = [s for s in self.stages if 'parent' not in s]
+        return {
+            'label': self.label,
+            'stages': [dict(s) for s in self.stages],
+            'total_wall_ms': sum(s['wall_ms'] for s in top_level),
+            'total_cpu_ms': sum(s['cpu_ms'] for s in top_level),
+            'peak_allocated_bytes': max(peaks) if peaks else None,
+            'threads': thread_settings(),
+        }
+    
     def get_report(self) -> str:
         """生成效能報告"""
         if not self.timings:
@@ -312,6 +742,164 @@ class PerformanceMonitor:
             report += f"{name}: {elapsed:.3f}s ({percentage:.1f}%)\n"
         report += f"總計: {total:.3f}s"
         return report
+    
+    def to_trace_events(self) -> list:
+        """生成 Chrome trace_event 列表（見 trace_events_from_profile）"""
+        return trace_events_from_profile(self.to_dict())
+
+
+def profile_stage(monitor: Optional[PerformanceMonitor], name: str):
+    """
+    取得階段剖析 context manager；未啟用剖析（monitor 為 None）時為空操作
+
+    Args:
+        monitor: 效能監控器（可為 None）
+        name: 階段名稱
+
+    Returns:
+        context manager
+    """
+    if monitor is None:
+        return nullcontext()
+    return monitor.stage(name)
+
+
+# ==================== Chrome Trace 匯出 ====================
+
+def trace_events_from_profile(profile: dict, label: Optional[str] = None) -> list:
+    """
+    將階段剖析報告轉換為 Chrome trace_event（Complete "X" 事件）
+    
+    每個階段一個 span（cat='stage'），並以一個涵蓋所有階段的 span（cat='image'）
+    標示單張圖像；pid / tid 沿用記錄時的行程與執行緒，因此多個 worker 的報告
+    合併後可在 Perfetto / chrome://tracing 中看到並行重疊與空檔。
+    圖像 span 的 args 附帶該行程生效的執行緒設定（profile['threads']）。
+    
+    Args:
+        profile: PerformanceMonitor.to_dict() 的輸出
+        label: 圖像層級 span 名稱（預設使用 profile['label']，再退回 'render'）
+        
+    Returns:
+        list: trace_event 字典列表
+    """
+    stages = [s for s in profile.get('stages', []) if 'start_us' in s]
+    if not stages:
+        return []
+    
+    label = label or profile.get('label') or 'render'
+    events = []
+    for stage in stages:
+        args = {'image': label, 'cpu_ms': round(stage['cpu_ms'], 3)}
+        if 'allocated_bytes' in stage:
+            args['allocated_bytes'] = stage['allocated_bytes']
+        events.append({
+            'name': stage['name'],
+            'cat': 'stage',
+            'ph': 'X',
+            'ts': stage['start_us'],
+            'dur': stage['wall_ms'] * 1000.0,
+            'pid': stage['pid'],
+            'tid': stage['tid'],
+            'args': args,
+        })
+    
+    first = min(stages, key=lambda s: s['start_us'])
+    start = first['start_us']
+    end = max(s['start_us'] + s['wall_ms'] * 1000.0 for s in stages)
+    image_args = {'total_cpu_ms': round(profile.get('total_cpu_ms', 0.0), 3)}
+    if 'threads' in profile:
+        image_args['threads'] = profile['threads']
+    events.append({
+        'name': label,
+        'cat': 'image',
+        'ph': 'X',
+        'ts': start,
+        'dur': end - start,
+        'pid': first['pid'],
+        'tid': first['tid'],
+        'args': image_args,
+    })
+    return events
+
+
+@contextmanager
+def trace_span(events: Optional[list], name: str, cat: str = 'stage', **args):
+    """
+    記錄單一 trace span 並附加到 events（events 為 None 時為空操作）
+    
+    用於不經過 PerformanceMonitor 的步驟（例如 JPEG 編碼、ZIP 打包）。
+    
+    Args:
+        events: trace_event 列表（原地附加）
+        name: span 名稱
+        cat: 類別（預設 'stage'）
+        **args: 附加於事件 args 的欄位
+    """
+    if events is None:
+        yield
+        return
+    
+    import time
+    start_us = time.time_ns() / 1000.0
+    wall_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        events.append({
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': (time.perf_counter() - wall_start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        })
+
+
+def build_chrome_trace(events: list) -> dict:
+    """
+    組裝 Chrome trace JSON 物件（附行程 / 執行緒名稱 metadata）
+    
+    Args:
+        events: trace_event 列表（可來自多個行程）
+        
+    Returns:
+        dict: {'traceEvents': [...], 'displayTimeUnit': 'ms'}
+    """
+    metadata = []
+    pids = sorted({e['pid'] for e in events})
+    for pid in pids:
+        metadata.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                         'args': {'name': f"phos worker {pid}"}})
+    for pid, tid in sorted({(e['pid'], e['tid']) for e in events}):
+        metadata.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                         'args': {'name': f"thread {tid}"}})
+    
+    return {
+        'traceEvents': metadata + sorted(events, key=lambda e: e['ts']),
+        'displayTimeUnit': 'ms',
+    }
+
+
+def write_chrome_trace(events: list, path) -> Path:
+    """
+    寫出 Chrome trace JSON 檔案（可於 Perfetto 或 chrome://tracing 開啟）
+    
+    Args:
+        events: trace_event 列表
+        path: 輸出路徑
+        
+    Returns:
+        Path: 輸出路徑
+    """
+    import json
+    
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(build_chrome_trace(events), f)
+    return path
 
 
 # ==================== 光譜模型模組（Phase 4） ====================
@@ -328,7 +916,7 @@ def load_smits_basis() -> dict:
         Smits (1999): "An RGB-to-Spectrum Conversion for Reflectances"
         https://www.cs.utah.edu/~bes/papers/color/
     """
-    data = np.load('data/smits_basis_spectra.npz')
+    data = load_asset('smits_basis_spectra')
     return {
         'wavelengths': data['wavelengths'],
         'white': data['white'],
@@ -352,7 +940,7 @@ def load_cie_1931() -> dict:
     Reference:
         CIE 1931 2° Standard Observer
     """
-    data = np.load('data/cie_1931_31points.npz')
+    data = load_asset('cie_1931_31points')
     return {
         'wavelengths': data['wavelengths'],
         'x_bar': data['x_bar'],
@@ -748,12 +1336,10 @@ def load_film_sensitivity(film_name: str) -> dict:
         - 峰值響應 = 1.0（各通道獨立歸一化）
         - 數據來源：基於典型膠片 Datasheet 合成
     """
-    data_path = Path(__file__).parent / "data" / "film_spectral_sensitivity.npz"
-    
-    if not data_path.exists():
-        raise FileNotFoundError(f"Film sensitivity data not found: {data_path}")
-    
-    data = np.load(data_path)
+    try:
+        data = load_asset('film_spectral_sensitivity')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Film sensitivity data not found: {DATA_DIR / 'film_spectral_sensitivity.npz'}")
     
     # 檢查膠片是否存在
     if f"{film_name}_red" not in data:
@@ -839,8 +1425,7 @@ def apply_film_spectral_sensitivity(
         - 波長積分間隔: Δλ = 13nm（380-770nm, 31 點）
         - **色彩空間**: 輸出為 sRGB（包含 gamma 編碼），與 xyz_to_srgb() 一致
         - **物理流程**: 光譜 × illuminant_spd → 積分 → Linear RGB → 正規化 → sRGB gamma 編碼
-        - 若 illuminant_spd 為 None，會嘗試讀取 st.session_state['film_illuminant']
-        - 若 illuminant_spd 為 None，會嘗試讀取 st.session_state['film_illuminant']
+        - 若 illuminant_spd 為 None，會嘗試讀取 st.session_state['film_illuminant']（僅在 UI 中）
     
     Version:
         v0.4.1: 修正缺少 gamma 編碼導致的亮度損失問題（-50% → +7.7%）
@@ -871,10 +1456,7 @@ def apply_film_spectral_sensitivity(
     
     # 若未提供光源 SPD，嘗試從 UI session state 取得
     if illuminant_spd is None:
-        try:
-            illuminant_choice = st.session_state.get("film_illuminant")
-        except Exception:
-            illuminant_choice = None
+        illuminant_choice = _ui_session_value("film_illuminant")
         if isinstance(illuminant_choice, str) and "D65" in illuminant_choice:
             illuminant_spd = get_illuminant_d65()
 
@@ -0,0 +1,326 @@
+"""
+Phos Output Module
+
+輸出編碼服務 - 每次渲染只編碼一次 JPEG
+
+單張處理的結果需要「檔案大小」、「下載按鈕」與「結果顯示」三份輸出。
+OutputService 在背景執行緒以 cv2.imencode 編碼一次（OpenCV 編碼期間釋放 GIL，
+不佔用 Streamlit 腳本執行緒），並依渲染 ID 快取編碼結果：大小取自緩衝區長度，
+下載直接傳送 JPEG 位元組，st.image 不再於伺服器端重新編碼 numpy 陣列。
+
+畫面顯示使用縮小的 JPEG 預覽（encode_preview：長邊 ≤ DISPLAY_MAX_SIDE），
+批量處理於 worker 中產生縮圖（THUMBNAIL_MAX_SIDE），UI 更新只傳送數十 KB，
+而非 1350 萬像素的陣列；下載仍為全解析度 JPEG。
+
+Author: @LYCO6273
+Version: 0.8.4
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from phos_core import trace_span
+
+__all__ = [
+    'OUTPUT_JPEG_QUALITY',
+    'PREVIEW_JPEG_QUALITY',
+    'DISPLAY_MAX_SIDE',
+    'THUMBNAIL_MAX_SIDE',
+    'EncodedOutput',
+    'OutputService',
+    'encode_jpeg',
+    'encode_output',
+    'encode_preview',
+    'display_image',
+    'new_render_id',
+    'get_output_service',
+]
+
+# 下載用 JPEG 品質
+OUTPUT_JPEG_QUALITY = 95
+# 預覽 / 縮圖 JPEG 品質
+PREVIEW_JPEG_QUALITY = 85
+# 畫面預覽長邊（雙欄對比 ~700 CSS px × 2 倍像素密度）
+DISPLAY_MAX_SIDE = 1600
+# 批量縮圖長邊（200 CSS px × 2 倍像素密度）
+THUMBNAIL_MAX_SIDE = 400
+
+
+@dataclass(frozen=True)
+class EncodedOutput:
+    """單次渲染的編碼結果（data 為全解析度下載檔，preview 為畫面預覽）"""
+    render_id: str
+    data: bytes
+    width: int
+    height: int
+    preview: bytes = b""
+    original_preview: Optional[bytes] = None
+    mean: float = 0.0  # 平均像素值（0-255，供統計顯示，無需保留陣列）
+    original_mean: Optional[float] = None
+    encode_time: float = 0.0
+    mime: str = "image/jpeg"
+
+    @property
+    def size_kb(self) -> float:
+        """檔案大小（KB）"""
+        return len(self.data) / 1024
+
+
+def encode_jpeg(image: np.ndarray, quality: int = OUTPUT_JPEG_QUALITY) -> bytes:
+    """
+    將 BGR uint8 圖像編碼為 JPEG
+
+    Args:
+        image: 圖像（BGR 格式）
+        quality: JPEG 品質（0-100）
+
+    Returns:
+        bytes: JPEG 檔案內容
+
+    Raises:
+        ValueError: 編碼失敗
+    """
+    try:
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    except cv2.error as e:
+        raise ValueError(f"JPEG 編碼失敗: {e}") from e
+    if not ok:
+        raise ValueError("JPEG 編碼失敗")
+    return encoded.tobytes()
+
+
+def display_image(image: np.ndarray, max_side: int = DISPLAY_MAX_SIDE) -> np.ndarray:
+    """
+    縮小至顯示尺寸（長邊超過 max_side 時以 INTER_AREA 縮小，否則原樣返回）
+
+    Args:
+        image: 圖像
+        max_side: 長邊上限（px）
+
+    Returns:
+        np.ndarray: 顯示尺寸的圖像（未縮小時為同一陣列）
+    """
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width, 1)
+    if scale >= 1:
+        return image
+    size = (max(round(width * scale), 1), max(round(height * scale), 1))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_preview(image: np.ndarray, max_side: int = DISPLAY_MAX_SIDE,
+                   quality: int = PREVIEW_JPEG_QUALITY, channels: str = "BGR") -> bytes:
+    """
+    產生顯示用的 JPEG 預覽（長邊超過 max_side 時以 INTER_AREA 縮小）
+
+    Args:
+        image: 圖像（uint8）
+        max_side: 預覽長邊上限（px）
+        quality: JPEG 品質
+        channels: image 的通道順序（'BGR' 或 'RGB'）
+
+    Returns:
+        bytes: JPEG 檔案內容
+
+    Raises:
+        ValueError: 編碼失敗或不支援的通道順序
+    """
+    if channels not in ("BGR", "RGB"):
+        raise ValueError(f"不支援的通道順序: {channels}. 可用: BGR, RGB")
+    image = display_image(image, max_side)
+    if channels == "RGB" and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    return encode_jpeg(image, quality)
+
+
+def _mean(image: np.ndarray) -> float:
+    # 所有通道的平均像素值（cv2.mean 逐通道累加，無 float64 暫存陣列）
+    channels = image.shape[2] if image.ndim == 3 else 1
+    return float(np.mean(cv2.mean(image)[:channels]))
+
+
+def encode_output(render_id: str, image: np.ndarray, trace_events: Optional[list] = None,
+                  original: Optional[np.ndarray] = None,
+                  quality: int = OUTPUT_JPEG_QUALITY) -> EncodedOutput:
+    """
+    編碼單次渲染的輸出（全解析度下載檔 + 畫面預覽）
+
+    Args:
+        render_id: 渲染 ID
+        image: 圖像（BGR 格式）
+        trace_events: Chrome trace 事件列表（可選，附加 'jpeg_encode' / 'preview_encode' span）
+        original: 原始圖像（BGR 格式，可選；產生對比顯示用的預覽）
+        quality: 下載檔 JPEG 品質
+
+    Returns:
+        EncodedOutput: 編碼結果
+
+    Raises:
+        ValueError: 編碼失敗
+    """
+    start = time.perf_counter()
+    with trace_span(trace_events, "jpeg_encode"):
+        data = encode_jpeg(image, quality)
+    with trace_span(trace_events, "preview_encode"):
+        preview = encode_preview(image)
+        original_preview = encode_preview(original) if original is not None else None
+    return EncodedOutput(
+        render_id=render_id,
+        data=data,
+        width=image.shape[1],
+        height=image.shape[0],
+        preview=preview,
+        original_preview=original_preview,
+        mean=_mean(image),
+        original_mean=_mean(original) if original is not None else None,
+        encode_time=time.perf_counter() - start,
+    )
+
+
+def new_render_id() -> str:
+    """產生新的渲染 ID"""
+    return uuid.uuid4().hex
+
+
+class OutputService:
+    """
+    輸出編碼服務
+
+    submit() 將編碼（下載檔 + 畫面預覽）排入背景執行緒並立即返回；
+    get() 等待並返回快取的結果。同一渲染 ID 只編碼一次，快取保留最近
+    max_entries 次渲染。
+    """
+
+    def __init__(self, max_entries: int = 4, quality: int = OUTPUT_JPEG_QUALITY):
+        """
+        Args:
+            max_entries: 快取的渲染數（超出時移除最舊者）
+            quality: JPEG 品質
+        """
+        self.max_entries = max(int(max_entries), 1)
+        self.quality = quality
+        self._entries: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, render_id: str, image: np.ndarray, trace_events: Optional[list] = None,
+               original: Optional[np.ndarray] = None) -> Future:
+        """
+        排入編碼（已快取的渲染 ID 直接返回既有結果）
+
+        image / original 在編碼完成前不可修改。
+
+        Args:
+            render_id: 渲染 ID
+            image: 圖像（BGR 格式）
+            trace_events: Chrome trace 事件列表（可選，附加 'jpeg_encode' / 'preview_encode' span）
+            original: 原始圖像（BGR 格式，可選；產生對比顯示用的預覽）
+
+        Returns:
+            Future[EncodedOutput]: 編碼結果
+        """
+        with self._lock:
+            future = self._entries.get(render_id)
+            if future is not None:
+                self._entries.move_to_end(render_id)
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='phos-encode')
+            future = self._executor.submit(encode_output, render_id, image, trace_events, original,
+                                           self.quality)
+            self._entries[render_id] = future
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return future
+
+    def put(self, output: EncodedOutput) -> Future:
+        """
+        加入已編碼的結果（例如渲染快取命中），以 output.render_id 為鍵
+
+        Args:
+            output: 編碼結果
+
+        Returns:
+            Future[EncodedOutput]: 已完成的 Future
+        """
+        future = Future()
+        future.set_result(output)
+        with self._lock:
+            self._entries[output.render_id] = future
+            self._entries.move_to_end(output.render_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return future
+
+    def get(self, render_id: str, timeout: Optional[float] = None) -> EncodedOutput:
+        """
+        取得編碼結果（編碼中時等待完成）
+
+        Args:
+            render_id: 渲染 ID
+            timeout: 最長等待秒數（None = 不限）
+
+        Returns:
+            EncodedOutput: 編碼結果
+
+        Raises:
+            KeyError: 渲染 ID 未提交或已自快取移除
+            ValueError: 編碼失敗
+        """
+        with self._lock:
+            future = self._entries.get(render_id)
+        if future is None:
+            raise KeyError(f"未知的渲染 ID: {render_id}")
+        return future.result(timeout)
+
+    def __contains__(self, render_id: str) -> bool:
+        with self._lock:
+            return render_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """清空快取"""
+        with self._lock:
+            self._entries.clear()
+
+
+_output_service: Optional[OutputService] = None
+_output_service_lock = threading.Lock()
+
+
+def _reset_output_service():
+    # fork 後子行程沒有父行程的編碼執行緒：捨棄繼承的服務，需要時重建
+    global _output_service, _output_service_lock
+    _output_service = None
+    _output_service_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_output_service)
+
+
+def get_output_service() -> OutputService:
+    """
+    取得行程共用的輸出編碼服務
+
+    Returns:
+        OutputService: 每個行程建立一次的服務
+    """
+    global _output_service
+    if _output_service is None:
+        with _output_service_lock:
+            if _output_service is None:
+                _output_service = OutputService()
+    return _output_service
@@ -0,0 +1,682 @@
+"""
+Phos Render Service
+
+本機 HTTP 渲染服務 - 以 API 提供無介面的處理管線
+
+以 asyncio 串流實作的精簡 HTTP/1.1 伺服器（僅標準函式庫），將渲染工作排入
+有上限的佇列，由行程池（forkserver worker，與批量處理相同）執行
+Phos.process_image() 並編碼 JPEG：
+
+    POST /jobs?film=Portra400&grain_style=默認&tone_style=filmic&seed=1
+         請求本體為圖像檔案位元組
+         → 202 已排入 / 200 已完成（渲染快取命中或相同工作）/ 429 佇列已滿
+    GET  /jobs/<job_id>          工作狀態與階段進度
+    GET  /jobs/<job_id>/result   全解析度 JPEG（?preview=1 為畫面預覽）
+    GET  /health                 佇列與 worker 狀態
+
+工作 ID 即 phos_cache.render_key()（輸入雜湊 + 胶片配置 + 設定 + 種子 + 引擎），
+因此相同請求去重為同一工作，已渲染過的請求直接由磁碟渲染快取返回。
+未指定 seed 的請求每次都是新工作（隨機 ID），不去重也不使用渲染快取，
+顆粒樣式每次不同。
+佇列已滿時回應 429 與 Retry-After，不在記憶體中無限累積上傳內容。
+
+worker 以 PerformanceMonitor 的階段邊界回報進度（經 multiprocessing 佇列），
+狀態端點顯示目前階段與已完成階段的耗時。
+
+用法：
+    python phos_service.py --port 8765 --workers 2 --queue-size 8
+    python tools/service_load_test.py --url http://127.0.0.1:8765
+
+Author: @LYCO6273
+Version: 0.8.4
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from phos_cache import CachedRender, get_render_cache, input_digest, render_key
+from phos_core import PerformanceMonitor, detect_core_budget, init_batch_worker, plan_batch_workers
+
+__all__ = [
+    'GRAIN_STYLES',
+    'TONE_STYLES',
+    'JobStatus',
+    'RenderJob',
+    'RenderService',
+    'RenderServer',
+    'QueueFullError',
+    'init_service_worker',
+    'job_monitor',
+    'render_job',
+    'serve',
+    'main',
+]
+
+# 與 UI 選項相同（ui_components.render_sidebar）
+GRAIN_STYLES = ("默認", "柔和", "較粗", "不使用")
+TONE_STYLES = ("filmic", "reinhard")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 8
+# 保留於記憶體的已結束工作數（含編碼結果；更早的結果仍可由渲染快取取得）
+DEFAULT_MAX_FINISHED = 32
+# 上傳大小上限（MB）
+DEFAULT_MAX_UPLOAD_MB = 200
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class JobStatus:
+    """工作狀態"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """渲染佇列已滿（HTTP 429）"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"渲染佇列已滿，請於 {retry_after:.0f} 秒後重試")
+        self.retry_after = retry_after
+
+
+@dataclass
+class RenderJob:
+    """渲染工作（job_id 為 phos_cache.render_key()）"""
+    job_id: str
+    film_type: str
+    settings: Dict[str, object]
+    seed: Optional[int] = None
+    status: str = JobStatus.QUEUED
+    stage: Optional[str] = None  # 目前執行中的階段
+    completed_stages: List[dict] = field(default_factory=list)  # [{'name', 'wall_ms'}, ...]
+    cached: bool = False  # 由渲染快取返回（未重新處理）
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[CachedRender] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        """是否已結束（完成或失敗）"""
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        """狀態端點的 JSON 內容"""
+        info = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'film': self.film_type,
+            'settings': self.settings,
+            'seed': self.seed,
+            'stage': self.stage,
+            'completed_stages': list(self.completed_stages),
+            'cached': self.cached,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.result is not None:
+            output = self.result.output
+            info.update(
+                width=output.width,
+                height=output.height,
+                size_kb=round(output.size_kb, 1),
+                process_time=self.result.process_time,
+            )
+        return info
+
+
+# ==================== Worker 行程 ====================
+
+_progress_queue = None  # worker 行程的進度佇列（init_service_worker 設定）
+
+
+def init_service_worker(budget: int, progress_queue=None):
+    """
+    渲染 worker 的初始化函數（ProcessPoolExecutor initializer）
+
+    Args:
+        budget: 分配給此 worker 的核心預算（見 phos_core.plan_batch_workers）
+        progress_queue: 階段進度佇列（multiprocessing.Queue，可選）
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+    init_batch_worker(budget)
+
+
+class _ProgressMonitor(PerformanceMonitor):
+    # 於頂層階段邊界回報進度：(job_id, 'start' | 'end', 階段, wall_ms)
+    def __init__(self, job_id: str, queue):
+        super().__init__(track_memory=False)
+        self.job_id = job_id
+        self.queue = queue
+
+    @contextmanager
+    def stage(self, name: str):
+        top_level = self._open_stage is None
+        if top_level:
+            self.queue.put((self.job_id, 'start', name, None))
+        start = time.perf_counter()
+        with super().stage(name):
+            yield
+        if top_level:
+            self.queue.put((self.job_id, 'end', name, (time.perf_counter() - start) * 1000.0))
+
+
+def job_monitor(job_id: str) -> PerformanceMonitor:
+    """
+    worker 中的階段剖析器（於頂層階段邊界回報進度；無進度佇列時為一般監控器）
+
+    Args:
+        job_id: 工作 ID
+
+    Returns:
+        PerformanceMonitor: 傳遞給處理管線的 profiler
+    """
+    if _progress_queue is None:
+        return PerformanceMonitor(track_memory=False)
+    return _ProgressMonitor(job_id, _progress_queue)
+
+
+def render_job(job_id: str, data: bytes, film_type: str, settings: Dict[str, object],
+               seed: Optional[int] = None) -> CachedRender:
+    """
+    於 worker 行程渲染並編碼一個工作，指定 seed 時寫入渲染快取
+
+    Args:
+        job_id: 工作 ID（渲染快取鍵）
+        data: 圖像檔案位元組
+        film_type: 胶片類型
+        settings: {'grain_style', 'tone_style'}
+        seed: 隨機種子（可選）
+
+    Returns:
+        CachedRender: 編碼結果
+
+    Raises:
+        ValueError: 圖像讀取失敗或處理錯誤
+    """
+    from Phos import process_image
+    from phos_output import encode_output
+
+    with job_monitor(job_id) as monitor:
+        final_image, process_time, _, original_image, original_size = process_image(
+            data, film_type, settings['grain_style'], settings['tone_style'],
+            profiler=monitor, seed=seed
+        )
+        with monitor.stage("jpeg_encode"):
+            output = encode_output(job_id, final_image, original=original_image)
+    entry = CachedRender(output, original_size, process_time)
+    if seed is not None:
+        get_render_cache().put(job_id, entry)
+    return entry
+
+
+# ==================== 服務 ====================
+
+def _job_key(data: bytes, film_type: str, settings: Dict[str, object], seed: Optional[int]) -> str:
+    # 與 Streamlit 單張處理相同的鍵結構（physics_params 為 None：使用胶片預設）
+    from Phos import prepare_film_profile
+
+    film = prepare_film_profile(film_type, settings['grain_style'], None)
+    if seed is None:
+        # 未指定種子：顆粒樣式每次不同，以隨機 ID 避免去重與快取
+        return secrets.token_hex(32)
+    key_settings = {'film_type': film_type, **settings, 'physics_params': None}
+    return render_key(input_digest(data), film, key_settings, seed)
+
+
+class RenderService:
+    """
+    渲染工作佇列
+
+    submit() 去重並排入工作（佇列已滿時拋出 QueueFullError）；
+    workers 個 dispatcher 協程自佇列取出工作並交由執行器執行。
+    須在事件迴圈中使用：await start() 後才開始處理，await stop() 關閉。
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 max_finished: int = DEFAULT_MAX_FINISHED,
+                 render_func: Callable[..., CachedRender] = render_job,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            workers: 並行渲染數（None = 核心預算，見 plan_batch_workers）
+            queue_size: 等待中工作的上限（超出時回應 429）
+            max_finished: 保留於記憶體的已結束工作數
+            render_func: worker 中執行的渲染函數（預設 render_job；須可 pickle）
+            executor: 執行器（None = forkserver 行程池，每個 worker 分配核心預算）
+        """
+        self.workers, self._worker_budget = plan_batch_workers(workers, num_jobs=detect_core_budget())
+        self.queue_size = max(int(queue_size), 1)
+        self.max_finished = max(int(max_finished), 1)
+        self.render_func = render_func
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._jobs: "OrderedDict[str, RenderJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers: List[asyncio.Task] = []
+        self._progress = None
+        self._progress_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._render_times: List[float] = []
+
+    # ---------- 生命週期 ----------
+
+    def _new_executor(self) -> Executor:
+        from phos_batch import batch_worker_context
+
+        context = batch_worker_context()
+        if self._progress is None:
+            self._progress = context.Queue()
+            self._progress_thread = threading.Thread(
+                target=self._drain_progress, name="phos-service-progress", daemon=True
+            )
+            self._progress_thread.start()
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                   initializer=init_service_worker,
+                                   initargs=(self._worker_budget, self._progress))
+
+    async def start(self):
+        """啟動 dispatcher 協程（與行程池），並預先載入管線（提交時計算工作 ID 需要）"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        await asyncio.to_thread(importlib.import_module, "Phos")
+        if self._executor is None:
+            self._executor = self._new_executor()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """停止處理並關閉行程池（執行中的工作完成後結束）"""
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._owns_executor and self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, True, cancel_futures=True)
+            self._executor = None
+        if self._progress is not None:
+            self._progress.put(None)
+            self._progress_thread.join(timeout=5)
+            self._progress.close()
+            self._progress = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    # ---------- 進度 ----------
+
+    def _drain_progress(self):
+        # 背景執行緒：轉送 worker 的階段事件到事件迴圈
+        progress = self._progress
+        while True:
+            try:
+                item = progress.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            try:
+                self._loop.call_soon_threadsafe(self._on_progress, *item)
+            except RuntimeError:
+                return  # 事件迴圈已關閉
+
+    def _on_progress(self, job_id: str, event: str, name: str, wall_ms: Optional[float]):
+        # 事件經佇列轉送，可能晚於工作結果到達：結束事件於工作完成後仍記錄
+        job = self._jobs.get(job_id)
+        if job is None or job.status == JobStatus.QUEUED:
+            return
+        if event == 'start':
+            if job.status == JobStatus.RUNNING:
+                job.stage = name
+        else:
+            job.completed_stages.append({'name': name, 'wall_ms': round(wall_ms, 1)})
+            if job.stage == name:
+                job.stage = None
+
+    # ---------- 工作 ----------
+
+    def get(self, job_id: str) -> RenderJob:
+        """
+        取得工作
+
+        Raises:
+            KeyError: 未知的工作 ID
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"未知的工作 ID: {job_id}")
+        return job
+
+    def retry_after(self) -> float:
+        """佇列清空的預估秒數（最近渲染時間 × 排隊數 / worker 數）"""
+        recent = self._render_times[-16:]
+        average = sum(recent) / len(recent) if recent else 10.0
+        pending = (self._queue.qsize() if self._queue is not None else 0) + self.workers
+        return max(math.ceil(average * pending / self.workers), 1)
+
+    def stats(self) -> dict:
+        """佇列與 worker 狀態"""
+        counts = {status: 0 for status in (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.DONE, JobStatus.FAILED)}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'jobs': counts,
+        }
+
+    def _add_job(self, job: RenderJob):
+        self._jobs[job.job_id] = job
+        self._jobs.move_to_end(job.job_id)
+        finished = [key for key, existing in self._jobs.items() if existing.finished]
+        for key in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[key]
+
+    async def submit(self, data: bytes, film_type: str, grain_style: str = "默認",
+                     tone_style: str = "filmic", seed: Optional[int] = None) -> Tuple[RenderJob, bool]:
+        """
+        提交渲染工作
+
+        指定 seed 時，相同輸入與設定的工作（排隊中、執行中或已完成）去重為同一工作；
+        渲染快取命中時直接返回已完成的工作，不佔用佇列。未指定 seed 時每次排入新工作。
+
+        Args:
+            data: 圖像檔案位元組
+            film_type: 胶片類型
+            grain_style: 顆粒風格（GRAIN_STYLES）
+            tone_style: Tone mapping 風格（TONE_STYLES）
+            seed: 隨機種子（可選）
+
+        Returns:
+            (工作, 是否為既有工作)
+
+        Raises:
+            ValueError: 參數無效或圖像為空
+            QueueFullError: 佇列已滿
+        """
+        if self._queue is None:
+            raise RuntimeError("RenderService 尚未啟動（await start()）")
+        if not data:
+            raise ValueError("請求本體為空，請上傳圖像檔案")
+        if grain_style not in GRAIN_STYLES:
+            raise ValueError(f"未知的顆粒風格: {grain_style}. 可用: {', '.join(GRAIN_STYLES)}")
+        if tone_style not in TONE_STYLES:
+            raise ValueError(f"未知的 Tone mapping 風格: {tone_style}. 可用: {', '.join(TONE_STYLES)}")
+        settings = {'grain_style': grain_style, 'tone_style': tone_style}
+
+        # 雜湊與胶片配置於執行緒計算，不阻塞事件迴圈
+        job_id = await asyncio.to_thread(_job_key, data, film_type, settings, seed)
+        existing = self._jobs.get(job_id)
+        if existing is not None and existing.status != JobStatus.FAILED:
+            return existing, True
+
+        cached = None
+        if seed is not None:
+            cached = await asyncio.to_thread(get_render_cache().get, job_id)
+        existing = self._jobs.get(job_id)
+        if existing is not None and existing.status != JobStatus.FAILED:
+            return existing, True
+
+        job = RenderJob(job_id, film_type, settings, seed)
+        if cached is not None:
+            job.status = JobStatus.DONE
+            job.cached = True
+            job.result = cached
+            job.finished_at = time.time()
+            job.done.set()
+        elif self._queue.full():
+            raise QueueFullError(self.retry_after())
+        else:
+            self._queue.put_nowait((job, data))
+        self._add_job(job)
+        return job, False
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> RenderJob:
+        """
+        等待工作結束
+
+        Raises:
+            KeyError: 未知的工作 ID
+            asyncio.TimeoutError: 逾時
+        """
+        job = self.get(job_id)
+        await asyncio.wait_for(job.done.wait(), timeout)
+        return job
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, data = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await loop.run_in_executor(
+                    self._executor, self.render_func, job.job_id, data, job.film_type, job.settings, job.seed
+                )
+                job.status = JobStatus.DONE
+                self._render_times.append(time.time() - job.started_at)
+                del self._render_times[:-64]
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "服務已停止"
+                raise
+            except BrokenProcessPool as e:
+                # worker 異常結束（例如記憶體不足被終止）：重建行程池，後續工作不受影響
+                job.status = JobStatus.FAILED
+                job.error = f"渲染 worker 異常結束: {e}"
+                if self._owns_executor:
+                    self._executor.shutdown(wait=False)
+                    self._executor = self._new_executor()
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.stage = None
+                job.finished_at = time.time()
+                job.done.set()
+                self._queue.task_done()
+                self._add_job(job)
+
+
+# ==================== HTTP ====================
+
+def _json_response(status: int, payload: dict, headers: Optional[dict] = None) -> Tuple[int, dict, bytes]:
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    return status, {'Content-Type': 'application/json; charset=utf-8', **(headers or {})}, body
+
+
+def _error(status: int, message: str, headers: Optional[dict] = None) -> Tuple[int, dict, bytes]:
+    return _json_response(status, {'error': message}, headers)
+
+
+class RenderServer:
+    """RenderService 的 HTTP 介面（每個連線處理一個請求）"""
+
+    def __init__(self, service: RenderService, max_upload_bytes: int = DEFAULT_MAX_UPLOAD_MB * 1024 * 1024):
+        self.service = service
+        self.max_upload_bytes = max_upload_bytes
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """處理一個 HTTP 連線"""
+        try:
+            try:
+                method, target, headers = await self._read_head(reader)
+                length = int(headers.get('content-length', 0) or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except (ValueError, UnicodeDecodeError):
+                response = _error(400, "無效的 HTTP 請求")
+            except asyncio.IncompleteReadError:
+                return
+            else:
+                if length > self.max_upload_bytes:
+                    response = _error(413, f"上傳檔案超過 {self.max_upload_bytes // (1024 * 1024)} MB")
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    response = await self.route(method, target, body)
+            await self._write(writer, *response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        request_line = await reader.readuntil(b"\r\n")
+        method, target, _ = request_line.decode('ascii').split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                return method.upper(), target, headers
+            name, separator, value = line.decode('latin-1').partition(":")
+            if not separator:
+                raise ValueError(line)
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, headers: dict, body: bytes):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+        writer.write("\r\n".join(lines).encode('latin-1') + body)
+        await writer.drain()
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[int, dict, bytes]:
+        """
+        分派請求
+
+        Returns:
+            (狀態碼, 標頭, 本體)
+        """
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"]:
+            return _json_response(200, self.service.stats())
+        if parts == ["jobs"]:
+            if method != "POST":
+                return _error(405, "請以 POST 提交工作", {'Allow': 'POST'})
+            return await self._submit(query, body)
+        if len(parts) in (2, 3) and parts[0] == "jobs" and (len(parts) == 2 or parts[2] == "result"):
+            if method != "GET":
+                return _error(405, "請以 GET 查詢工作", {'Allow': 'GET'})
+            try:
+                job = self.service.get(parts[1])
+            except KeyError as e:
+                return _error(404, e.args[0])
+            if len(parts) == 2:
+                return _json_response(200, job.to_dict())
+            return self._result(job, query)
+        return _error(404, f"未知的路徑: {url.path}")
+
+    async def _submit(self, query: Dict[str, str], body: bytes) -> Tuple[int, dict, bytes]:
+        if 'film' not in query:
+            return _error(400, "缺少參數: film")
+        try:
+            seed = int(query['seed']) if query.get('seed', '') != '' else None
+            job, existing = await self.service.submit(
+                body, query['film'],
+                grain_style=query.get('grain_style', "默認"),
+                tone_style=query.get('tone_style', "filmic"),
+                seed=seed,
+            )
+        except QueueFullError as e:
+            return _error(429, str(e), {'Retry-After': str(int(e.retry_after))})
+        except ValueError as e:
+            return _error(400, str(e))
+        payload = {**job.to_dict(), 'deduplicated': existing}
+        return _json_response(200 if job.finished else 202, payload,
+                              {'Location': f"/jobs/{job.job_id}"})
+
+    @staticmethod
+    def _result(job: RenderJob, query: Dict[str, str]) -> Tuple[int, dict, bytes]:
+        if job.status == JobStatus.FAILED:
+            return _json_response(500, job.to_dict())
+        if job.status != JobStatus.DONE:
+            return _json_response(409, job.to_dict())
+        output = job.result.output
+        data = output.preview if query.get('preview', '0') not in ('', '0') else output.data
+        return 200, {'Content-Type': output.mime, 'ETag': f'"{job.job_id}"'}, data
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                service: Optional[RenderService] = None,
+                ready: Optional[Callable[[asyncio.AbstractServer], None]] = None):
+    """
+    執行 HTTP 渲染服務直到被取消
+
+    Args:
+        host: 監聽位址
+        port: 監聽埠（0 = 自動選擇）
+        service: 渲染服務（None = 預設設定）
+        ready: 開始監聽後呼叫（參數為 asyncio.Server，可取得實際的埠）
+    """
+    service = service or RenderService()
+    async with service:
+        server = await asyncio.start_server(RenderServer(service).handle, host, port)
+        async with server:
+            if ready is not None:
+                ready(server)
+            await server.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 本機 HTTP 渲染服務")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"監聽位址（預設 {DEFAULT_HOST}）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"監聽埠（預設 {DEFAULT_PORT}）")
+    parser.add_argument('--workers', type=int, default=None, help="並行渲染數（預設為核心預算）")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"等待中工作上限，超出回應 429（預設 {DEFAULT_QUEUE_SIZE}）")
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        print(f"Phos 渲染服務：http://{address[0]}:{address[1]}（Ctrl+C 結束）", flush=True)
+
+    service = RenderService(workers=args.workers, queue_size=args.queue_size)
+    try:
+        asyncio.run(serve(args.host, args.port, service, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,7 @@ Date: 2025-12-24
 import numpy as np
 from typing import Optional, Tuple
 from film_models import ReciprocityFailureParams
+from modules.pointwise import get_pointwise_backend, pointwise
 
 
 # ==================== 核心函數 ====================
@@ -93,17 +94,32 @@ def apply_reciprocity_failure(
     if use_mono:
         # 黑白模式：單通道處理
         p = p_values if isinstance(p_values, (float, np.floating)) else p_values[0]
-        effective_intensity = intensity * (exposure_time ** (p - 1.0))
-    else:
-        # 彩色模式：分通道處理
+        # 縮放與 Clip 到合理範圍（避免數值溢出）為單次逐點運算
+        return pointwise('scale_clip', x=intensity, scale=exposure_time ** (p - 1.0))
+
+    # 彩色模式：分通道處理
+    channels = min(3, num_channels)
+    factors = [
+        exposure_time ** ((p_values[ch] if hasattr(p_values, '__getitem__') else p_values) - 1.0)
+        for ch in range(channels)
+    ]
+    
+    if get_pointwise_backend() == 'numpy':
+        # 逐通道純量乘法直接寫入輸出後原地裁切（不經逐點核心：跨步的通道切片
+        # 逐一派送列帶反而較慢）；運算 dtype 與寫入轉換同原逐通道運算
         effective_intensity = np.zeros_like(intensity)
-        for ch in range(min(3, num_channels)):
-            p_ch = p_values[ch] if hasattr(p_values, '__getitem__') else p_values
-            effective_intensity[:, :, ch] = intensity[:, :, ch] * (exposure_time ** (p_ch - 1.0))
-    
-    # Clip 到合理範圍（避免數值溢出）
-    effective_intensity = np.clip(effective_intensity, 0, 1)
-    
+        for ch in range(channels):
+            np.multiply(intensity[:, :, ch], factors[ch], out=effective_intensity[:, :, ch], casting='unsafe')
+        return np.clip(effective_intensity, 0, 1, out=effective_intensity)
+    
+    # 融合後端：逐通道係數以 (1, 1, C) 廣播，整幅單次縮放與裁切
+    # （0、1 可精確表示，裁切與寫入時的 dtype 轉換可交換）
+    scales = np.array(factors, dtype=np.result_type(intensity, *factors)).reshape(1, 1, channels)
+    scaled = pointwise('scale_clip_channels', x=intensity[:, :, :channels], scale=scales)
+    if channels == num_channels:
+        return scaled.astype(intensity.dtype, copy=False)
+    effective_intensity = np.zeros_like(intensity)
+    effective_intensity[:, :, :channels] = scaled
     return effective_intensity
 
 
@@ -0,0 +1,49 @@
+"""
+數據資產包建構腳本
+
+功能：
+- 將 data/*.npz（Smits 基底、CIE 1931、膠片光譜敏感度、Mie 查表）
+  打包為單一記憶體映射檔 data/phos_assets.pack
+- 寫入 manifest（來源大小 / 修改時間 / sha256、各陣列 dtype / shape / offset）
+
+部署或更新任一 npz 後執行一次；資產包過期時載入端會警告並退回讀取 npz。
+
+用法：
+    python scripts/build_asset_pack.py
+    python scripts/build_asset_pack.py --output /tmp/phos_assets.pack
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加父目錄到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from asset_pack import ASSET_PACK_PATH, ASSET_SOURCES, DATA_DIR, build_asset_pack
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="建構數據資產包")
+    parser.add_argument('--output', type=Path, default=ASSET_PACK_PATH, help="輸出路徑")
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help="來源 npz 目錄")
+    parser.add_argument('--sources', nargs='+', default=list(ASSET_SOURCES), help="資產名稱（npz 檔名主幹）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    manifest = build_asset_pack(args.output, args.data_dir, args.sources)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for name, asset in manifest['assets'].items():
+        skipped = f"（略過 object 陣列: {', '.join(asset['skipped'])}）" if asset['skipped'] else ""
+        print(f"  ✓ {name:<28} {len(asset['arrays']):>3} 個陣列 {skipped}")
+
+    size_kb = args.output.stat().st_size / 1024
+    print(f"\n資產包 {args.output}（{size_kb:.1f} KB，{elapsed_ms:.1f} ms）")
+    print(f"版本: {manifest['pack_version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
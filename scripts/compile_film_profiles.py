@@ -0,0 +1,52 @@
+"""
+胶片數據檔編譯腳本
+
+功能：
+- 編譯 data/films/*.toml（解析繼承、驗證欄位）
+- 建構全部 FilmProfile（執行 __post_init__ 參數驗證）
+- 寫入以數據檔雜湊為鍵的編譯快取（data/films/__cache__/）
+
+部署或新增胶片後執行一次，之後各行程啟動直接載入快取。
+
+用法：
+    python scripts/compile_film_profiles.py
+    python scripts/compile_film_profiles.py --data-dir path/to/films
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加父目錄到 sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from film_models import (
+    FILM_CACHE_DIR,
+    FILM_DATA_DIR,
+    build_film_profile,
+    film_data_hash,
+    load_film_specs,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="編譯胶片數據檔")
+    parser.add_argument('--data-dir', type=Path, default=FILM_DATA_DIR, help="數據檔目錄")
+    parser.add_argument('--cache-dir', type=Path, default=FILM_CACHE_DIR, help="編譯快取目錄")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    specs = load_film_specs(args.data_dir, args.cache_dir)
+    for name, spec in specs.items():
+        profile = build_film_profile(spec)
+        print(f"  ✓ {name:<32} {profile.color_type:<7} {profile.iso_rating or ''}")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{len(specs)} 款胶片編譯完成（{elapsed_ms:.1f} ms）")
+    print(f"快取鍵: {film_data_hash(args.data_dir)[:16]} → {args.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
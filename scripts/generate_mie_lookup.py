@@ -7,24 +7,51 @@ Mie 散射查表生成腳本 (Phase 5.5 - 高密度版本)
 版本更新:
     v1: 3 波長 × 7 ISO = 21 格點
     v2: 10 波長 × 20 ISO = 200 格點 (Phase 5.5)
+    v3 生成器: 行程池並行、相位函數記憶化、檢查點續跑
+
+效能:
+    - 同一波長的所有 ISO 共用同一組粒徑（0.3-4 μm 等距取樣），
+      僅分布權重不同：每個 (λ, 粒徑) 的 Mie 相位函數只計算一次，
+      ISO 格點以權重向量 × 相位函數矩陣合成
+    - 以波長列為單位分派到行程池（每列內共用記憶化結果）
+    - 每完成一列寫入檢查點，中斷後以相同參數重新執行即從檢查點續跑
+    - 每個格點寫入內容定址快取（data/mie_cells/），加密或重新生成時不重算
+
+自適應加密 (--refine):
+    在相鄰節點中點計算實際格點，與執行期線性插值比較；σ/κ/ρ/η 相對誤差
+    超過容差的區間插入中點，重複至收斂。輸出非等距直線網格，
+    執行期 lookup_mie_params 的 searchsorted 查找（O(log n)）直接適用。
 
 依賴:
     pip install miepython numpy scipy
 
 使用:
     python3 generate_mie_lookup.py
+    python3 generate_mie_lookup.py --n-wavelengths 40 --n-isos 60 --workers 8 \\
+        --output ../data/mie_lookup_table_dense.npz
+    python3 generate_mie_lookup.py --refine --tolerance 0.02 --output ../data/mie_lookup_table_adaptive.npz
     
 輸出:
     ../data/mie_lookup_table_v3.npz
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing
 import numpy as np
 import miepython
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
 from scipy.optimize import minimize
 from scipy.stats import lognorm
 import time
 import os
 
+# numpy 2.0 將 trapz 更名為 trapezoid
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
 # ============================================================
 # 1. 物理參數定義
 # ============================================================
@@ -61,6 +88,38 @@ PARTICLE_DISTRIBUTIONS = {
 # 折射率
 N_GELATIN = 1.50  # 明膠介質
 
+# 數值設定（影響格點結果，納入檢查點指紋）
+ANGLES_DEG = np.linspace(0.1, 20, 150)  # 散射角網格 0.1° ~ 20°（小角區域）
+N_DIAMETER_SAMPLES = 30                 # 粒徑採樣點數（0.3-4 μm 等距）
+Z_EFF_UM = 500.0                        # 等效散射深度 (μm, Phase 5.2 修正值)
+PIXEL_SIZE_UM = 12.0                    # 像素尺寸 (μm/px)
+
+
+def particle_distribution(iso):
+    """
+    粒徑分布參數（對數常態, μm）
+    
+    表中 ISO 直接取值；其他 ISO（加密網格）以 log(粒徑) vs log(ISO)
+    線性插值，超出 50-6400 範圍時夾在端點。
+    
+    Args:
+        iso: 感光度
+    
+    Returns:
+        dict: {'mean': μm, 'std': μm}
+    """
+    if iso in PARTICLE_DISTRIBUTIONS:
+        return PARTICLE_DISTRIBUTIONS[iso]
+    
+    isos = np.array(sorted(PARTICLE_DISTRIBUTIONS), dtype=float)
+    log_iso = np.log(np.clip(float(iso), isos[0], isos[-1]))
+    return {
+        key: float(np.exp(np.interp(log_iso, np.log(isos),
+                                    np.log([PARTICLE_DISTRIBUTIONS[i][key] for i in sorted(PARTICLE_DISTRIBUTIONS)]))))
+        for key in ('mean', 'std')
+    }
+
+
 def n_AgBr_vacuum(wavelength_nm):
     """
     AgBr 折射率（相對真空/空氣）
@@ -159,7 +218,30 @@ def compute_mie_phase_function(wavelength_nm, particle_diameter_um, angles_deg):
     
     return phase
 
-def compute_polydisperse_phase(wavelength_nm, iso, angles_deg, n_samples=30):
+@lru_cache(maxsize=None)
+def _phase_matrix(wavelength_nm, angles_key, n_samples):
+    """
+    各粒徑的 Mie 相位函數矩陣（每個 (λ, 粒徑) 只計算一次）
+    
+    所有 ISO 使用同一組粒徑取樣，只有分布權重不同，
+    因此同一波長的 ISO 格點共用此矩陣。
+    
+    Args:
+        wavelength_nm: 波長 (nm)
+        angles_key: 角度 (度) tuple（可 hash）
+        n_samples: 粒徑採樣點數
+    
+    Returns:
+        np.ndarray: (n_samples, n_angles) 唯讀
+    """
+    angles_deg = np.array(angles_key)
+    diameters = np.linspace(0.3, 4.0, n_samples)
+    matrix = np.stack([compute_mie_phase_function(wavelength_nm, d, angles_deg) for d in diameters])
+    matrix.flags.writeable = False
+    return matrix
+
+
+def compute_polydisperse_phase(wavelength_nm, iso, angles_deg, n_samples=N_DIAMETER_SAMPLES):
     """
     計算粒徑分布加權的平均相位函數
     
@@ -172,7 +254,7 @@ def compute_polydisperse_phase(wavelength_nm, iso, angles_deg, n_samples=30):
     Returns:
         <P(θ)>: 粒徑分布加權平均相位函數
     """
-    params = PARTICLE_DISTRIBUTIONS[iso]
+    params = particle_distribution(iso)
     mean_um = params['mean']
     std_um = params['std']
     
@@ -186,15 +268,14 @@ def compute_polydisperse_phase(wavelength_nm, iso, angles_deg, n_samples=30):
     weights = dist.pdf(diameters)
     weights = weights / (np.sum(weights) + 1e-10)  # 正規化
     
-    # 加權平均相位函數
-    phase_avg = np.zeros_like(angles_deg, dtype=float)
-    for d, w in zip(diameters, weights):
-        phase = compute_mie_phase_function(wavelength_nm, d, angles_deg)
-        phase_avg += w * phase
+    # 加權平均相位函數：權重向量 × 相位函數矩陣（記憶化，跨 ISO 共用）
+    angles_deg = np.asarray(angles_deg, dtype=float)
+    phases = _phase_matrix(float(wavelength_nm), tuple(angles_deg.tolist()), n_samples)
+    phase_avg = weights @ phases
     
     # 正規化: ∫ P(θ) sin(θ) dθ = 2 (積分為 4π / 2π)
     theta_rad = np.deg2rad(angles_deg)
-    norm_factor = np.trapz(phase_avg * np.sin(theta_rad), theta_rad)
+    norm_factor = _trapezoid(phase_avg * np.sin(theta_rad), theta_rad)
     phase_avg = phase_avg / (norm_factor + 1e-10)
     
     return phase_avg
@@ -235,7 +316,7 @@ def phase_to_spatial_psf(phase_function, angles_deg, z_eff_um=500.0,
     psf_grid = np.interp(theta_deg, angles_deg, phase_function, right=0)
     
     # 正規化: ∫ PSF(r) 2πr dr = 1
-    norm_factor = np.trapz(psf_grid * r_grid, r_grid) * 2 * np.pi
+    norm_factor = _trapezoid(psf_grid * r_grid, r_grid) * 2 * np.pi
     psf_grid = psf_grid / (norm_factor + 1e-10)
     
     return r_grid, psf_grid
@@ -254,7 +335,7 @@ def dual_kernel(r, sigma, kappa, rho):
     kernel = rho * gaussian + (1 - rho) * exponential
     
     # 正規化
-    norm = np.trapz(kernel * r, r) * 2 * np.pi
+    norm = _trapezoid(kernel * r, r) * 2 * np.pi
     return kernel / (norm + 1e-10)
 
 def fit_dual_kernel(r, psf_target):
@@ -297,13 +378,26 @@ def fit_dual_kernel(r, psf_target):
 # 5. 能量係數計算
 # ============================================================
 
+@lru_cache(maxsize=1)
+def _reference_qsca():
+    """基準散射效率 Q_scat（550nm, ISO 400 → d=1.2μm），每個行程只計算一次"""
+    try:
+        d_ref_m = 1.2e-6  # ISO 400 → d=1.2μm (轉換為 m)
+        lambda_ref_m = 550e-9  # 550nm (轉換為 m)
+        m_ref = relative_refractive_index(550)
+        _, qsca_ref, _, _ = miepython.efficiencies(m_ref, d_ref_m, lambda_ref_m)  # m_ref 已是相對折射率
+    except Exception:
+        qsca_ref = 1.0
+    return qsca_ref
+
+
 def compute_energy_fraction(wavelength_nm, iso):
     """
     計算散射能量分數 η(λ, ISO)
     
     基於 Mie 散射效率 Q_scat
     """
-    params = PARTICLE_DISTRIBUTIONS[iso]
+    params = particle_distribution(iso)
     mean_um = params['mean']
     
     # 尺寸參數
@@ -322,133 +416,324 @@ def compute_energy_fraction(wavelength_nm, iso):
         qsca = (8.0/3.0) * x**4 * abs((m**2 - 1)/(m**2 + 2))**2
     
     # 正規化：綠光 (550nm, ISO=400) 為基準
-    try:
-        d_ref_m = 1.2e-6  # ISO 400 → d=1.2μm (轉換為 m)
-        lambda_ref_m = 550e-9  # 550nm (轉換為 m)
-        m_ref = relative_refractive_index(550)
-        _, qsca_ref, _, _ = miepython.efficiencies(m_ref, d_ref_m, lambda_ref_m)  # m_ref 已是相對折射率
-    except:
-        qsca_ref = 1.0
+    qsca_ref = _reference_qsca()
     
     eta = qsca / (qsca_ref + 1e-10)
     
     return eta
 
 # ============================================================
-# 6. 主生成流程
+# 6. 格點計算、檢查點與並行生成
 # ============================================================
 
-def generate_lookup_table():
-    """生成完整查表"""
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / 'data' / 'mie_lookup_table_v3.npz'
+CELL_FIELDS = ('sigma', 'kappa', 'rho', 'eta', 'rmse')
+
+
+def compute_cell(wavelength_nm, iso):
+    """
+    計算單一 (λ, ISO) 格點
+    
+    Returns:
+        dict: {'sigma', 'kappa', 'rho', 'eta', 'rmse'}
+    """
+    phase = compute_polydisperse_phase(wavelength_nm, iso, ANGLES_DEG)
+    r, psf = phase_to_spatial_psf(phase, ANGLES_DEG, z_eff_um=Z_EFF_UM, pixel_size_um=PIXEL_SIZE_UM)
+    sigma, kappa, rho, rmse = fit_dual_kernel(r, psf)
+    eta = compute_energy_fraction(wavelength_nm, iso)
+    return dict(zip(CELL_FIELDS, map(float, (sigma, kappa, rho, eta, rmse))))
+
+
+def compute_row(wavelength_nm, isos):
+    """
+    計算一個波長列（行程池任務單位，列內共用相位函數矩陣）
+    
+    Returns:
+        list: [(iso, cell dict), ...]
+    """
+    return [(iso, compute_cell(wavelength_nm, iso)) for iso in isos]
+
+
+def physics_fingerprint():
+    """影響格點結果的物理 / 數值設定雜湊（檢查點僅在設定相同時重用）"""
+    config = {
+        'angles_deg': ANGLES_DEG.tolist(),
+        'n_diameter_samples': N_DIAMETER_SAMPLES,
+        'z_eff_um': Z_EFF_UM,
+        'pixel_size_um': PIXEL_SIZE_UM,
+        'n_gelatin': N_GELATIN,
+        'particle_distributions': {str(k): v for k, v in PARTICLE_DISTRIBUTIONS.items()},
+        'miepython': miepython.__version__,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def cell_key(wavelength_nm, iso):
+    """格點鍵（檢查點 JSON 使用）"""
+    return f"{float(wavelength_nm)!r}|{int(iso)}"
+
+
+def load_checkpoint(path, fingerprint):
+    """
+    讀取檢查點
+    
+    Returns:
+        dict: 格點鍵 → cell dict（檔案不存在或設定不符時為空）
+    """
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        print(f"⚠️  檢查點無法讀取，重新計算: {path}")
+        return {}
+    if data.get('fingerprint') != fingerprint:
+        print(f"⚠️  檢查點設定不符（{data.get('fingerprint')} ≠ {fingerprint}），重新計算")
+        return {}
+    return data['cells']
+
+
+def save_checkpoint(path, fingerprint, cells):
+    """原子寫入檢查點（先寫暫存檔再取代）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({'fingerprint': fingerprint, 'cells': cells}), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def make_grid(n_wavelengths=len(WAVELENGTHS), n_isos=None):
+    """
+    生成查表網格
+    
+    Args:
+        n_wavelengths: 波長點數（400-700nm 等距）
+        n_isos: ISO 點數（None = 預設 20 個 ISO；否則 50-6400 等比取樣並取整）
+    
+    Returns:
+        (wavelengths, iso_values)
+    """
+    wavelengths = np.linspace(400, 700, n_wavelengths)
+    if n_isos is None:
+        return wavelengths, np.array(ISO_VALUES)
+    isos = np.unique(np.round(np.geomspace(min(ISO_VALUES), max(ISO_VALUES), n_isos)).astype(int))
+    return wavelengths, isos
+
+
+class CellCache:
+    """
+    內容定址格點快取（每個格點一個 JSON 檔）
+    
+    鍵 = sha256(物理設定指紋, λ, ISO)：設定改變時自動失效，
+    加密網格或重新生成時已計算的格點不再重算。寫入為原子操作，
+    多個行程可共用同一目錄。
+    
+    Args:
+        root: 快取目錄
+        fingerprint: 物理設定指紋（預設 physics_fingerprint()）
+    """
+    
+    def __init__(self, root, fingerprint=None):
+        self.root = Path(root)
+        self.fingerprint = fingerprint or physics_fingerprint()
+    
+    def _path(self, wavelength_nm, iso):
+        digest = hashlib.sha256(f"{self.fingerprint}|{cell_key(wavelength_nm, iso)}".encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+    
+    def get(self, wavelength_nm, iso):
+        """讀取格點（不存在或損毀時返回 None）"""
+        try:
+            return json.loads(self._path(wavelength_nm, iso).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, wavelength_nm, iso, cell):
+        """寫入格點"""
+        path = self._path(wavelength_nm, iso)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cell), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+def compute_grid(wavelengths, iso_values, workers=1, cells=None, cell_cache=None, on_row=None):
+    """
+    計算網格上所有缺少的格點
+    
+    Args:
+        wavelengths: 波長 (nm)
+        iso_values: ISO 值
+        workers: 行程數（1 = 單行程）
+        cells: 已有的格點（格點鍵 → cell dict），就地更新
+        cell_cache: CellCache（可選），命中的格點不重算，新格點寫入
+        on_row: 每完成一列的回呼 (wavelength, results)
+    
+    Returns:
+        (cells, computed): 所有格點與本次實際計算的格點數
+    """
+    cells = {} if cells is None else cells
+    pending = []
+    for wavelength in wavelengths:
+        missing = []
+        for iso in iso_values:
+            key = cell_key(wavelength, iso)
+            if key not in cells and cell_cache is not None:
+                cached = cell_cache.get(wavelength, iso)
+                if cached is not None:
+                    cells[key] = cached
+            if key not in cells:
+                missing.append(int(iso))
+        if missing:
+            pending.append((float(wavelength), missing))
+    
+    def record(wavelength, results):
+        for iso, cell in results:
+            cells[cell_key(wavelength, iso)] = cell
+            if cell_cache is not None:
+                cell_cache.put(wavelength, iso, cell)
+        if on_row is not None:
+            on_row(wavelength, results)
+    
+    if workers == 1 or len(pending) <= 1:
+        for wavelength, isos in pending:
+            record(wavelength, compute_row(wavelength, isos))
+    else:
+        # 由乾淨的 forkserver 行程產生 worker：從已啟動 numba 執行緒的行程 fork，
+        # 主行程結束時會卡住（同 phos_batch.batch_worker_context）
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as executor:
+            futures = {executor.submit(compute_row, wavelength, isos): wavelength for wavelength, isos in pending}
+            for future in as_completed(futures):
+                record(futures[future], future.result())
+    
+    return cells, sum(len(isos) for _, isos in pending)
+
+
+def assemble_tables(wavelengths, iso_values, cells):
+    """
+    將格點組裝為 (n_wavelengths, n_isos) 陣列
+    
+    Returns:
+        dict: field → 陣列（CELL_FIELDS）
+    """
+    tables = {field: np.zeros((len(wavelengths), len(iso_values))) for field in CELL_FIELDS}
+    for i, wavelength in enumerate(wavelengths):
+        for j, iso in enumerate(iso_values):
+            cell = cells[cell_key(wavelength, iso)]
+            for field in CELL_FIELDS:
+                tables[field][i, j] = cell[field]
+    return tables
+
+
+def generate_lookup_table(wavelengths=WAVELENGTHS, iso_values=ISO_VALUES, workers=None,
+                          output_path=DEFAULT_OUTPUT, checkpoint_path=None, cell_cache=None,
+                          extra_metadata=None):
+    """
+    生成完整查表
+    
+    Args:
+        wavelengths: 波長 (nm)
+        iso_values: ISO 值
+        workers: 行程數（None = CPU 核心數；1 = 單行程）
+        output_path: 輸出 .npz（None = 不寫檔）
+        checkpoint_path: 檢查點路徑（None = <output>.checkpoint.json；無輸出時不使用）
+        cell_cache: CellCache（可選），命中的格點不重算
+        extra_metadata: 附加到 metadata 的欄位
+    
+    Returns:
+        dict: 查表（與 .npz 內容相同）
+    """
+    wavelengths = np.asarray(wavelengths, dtype=float)
+    iso_values = np.asarray(iso_values)
+    n_wavelengths, n_isos = len(wavelengths), len(iso_values)
+    total_cases = n_wavelengths * n_isos
+    workers = workers or os.cpu_count() or 1
+    
     print("=" * 70)
     print("  Mie 散射查表生成 (Phase 5.5 - 高密度版本)")
     print("=" * 70)
     print(f"\n參數設定:")
-    print(f"  波長: {len(WAVELENGTHS)} 點 ({WAVELENGTHS.min():.0f}-{WAVELENGTHS.max():.0f} nm)")
-    print(f"  ISO 值: {len(ISO_VALUES)} 點 ({min(ISO_VALUES)}-{max(ISO_VALUES)})")
-    print(f"  總格點數: {len(WAVELENGTHS)} × {len(ISO_VALUES)} = {len(WAVELENGTHS) * len(ISO_VALUES)}")
+    print(f"  波長: {n_wavelengths} 點 ({wavelengths.min():.0f}-{wavelengths.max():.0f} nm)")
+    print(f"  ISO 值: {n_isos} 點 ({iso_values.min()}-{iso_values.max()})")
+    print(f"  總格點數: {n_wavelengths} × {n_isos} = {total_cases}")
     print(f"  粒徑分布: 對數常態 (mean: 0.7-2.5 μm)")
     print(f"  相對折射率: m ≈ {relative_refractive_index(550):.3f} @ 550nm")
+    print(f"  行程數: {workers}")
     print()
     
-    # 初始化表格
-    n_wavelengths = len(WAVELENGTHS)
-    n_isos = len(ISO_VALUES)
-    
-    table_sigma = np.zeros((n_wavelengths, n_isos))
-    table_kappa = np.zeros((n_wavelengths, n_isos))
-    table_rho = np.zeros((n_wavelengths, n_isos))
-    table_eta = np.zeros((n_wavelengths, n_isos))
-    
-    # 角度網格 (小角區域)
-    angles_deg = np.linspace(0.1, 20, 150)  # 0.1° ~ 20°
+    # 檢查點：已完成的格點直接沿用
+    fingerprint = physics_fingerprint()
+    if checkpoint_path is None and output_path is not None:
+        checkpoint_path = Path(output_path).with_suffix('.checkpoint.json')
+    cells = load_checkpoint(checkpoint_path, fingerprint) if checkpoint_path else {}
+    grid_keys = {cell_key(wavelength, iso) for wavelength in wavelengths for iso in iso_values}
+    cells = {key: cell for key, cell in cells.items() if key in grid_keys}
     
-    # 統計資訊
-    total_cases = n_wavelengths * n_isos
-    case_count = 0
     start_time = time.time()
-    
-    # 遍歷所有 (λ, ISO) 組合
-    for i, wavelength in enumerate(WAVELENGTHS):
-        for j, iso in enumerate(ISO_VALUES):
-            case_count += 1
-            print(f"\n[{case_count}/{total_cases}] λ={wavelength}nm, ISO={iso}")
-            print("-" * 70)
-            
-            case_start = time.time()
-            
-            # 1. 計算多粒徑平均相位函數
-            print("  [1/4] 計算 Mie 相位函數...", end=" ", flush=True)
-            t0 = time.time()
-            phase = compute_polydisperse_phase(wavelength, iso, angles_deg)
-            print(f"✓ ({time.time()-t0:.2f}s)")
-            
-            # 2. 轉換為空間 PSF
-            print("  [2/4] 轉換為空間 PSF...", end=" ", flush=True)
-            t0 = time.time()
-            r, psf = phase_to_spatial_psf(phase, angles_deg)
-            print(f"✓ ({time.time()-t0:.2f}s)")
-            
-            # 3. 擬合雙段核
-            print("  [3/4] 擬合雙段核參數...", end=" ", flush=True)
-            t0 = time.time()
-            sigma, kappa, rho, rmse = fit_dual_kernel(r, psf)
-            print(f"✓ ({time.time()-t0:.2f}s)")
-            
-            # 4. 計算能量分數
-            print("  [4/4] 計算能量分數...", end=" ", flush=True)
-            t0 = time.time()
-            eta = compute_energy_fraction(wavelength, iso)
-            print(f"✓ ({time.time()-t0:.2f}s)")
-            
-            # 儲存結果
-            table_sigma[i, j] = sigma
-            table_kappa[i, j] = kappa
-            table_rho[i, j] = rho
-            table_eta[i, j] = eta
-            
-            case_time = time.time() - case_start
-            print(f"\n  ✅ 結果: σ={sigma:.2f}px, κ={kappa:.2f}px, ρ={rho:.3f}, η={eta:.3f}")
-            print(f"     RMSE={rmse:.4f}, 耗時={case_time:.2f}s")
-    
+    done = len(cells)
+    if done:
+        print(f"從檢查點續跑: 已完成 {done}/{total_cases} 格點")
+    
+    def on_row(wavelength, results):
+        nonlocal done
+        done += len(results)
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, fingerprint, cells)
+        elapsed = time.time() - start_time
+        print(f"  [{done}/{total_cases}] λ={wavelength:.1f}nm: {len(results)} 個 ISO ✓ ({elapsed:.1f}s)")
+    
+    cells, computed = compute_grid(wavelengths, iso_values, workers, cells, cell_cache, on_row)
     total_time = time.time() - start_time
     
+    # 組裝表格
+    tables = assemble_tables(wavelengths, iso_values, cells)
+    table_sigma, table_kappa, table_rho, table_eta = (tables[f] for f in ('sigma', 'kappa', 'rho', 'eta'))
+    
     # 封裝為字典
     lookup_table = {
-        'wavelengths': WAVELENGTHS,
-        'iso_values': np.array(ISO_VALUES),
+        'wavelengths': wavelengths,
+        'iso_values': iso_values,
         'sigma': table_sigma,
         'kappa': table_kappa,
         'rho': table_rho,
         'eta': table_eta,
         'metadata': {
-            'z_eff_um': 500.0,  # Phase 5.2 修正值
-            'pixel_size_um': 12.0,
+            'z_eff_um': Z_EFF_UM,  # Phase 5.2 修正值
+            'pixel_size_um': PIXEL_SIZE_UM,
             'n_gelatin': N_GELATIN,
             'particle_distributions': PARTICLE_DISTRIBUTIONS,
             'version': '3.0',  # TASK-010: 修正折射率
             'date': '2025-12-20',
-            'resolution': f'{len(WAVELENGTHS)}x{len(ISO_VALUES)} (高密度)',
+            'resolution': f'{n_wavelengths}x{n_isos} (高密度)',
             'library': f'miepython {miepython.__version__}',
-            'generation_time_sec': total_time
+            'generation_time_sec': total_time,
+            'fit_rmse_max': float(np.max(tables['rmse'])),
+            'physics_fingerprint': fingerprint,
+            **(extra_metadata or {}),
         }
     }
     
-    # 儲存
-    output_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, 'mie_lookup_table_v3.npz')
+    if output_path is None:
+        return lookup_table
     
+    # 儲存
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     np.savez_compressed(output_path, **lookup_table)
+    if checkpoint_path and Path(checkpoint_path).exists():
+        Path(checkpoint_path).unlink()
     
-    file_size = os.path.getsize(output_path) / 1024
+    file_size = output_path.stat().st_size / 1024
     
     print("\n" + "=" * 70)
     print("  生成完成！")
     print("=" * 70)
     print(f"✅ 查表已儲存: {output_path}")
     print(f"   檔案大小: {file_size:.2f} KB")
-    print(f"   總耗時: {total_time:.1f}s ({total_time/total_cases:.1f}s/case)")
+    print(f"   總耗時: {total_time:.1f}s ({total_time/max(computed, 1):.2f}s/case，計算 {computed} 格點)")
     print()
     
     # 顯示統計摘要
@@ -460,29 +745,177 @@ def generate_lookup_table():
     print()
     
     # 驗證 η 的波長依賴性 (Phase 5.5: 找最接近 450nm 和 650nm 的索引)
-    idx_450 = np.argmin(np.abs(WAVELENGTHS - 450))
-    idx_650 = np.argmin(np.abs(WAVELENGTHS - 650))
+    idx_450 = np.argmin(np.abs(wavelengths - 450))
+    idx_650 = np.argmin(np.abs(wavelengths - 650))
     
     eta_450 = table_eta[idx_450, :]  # 藍光 @ all ISOs
     eta_650 = table_eta[idx_650, :]  # 紅光 @ all ISOs
     ratio_avg = np.mean(eta_450 / (eta_650 + 1e-10))
-    print(f"驗證: η({WAVELENGTHS[idx_450]:.0f}nm)/η({WAVELENGTHS[idx_650]:.0f}nm) 平均比例 = {ratio_avg:.2f}x")
+    print(f"驗證: η({wavelengths[idx_450]:.0f}nm)/η({wavelengths[idx_650]:.0f}nm) 平均比例 = {ratio_avg:.2f}x")
     print(f"      (Phase 1 經驗公式: 3.62x, 預期 Mie 較低 ~2-3x)")
     print(f"      (Phase 5.2 結果: 0.14x, Mie 振盪效應)")
     
     return lookup_table
 
 # ============================================================
-# 7. 主程式
+# 7. 自適應加密
+# ============================================================
+
+DEFAULT_CELL_CACHE = Path(__file__).resolve().parent.parent / 'data' / 'mie_cells'
+PARAM_FIELDS = ('sigma', 'kappa', 'rho', 'eta')
+
+
+def interpolation_error(actual, lower, upper, t):
+    """
+    線性插值相對誤差（四個參數取最大）
+    
+    Args:
+        actual: 中點實際值 dict（field → 陣列）
+        lower / upper: 兩側節點值 dict
+        t: 中點在兩節點間的位置（0-1，執行期插值權重）
+    
+    Returns:
+        np.ndarray: 逐點最大相對誤差
+    """
+    errors = []
+    for field in PARAM_FIELDS:
+        predicted = lower[field] * (1 - t) + upper[field] * t
+        errors.append(np.abs(actual[field] - predicted) / np.maximum(np.abs(actual[field]), 1e-6))
+    return np.max(errors, axis=0)
+
+
+def refine_grid(wavelengths=WAVELENGTHS, iso_values=ISO_VALUES, tolerance=0.02, max_levels=2,
+                workers=None, cell_cache=None, min_wavelength_step=1.0, min_iso_step=2):
+    """
+    自適應加密查表網格
+    
+    每一輪在相鄰節點的中點計算實際格點，與執行期雙線性插值
+    （lookup_mie_params 沿該軸的線性插值）比較；任一 ISO / 波長上
+    σ/κ/ρ/η 的相對誤差超過 tolerance 的區間插入中點。中點格點寫入
+    cell_cache，加入網格後不再重算。結果為非等距的直線網格
+    （rectilinear），執行期 searchsorted 查找不需任何修改。
+    
+    註：η 取自平均粒徑的 Q_sca，帶有 Mie 共振紋波（波長週期約數 nm），
+    預設 10×20 網格的中點誤差約 20%；加密輪數與最小步長限制網格大小，
+    最終的最大中點誤差記錄於 report 與查表 metadata。
+    
+    Args:
+        wavelengths: 初始波長 (nm)
+        iso_values: 初始 ISO
+        tolerance: 中點相對插值誤差上限
+        max_levels: 最多加密輪數
+        workers: 行程數
+        cell_cache: CellCache（建議提供，否則每輪重算）
+        min_wavelength_step: 波長區間小於此值 (nm) 時不再加密
+        min_iso_step: ISO 區間小於此值時不再加密
+    
+    Returns:
+        (wavelengths, iso_values, report):
+            report: {'levels': [{'wavelengths_added', 'isos_added', 'max_error'}, ...],
+                     'max_midpoint_error': 最後一輪的最大中點誤差}
+    """
+    workers = workers or os.cpu_count() or 1
+    wavelengths = np.asarray(wavelengths, dtype=float)
+    iso_values = np.asarray(iso_values, dtype=int)
+    cells = {}
+    report = {'levels': [], 'max_midpoint_error': None}
+    
+    def grid(wls, isos):
+        compute_grid(wls, isos, workers, cells, cell_cache)
+        return assemble_tables(wls, isos, cells)
+    
+    for level in range(max_levels + 1):
+        nodes = grid(wavelengths, iso_values)
+        max_error = 0.0
+        
+        # 波長軸：中點 × 所有 ISO
+        wl_candidates = np.flatnonzero(np.diff(wavelengths) >= 2 * min_wavelength_step)
+        new_wavelengths = []
+        if len(wl_candidates):
+            mids = (wavelengths[wl_candidates] + wavelengths[wl_candidates + 1]) / 2
+            actual = grid(mids, iso_values)
+            lower = {f: nodes[f][wl_candidates] for f in PARAM_FIELDS}
+            upper = {f: nodes[f][wl_candidates + 1] for f in PARAM_FIELDS}
+            errors = interpolation_error(actual, lower, upper, 0.5).max(axis=1)
+            max_error = max(max_error, float(errors.max()))
+            new_wavelengths = mids[errors > tolerance].tolist()
+        
+        # ISO 軸：所有波長 × 中點（取整後依實際位置計算插值權重）
+        iso_candidates = np.flatnonzero(np.diff(iso_values) >= 2 * min_iso_step)
+        new_isos = []
+        if len(iso_candidates):
+            lo, hi = iso_values[iso_candidates], iso_values[iso_candidates + 1]
+            mids = np.round((lo + hi) / 2).astype(int)
+            actual = grid(wavelengths, mids)
+            lower = {f: nodes[f][:, iso_candidates] for f in PARAM_FIELDS}
+            upper = {f: nodes[f][:, iso_candidates + 1] for f in PARAM_FIELDS}
+            t = (mids - lo) / (hi - lo)
+            errors = interpolation_error(actual, lower, upper, t[None, :]).max(axis=0)
+            max_error = max(max_error, float(errors.max()))
+            new_isos = mids[errors > tolerance].tolist()
+        
+        report['max_midpoint_error'] = max_error
+        print(f"  加密第 {level} 輪: {len(wavelengths)}×{len(iso_values)} 網格，"
+              f"最大中點誤差 {max_error:.4f}，新增 {len(new_wavelengths)} 波長 / {len(new_isos)} ISO")
+        if level == max_levels or not (new_wavelengths or new_isos):
+            break
+        
+        report['levels'].append({
+            'wavelengths_added': new_wavelengths,
+            'isos_added': new_isos,
+            'max_error': max_error,
+        })
+        wavelengths = np.unique(np.concatenate([wavelengths, new_wavelengths]))
+        iso_values = np.unique(np.concatenate([iso_values, np.asarray(new_isos, dtype=int)]))
+    
+    return wavelengths, iso_values, report
+
+
+# ============================================================
+# 8. 主程式
 # ============================================================
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成 Mie 散射查表")
+    parser.add_argument('--n-wavelengths', type=int, default=len(WAVELENGTHS), help="波長點數（400-700nm）")
+    parser.add_argument('--n-isos', type=int, default=None, help="ISO 點數（預設 20 個標準 ISO）")
+    parser.add_argument('--workers', type=int, default=None, help="行程數（預設 CPU 核心數）")
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help="輸出 .npz 路徑")
+    parser.add_argument('--checkpoint', type=Path, default=None, help="檢查點路徑（預設 <output>.checkpoint.json）")
+    parser.add_argument('--cell-cache', type=Path, default=DEFAULT_CELL_CACHE, help="格點快取目錄")
+    parser.add_argument('--no-cell-cache', action='store_true', help="不使用格點快取")
+    parser.add_argument('--refine', action='store_true', help="自適應加密網格（以中點插值誤差判定）")
+    parser.add_argument('--tolerance', type=float, default=0.02, help="加密的中點相對誤差上限")
+    parser.add_argument('--max-levels', type=int, default=2, help="最多加密輪數")
+    args = parser.parse_args(argv)
+    
+    cell_cache = None if args.no_cell_cache else CellCache(args.cell_cache)
+    wavelengths, iso_values = make_grid(args.n_wavelengths, args.n_isos)
+    extra_metadata = {'grid': 'uniform'}
+    if args.refine:
+        print(f"自適應加密（容差 {args.tolerance}，最多 {args.max_levels} 輪）")
+        wavelengths, iso_values, report = refine_grid(
+            wavelengths, iso_values, tolerance=args.tolerance, max_levels=args.max_levels,
+            workers=args.workers, cell_cache=cell_cache,
+        )
+        extra_metadata = {
+            'grid': 'adaptive',
+            'refine_tolerance': args.tolerance,
+            'max_midpoint_error': report['max_midpoint_error'],
+            'refine_levels': report['levels'],
+        }
+    generate_lookup_table(wavelengths, iso_values, workers=args.workers,
+                          output_path=args.output, checkpoint_path=args.checkpoint,
+                          cell_cache=cell_cache, extra_metadata=extra_metadata)
+
+
 if __name__ == '__main__':
     try:
-        table = generate_lookup_table()
+        main()
         print("\n🎉 Mie 查表生成成功！")
         print("   可繼續 Phase 5.3: 整合到 Phos_0.3.0.py")
     except KeyboardInterrupt:
-        print("\n\n⚠️  用戶中斷，查表生成未完成")
+        print("\n\n⚠️  用戶中斷，查表生成未完成（已完成的格點保存在檢查點，重新執行即續跑）")
     except Exception as e:
         print(f"\n\n❌ 錯誤: {e}")
         import traceback
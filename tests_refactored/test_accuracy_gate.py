@@ -0,0 +1,183 @@
+"""
+精度閘門（tools/accuracy_gate.py）與快速路徑開關測試
+
+測試範圍：
+1. CIEDE2000 實作（Sharma et al. 2005 測試資料）
+2. PSNR / 階段誤差指標
+3. performance_modes 開關
+4. 已註冊快速路徑通過閘門、劣化候選被攔下
+"""
+
+import numpy as np
+import pytest
+
+from color_utils import delta_e_ciede2000, srgb_to_lab
+from modules.performance_modes import fast_path, fast_path_enabled, list_fast_paths, set_fast_path
+from modules.pointwise import POINTWISE_BACKENDS, POINTWISE_FUSED, available_backends
+from tools.accuracy_gate import (
+    GATES,
+    AccuracyGate,
+    Tolerance,
+    check_tolerance,
+    delta_e_bgr,
+    load_corpus,
+    main,
+    psnr,
+    run_gate,
+    select_gates,
+    stage_max_abs,
+)
+
+
+# Sharma, Wu & Dalal (2005) Table 1 節錄
+SHARMA_PAIRS = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 3.1571, -77.2803), (50.0, 0.0, -82.7485), 2.8615),
+    ((50.0, 2.8361, -74.0200), (50.0, 0.0, -82.7485), 3.4412),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+]
+
+
+class TestMetrics:
+    """測試色差與誤差指標"""
+
+    @pytest.mark.parametrize("lab1, lab2, expected", SHARMA_PAIRS)
+    def test_ciede2000_reference_data(self, lab1, lab2, expected):
+        assert float(delta_e_ciede2000(np.array(lab1), np.array(lab2))) == pytest.approx(expected, abs=1e-4)
+        assert float(delta_e_ciede2000(np.array(lab2), np.array(lab1))) == pytest.approx(expected, abs=1e-4)
+
+    def test_ciede2000_vectorised(self):
+        lab1 = np.array([p[0] for p in SHARMA_PAIRS])
+        lab2 = np.array([p[1] for p in SHARMA_PAIRS])
+        np.testing.assert_allclose(delta_e_ciede2000(lab1, lab2), [p[2] for p in SHARMA_PAIRS], atol=1e-4)
+
+    def test_srgb_white_is_l100(self):
+        lab = srgb_to_lab(np.ones((2, 2, 3)))
+        np.testing.assert_allclose(lab[..., 0], 100.0, atol=0.01)
+        np.testing.assert_allclose(lab[..., 1:], 0.0, atol=0.05)
+
+    def test_identical_images(self):
+        image = np.random.default_rng(0).integers(0, 256, (16, 16, 3), dtype=np.uint8)
+        assert psnr(image, image) == float('inf')
+        assert delta_e_bgr(image, image).max() == 0.0
+
+    def test_psnr_single_step(self):
+        a = np.full((8, 8, 3), 100, dtype=np.uint8)
+        # MSE = 1 → PSNR = 20·log10(255)
+        assert psnr(a, a + 1) == pytest.approx(48.1308, abs=1e-3)
+
+    def test_stage_max_abs_skips_none(self):
+        ref = (None, np.zeros(4, np.float32), np.ones(4, np.float32))
+        cand = (None, np.full(4, 0.25, np.float32), np.ones(4, np.float32))
+        assert stage_max_abs(ref, cand) == pytest.approx(0.25)
+
+    def test_check_tolerance(self):
+        metrics = {'psnr': 40.0, 'delta_e_max': 2.0, 'delta_e_mean': 0.05,
+                   'stage': 'x', 'stage_max_abs': 1e-3}
+        assert len(check_tolerance(metrics, Tolerance(stage_max_abs=1e-5))) == 3
+        assert check_tolerance(metrics, Tolerance(psnr_min=30, delta_e_max=3, stage_max_abs=1e-2)) == []
+
+
+class TestPerformanceModes:
+    """測試快速路徑開關"""
+
+    def test_input_lut_registered(self):
+        assert 'input_lut' in list_fast_paths()
+        assert fast_path_enabled('input_lut')
+
+    def test_context_manager_restores(self):
+        with fast_path('input_lut', False):
+            assert not fast_path_enabled('input_lut')
+        assert fast_path_enabled('input_lut')
+
+    def test_unknown_name(self):
+        with pytest.raises(KeyError):
+            fast_path_enabled('no_such_path')
+        with pytest.raises(KeyError):
+            set_fast_path('no_such_path', True)
+
+    def test_every_fast_path_has_gate(self):
+        assert set(list_fast_paths()) <= {gate.fast_path for gate in GATES.values()}
+
+    def test_pointwise_gate_per_backend(self):
+        gates = [GATES[key] for key in select_gates([POINTWISE_FUSED])]
+        for stage in ('tone_mapping', 'reciprocity'):
+            assert sorted(gate.backend for gate in gates if gate.stage == stage) == \
+                sorted(b for b in POINTWISE_BACKENDS if b != 'numpy')
+        assert select_gates([f"{POINTWISE_FUSED}[opencv]"]) == [f"{POINTWISE_FUSED}[opencv]"]
+
+
+class TestGate:
+    """測試閘門判定"""
+
+    @pytest.fixture(scope="class")
+    def corpus(self):
+        corpus = load_corpus()
+        assert len(corpus) >= 1
+        return [(name, image) for name, image in corpus
+                if name in ("blue_sky_scene", "gray_bars", "synthetic_highlights")]
+
+    def test_input_lut_passes(self, corpus):
+        report = run_gate(GATES['input_lut'], corpus, films=["Cinestill800T_MediumPhysics"])
+        assert report['passed'], report['results']
+        assert all(r['stage_max_abs'] <= 1e-5 for r in report['results'])
+
+    def test_stage_only_gate(self, corpus):
+        """full_render=False：僅比較階段輸出，渲染指標為 None"""
+        report = run_gate(GATES['hd_curve_lut'], corpus, films=["HP5Plus400"])
+        assert report['passed'], report['results']
+        assert all(r['psnr'] is None for r in report['results'])
+        assert all(r['stage_max_abs'] <= 5e-4 for r in report['results'])
+
+    def test_degraded_candidate_fails(self, corpus):
+        from modules.optical_core import spectral_response
+
+        def quantised_response(image, film):
+            # 模擬過粗的近似：快速路徑啟用時將響應量化到 1/32
+            responses = spectral_response(image, film)
+            if not fast_path_enabled('input_lut'):
+                return responses
+            return tuple(None if r is None else np.round(r * 32) / 32 for r in responses)
+
+        gate = AccuracyGate('input_lut', 'spectral_response', quantised_response,
+                            Tolerance(stage_max_abs=1e-5))
+        report = run_gate(gate, corpus[:1], films=["Portra400"])
+        assert not report['passed']
+        assert any('spectral_response' in v for v in report['results'][0]['violations'])
+
+    def test_pointwise_backends_compared_with_numpy(self, corpus):
+        for key in select_gates([POINTWISE_FUSED]):
+            gate = GATES[key]
+            report = run_gate(gate, corpus[:1], films=["Portra400"])
+            if gate.backend in available_backends():
+                assert report['passed'] and report['skipped'] is None, report['results']
+                assert len(report['results']) == 1
+            else:
+                assert report['passed'] is None and report['results'] == []
+                assert gate.backend in report['skipped']
+
+    @pytest.mark.parametrize("backend", [b for b in available_backends() if b != 'numpy'])
+    def test_reciprocity_gate_covers_mono(self, corpus, backend):
+        """互易律失效階段在彩色與黑白（(H, W, 1) 單通道）膠片上與 numpy 一致"""
+        gate = GATES[f"{POINTWISE_FUSED}[{backend}]:reciprocity"]
+        report = run_gate(gate, corpus[:1], films=["Portra400", "HP5Plus400"])
+        assert report['passed'], report['results']
+        assert [r['film'] for r in report['results']] == ["Portra400", "HP5Plus400"]
+
+    def test_missing_backend_is_skipped_not_passed(self, corpus, monkeypatch, capsys):
+        import tools.accuracy_gate as accuracy_gate
+
+        monkeypatch.setattr(accuracy_gate, "available_backends", lambda: ('numpy',))
+        report = run_gate(GATES[f"{POINTWISE_FUSED}[numba]"], corpus)
+        assert report['passed'] is None and "numba" in report['skipped']
+
+        assert main(['--fast-path', POINTWISE_FUSED, '--films', 'Portra400', '--no-synthetic']) == 0
+        out = capsys.readouterr().out
+        assert out.count("略過") == len(select_gates([POINTWISE_FUSED]))
+        assert "✅ 通過" not in out
+
+    def test_cli_exit_code(self, capsys):
+        assert main(['--fast-path', 'input_lut', '--films', 'Portra400', '--no-synthetic']) == 0
+        assert "✅ 通過" in capsys.readouterr().out
@@ -0,0 +1,146 @@
+"""
+數據資產包（asset_pack.py）測試
+
+測試範圍：
+1. 建構與載入：陣列與 npz 完全相同、唯讀、64 位元組對齊
+2. 退回機制：資產包不存在 / 格式不符 / 來源已更新
+3. 路徑解析與工作目錄無關
+4. 既有載入函數結果不變
+"""
+
+import shutil
+import warnings
+
+import numpy as np
+import pytest
+
+import asset_pack
+from asset_pack import (
+    ASSET_SOURCES,
+    DATA_DIR,
+    AssetPack,
+    build_asset_pack,
+    get_asset_pack,
+    load_asset,
+    resolve_data_path,
+)
+
+
+@pytest.fixture
+def data_copy(tmp_path):
+    """複製 npz 至暫存目錄並在其中建構資產包"""
+    for name in ASSET_SOURCES:
+        shutil.copy2(DATA_DIR / f"{name}.npz", tmp_path / f"{name}.npz")
+    pack_path = tmp_path / "phos_assets.pack"
+    build_asset_pack(pack_path, tmp_path)
+    yield tmp_path, pack_path
+    get_asset_pack.cache_clear()
+
+
+def _npz_arrays(path):
+    with np.load(path, allow_pickle=True) as data:
+        return {k: data[k] for k in data.files if not data[k].dtype.hasobject}
+
+
+class TestBuildAndLoad:
+    """測試建構與載入"""
+
+    @pytest.mark.parametrize("name", ASSET_SOURCES)
+    def test_arrays_match_npz(self, data_copy, name):
+        data_dir, pack_path = data_copy
+        arrays = AssetPack(pack_path).arrays(name)
+        expected = _npz_arrays(data_dir / f"{name}.npz")
+
+        assert set(arrays) == set(expected)
+        for key, array in expected.items():
+            assert arrays[key].dtype == array.dtype
+            np.testing.assert_array_equal(arrays[key], array)
+
+    def test_views_are_readonly_and_aligned(self, data_copy):
+        _, pack_path = data_copy
+        for array in AssetPack(pack_path).arrays('cie_1931_31points').values():
+            assert not array.flags.writeable
+            assert array.ctypes.data % 64 == 0
+            with pytest.raises(ValueError):
+                array[0] = 0
+
+    def test_object_arrays_skipped(self, data_copy):
+        _, pack_path = data_copy
+        pack = AssetPack(pack_path)
+        assert pack.manifest['assets']['mie_lookup_table_v3']['skipped'] == ['metadata']
+        assert len(pack.version) == 16
+
+    def test_load_asset_prefers_pack(self, data_copy):
+        data_dir, pack_path = data_copy
+        arrays = load_asset('smits_basis_spectra', data_dir / "smits_basis_spectra.npz", pack_path)
+        assert not arrays['white'].flags.writeable
+
+    def test_unknown_asset(self, data_copy):
+        _, pack_path = data_copy
+        with pytest.raises(KeyError, match="資產包中沒有"):
+            AssetPack(pack_path).arrays('nonexistent')
+
+
+class TestFallback:
+    """測試退回直接讀取 npz"""
+
+    def test_missing_pack(self, tmp_path):
+        arrays = load_asset('cie_1931_31points', pack_path=tmp_path / "missing.pack")
+        assert arrays['x_bar'].flags.writeable
+        assert arrays['x_bar'].shape == (31,)
+
+    def test_bad_magic_warns(self, tmp_path):
+        bad = tmp_path / "bad.pack"
+        bad.write_bytes(b"NOTAPACK" + b"\0" * 64)
+        with pytest.raises(ValueError, match="不是 Phos 資產包"):
+            AssetPack(bad)
+        with pytest.warns(UserWarning, match="無法開啟資產包"):
+            arrays = load_asset('cie_1931_31points', pack_path=bad)
+        assert arrays['y_bar'].shape == (31,)
+        get_asset_pack.cache_clear()
+
+    def test_stale_source_warns_once(self, data_copy):
+        data_dir, pack_path = data_copy
+        source = data_dir / "cie_1931_31points.npz"
+        with np.load(source) as data:
+            updated = {k: data[k] for k in data.files}
+        updated['x_bar'] = updated['x_bar'] * 2
+        np.savez(source, **updated)
+
+        with pytest.warns(UserWarning, match="已過期"):
+            arrays = load_asset('cie_1931_31points', source, pack_path)
+        np.testing.assert_array_equal(arrays['x_bar'], updated['x_bar'])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            load_asset('cie_1931_31points', source, pack_path)
+
+    def test_other_source_path_not_served_from_pack(self, data_copy, tmp_path_factory):
+        _, pack_path = data_copy
+        other = tmp_path_factory.mktemp("other") / "mie_lookup_table_v3.npz"
+        np.savez(other, wavelengths=np.arange(3.0))
+        arrays = load_asset('mie_lookup_table_v3', other, pack_path)
+        assert set(arrays) == {'wavelengths'}
+
+    def test_missing_npz_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_asset('x', tmp_path / "x.npz", pack_path=tmp_path / "missing.pack")
+
+
+class TestPaths:
+    """測試路徑解析與既有載入函數"""
+
+    def test_resolve_from_other_cwd(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        resolved = resolve_data_path("data/mie_lookup_table_v3.npz")
+        assert resolved == asset_pack.PROJECT_ROOT / "data" / "mie_lookup_table_v3.npz"
+        assert resolve_data_path("data/missing.npz") == asset_pack.Path("data/missing.npz")
+
+    def test_loaders_work_from_other_cwd(self, tmp_path, monkeypatch):
+        import phos_core
+
+        monkeypatch.chdir(tmp_path)
+        basis = phos_core.load_smits_basis()
+        np.testing.assert_array_equal(basis['white'], _npz_arrays(DATA_DIR / "smits_basis_spectra.npz")['white'])
+        assert phos_core.load_cie_1931()['x_bar'].shape == (31,)
+        assert phos_core.load_film_sensitivity('Portra400')['type'] == 'color_negative'
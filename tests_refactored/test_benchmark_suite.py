@@ -0,0 +1,115 @@
+"""
+效能基準測試套件（tools/benchmark_suite.py）測試
+
+測試範圍：
+1. 解析度計算與合成場景
+2. 單一配置的結果格式
+3. compare 退化判定與 CLI 結束碼
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from tools.benchmark_suite import (
+    BENCHMARK_CASES,
+    QUALITY_TIERS,
+    RESOLUTIONS_MP,
+    benchmark_case,
+    compare_reports,
+    main,
+    make_test_scene,
+    resolution_for_megapixels,
+)
+
+
+def _report(total_ms, stages, key="physical/Portra400_MediumPhysics_Mie/1224x816"):
+    return {
+        'metadata': {'schema_version': 2},
+        'benchmarks': [{
+            'key': key,
+            'film_name': "Portra400_MediumPhysics_Mie",
+            'resolution': {'width': 1224, 'height': 816},
+            'stages': {name: {'time_ms': ms, 'std_ms': 0.0} for name, ms in stages.items()},
+            'total_time_ms': total_ms,
+        }],
+    }
+
+
+class TestScene:
+    """測試解析度與合成場景"""
+
+    @pytest.mark.parametrize("megapixels", RESOLUTIONS_MP)
+    def test_resolution_for_megapixels(self, megapixels):
+        width, height = resolution_for_megapixels(megapixels)
+        assert width % 2 == 0 and height % 2 == 0
+        assert abs(width * height / 1e6 - megapixels) / megapixels < 0.01
+        assert width / height == pytest.approx(1.5, rel=0.01)
+
+    def test_scene_is_deterministic(self):
+        a = make_test_scene(240, 160, seed=3)
+        b = make_test_scene(240, 160, seed=3)
+        assert a.shape == (160, 240, 3)
+        assert a.dtype == np.uint8
+        np.testing.assert_array_equal(a, b)
+        assert a.max() >= 250  # 含高光點
+
+    def test_matrix_covers_all_tiers_and_categories(self):
+        assert {c.tier for c in BENCHMARK_CASES} == set(QUALITY_TIERS)
+        assert {'artistic', 'medium_physics', 'mie', 'bw'} <= {c.category for c in BENCHMARK_CASES}
+
+
+class TestBenchmarkCase:
+    """測試單一配置的結果格式"""
+
+    def test_entry_schema(self):
+        case = next(c for c in BENCHMARK_CASES if c.film_name == "Portra400_MediumPhysics_Mie")
+        entry = benchmark_case(case, 0.05, repeat=2, warmup=False)
+
+        assert entry['status'] != "❌ 失敗", entry.get('error')
+        assert entry['key'].startswith("physical/Portra400_MediumPhysics_Mie/")
+        for stage in ("decode", "spectral_response", "grain", "tone_mapping", "encode", "jpeg_encode"):
+            assert stage in entry['stages']
+            assert entry['stages'][stage]['time_ms'] >= 0
+            assert 'std_ms' in entry['stages'][stage]
+        assert entry['total_time_ms'] > 0
+        assert entry['time_per_megapixel_ms'] == pytest.approx(
+            entry['total_time_ms'] / entry['megapixels']
+        )
+
+
+class TestCompare:
+    """測試基準比較"""
+
+    def test_flags_regression_above_threshold(self):
+        baseline = _report(100.0, {'grain': 40.0, 'encode': 10.0})
+        candidate = _report(130.0, {'grain': 70.0, 'encode': 10.5})
+
+        rows = {r['metric']: r for r in compare_reports(baseline, candidate, threshold=0.10)}
+        assert rows['total']['regression']
+        assert rows['grain']['regression']
+        assert not rows['encode']['regression']
+        assert rows['grain']['change'] == pytest.approx(0.75)
+
+    def test_short_stages_ignored(self):
+        baseline = _report(100.0, {'decode': 1.0})
+        candidate = _report(100.0, {'decode': 3.0})
+        rows = {r['metric']: r for r in compare_reports(baseline, candidate, min_time_ms=5.0)}
+        assert not rows['decode']['regression']
+
+    def test_unmatched_entries_skipped(self):
+        baseline = _report(100.0, {}, key="a")
+        candidate = _report(500.0, {}, key="b")
+        assert compare_reports(baseline, candidate) == []
+
+    def test_cli_exit_code(self, tmp_path):
+        base_path = tmp_path / "base.json"
+        new_path = tmp_path / "new.json"
+        base_path.write_text(json.dumps(_report(100.0, {'grain': 50.0})))
+
+        new_path.write_text(json.dumps(_report(102.0, {'grain': 51.0})))
+        assert main(['compare', str(base_path), str(new_path)]) == 0
+
+        new_path.write_text(json.dumps(_report(150.0, {'grain': 90.0})))
+        assert main(['compare', str(base_path), str(new_path), '--threshold', '0.2']) == 1
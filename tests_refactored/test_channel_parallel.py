@@ -0,0 +1,132 @@
+"""
+通道並行執行器測試（phos_core.map_channels / optical_processing(parallel_channels=...)）
+
+測試範圍：
+1. 常駐執行器：跨呼叫重用執行緒、結果順序、例外傳遞
+2. 預設值（PHOS_PARALLEL_CHANNELS）
+3. 彩色膠片並行渲染與循序渲染逐位元一致
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+import phos_core
+from phos_core import (
+    CHANNEL_WORKERS,
+    PerformanceMonitor,
+    get_channel_executor,
+    map_channels,
+    parallel_channel_process,
+    parallel_channels_default,
+)
+from film_models import get_film_profile
+from modules.optical_core import spectral_response
+from Phos import optical_processing
+
+
+@pytest.fixture
+def smooth_image():
+    """平滑漸層圖像（避免隨機雜訊導致自適應 bloom 半徑過小）"""
+    x = np.linspace(0, 255, 160, dtype=np.float32)
+    y = np.linspace(0, 255, 120, dtype=np.float32)
+    xx, yy = np.meshgrid(x, y)
+    return np.stack([xx, yy, (xx + yy) / 2], axis=2).astype(np.uint8)
+
+
+# ==================== 執行器 ====================
+
+class TestChannelExecutor:
+    """測試常駐通道執行器"""
+
+    def test_executor_is_persistent(self):
+        assert get_channel_executor() is get_channel_executor()
+
+    def test_threads_reused_across_calls(self):
+        """多次呼叫只使用執行器的 worker 執行緒（不再每次建立新執行緒池）"""
+        seen = set()
+        for _ in range(5):
+            seen.update(map_channels(lambda _: threading.current_thread().name, range(3), parallel=True))
+        assert all(name.startswith("phos-channel") for name in seen)
+        assert len(seen) <= CHANNEL_WORKERS
+
+    def test_preserves_order(self):
+        assert map_channels(lambda x: x * 2, [3, 1, 2], parallel=True) == [6, 2, 4]
+
+    def test_sequential_runs_in_caller_thread(self):
+        caller = threading.current_thread().name
+        names = map_channels(lambda _: threading.current_thread().name, range(3), parallel=False)
+        assert names == [caller] * 3
+
+    def test_worker_exception_propagates(self):
+        def fail_on_green(channel):
+            if channel == "g":
+                raise ValueError("green failed")
+            return channel
+
+        with pytest.raises(ValueError, match="green failed"):
+            map_channels(fail_on_green, "rgb", parallel=True)
+
+    def test_parallel_channel_process(self):
+        data = [np.full((4, 4), v, dtype=np.float32) for v in (1.0, 2.0, 3.0)]
+        result = parallel_channel_process(np.multiply, *data, 2.0)
+        assert [float(r[0, 0]) for r in result] == [2.0, 4.0, 6.0]
+        assert parallel_channel_process(np.multiply, None, data[1], data[2], 2.0) == (None, None, None)
+
+    def test_fork_reset(self):
+        executor = get_channel_executor()
+        try:
+            phos_core._reset_channel_executor()
+            assert get_channel_executor() is not executor
+        finally:
+            phos_core._channel_executor = executor
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, True), ("1", True), ("true", True), ("0", False), ("off", False), ("False", False),
+    ])
+    def test_default_from_env(self, monkeypatch, value, expected):
+        if value is None:
+            monkeypatch.delenv("PHOS_PARALLEL_CHANNELS", raising=False)
+        else:
+            monkeypatch.setenv("PHOS_PARALLEL_CHANNELS", value)
+        assert parallel_channels_default() is expected
+
+
+# ==================== optical_processing ====================
+
+class TestParallelRender:
+    """測試並行通道渲染與循序渲染一致"""
+
+    @pytest.mark.parametrize("film_name", [
+        "Portra400", "Cinestill800T_MediumPhysics", "Portra400_MediumPhysics_Mie", "Velvia50",
+    ])
+    @pytest.mark.parametrize("tone_style", ["filmic", "reinhard"])
+    def test_bit_identical(self, smooth_image, film_name, tone_style):
+        film = get_film_profile(film_name)
+        responses = spectral_response(smooth_image, film)
+
+        outputs = []
+        for parallel in (False, True):
+            np.random.seed(0)
+            outputs.append(optical_processing(*responses, film, "默認", tone_style,
+                                              parallel_channels=parallel))
+        np.testing.assert_array_equal(outputs[0], outputs[1])
+
+    def test_profiled_channel_stages(self, smooth_image):
+        """並行模式下通道鏈階段巢狀於 channels，且記錄於 worker 執行緒"""
+        film = get_film_profile("Portra400")
+        responses = spectral_response(smooth_image, film)
+
+        with PerformanceMonitor(track_memory=False) as monitor:
+            optical_processing(*responses, film, "默認", "filmic", profiler=monitor,
+                               parallel_channels=True)
+
+        stages = monitor.to_dict()['stages']
+        channels = [s for s in stages if s['name'] == "channels"]
+        nested = [s for s in stages if s.get('parent') == "channels"]
+        assert len(channels) == 1 and 'parent' not in channels[0]
+        assert {s['name'] for s in nested} >= {"halation_r", "halation_g", "halation_b",
+                                               "combine", "tone_mapping"}
+        assert sum(s['name'] == "combine" for s in nested) == 3
+        assert channels[0]['tid'] not in {s['tid'] for s in nested}
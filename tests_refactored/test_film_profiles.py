@@ -61,7 +61,13 @@ from film_models import (
     create_film_profile_from_iso,
     PhysicsMode,
     GrainParams,
-    BloomParams
+    BloomParams,
+    FILM_CATALOG,
+    get_film_info,
+    list_film_names,
+    compile_film_specs,
+    load_film_specs,
+    build_film_profile,
 )
 
 
@@ -961,5 +967,167 @@ class TestConsistencyWithExisting:
         assert film.bloom_params.scattering_ratio < 0.10
 
 
+# ============================================================
+# Section 4: Lazy Film Registry Tests
+# ============================================================
+
+class TestLazyRegistry:
+    """測試延遲建構的胶片註冊表與元數據索引"""
+    
+    def test_import_builds_no_profiles(self):
+        """導入 film_models 不應建構任何胶片"""
+        import subprocess
+        code = "import film_models; print(len(film_models._FILM_PROFILE_CACHE))"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "0"
+    
+    def test_get_film_profile_memoised(self):
+        """同名請求返回同一實例"""
+        assert get_film_profile("Portra400") is get_film_profile("Portra400")
+        assert FILM_PROFILES["Portra400"] is get_film_profile("Portra400")
+        assert create_film_profiles()["Portra400"] is get_film_profile("Portra400")
+    
+    def test_mie_variant_shares_base_layers(self):
+        """_Mie 變體繼承基礎胶片的層參數"""
+        base = get_film_profile("NC200")
+        mie = get_film_profile("NC200_Mie")
+        assert mie.red_layer == base.red_layer
+        assert mie.bloom_params == base.bloom_params
+        assert mie.wavelength_bloom_params.use_mie_lookup
+    
+    def test_catalog_covers_all_films(self):
+        """元數據索引涵蓋所有胶片，順序一致"""
+        assert list(FILM_CATALOG) == list_film_names() == list(FILM_PROFILES)
+    
+    @pytest.mark.parametrize("film_name", list(FILM_CATALOG))
+    def test_catalog_matches_profile(self, film_name):
+        """元數據索引與 FilmProfile 欄位一致"""
+        info = get_film_info(film_name)
+        film = get_film_profile(film_name)
+        assert info.name == film.name
+        assert info.display_name == film.display_name
+        assert info.brand == film.brand
+        assert info.film_type == film.film_type
+        assert info.iso_rating == film.iso_rating
+        assert info.color_type == film.color_type
+        assert info.description == film.description
+        assert list(info.features) == film.features
+        assert info.best_for == film.best_for
+    
+    def test_invalid_film_info(self):
+        """無效胶片名稱"""
+        with pytest.raises(ValueError, match="未知的胶片類型"):
+            get_film_info("INVALID_FILM")
+        assert "INVALID_FILM" not in FILM_PROFILES
+        with pytest.raises(KeyError):
+            FILM_PROFILES["INVALID_FILM"]
+
+
+class TestFilmDataFiles:
+    """測試胶片數據檔編譯、繼承與編譯快取"""
+    
+    BASE = """
+name = "Base100"
+color_type = "single"
+sensitivity_factor = 1.1
+display_name = "Base 100"
+
+[bw_hd_curve]
+contrast = "low"
+
+[panchromatic_layer]
+r_response_weight = 0.3
+g_response_weight = 0.4
+b_response_weight = 0.3
+diffuse_weight = 1.0
+direct_weight = 1.0
+response_curve = 1.2
+grain_intensity = 0.1
+
+[tone_params]
+gamma = 2.0
+shoulder_strength = 0.15
+linear_strength = 0.50
+linear_angle = 0.25
+toe_strength = 0.35
+toe_numerator = 0.02
+toe_denominator = 0.35
+
+[reciprocity_params]
+p_mono = 0.8
+"""
+    
+    @staticmethod
+    def _write(directory, name, text):
+        directory.mkdir(exist_ok=True)
+        (directory / f"{name}.toml").write_text(text, encoding="utf-8")
+    
+    def test_inheritance_and_reset(self, tmp_path):
+        """extends 逐參數覆蓋表格，reset 回到預設值"""
+        self._write(tmp_path, "Base100", self.BASE)
+        self._write(tmp_path, "Child100", """
+extends = "Base100"
+reset = ["reciprocity_params"]
+name = "Child100"
+
+[panchromatic_layer]
+grain_intensity = 0.3
+""")
+        specs = compile_film_specs(tmp_path)
+        child = build_film_profile(specs["Child100"])
+        base = build_film_profile(specs["Base100"])
+        
+        assert child.display_name == "Base 100"
+        assert child.panchromatic_layer.grain_intensity == 0.3
+        assert child.panchromatic_layer.response_curve == 1.2
+        assert child.hd_curve_params == base.hd_curve_params
+        assert base.reciprocity_params.p_mono == 0.8
+        assert child.reciprocity_params.p_mono != 0.8
+        assert "extends" not in specs["Child100"]
+    
+    @pytest.mark.parametrize("text, message", [
+        ('name = "Bad"\nunknown_key = 1\n', "未知欄位"),
+        ('name = "Bad"\n[tone_params]\ngama = 2.0\n', "未知參數"),
+        ('name = "Other"\n', "必須與檔名相同"),
+        ('name = "Bad"\nextends = "Missing"\n', "不存在"),
+        ('name = "Bad"\nextends = "Bad"\n', "循環繼承"),
+    ])
+    def test_invalid_files(self, tmp_path, text, message):
+        """數據檔錯誤以 ValueError 回報"""
+        self._write(tmp_path, "Bad", text)
+        with pytest.raises(ValueError, match=message):
+            compile_film_specs(tmp_path)
+    
+    def test_cache_keyed_by_file_hash(self, tmp_path):
+        """編譯快取以數據檔雜湊為鍵，變更後重新編譯"""
+        data_dir, cache_dir = tmp_path / "films", tmp_path / "cache"
+        self._write(data_dir, "Base100", self.BASE)
+        
+        first = load_film_specs(data_dir, cache_dir)
+        cache_files = list(cache_dir.glob("film_specs_*.pickle"))
+        assert len(cache_files) == 1
+        assert load_film_specs(data_dir, cache_dir) == first
+        
+        self._write(data_dir, "Base100", self.BASE.replace("sensitivity_factor = 1.1", "sensitivity_factor = 1.4"))
+        updated = load_film_specs(data_dir, cache_dir)
+        assert updated["Base100"]["sensitivity_factor"] == 1.4
+        assert list(cache_dir.glob("film_specs_*.pickle")) != cache_files
+        assert len(list(cache_dir.glob("film_specs_*.pickle"))) == 1
+    
+    def test_unwritable_cache_warns(self, tmp_path):
+        """快取目錄不可寫入時仍可載入"""
+        data_dir = tmp_path / "films"
+        self._write(data_dir, "Base100", self.BASE)
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("")
+        with pytest.warns(UserWarning, match="無法寫入胶片編譯快取"):
+            specs = load_film_specs(data_dir, blocker / "cache")
+        assert "Base100" in specs
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
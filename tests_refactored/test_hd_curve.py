@@ -0,0 +1,116 @@
+"""
+測試 modules.hd_curve 模組（H&D 曲線查表）
+
+測試範圍：
+    1. 查表結果與精確計算一致（含 toe / shoulder 折點與精確尾段）
+    2. 依參數快取
+    3. apply_hd_curve / apply_hd_curve_lut 的快速路徑開關
+"""
+
+import pytest
+import numpy as np
+
+from film_models import HDCurveParams, create_bw_hd_curve_params
+from modules.hd_curve import (
+    HD_LUT_LOG_RANGE,
+    apply_hd_curve_lut,
+    get_hd_curve_lut,
+    hd_curve_transmittance,
+)
+from modules.image_processing import apply_hd_curve
+from modules.performance_modes import fast_path
+
+
+def _exact(exposure, hd_params):
+    return hd_curve_transmittance(np.log10(np.clip(exposure, 1e-10, None)), hd_params)
+
+
+HD_PARAMS = [
+    HDCurveParams(enabled=True),
+    HDCurveParams(enabled=True, use_visual_baseline=False, toe_strength=2.0, D_max=2.5,
+                  shoulder_strength=1.5),
+    HDCurveParams(enabled=True, toe_end=-1.0, toe_strength=0.5, shoulder_start=0.3,
+                  shoulder_strength=1.0),
+    HDCurveParams(enabled=True, gamma=1.8, toe_enabled=False, shoulder_enabled=False),
+]
+
+
+@pytest.fixture
+def exposure_sweep():
+    """0 到 1000 的曝光量（含 0、裁切值與查表上限附近）"""
+    rng = np.random.default_rng(0)
+    sweep = np.concatenate([
+        10.0 ** rng.uniform(-11, 3, 200_000),
+        [0.0, 1e-10, 1.0, 10.0, 10.0 + 1e-6, 1000.0],
+    ])
+    return sweep.astype(np.float32)
+
+
+class TestHDCurveLUT:
+    """測試 H&D 曲線查表"""
+
+    @pytest.mark.parametrize("hd_params", HD_PARAMS)
+    def test_matches_exact(self, exposure_sweep, hd_params):
+        """查表與精確計算的誤差 < 3e-4（透射率）"""
+        result = apply_hd_curve_lut(exposure_sweep, hd_params)
+        exact = _exact(exposure_sweep, hd_params)
+        assert result.dtype == np.float32
+        assert np.abs(result - exact).max() < 3e-4
+
+    def test_float64_input(self, exposure_sweep):
+        exposure = exposure_sweep.astype(np.float64)
+        result = apply_hd_curve_lut(exposure, HD_PARAMS[1])
+        assert result.dtype == np.float64
+        assert np.abs(result - _exact(exposure, HD_PARAMS[1])).max() < 3e-4
+
+    def test_exact_tail(self):
+        """超出查表上限的曝光量以精確公式計算"""
+        exposure = np.array([20.0, 100.0, 1e4], dtype=np.float32)
+        hd_params = HD_PARAMS[2]
+        np.testing.assert_array_equal(apply_hd_curve_lut(exposure, hd_params), _exact(exposure, hd_params))
+
+    def test_knots_exact(self):
+        """取樣點上的值即精確值（含曝光量裁切下限）"""
+        hd_params = HD_PARAMS[0]
+        lut = get_hd_curve_lut(hd_params)
+        exposure = 10.0 ** np.array([HD_LUT_LOG_RANGE[0], 0.0, HD_LUT_LOG_RANGE[1]])
+        np.testing.assert_allclose(apply_hd_curve_lut(exposure, hd_params), _exact(exposure, hd_params),
+                                   atol=1e-12)
+        assert lut.size >= 4096
+
+    def test_cached_per_params(self):
+        a = get_hd_curve_lut(HDCurveParams(enabled=True))
+        assert get_hd_curve_lut(HDCurveParams(enabled=True)) is a
+        assert get_hd_curve_lut(HDCurveParams(enabled=True, gamma=0.7)) is not a
+        assert not a.values[np.float32].flags.writeable
+
+    def test_rejects_non_dataclass(self):
+        with pytest.raises(TypeError):
+            get_hd_curve_lut(object())
+
+
+class TestApplyHDCurveFastPath:
+    """測試 apply_hd_curve 的查表開關"""
+
+    def test_fast_path_off_is_exact(self, exposure_sweep):
+        hd_params = create_bw_hd_curve_params(film_name="HP5Plus400", contrast="normal")
+        with fast_path('hd_curve_lut', False):
+            result = apply_hd_curve(exposure_sweep, hd_params)
+        np.testing.assert_array_equal(result, _exact(exposure_sweep, hd_params))
+
+    def test_fast_path_on_close_to_exact(self, exposure_sweep):
+        hd_params = create_bw_hd_curve_params(film_name="HP5Plus400", contrast="normal")
+        fast = apply_hd_curve(exposure_sweep, hd_params)
+        with fast_path('hd_curve_lut', False):
+            exact = apply_hd_curve(exposure_sweep, hd_params)
+        assert np.abs(fast - exact).max() < 3e-4
+
+    def test_lut_respects_fast_path_switch(self, exposure_sweep):
+        """直接呼叫 apply_hd_curve_lut 時開關同樣有效"""
+        hd_params = HD_PARAMS[1]
+        with fast_path('hd_curve_lut', False):
+            result = apply_hd_curve_lut(exposure_sweep, hd_params)
+        np.testing.assert_array_equal(result, _exact(exposure_sweep, hd_params))
+
+    def test_disabled_returns_input(self, exposure_sweep):
+        assert apply_hd_curve(exposure_sweep, HDCurveParams(enabled=False)) is exposure_sweep
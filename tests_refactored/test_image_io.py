@@ -0,0 +1,228 @@
+"""
+測試 modules.image_io 模組（降解析度 JPEG 解碼）
+
+測試範圍：
+    1. JPEG 檔頭尺寸讀取與解碼倍率選擇
+    2. 降解析度解碼（EXIF 方向、標準化尺寸與全解析度解碼一致）
+    3. 快速路徑關閉 / 不適用時與原流程逐位元相同
+    4. 不複製的輸入來源（mmap 路徑、共享緩衝區）
+    5. 批量處理的解碼（RGB 陣列、路徑輸入）
+"""
+
+import io
+import mmap
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from modules.image_io import (
+    REDUCED_DECODE,
+    decode_image,
+    decode_standardized,
+    image_buffer,
+    image_source_name,
+    jpeg_size,
+    reduced_decode_factor,
+    standardize_decoded,
+)
+from modules.optical_core import standardize
+from modules.performance_modes import fast_path
+from phos_batch import BatchProcessor
+
+
+TARGET = 100
+
+
+def _scene(height=450, width=820, seed=0):
+    """平滑漸層 + 少量雜訊的 BGR uint8 影像"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width, y / height, (x + y) / (width + height)], axis=-1) * 220
+    return np.clip(base + rng.normal(0, 4, base.shape), 0, 255).astype(np.uint8)
+
+
+def _jpeg(image, quality=95):
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return encoded.tobytes()
+
+
+def _jpeg_with_orientation(image, orientation):
+    """以 PIL 寫入 EXIF 方向標籤（0x0112）"""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    Image.fromarray(image[..., ::-1]).save(buffer, "JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class TestJpegHeader:
+    """測試檔頭尺寸讀取與倍率選擇"""
+
+    def test_jpeg_size(self):
+        assert jpeg_size(_jpeg(_scene(450, 820))) == (820, 450)
+
+    def test_jpeg_size_accepts_array(self):
+        data = np.frombuffer(_jpeg(_scene(64, 48)), dtype=np.uint8)
+        assert jpeg_size(data) == (48, 64)
+
+    def test_jpeg_size_skips_exif(self):
+        assert jpeg_size(_jpeg_with_orientation(_scene(64, 96), 6)) == (96, 64)
+
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"not an image",
+        cv2.imencode(".png", np.zeros((8, 8, 3), np.uint8))[1].tobytes(),
+    ])
+    def test_not_jpeg(self, data):
+        assert jpeg_size(data) is None
+
+    def test_truncated_header(self):
+        assert jpeg_size(_jpeg(_scene(64, 64))[:20]) is None
+
+    @pytest.mark.parametrize("width, height, target, expected", [
+        (8000, 6000, 3000, 2),
+        (12000, 12000, 1500, 8),
+        (6000, 4000, 1000, 4),
+        (5464, 8192, 3000, 1),   # 短邊不足兩倍目標
+        (6001, 6001, 3000, 2),   # libjpeg 無條件進位：ceil(6001 / 2) = 3001
+        (2999, 5000, 3000, 1),
+    ])
+    def test_factor(self, width, height, target, expected):
+        assert reduced_decode_factor(width, height, target) == expected
+
+
+class TestReducedDecode:
+    """測試降解析度解碼"""
+
+    def test_decodes_reduced(self):
+        image, size = decode_image(_jpeg(_scene(450, 820)), TARGET)
+        assert image.shape == (113, 205, 3)  # 1/4：ceil(450 / 4), ceil(820 / 4)
+        assert size == (820, 450)
+
+    def test_full_resolution_without_target(self):
+        image, size = decode_image(_jpeg(_scene(450, 820)))
+        assert image.shape == (450, 820, 3)
+        assert size == (820, 450)
+
+    def test_fast_path_disabled(self):
+        data = _jpeg(_scene(450, 820))
+        with fast_path(REDUCED_DECODE, False):
+            image, size = decode_image(data, TARGET)
+        np.testing.assert_array_equal(image, cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR))
+        assert size == (820, 450)
+
+    @pytest.mark.parametrize("orientation", [1, 3, 6, 8])
+    def test_exif_orientation(self, orientation):
+        """方向旋轉 90° 時原始尺寸隨之互換，與全解析度解碼的方向一致"""
+        data = _jpeg_with_orientation(_scene(450, 820), orientation)
+        full = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        image, size = decode_image(data, TARGET)
+        assert size == (full.shape[1], full.shape[0])
+        assert image.shape[0] / image.shape[1] == pytest.approx(full.shape[0] / full.shape[1], rel=0.01)
+
+    @pytest.mark.parametrize("shape", [(450, 820), (820, 450), (403, 403), (611, 1003)])
+    def test_standardized_size_matches_full_decode(self, shape):
+        data = _jpeg(_scene(*shape))
+        with fast_path(REDUCED_DECODE, False):
+            reference, full = decode_standardized(data, TARGET)
+        result, decoded = decode_standardized(data, TARGET)
+        assert decoded.shape[0] < full.shape[0]
+        assert result.shape == reference.shape
+        assert min(result.shape[:2]) == TARGET
+        assert np.abs(result.astype(np.float64) - reference).mean() < 2.0
+
+    def test_small_image_matches_standardize(self):
+        """無法降解析度時與 cv2.imdecode + standardize() 逐位元相同"""
+        data = _jpeg(_scene(300, 420))
+        result, decoded = decode_standardized(data)
+        expected = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        np.testing.assert_array_equal(decoded, expected)
+        np.testing.assert_array_equal(result, standardize(expected))
+
+    def test_standardize_decoded_matches_standardize(self):
+        image = _scene(450, 820)
+        np.testing.assert_array_equal(standardize_decoded(image, (820, 450)), standardize(image))
+
+    def test_invalid_data(self):
+        with pytest.raises(ValueError, match="無法讀取圖像"):
+            decode_image(b"\xff\xd8 broken", TARGET)
+
+
+class TestImageBuffer:
+    """測試不複製的輸入來源"""
+
+    def test_path_is_memory_mapped(self, tmp_path):
+        data = _jpeg(_scene(64, 96))
+        path = tmp_path / "scene.jpg"
+        path.write_bytes(data)
+        for source in (path, str(path)):
+            with image_buffer(source) as buffer:
+                assert isinstance(buffer.base.obj, mmap.mmap)
+                assert buffer.tobytes() == data
+                image, size = decode_image(buffer)
+            assert size == (96, 64)
+
+    def test_bytes_io_shares_buffer(self):
+        f = io.BytesIO(_jpeg(_scene(64, 96)))
+        with image_buffer(f) as buffer:
+            assert buffer.tobytes() == f.getvalue()
+            with pytest.raises(BufferError):  # 緩衝區被視圖共用，無法調整大小
+                f.truncate(0)
+
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, lambda d: np.frombuffer(d, np.uint8)])
+    def test_bytes_like(self, wrap):
+        data = _jpeg(_scene(64, 96))
+        with image_buffer(wrap(data)) as buffer:
+            assert buffer.tobytes() == data
+
+    def test_reader_without_buffer(self):
+        class Reader:
+            def __init__(self, data):
+                self.data = data
+
+            def read(self):
+                return self.data
+
+        data = _jpeg(_scene(64, 96))
+        with image_buffer(Reader(data)) as buffer:
+            assert buffer.tobytes() == data
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.jpg"
+        path.write_bytes(b"")
+        with image_buffer(path) as buffer, pytest.raises(ValueError, match="無法讀取圖像"):
+            decode_image(buffer)
+
+    def test_source_name(self, tmp_path):
+        f = io.BytesIO(b"")
+        f.name = "upload.jpg"
+        assert image_source_name(f) == "upload.jpg"
+        assert image_source_name(tmp_path / "a" / "b.png") == "b.png"
+        assert image_source_name(b"...") == "image"
+
+
+class TestBatchDecode:
+    """測試批量處理的解碼"""
+
+    def test_process_func_receives_rgb(self):
+        image = _scene(64, 96)
+        ok, encoded = cv2.imencode(".png", image)
+        f = io.BytesIO(encoded.tobytes())
+        f.name = "scene.png"
+
+        result = BatchProcessor().process_single_image(f, None, lambda array, film, settings: array, {})
+        assert result.success
+        np.testing.assert_array_equal(result.image_data, image[..., ::-1])
+
+    def test_path_input(self, tmp_path):
+        image = _scene(64, 96)
+        path = tmp_path / "scene.png"
+        cv2.imwrite(str(path), image)
+
+        result = BatchProcessor().process_single_image(path, None, lambda array, film, settings: array, {})
+        assert result.success
+        assert result.filename == "scene.png"
+        np.testing.assert_array_equal(result.image_data, image[..., ::-1])
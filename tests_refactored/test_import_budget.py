@@ -0,0 +1,65 @@
+"""
+導入時間預算（tools/import_budget.py）測試
+
+測試範圍：
+1. -X importtime 輸出解析與預算檢查
+2. 核心模組導入不拉入 streamlit / PIL / scipy，且在時間預算內
+"""
+
+import pytest
+
+from tools.import_budget import (
+    IMPORT_BUDGETS,
+    ImportBudget,
+    check_import_budget,
+    measure_import,
+    parse_importtime,
+)
+
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |      90000 | numpy
+import time:       500 |        500 |     streamlit.version
+import time:      3000 |     300000 |   streamlit
+import time:      1000 |     400000 | phos_core
+"""
+
+
+class TestParsing:
+    """測試輸出解析與預算檢查"""
+
+    def test_parse_importtime(self):
+        entries = parse_importtime(SAMPLE)
+        assert entries[0] == ('_io', 120, 120)
+        assert entries[-1] == ('phos_core', 1000, 400000)
+        assert len(entries) == 5
+
+    def test_check_budget(self):
+        entries = parse_importtime(SAMPLE)
+        report = {
+            'module': 'phos_core',
+            'cumulative_ms': 400.0,
+            'loaded': sorted(name for name, _, _ in entries),
+        }
+        violations = check_import_budget(report, ImportBudget(cumulative_ms=350.0))
+        assert len(violations) == 2
+        assert any('streamlit' in v for v in violations)
+        assert check_import_budget(report, ImportBudget(cumulative_ms=500.0, forbidden=())) == []
+
+
+class TestCoreImports:
+    """實際量測核心模組導入"""
+
+    @pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+    def test_within_budget(self, module):
+        report = measure_import(module, runs=3)
+        assert check_import_budget(report, IMPORT_BUDGETS[module]) == []
+
+    def test_ui_session_value_without_streamlit(self, monkeypatch):
+        import sys
+        from phos_core import _ui_session_value
+
+        monkeypatch.delitem(sys.modules, 'streamlit', raising=False)
+        assert _ui_session_value("film_illuminant", "default") == "default"
@@ -0,0 +1,101 @@
+"""
+峰值記憶體量測工具（tools/memory_harness.py）測試
+
+測試範圍：
+1. RSS 取樣與逐階段歸因
+2. 預算檢查
+3. 實際渲染的記憶體預算（13.5 MP 為 slow）
+
+預算以 2026-10 量測值（Mie 彩色 13.5 MP 追蹤峰值約 1.34 GB）留約 50% 餘裕。
+"""
+
+import numpy as np
+import pytest
+
+from tools.memory_harness import (
+    MB,
+    RSSSampler,
+    assert_memory_budget,
+    attribute_memory,
+    check_memory_budget,
+    measure_render,
+)
+
+
+def _profile():
+    return {
+        'stages': [
+            {'name': 'grain', 'wall_ms': 10.0, 'cpu_ms': 10.0, 'start_us': 1000.0,
+             'allocated_bytes': 100 * MB, 'retained_bytes': 40 * MB, 'peak_traced_bytes': 300 * MB},
+            {'name': 'encode', 'wall_ms': 5.0, 'cpu_ms': 5.0, 'start_us': 11000.0,
+             'allocated_bytes': 20 * MB, 'retained_bytes': 10 * MB, 'peak_traced_bytes': 200 * MB},
+        ]
+    }
+
+
+class TestAttribution:
+    """測試 RSS 取樣與階段歸因"""
+
+    def test_rss_sampler_collects_samples(self):
+        with RSSSampler(interval=0.001) as sampler:
+            data = np.ones((1024, 1024, 8), dtype=np.float32)
+            data += 1
+        assert len(sampler.samples) >= 2
+        assert sampler.peak_bytes >= sampler.baseline_bytes
+
+    def test_samples_attributed_by_timestamp(self):
+        samples = [(500.0, 100 * MB), (5000.0, 400 * MB), (12000.0, 250 * MB), (20000.0, 150 * MB)]
+        report = attribute_memory(_profile(), samples)
+
+        assert report['stages']['grain']['rss_peak_mb'] == pytest.approx(400)
+        assert report['stages']['encode']['rss_peak_mb'] == pytest.approx(250)
+        assert report['peak_rss_mb'] == pytest.approx(400)
+        assert report['rss_baseline_mb'] == pytest.approx(100)
+        assert report['peak_traced_mb'] == pytest.approx(300)
+        assert report['peak_stage'] == 'grain'
+
+    def test_without_rss_samples(self):
+        report = attribute_memory(_profile())
+        assert report['peak_rss_mb'] is None
+        assert report['stages']['grain']['rss_peak_mb'] is None
+
+
+class TestBudget:
+    """測試預算檢查"""
+
+    def test_within_budget(self):
+        report = attribute_memory(_profile())
+        report.update({'film_name': 'X', 'tier': 'physical', 'megapixels': 1.0})
+        assert check_memory_budget(report, peak_mb=400, stages={'grain': 150}) == []
+        assert_memory_budget(report, peak_mb=400)
+
+    def test_violations_reported(self):
+        report = attribute_memory(_profile())
+        report.update({'film_name': 'X', 'tier': 'physical', 'megapixels': 1.0})
+
+        violations = check_memory_budget(report, peak_mb=250, stages={'grain': 50, 'film_spectra': 10})
+        assert len(violations) == 3
+        assert any('grain' in v for v in violations)
+        assert any('film_spectra' in v and '未執行' in v for v in violations)
+
+        with pytest.raises(AssertionError, match="記憶體預算超出"):
+            assert_memory_budget(report, peak_mb=250)
+
+
+class TestRenderBudgets:
+    """實際渲染的記憶體預算"""
+
+    def test_mie_colour_render_1mp(self):
+        report = measure_render("Portra400_MediumPhysics_Mie", 1.0)
+        assert report['peak_stage'] is not None
+        assert_memory_budget(report, peak_mb=160, stages={'grain': 70, 'wavelength_bloom': 45})
+
+    def test_spectral_render_1mp(self):
+        report = measure_render("Portra400", 1.0, tier="spectral")
+        assert 'film_spectra' in report['stages']
+        assert_memory_budget(report, peak_mb=600, stages={'film_spectra': 500})
+
+    @pytest.mark.slow
+    def test_mie_colour_render_13_5mp(self):
+        report = measure_render("Portra400_MediumPhysics_Mie", 13.5)
+        assert_memory_budget(report, peak_mb=2000)
@@ -0,0 +1,160 @@
+"""
+Mie 查表生成腳本（scripts/generate_mie_lookup.py）測試
+
+測試範圍：
+1. 相位函數記憶化與原逐粒徑累加結果一致
+2. 加密網格的粒徑分布插值
+3. 檢查點續跑只計算缺少的格點
+4. 行程池與單行程結果完全相同
+
+需要 miepython（離線生成依賴），未安裝時跳過。
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("miepython")
+
+from scripts import generate_mie_lookup as gen
+
+
+class TestPhysics:
+    """測試記憶化與插值"""
+
+    def test_memoised_phase_matches_direct_sum(self):
+        wavelength, iso = 466.0, 400
+        phase = gen.compute_polydisperse_phase(wavelength, iso, gen.ANGLES_DEG)
+
+        # 原實作：逐粒徑呼叫 Mie 並累加
+        params = gen.PARTICLE_DISTRIBUTIONS[iso]
+        dist = gen.lognorm(s=params['std'] / params['mean'], scale=params['mean'])
+        diameters = np.linspace(0.3, 4.0, gen.N_DIAMETER_SAMPLES)
+        weights = dist.pdf(diameters)
+        weights = weights / (np.sum(weights) + 1e-10)
+        expected = np.zeros_like(gen.ANGLES_DEG)
+        for d, w in zip(diameters, weights):
+            expected += w * gen.compute_mie_phase_function(wavelength, d, gen.ANGLES_DEG)
+        theta = np.deg2rad(gen.ANGLES_DEG)
+        expected /= gen._trapezoid(expected * np.sin(theta), theta) + 1e-10
+
+        np.testing.assert_allclose(phase, expected, rtol=1e-12)
+
+    def test_phase_matrix_shared_across_isos(self):
+        gen._phase_matrix.cache_clear()
+        for iso in (100, 400, 1600):
+            gen.compute_polydisperse_phase(500.0, iso, gen.ANGLES_DEG)
+        info = gen._phase_matrix.cache_info()
+        assert info.misses == 1 and info.hits == 2
+
+    def test_particle_distribution_interpolation(self):
+        assert gen.particle_distribution(400) == gen.PARTICLE_DISTRIBUTIONS[400]
+        mid = gen.particle_distribution(450)
+        assert gen.PARTICLE_DISTRIBUTIONS[400]['mean'] < mid['mean'] < gen.PARTICLE_DISTRIBUTIONS[500]['mean']
+        assert gen.particle_distribution(10) == pytest.approx(gen.PARTICLE_DISTRIBUTIONS[50])
+
+
+class TestGeneration:
+    """測試檢查點與並行"""
+
+    WAVELENGTHS = (450.0, 650.0)
+    ISOS = (100, 400)
+
+    def test_checkpoint_resume(self, tmp_path, monkeypatch):
+        output = tmp_path / "mie.npz"
+        checkpoint = tmp_path / "mie.checkpoint.json"
+        full = gen.generate_lookup_table(self.WAVELENGTHS, self.ISOS, workers=1, output_path=None)
+
+        # 模擬中斷：檢查點只有第一個波長列
+        cells = {
+            gen.cell_key(450.0, iso): {f: float(full[f][0, j]) if f != 'rmse' else 0.0 for f in gen.CELL_FIELDS}
+            for j, iso in enumerate(self.ISOS)
+        }
+        gen.save_checkpoint(checkpoint, gen.physics_fingerprint(), cells)
+
+        calls = []
+        original = gen.compute_row
+        monkeypatch.setattr(gen, 'compute_row', lambda wl, isos: calls.append(wl) or original(wl, isos))
+
+        table = gen.generate_lookup_table(self.WAVELENGTHS, self.ISOS, workers=1,
+                                          output_path=output, checkpoint_path=checkpoint)
+        assert calls == [650.0]
+        assert not checkpoint.exists()
+        for field in ('sigma', 'kappa', 'rho', 'eta'):
+            np.testing.assert_array_equal(table[field], full[field])
+        with np.load(output, allow_pickle=True) as saved:
+            np.testing.assert_array_equal(saved['sigma'], full['sigma'])
+
+    def test_checkpoint_ignored_when_settings_differ(self, tmp_path):
+        checkpoint = tmp_path / "cp.json"
+        checkpoint.write_text(json.dumps({'fingerprint': 'other', 'cells': {'x': {}}}))
+        assert gen.load_checkpoint(checkpoint, gen.physics_fingerprint()) == {}
+
+    def test_process_pool_matches_serial(self):
+        serial = gen.generate_lookup_table(self.WAVELENGTHS, self.ISOS, workers=1, output_path=None)
+        parallel = gen.generate_lookup_table(self.WAVELENGTHS, self.ISOS, workers=2, output_path=None)
+        for field in ('sigma', 'kappa', 'rho', 'eta'):
+            np.testing.assert_array_equal(parallel[field], serial[field])
+
+    def test_make_grid(self):
+        wavelengths, isos = gen.make_grid(40, 60)
+        assert len(wavelengths) == 40 and wavelengths[0] == 400 and wavelengths[-1] == 700
+        assert isos[0] == 50 and isos[-1] == 6400 and np.all(np.diff(isos) > 0)
+        assert list(gen.make_grid()[1]) == gen.ISO_VALUES
+
+
+class TestAdaptiveRefinement:
+    """測試自適應加密與格點快取（以解析格點函數取代 Mie 計算）"""
+
+    @staticmethod
+    def analytic_cell(wavelength_nm, iso):
+        # σ 線性（插值無誤差）；η 在 550nm 有窄峰
+        return {
+            'sigma': 10.0 + wavelength_nm / 100.0,
+            'kappa': 30.0,
+            'rho': 0.9,
+            'eta': 1.0 + np.exp(-((wavelength_nm - 550.0) / 12.0) ** 2),
+            'rmse': 0.0,
+        }
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = []
+
+        def cell(wavelength_nm, iso):
+            calls.append((wavelength_nm, iso))
+            return self.analytic_cell(wavelength_nm, iso)
+
+        monkeypatch.setattr(gen, 'compute_cell', cell)
+        return calls
+
+    def test_refines_only_where_needed(self, calls, tmp_path):
+        wavelengths, isos, report = gen.refine_grid(
+            np.linspace(400, 700, 7), [100, 400, 1600], tolerance=0.01, max_levels=6,
+            workers=1, cell_cache=gen.CellCache(tmp_path),
+        )
+        assert list(isos) == [100, 400, 1600]
+        added = np.setdiff1d(wavelengths, np.linspace(400, 700, 7))
+        assert len(added) > 0
+        assert np.all(np.abs(added - 550) < 100)
+        assert report['max_midpoint_error'] <= 0.01
+        assert np.all(np.diff(wavelengths) > 0)
+
+    def test_cell_cache_prevents_recomputation(self, calls, tmp_path):
+        cache = gen.CellCache(tmp_path)
+        gen.refine_grid(np.linspace(400, 700, 7), [100, 400], tolerance=0.01, max_levels=3,
+                        workers=1, cell_cache=cache)
+        first = len(calls)
+        assert first == len(set(calls))
+
+        calls.clear()
+        gen.refine_grid(np.linspace(400, 700, 7), [100, 400], tolerance=0.01, max_levels=3,
+                        workers=1, cell_cache=cache)
+        assert calls == []
+
+    def test_cache_keyed_by_settings(self, tmp_path):
+        cell = self.analytic_cell(500.0, 400)
+        gen.CellCache(tmp_path, fingerprint='a').put(500.0, 400, cell)
+        assert gen.CellCache(tmp_path, fingerprint='a').get(500.0, 400) == cell
+        assert gen.CellCache(tmp_path, fingerprint='b').get(500.0, 400) is None
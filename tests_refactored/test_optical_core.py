@@ -135,6 +135,44 @@ class TestSpectralResponse:
         # 純黑應該產生接近 0.0 的響應
         assert response_total.max() < 0.01
 
+    @pytest.mark.parametrize("film_name", ["Portra400", "Cinestill800T_Mie", "HP5Plus400"])
+    def test_lut_matrix_path_matches_per_channel_reference(self, film_name):
+        """查表 + 矩陣路徑應與逐通道浮點解碼 + 純量乘加一致"""
+        from modules.optical_core import srgb_to_linear
+
+        image = np.random.randint(0, 256, (64, 96, 3), dtype=np.uint8)
+        film = get_film_profile(film_name)
+
+        b, g, r = cv2.split(image)
+        r_lin, g_lin, b_lin = (srgb_to_linear(c.astype(np.float32) / 255.0) for c in (r, g, b))
+        c = film.get_spectral_response()
+        expected = [
+            c[0] * r_lin + c[1] * g_lin + c[2] * b_lin,
+            c[3] * r_lin + c[4] * g_lin + c[5] * b_lin,
+            c[6] * r_lin + c[7] * g_lin + c[8] * b_lin,
+            c[9] * r_lin + c[10] * g_lin + c[11] * b_lin,
+        ]
+
+        responses = spectral_response(image, film)
+
+        for response, reference in zip(responses, expected):
+            if response is None:
+                continue
+            assert response.dtype == np.float32
+            assert response.flags['C_CONTIGUOUS']
+            np.testing.assert_allclose(response, reference, atol=1e-6)
+
+    def test_uint16_input_matches_uint8(self):
+        """16-bit 輸入（逐像素解碼路徑）應與等值的 8-bit 輸入一致"""
+        image = np.random.randint(0, 256, (32, 32, 3), dtype=np.uint8)
+        film = get_film_profile("Portra400")
+
+        responses_8 = spectral_response(image, film)
+        responses_16 = spectral_response(image.astype(np.uint16) * 257, film)
+
+        for a, b in zip(responses_8, responses_16):
+            np.testing.assert_allclose(a, b, atol=1e-6)
+
 
 class TestAverageResponse:
     """測試 average_response() 函數邏輯"""
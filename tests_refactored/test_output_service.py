@@ -0,0 +1,172 @@
+"""
+輸出編碼服務測試（phos_output.OutputService）
+
+測試範圍：
+1. 每個渲染 ID 只編碼一次，大小 / 顯示 / 下載共用同一份位元組
+2. 編碼在背景執行緒執行，附加 jpeg_encode / preview_encode trace span
+3. 快取上限與錯誤處理
+4. 顯示用預覽與批量縮圖
+"""
+
+import io
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import phos_output
+from phos_batch import BatchProcessor
+from phos_output import (
+    DISPLAY_MAX_SIDE,
+    OUTPUT_JPEG_QUALITY,
+    THUMBNAIL_MAX_SIDE,
+    OutputService,
+    display_image,
+    encode_jpeg,
+    encode_preview,
+    get_output_service,
+    new_render_id,
+)
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur((rng.random((120, 180, 3)) * 255).astype(np.uint8), (0, 0), 2)
+
+
+@pytest.fixture
+def count_encodes(monkeypatch):
+    """記錄 encode_jpeg 的呼叫執行緒"""
+    calls = []
+    original = phos_output.encode_jpeg
+
+    def counting(image, quality=OUTPUT_JPEG_QUALITY):
+        calls.append(threading.current_thread().name)
+        return original(image, quality)
+
+    monkeypatch.setattr(phos_output, "encode_jpeg", counting)
+    return calls
+
+
+class TestOutputService:
+    """測試編碼快取"""
+
+    def test_encodes_once(self, image, count_encodes):
+        service = OutputService()
+        render_id = new_render_id()
+        first = service.submit(render_id, image).result()
+        encodes = len(count_encodes)  # 下載檔 + 預覽
+        assert service.submit(render_id, image).result() is first
+        assert service.get(render_id) is first
+        assert len(count_encodes) == encodes == 2
+
+    def test_encoded_in_background(self, image, count_encodes):
+        service = OutputService()
+        service.get(service.submit("a", image).result().render_id)
+        assert count_encodes[0].startswith("phos-encode")
+
+    def test_output_matches_opencv(self, image):
+        output = OutputService().submit("a", image).result()
+        assert output.data == encode_jpeg(image)
+        assert output.size_kb == pytest.approx(len(output.data) / 1024)
+        assert (output.width, output.height) == (180, 120)
+        assert output.mime == "image/jpeg"
+        decoded = cv2.imdecode(np.frombuffer(output.data, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == image.shape
+        assert np.abs(decoded.astype(int) - image).mean() < 2.0
+
+    def test_trace_span(self, image):
+        events = []
+        OutputService().submit("a", image, events).result()
+        assert [e['name'] for e in events] == ["jpeg_encode", "preview_encode"]
+        assert events[0]['tid'] != threading.get_ident()
+
+    def test_evicts_oldest(self, image):
+        service = OutputService(max_entries=2)
+        for render_id in ("a", "b", "c"):
+            service.submit(render_id, image)
+        assert "a" not in service
+        assert "b" in service and "c" in service
+        assert len(service) == 2
+
+    def test_recent_use_keeps_entry(self, image):
+        service = OutputService(max_entries=2)
+        service.submit("a", image)
+        service.submit("b", image)
+        service.submit("a", image)
+        service.submit("c", image)
+        assert "a" in service and "b" not in service
+
+    def test_unknown_render_id(self):
+        with pytest.raises(KeyError, match="渲染 ID"):
+            OutputService().get("missing")
+
+    def test_encode_failure(self):
+        service = OutputService()
+        service.submit("bad", np.zeros((0, 0, 3), np.uint8))
+        with pytest.raises(ValueError, match="JPEG 編碼失敗"):
+            service.get("bad")
+
+    def test_shared_service(self):
+        assert get_output_service() is get_output_service()
+        assert new_render_id() != new_render_id()
+
+
+def _decode(data: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+class TestPreviews:
+    """測試顯示用預覽與批量縮圖"""
+
+    @pytest.mark.parametrize("shape, expected", [
+        ((3000, 4500, 3), (1067, 1600, 3)),
+        ((4500, 3000, 3), (1600, 1067, 3)),
+        ((120, 180, 3), (120, 180, 3)),  # 小於上限時不放大
+    ])
+    def test_preview_size(self, shape, expected):
+        preview = _decode(encode_preview(np.full(shape, 128, np.uint8)))
+        assert preview.shape == expected
+        assert max(expected[:2]) <= DISPLAY_MAX_SIDE
+
+    def test_display_image(self):
+        large = np.zeros((3000, 4500, 3), np.uint8)
+        small = np.zeros((300, 450, 3), np.uint8)
+        assert display_image(large).shape == (1067, 1600, 3)
+        assert display_image(small) is small
+
+    def test_preview_is_smaller_than_download(self):
+        rng = np.random.default_rng(1)
+        frame = cv2.resize((rng.random((300, 450, 3)) * 255).astype(np.uint8), (3000, 2000),
+                           interpolation=cv2.INTER_CUBIC)
+        assert len(encode_preview(frame)) * 3 < len(encode_jpeg(frame))
+
+    def test_rgb_channels(self, image):
+        bgr = _decode(encode_preview(image[..., ::-1].copy(), channels="RGB"))
+        assert np.abs(bgr.astype(int) - image).mean() < 4.0
+
+    def test_invalid_channels(self, image):
+        with pytest.raises(ValueError, match="通道順序"):
+            encode_preview(image, channels="HSV")
+
+    def test_service_previews(self, image):
+        output = OutputService().submit("a", image, original=image[::-1].copy()).result()
+        assert _decode(output.preview).shape == image.shape
+        assert _decode(output.original_preview).shape == image.shape
+        assert OutputService().submit("b", image).result().original_preview is None
+
+    def test_batch_thumbnail(self):
+        frame = np.zeros((600, 900, 3), np.uint8)
+        frame[..., 0] = 255  # RGB 陣列中的紅色
+        ok, encoded = cv2.imencode(".png", frame)
+        f = io.BytesIO(encoded.tobytes())
+        f.name = "frame.png"
+
+        result = BatchProcessor().process_single_image(
+            f, None, lambda array, film, settings: frame, {}
+        )
+        thumbnail = _decode(result.thumbnail)
+        assert thumbnail.shape == (267, THUMBNAIL_MAX_SIDE, 3)
+        assert thumbnail[..., 2].mean() > 250 and thumbnail[..., 0].mean() < 5  # 與 ZIP 相同為 RGB
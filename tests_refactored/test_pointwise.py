@@ -0,0 +1,200 @@
+"""
+測試 modules.pointwise 模組（逐點運算核心與後端）
+
+測試範圍：
+    1. numpy 參考實作與原逐步運算逐位元相同
+    2. 各可用後端（numba / numexpr / opencv）與參考實作一致（ulp 等級）且 dtype 相同
+    3. 後端選擇、快速路徑開關與選用依賴缺少時的退回
+"""
+
+import warnings
+
+import pytest
+import numpy as np
+
+import modules.pointwise as pw
+from modules.performance_modes import fast_path
+from modules.pointwise import (
+    KERNELS,
+    POINTWISE_FUSED,
+    available_backends,
+    get_pointwise_backend,
+    pointwise,
+    pointwise_backend,
+    set_pointwise_backend,
+)
+
+
+SCALARS = dict(
+    threshold=0.8, eta=0.08, base=0.05, sensitivity=0.7, strength=1.2,
+    weight_min=0.1, weight_max=0.9, w_diffuse=0.4, w_direct=0.6,
+    grain_scale=0.03, grain_total=0.02, scale=0.8,
+    exposure_scale=2.0, a=0.22, b=0.3, cb=0.03, de=0.004, df=0.06, ef=0.2 / 3.0,
+)
+
+
+def _kernel_args(name, dtype=np.float32, shape=(64, 96)):
+    rng = np.random.default_rng(0)
+    kernel = KERNELS[name]
+    kwargs = {key: (rng.random(shape) * 1.4 - 0.2).astype(dtype) for key in kernel.arrays}
+    if 'sign' in kwargs:
+        kwargs['sign'] = rng.choice([-1, 1], shape)
+    kwargs.update({key: SCALARS[key] for key in kernel.scalars})
+    return kwargs
+
+
+# 原逐步運算（重構前各呼叫點的程式碼）
+ORIGINALS = {
+    'scatter_highlights': lambda x, threshold, eta: np.maximum(x - threshold, 0) * eta,
+    'bloom_recombine': lambda x, scattered, bloom: np.clip(x - scattered + bloom, 0, 1),
+    'artistic_weights': lambda x, base, sensitivity: np.clip((base + x ** 2) * sensitivity, 0, 1),
+    'artistic_glow': lambda bloom, weights, strength: (
+        (bloom * weights * strength) / (1.0 + bloom * weights * strength)
+    ),
+    'grain_weighting': lambda noise, sign, x, sensitivity, weight_min, weight_max: (
+        (noise ** 2 - 1.0) / np.sqrt(2.0) * sign
+        * np.clip((0.5 - np.abs(x - 0.5)) * 2, weight_min, weight_max) * sensitivity
+    ),
+    'combine_layers': lambda bloom, lux, w_diffuse, w_direct: bloom * w_diffuse + lux * w_direct,
+    'combine_layers_grain': lambda bloom, lux, grain_r, grain_g, grain_b, w_diffuse, w_direct,
+                                   grain_scale, grain_total: (
+        bloom * w_diffuse + lux * w_direct
+        + (grain_r * grain_scale + grain_g * grain_total + grain_b * grain_total)
+    ),
+    'scale_clip': lambda x, scale: np.clip(x * scale, 0, 1),
+    'scale_clip_channels': lambda x, scale: np.clip(x * scale, 0, 1),
+}
+
+
+def _original_filmic(lux, exposure_scale, a, b, cb, de, df, ef):
+    x = exposure_scale * np.maximum(lux, 0)
+    numerator = x * (a * x + cb) + de
+    denominator = x * (a * x + b) + df
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, (numerator / denominator) - ef, 0)
+
+
+ORIGINALS['filmic_curve'] = _original_filmic
+
+
+class TestReference:
+    """測試 numpy 參考實作"""
+
+    def test_every_kernel_has_original(self):
+        assert set(ORIGINALS) == set(KERNELS)
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @pytest.mark.parametrize("name", sorted(KERNELS))
+    def test_bit_identical_to_original(self, name, dtype):
+        """numpy 後端與原逐步運算逐位元相同（含 dtype）"""
+        kwargs = _kernel_args(name, dtype)
+        with pointwise_backend('numpy'):
+            result = pointwise(name, **kwargs)
+        expected = ORIGINALS[name](**kwargs)
+        assert result.dtype == expected.dtype
+        np.testing.assert_array_equal(result, expected)
+
+    def test_numpy_scalar_promotes(self):
+        """numpy float64 純量與原運算相同地提升結果 dtype（NEP 50）"""
+        x = np.full((4, 4), 0.9, dtype=np.float32)
+        with pointwise_backend('numpy'):
+            assert pointwise('scatter_highlights', x=x, threshold=0.8, eta=0.1).dtype == np.float32
+            assert pointwise('scatter_highlights', x=x, threshold=0.8, eta=np.float64(0.1)).dtype == np.float64
+
+
+@pytest.mark.parametrize("backend", [b for b in available_backends() if b != 'numpy'])
+class TestBackends:
+    """測試各可用後端與參考實作一致"""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @pytest.mark.parametrize("name", sorted(KERNELS))
+    def test_matches_reference(self, backend, name, dtype):
+        kwargs = _kernel_args(name, dtype)
+        with pointwise_backend('numpy'):
+            expected = pointwise(name, **kwargs)
+        with pointwise_backend(backend):
+            result = pointwise(name, **kwargs)
+        assert result.dtype == expected.dtype
+        assert result.shape == expected.shape
+        atol = 1e-6 if expected.dtype == np.float32 else 1e-7
+        np.testing.assert_allclose(result, expected, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("shape", [(32, 48, 1), (32, 48, 3)])
+    @pytest.mark.parametrize("name", sorted(KERNELS))
+    def test_channel_axis(self, backend, name, shape):
+        """(H, W, 1) / (H, W, 3) 輸入保留形狀，純量作用於所有通道"""
+        kwargs = _kernel_args(name, np.float32, shape)
+        with pointwise_backend('numpy'):
+            expected = pointwise(name, **kwargs)
+        with pointwise_backend(backend):
+            result = pointwise(name, **kwargs)
+        assert result.shape == expected.shape == shape
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-6)
+
+    def test_noncontiguous_input(self, backend):
+        """非連續視圖（如 (H, W, 3) 的單一通道）"""
+        rng = np.random.default_rng(1)
+        image = rng.random((32, 48, 3)).astype(np.float32)
+        with pointwise_backend('numpy'):
+            expected = pointwise('scale_clip', x=image[:, :, 1], scale=1.3)
+        with pointwise_backend(backend):
+            result = pointwise('scale_clip', x=image[:, :, 1], scale=1.3)
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-6)
+
+    def test_channel_scales_broadcast(self, backend):
+        """(H, W, 3) 與 (1, 1, 3) 逐通道係數的整幅運算"""
+        image = np.random.default_rng(2).random((32, 48, 3)).astype(np.float32) * 1.2
+        scales = np.array([0.8, 1.1, 1.4], dtype=np.float32).reshape(1, 1, 3)
+        with pointwise_backend(backend):
+            result = pointwise('scale_clip_channels', x=image, scale=scales)
+        assert result.shape == image.shape
+        np.testing.assert_allclose(result, np.clip(image * scales, 0, 1), rtol=0, atol=1e-6)
+
+
+class TestBackendSelection:
+    """測試後端選擇"""
+
+    def test_fast_path_off_uses_numpy(self):
+        with fast_path(POINTWISE_FUSED, False):
+            assert get_pointwise_backend() == 'numpy'
+
+    def test_auto_selection(self):
+        """auto 僅選擇無 JIT / 非融合成本的後端"""
+        with pointwise_backend('auto'), fast_path(POINTWISE_FUSED, True):
+            backend = get_pointwise_backend()
+        expected = 'numexpr' if 'numexpr' in available_backends() else 'numpy'
+        assert backend == expected
+
+    def test_context_manager_restores(self):
+        previous = set_pointwise_backend('numpy')
+        try:
+            with pointwise_backend('opencv'):
+                assert pw._selected == 'opencv'
+            assert pw._selected == 'numpy'
+        finally:
+            set_pointwise_backend(previous)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="未知的逐點運算後端"):
+            set_pointwise_backend('cuda')
+
+    def test_missing_dependency_falls_back(self, monkeypatch):
+        """選用依賴未安裝時警告一次並退回 numpy"""
+        monkeypatch.setattr(pw, 'available_backends', lambda: ('numpy',))
+        monkeypatch.setattr(pw, '_warned', set())
+        kwargs = _kernel_args('artistic_weights')
+        with pointwise_backend('numexpr'), fast_path(POINTWISE_FUSED, True):
+            with pytest.warns(UserWarning, match="numexpr 不可用"):
+                result = pointwise('artistic_weights', **kwargs)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                pointwise('artistic_weights', **kwargs)
+        np.testing.assert_array_equal(result, ORIGINALS['artistic_weights'](**kwargs))
+
+    def test_unknown_kernel(self):
+        with pytest.raises(KeyError, match="未註冊的逐點核心"):
+            pointwise('nonexistent', x=np.zeros(3))
+
+    def test_wrong_arguments(self):
+        with pytest.raises(TypeError, match="scale_clip"):
+            pointwise('scale_clip', x=np.zeros(3))
@@ -19,6 +19,9 @@ from modules.psf_utils import (
     create_dual_kernel_psf,
     load_mie_lookup_table,
     lookup_mie_params,
+    lookup_mie_params_batch,
+    get_mie_psf_bank,
+    clear_mie_caches,
     convolve_fft,
     convolve_adaptive,
     get_gaussian_kernel,
@@ -117,6 +120,84 @@ class TestMieLookupTable:
         # assert sigma_min <= sigma_max
 
 
+class TestMieCaching:
+    """測試依路徑快取、向量化插值與 PSF 快取"""
+    
+    V2 = "data/mie_lookup_table_v2.npz"
+    V3 = "data/mie_lookup_table_v3.npz"
+    
+    def test_tables_cached_per_path(self):
+        """不同路徑各自快取，同一路徑返回同一物件"""
+        v2 = load_mie_lookup_table(self.V2)
+        v3 = load_mie_lookup_table(self.V3)
+        
+        assert load_mie_lookup_table(self.V3) is v3
+        assert not np.array_equal(v2['sigma'], v3['sigma'])
+        with pytest.raises(FileNotFoundError, match="Mie 查表檔案不存在"):
+            load_mie_lookup_table("nonexistent_file.npz")
+    
+    def test_cache_independent_of_cwd(self, tmp_path, monkeypatch):
+        """相對路徑以專案根目錄解析"""
+        table = load_mie_lookup_table(self.V3)
+        monkeypatch.chdir(tmp_path)
+        assert load_mie_lookup_table(self.V3) is table
+    
+    def test_batch_matches_scalar(self):
+        """向量化插值與逐點插值完全相同"""
+        table = load_mie_lookup_table(self.V3)
+        wavelengths = np.array([400.0, 450.0, 533.3, 650.0, 720.0])[:, None]
+        isos = np.array([25, 100, 555, 6400, 12800])[None, :]
+        
+        params = lookup_mie_params_batch(wavelengths, isos, table)
+        assert params['sigma'].shape == (5, 5)
+        for i, wl in enumerate(wavelengths[:, 0]):
+            for j, iso in enumerate(isos[0]):
+                expected = lookup_mie_params(float(wl), int(iso), table)
+                actual = tuple(params[k][i, j] for k in ('sigma', 'kappa', 'rho', 'eta'))
+                assert actual == expected
+    
+    def test_non_uniform_axes(self):
+        """非等距（自適應加密）查表：雙線性函數在格內精確重建"""
+        wavelengths = np.array([400.0, 450.0, 460.0, 475.0, 700.0])
+        iso_values = np.array([50, 100, 112, 400, 6400])
+        wl_grid, iso_grid = np.meshgrid(wavelengths, iso_values, indexing='ij')
+        table = {
+            'wavelengths': wavelengths,
+            'iso_values': iso_values,
+            'sigma': 2.0 * wl_grid + 0.01 * iso_grid,
+            'kappa': 3.0 * wl_grid,
+            'rho': np.full(wl_grid.shape, 0.8),
+            'eta': 1.0 + 0.001 * iso_grid,
+        }
+        queries_wl = np.array([405.0, 455.0, 467.5, 600.0])
+        queries_iso = np.array([75, 106, 300, 5000])
+        params = lookup_mie_params_batch(queries_wl, queries_iso, table)
+        np.testing.assert_allclose(params['sigma'], 2.0 * queries_wl + 0.01 * queries_iso, rtol=1e-9)
+        np.testing.assert_allclose(params['eta'], 1.0 + 0.001 * queries_iso, rtol=1e-9)
+    
+    def test_psf_bank_memoised_and_readonly(self):
+        """PSF 只建構一次，且與直接建構完全相同"""
+        clear_mie_caches()
+        bank = get_mie_psf_bank(self.V3, 400, (650.0, 550.0, 450.0))
+        assert get_mie_psf_bank(self.V3, 400, [650, 550, 450]) is bank
+        
+        table = load_mie_lookup_table(self.V3)
+        sigma, kappa, rho, eta = lookup_mie_params(450.0, 400, table)
+        assert bank.eta[2] == eta
+        assert bank.radius == int(max(bank.sigma) * 4)
+        np.testing.assert_array_equal(
+            bank.psfs[2], create_dual_kernel_psf(sigma, kappa, rho, radius=bank.radius)
+        )
+        assert not bank.psfs[0].flags.writeable
+        assert not bank.sigma.flags.writeable
+    
+    def test_psf_bank_keyed_by_iso_and_path(self):
+        """不同 ISO / 查表使用不同 PSF"""
+        a = get_mie_psf_bank(self.V3, 400, (650, 550, 450))
+        assert get_mie_psf_bank(self.V3, 1600, (650, 550, 450)) is not a
+        assert get_mie_psf_bank(self.V2, 400, (650, 550, 450)) is not a
+
+
 # ==================== 測試 PSF 核生成 ====================
 
 class TestPSFGeneration:
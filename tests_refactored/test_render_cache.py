@@ -0,0 +1,268 @@
+"""
+渲染快取測試（phos_cache）
+
+測試範圍：
+1. 快取鍵涵蓋輸入位元組、胶片配置、設定、種子與引擎狀態
+2. 磁碟存取往返、容量上限與 LRU 移除
+3. 損毀項目、停用與環境變數設定
+4. 單張處理流程：未固定種子時不重用快取與編碼結果
+"""
+
+import importlib
+import os
+import pickle
+import time
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+
+import phos_cache
+from film_models import PhysicsMode, get_film_profile
+from modules.image_io import image_buffer
+from phos_cache import (
+    RENDER_CACHE_DIR_ENV,
+    RENDER_CACHE_MB_ENV,
+    CachedRender,
+    RenderCache,
+    engine_fingerprint,
+    film_fingerprint,
+    get_render_cache,
+    input_digest,
+    render_key,
+)
+from phos_output import EncodedOutput, OutputService
+
+
+SETTINGS = {'tone_style': 'filmic', 'physics_params': {'physics_mode': PhysicsMode.PHYSICAL, 'grain_size': 1.5}}
+
+
+@pytest.fixture
+def film():
+    return get_film_profile("Portra400")
+
+
+def _key(data=b"image", film=None, settings=SETTINGS, seed=None):
+    return render_key(input_digest(data), film or get_film_profile("Portra400"), settings, seed)
+
+
+def _entry(key, payload_size=1000):
+    output = EncodedOutput(render_id=key, data=os.urandom(payload_size), width=4, height=3, preview=b"p")
+    return CachedRender(output, original_size=(40, 30), process_time=1.5)
+
+
+class TestRenderKey:
+    """測試快取鍵"""
+
+    def test_deterministic(self, film):
+        assert _key(film=film) == _key(film=get_film_profile("Portra400"))
+        assert len(_key()) == 64
+
+    def test_input_bytes(self):
+        assert _key(b"image") != _key(b"image2")
+
+    def test_digest_accepts_buffer_views(self, tmp_path):
+        path = tmp_path / "input.jpg"
+        path.write_bytes(b"\xff\xd8 some jpeg bytes")
+        with image_buffer(path) as buffer:
+            assert input_digest(buffer) == input_digest(path.read_bytes())
+
+    def test_film_profile(self, film):
+        tuned = replace(film, grain_params=replace(film.grain_params, intensity=film.grain_params.intensity + 0.1))
+        assert film_fingerprint(tuned) != film_fingerprint(film)
+        assert _key(film=tuned) != _key(film=film)
+        assert _key(film=get_film_profile("Velvia50")) != _key(film=film)
+
+    def test_settings(self):
+        changed = {**SETTINGS, 'physics_params': {**SETTINGS['physics_params'], 'grain_size': 2.0}}
+        assert _key(settings=changed) != _key()
+        reordered = dict(reversed(list(SETTINGS.items())))
+        assert _key(settings=reordered) == _key()
+
+    def test_seed(self):
+        assert _key(seed=1) != _key(seed=2)
+        assert _key(seed=None) != _key(seed=0)
+
+    def test_engine_state(self):
+        # 依目前載入的註冊表切換（test_modules_structure 會重新載入 modules.*）
+        performance_modes = importlib.import_module("modules.performance_modes")
+        name = next(iter(performance_modes.list_fast_paths()))
+        with performance_modes.fast_path(name, False):
+            disabled = engine_fingerprint()
+            key = _key()
+        assert disabled != engine_fingerprint()
+        assert key != _key()
+
+
+class TestRenderCache:
+    """測試磁碟快取"""
+
+    def test_roundtrip(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        key = _key()
+        entry = _entry(key)
+        assert cache.get(key) is None
+        assert cache.put(key, entry)
+        assert key in cache
+        assert cache.get(key) == entry
+        assert RenderCache(tmp_path).get(key) == entry  # 其他行程 / 重新啟動
+
+    def test_render_id_must_match_key(self, tmp_path):
+        with pytest.raises(ValueError, match="render_id"):
+            RenderCache(tmp_path).put(_key(), _entry(_key(b"other")))
+
+    def test_rejects_non_hex_key(self, tmp_path):
+        with pytest.raises(ValueError, match="十六進位"):
+            RenderCache(tmp_path).get("../escape")
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        keys = [_key(bytes([i])) for i in range(3)]
+        entry_size = len(pickle.dumps(_entry(keys[0]), protocol=pickle.HIGHEST_PROTOCOL))
+        cache = RenderCache(tmp_path, max_bytes=3 * entry_size)
+        for i, key in enumerate(keys):
+            cache.put(key, _entry(key))
+            os.utime(tmp_path / f"{key}.render", ns=(i * 10**9, i * 10**9))
+        assert len(cache) == 3
+
+        assert cache.get(keys[0]) is not None  # 讀取更新最近使用時間
+        new_key = _key(b"new")
+        cache.put(new_key, _entry(new_key))
+
+        assert keys[0] in cache and new_key in cache
+        assert keys[1] not in cache
+        assert cache.size_bytes() <= 3 * entry_size
+
+    def test_entry_larger_than_cap(self, tmp_path):
+        cache = RenderCache(tmp_path, max_bytes=500)
+        key = _key()
+        assert not cache.put(key, _entry(key))
+        assert len(cache) == 0
+
+    def test_corrupt_entry(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        key = _key()
+        (tmp_path / f"{key}.render").write_bytes(b"not a pickle")
+        with pytest.warns(UserWarning, match="損毀"):
+            assert cache.get(key) is None
+        assert key not in cache
+
+    def test_foreign_entry(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        key = _key()
+        (tmp_path / f"{key}.render").write_bytes(pickle.dumps(_entry(_key(b"other"))))
+        with pytest.warns(UserWarning, match="損毀"):
+            assert cache.get(key) is None
+
+    def test_disabled(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache", max_bytes=0)
+        key = _key()
+        assert not cache.enabled
+        assert not cache.put(key, _entry(key))
+        assert cache.get(key) is None
+        assert not (tmp_path / "cache").exists()
+
+    def test_clear(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        for i in range(3):
+            key = _key(bytes([i]))
+            cache.put(key, _entry(key))
+        cache.clear()
+        assert len(cache) == 0 and cache.size_bytes() == 0
+
+    def test_hit_serves_encoded_output(self, tmp_path):
+        """命中時不需圖像陣列：編碼結果直接加入輸出服務"""
+        image = np.full((30, 40, 3), 100, np.uint8)
+        key = _key()
+        service = OutputService()
+        RenderCache(tmp_path).put(key, CachedRender(service.submit(key, image, original=image).result()))
+
+        cached = RenderCache(tmp_path).get(key)
+        fresh = OutputService()
+        fresh.put(cached.output)
+        output = fresh.get(key)
+        assert output.mean == pytest.approx(100) and output.original_mean == pytest.approx(100)
+        decoded = cv2.imdecode(np.frombuffer(output.data, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == image.shape
+
+    def test_lookup_is_fast(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        key = _key()
+        cache.put(key, _entry(key, payload_size=2_000_000))
+        start = time.perf_counter()
+        assert cache.get(key) is not None
+        assert time.perf_counter() - start < 0.1
+
+
+class TestSharedCache:
+    """測試環境變數設定"""
+
+    @pytest.fixture(autouse=True)
+    def reset(self, monkeypatch):
+        monkeypatch.setattr(phos_cache, "_render_cache", None)
+
+    def test_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(RENDER_CACHE_DIR_ENV, str(tmp_path))
+        monkeypatch.setenv(RENDER_CACHE_MB_ENV, "2")
+        cache = get_render_cache()
+        assert cache is get_render_cache()
+        assert cache.directory == tmp_path
+        assert cache.max_bytes == 2 * 1024 * 1024
+
+    def test_disable_with_zero(self, monkeypatch):
+        monkeypatch.setenv(RENDER_CACHE_MB_ENV, "0")
+        assert not get_render_cache().enabled
+
+    def test_invalid_size(self, monkeypatch):
+        monkeypatch.setenv(RENDER_CACHE_MB_ENV, "lots")
+        with pytest.raises(ValueError, match=RENDER_CACHE_MB_ENV):
+            get_render_cache()
+
+
+
+class TestSingleImageFlow:
+    """測試 Streamlit 單張處理流程（Phos.render_uploaded_image）與快取的互動"""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, tmp_path, monkeypatch):
+        import Phos
+
+        def fake_process_image(uploaded_image, film_type, grain_style, tone_style, physics_params=None,
+                               profiler=None, seed=None, **kwargs):
+            # 與管線相同：顆粒取自 numpy 全域亂數，指定 seed 時可重現
+            if seed is not None:
+                np.random.seed(seed)
+            image = np.random.randint(0, 256, (30, 40, 3), dtype=np.uint8)
+            return image, 0.1, "out.jpg", image, (40, 30)
+
+        monkeypatch.setattr(Phos, "process_image", fake_process_image)
+        cache = RenderCache(tmp_path)
+        monkeypatch.setattr(phos_cache, "_render_cache", cache)
+        return cache
+
+    @staticmethod
+    def _render(**kwargs):
+        from Phos import render_uploaded_image
+        from phos_output import get_output_service
+
+        render_id = render_uploaded_image(b"photo bytes", "Portra400", "默認", "filmic", None,
+                                          PhysicsMode.PHYSICAL, **kwargs)
+        return render_id, get_output_service().get(render_id).data
+
+    def test_unseeded_renders_are_not_reused(self, cache):
+        first_id, first = self._render()
+        second_id, second = self._render()
+        assert first_id != second_id
+        assert first != second
+        assert len(cache) == 0
+
+    def test_seeded_render_is_cached(self, cache):
+        first_id, first = self._render(seed=7)
+        second_id, second = self._render(seed=7)
+        assert first_id == second_id and first == second
+        assert len(cache) == 1
+
+    def test_profiled_render_gets_new_output(self, cache):
+        cached_id, _ = self._render(seed=7)
+        profiled_id, _ = self._render(seed=7, profile_stages=True)
+        assert profiled_id != cached_id
@@ -0,0 +1,284 @@
+"""
+本機渲染服務測試（phos_service）
+
+以替代的渲染函數（解碼 + 編碼，不執行完整管線）測試服務行為：
+1. 去重（相同輸入與設定為同一工作）與渲染快取命中
+2. 佇列上限（429 / Retry-After）與失敗處理
+3. HTTP 端點（提交 / 狀態 / 結果 / 錯誤碼）
+4. 行程池 worker 的階段進度回報
+"""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import phos_cache
+from modules.image_io import decode_image
+from phos_cache import CachedRender, RenderCache
+from phos_output import encode_output
+from phos_service import (
+    JobStatus,
+    QueueFullError,
+    RenderServer,
+    RenderService,
+    job_monitor,
+)
+from tools.service_load_test import http_request, run_load_test
+
+
+_gate = threading.Event()  # 清除時 fake_render 阻塞（模擬長時間渲染；worker 行程中恆為設定）
+_gate.set()
+
+
+def fake_render(job_id, data, film_type, settings, seed):
+    """替代的渲染函數：解碼後直接編碼，回報 decode / jpeg_encode 階段"""
+    with job_monitor(job_id) as monitor:
+        with monitor.stage("decode"):
+            image, size = decode_image(data)
+        _gate.wait(timeout=30)
+        with monitor.stage("jpeg_encode"):
+            output = encode_output(job_id, image)
+    return CachedRender(output, size, 0.01)
+
+
+def _jpeg(seed=0):
+    rng = np.random.default_rng(seed)
+    return cv2.imencode(".jpg", (rng.random((24, 32, 3)) * 255).astype(np.uint8))[1].tobytes()
+
+
+@pytest.fixture(autouse=True)
+def render_cache(tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path / "renders")
+    monkeypatch.setattr(phos_cache, "_render_cache", cache)
+    _gate.set()
+    yield cache
+    _gate.set()
+
+
+def _service(**kwargs):
+    kwargs.setdefault('executor', ThreadPoolExecutor(max_workers=1))
+    return RenderService(workers=1, render_func=fake_render, **kwargs)
+
+
+class TestRenderService:
+    """測試工作佇列"""
+
+    def test_submit_and_wait(self):
+        async def scenario():
+            async with _service() as service:
+                job, existing = await service.submit(_jpeg(), "Portra400", seed=1)
+                assert not existing and job.status == JobStatus.QUEUED
+                job = await service.wait(job.job_id, timeout=30)
+                return job
+
+        job = asyncio.run(scenario())
+        assert job.status == JobStatus.DONE
+        assert (job.result.output.width, job.result.output.height) == (32, 24)
+        assert job.to_dict()['width'] == 32
+
+    def test_deduplicates_identical_requests(self):
+        async def scenario():
+            async with _service() as service:
+                first, _ = await service.submit(_jpeg(), "Portra400", seed=1)
+                second, existing = await service.submit(_jpeg(), "Portra400", seed=1)
+                other, other_existing = await service.submit(_jpeg(), "Portra400", seed=2)
+                await service.wait(other.job_id, timeout=30)
+                return first, second, existing, other, other_existing
+
+        first, second, existing, other, other_existing = asyncio.run(scenario())
+        assert second is first and existing
+        assert other.job_id != first.job_id and not other_existing
+
+    def test_render_cache_hit(self, render_cache):
+        async def scenario():
+            async with _service() as service:
+                job, _ = await service.submit(_jpeg(), "Portra400", seed=1)
+                await service.wait(job.job_id, timeout=30)
+                render_cache.put(job.job_id, job.result)  # 由其他行程 / 先前執行寫入
+            async with _service() as service:
+                return await service.submit(_jpeg(), "Portra400", seed=1)
+
+        job, existing = asyncio.run(scenario())
+        assert job.status == JobStatus.DONE and job.cached and not existing
+
+    def test_unseeded_requests_are_not_reused(self, render_cache):
+        async def scenario():
+            async with _service() as service:
+                first, _ = await service.submit(_jpeg(), "Portra400")
+                await service.wait(first.job_id, timeout=30)
+                render_cache.put(first.job_id, first.result)
+                second, existing = await service.submit(_jpeg(), "Portra400")
+                await service.wait(second.job_id, timeout=30)
+                return first, second, existing
+
+        first, second, existing = asyncio.run(scenario())
+        assert second.job_id != first.job_id and not existing
+        assert not second.cached and second.status == JobStatus.DONE
+
+    def test_queue_full(self):
+        _gate.clear()
+
+        async def scenario():
+            async with _service(queue_size=1) as service:
+                await service.submit(_jpeg(0), "Portra400")
+                await asyncio.sleep(0.2)  # 第一個工作進入執行
+                await service.submit(_jpeg(1), "Portra400")
+                with pytest.raises(QueueFullError) as info:
+                    await service.submit(_jpeg(2), "Portra400")
+                _gate.set()
+                return info.value
+
+        error = asyncio.run(scenario())
+        assert error.retry_after >= 1
+
+    def test_failed_job_can_be_retried(self):
+        async def scenario():
+            async with _service() as service:
+                job, _ = await service.submit(b"not an image", "Portra400")
+                await service.wait(job.job_id, timeout=30)
+                retry, existing = await service.submit(b"not an image", "Portra400")
+                return job, retry, existing
+
+        job, retry, existing = asyncio.run(scenario())
+        assert job.status == JobStatus.FAILED and "無法讀取圖像" in job.error
+        assert retry is not job and not existing
+
+    @pytest.mark.parametrize("kwargs, message", [
+        ({'grain_style': "粗"}, "顆粒風格"),
+        ({'tone_style': "aces"}, "Tone mapping"),
+        ({'film_type': "Nope"}, "未知的胶片類型"),
+    ])
+    def test_invalid_parameters(self, kwargs, message):
+        async def scenario():
+            async with _service() as service:
+                await service.submit(_jpeg(), **{'film_type': "Portra400", **kwargs})
+
+        with pytest.raises(ValueError, match=message):
+            asyncio.run(scenario())
+
+    def test_finished_jobs_are_bounded(self):
+        async def scenario():
+            async with _service(max_finished=2) as service:
+                jobs = []
+                for seed in range(4):
+                    job, _ = await service.submit(_jpeg(), "Portra400", seed=seed)
+                    jobs.append(await service.wait(job.job_id, timeout=30))
+                return service, jobs
+
+        service, jobs = asyncio.run(scenario())
+        with pytest.raises(KeyError, match="工作 ID"):
+            service.get(jobs[0].job_id)
+        assert service.get(jobs[-1].job_id) is jobs[-1]
+
+
+class TestHTTP:
+    """測試 HTTP 端點"""
+
+    @staticmethod
+    async def _serve(scenario, **kwargs):
+        async with _service(**kwargs) as service:
+            server = await asyncio.start_server(RenderServer(service, max_upload_bytes=1 << 20).handle,
+                                                "127.0.0.1", 0)
+            async with server:
+                host, port = server.sockets[0].getsockname()[:2]
+                return await scenario(host, port)
+
+    def test_submit_status_result(self):
+        async def scenario(host, port):
+            status, headers, body = await http_request(host, port, "POST", "/jobs?film=Portra400&seed=3", _jpeg())
+            job = json.loads(body)
+            assert status == 202 and headers['location'] == f"/jobs/{job['job_id']}"
+            while job['status'] not in ("done", "failed"):
+                await asyncio.sleep(0.05)
+                _, _, body = await http_request(host, port, "GET", f"/jobs/{job['job_id']}")
+                job = json.loads(body)
+            result = await http_request(host, port, "GET", f"/jobs/{job['job_id']}/result")
+            preview = await http_request(host, port, "GET", f"/jobs/{job['job_id']}/result?preview=1")
+            again = await http_request(host, port, "POST", "/jobs?film=Portra400&seed=3", _jpeg())
+            return job, result, preview, again
+
+        job, result, preview, again = asyncio.run(self._serve(scenario))
+        assert job['status'] == "done" and job['seed'] == 3
+        assert result[0] == 200 and result[1]['content-type'] == "image/jpeg"
+        assert cv2.imdecode(np.frombuffer(result[2], np.uint8), cv2.IMREAD_COLOR).shape == (24, 32, 3)
+        assert preview[0] == 200 and preview[2] != result[2]
+        assert again[0] == 200 and json.loads(again[2])['deduplicated']
+
+    def test_backpressure(self):
+        _gate.clear()
+
+        async def scenario(host, port):
+            await http_request(host, port, "POST", "/jobs?film=Portra400", _jpeg(0))
+            await asyncio.sleep(0.2)
+            await http_request(host, port, "POST", "/jobs?film=Portra400", _jpeg(1))
+            rejected = await http_request(host, port, "POST", "/jobs?film=Portra400", _jpeg(2))
+            _, _, health = await http_request(host, port, "GET", "/health")
+            _gate.set()
+            return rejected, json.loads(health)
+
+        (status, headers, body), health = asyncio.run(self._serve(scenario, queue_size=1))
+        assert status == 429 and int(headers['retry-after']) >= 1
+        assert "佇列已滿" in json.loads(body)['error']
+        assert health['queued'] == 1 and health['jobs']['running'] == 1
+
+    def test_result_not_ready(self):
+        _gate.clear()
+
+        async def scenario(host, port):
+            _, _, body = await http_request(host, port, "POST", "/jobs?film=Portra400", _jpeg())
+            response = await http_request(host, port, "GET", f"/jobs/{json.loads(body)['job_id']}/result")
+            _gate.set()
+            return response
+
+        status, _, body = asyncio.run(self._serve(scenario))
+        assert status == 409 and json.loads(body)['status'] in ("queued", "running")
+
+    @pytest.mark.parametrize("method, path, body, expected", [
+        ("POST", "/jobs", b"x", 400),                    # 缺少 film
+        ("POST", "/jobs?film=Portra400", b"", 400),      # 空本體
+        ("POST", "/jobs?film=Portra400&seed=x", b"x", 400),
+        ("GET", "/jobs", b"", 405),
+        ("GET", "/jobs/abc", b"", 404),
+        ("GET", "/unknown", b"", 404),
+        ("POST", "/jobs?film=Portra400", b"x" * ((1 << 20) + 1), 413),
+    ])
+    def test_errors(self, method, path, body, expected):
+        async def scenario(host, port):
+            return await http_request(host, port, method, path, body)
+
+        status, _, payload = asyncio.run(self._serve(scenario))
+        assert status == expected
+        assert json.loads(payload)['error']
+
+    def test_load_test_client(self):
+        async def scenario(host, port):
+            inputs = [_jpeg(0), _jpeg(1)]
+            return await run_load_test(f"http://{host}:{port}", inputs, requests=6, concurrency=6,
+                                       poll_interval=0.05)
+
+        report = asyncio.run(self._serve(scenario, queue_size=1))
+        assert report['completed'] == 6 and report['failed'] == 0
+        assert report['deduplicated'] >= 3  # 6 個請求只有 2 張不同圖像
+        assert report['service']['jobs']['done'] == 2
+
+
+class TestWorkerProgress:
+    """測試行程池 worker 的階段進度"""
+
+    def test_stage_progress_from_process_pool(self):
+        async def scenario():
+            async with RenderService(workers=1, render_func=fake_render) as service:
+                job, _ = await service.submit(_jpeg(), "Portra400")
+                await service.wait(job.job_id, timeout=120)
+                await asyncio.sleep(0.2)  # 進度事件經背景執行緒轉送
+                return job
+
+        job = asyncio.run(scenario())
+        assert job.status == JobStatus.DONE, job.error
+        assert [stage['name'] for stage in job.completed_stages] == ["decode", "jpeg_encode"]
+        assert all(stage['wall_ms'] >= 0 for stage in job.completed_stages)
@@ -0,0 +1,219 @@
+"""
+測試 modules.row_bands 模組（列帶資料並行）
+
+測試範圍：
+    1. 列帶結果與整幅計算逐位元相同（含 dtype、非整除列數、關鍵字參數）
+    2. 管線中的逐點階段（pointwise numpy 後端、H&D 查表、sRGB 解碼、Reinhard）
+    3. worker 數 / serial_row_bands / 與執行緒預算、並行通道的整合
+"""
+
+import importlib
+import threading
+
+import numpy as np
+import pytest
+
+import modules.row_bands as rb
+from modules.row_bands import (
+    MIN_BAND_PIXELS,
+    apply_row_bands,
+    band_rows,
+    get_band_workers,
+    row_banded,
+    serial_row_bands,
+    set_band_workers,
+)
+from modules.pointwise import KERNELS, pointwise, pointwise_backend
+from modules.hd_curve import apply_hd_curve_lut
+from modules.optical_core import srgb_to_linear
+from modules.tone_mapping import apply_reinhard_to_channel
+from film_models import get_film_profile
+
+
+SCALARS = dict(
+    threshold=0.8, eta=0.08, base=0.05, sensitivity=0.7, strength=1.2,
+    weight_min=0.1, weight_max=0.9, w_diffuse=0.4, w_direct=0.6,
+    grain_scale=0.03, grain_total=0.02, scale=0.8,
+    exposure_scale=2.0, a=0.22, b=0.3, cb=0.03, de=0.004, df=0.06, ef=0.2 / 3.0,
+)
+SHAPE = (700, 410)  # 不整除列帶高度、超過 MIN_BAND_PIXELS
+
+
+@pytest.fixture
+def bands():
+    """啟用 4 個列帶 worker，測試後還原"""
+    previous = set_band_workers(4)
+    yield
+    set_band_workers(previous)
+
+
+def _image(shape=SHAPE, dtype=np.float32, seed=0):
+    return (np.random.default_rng(seed).random(shape) * 1.4 - 0.2).astype(dtype)
+
+
+def _direct(func, *args, **kwargs):
+    with serial_row_bands():
+        return func(*args, **kwargs)
+
+
+class TestApplyRowBands:
+    """測試 apply_row_bands"""
+
+    def test_shape_is_banded(self):
+        assert np.prod(SHAPE) >= MIN_BAND_PIXELS
+        assert band_rows(_image()) < SHAPE[0]
+        assert SHAPE[0] % band_rows(_image()) != 0
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_bit_identical(self, bands, dtype):
+        x = _image(dtype=dtype)
+        func = lambda a: np.clip(np.power(np.maximum(a, 0), 1 / 2.2) * 1.3, 0, 1)
+        result = apply_row_bands(func, x)
+        expected = func(x)
+        assert result.dtype == expected.dtype
+        np.testing.assert_array_equal(result, expected)
+
+    def test_keyword_and_unbanded_arguments(self, bands):
+        """同形狀陣列（位置 / 關鍵字）切分，其餘參數原樣傳入"""
+        x, y = _image(seed=1), _image(seed=2)
+        row = np.linspace(0, 1, SHAPE[1], dtype=np.float32)
+        func = lambda a, b, offset, scale=1.0: (a * b + offset) * scale
+        result = apply_row_bands(func, x, b=y, offset=row, scale=np.float32(0.5))
+        np.testing.assert_array_equal(result, func(x, y, row, np.float32(0.5)))
+
+    def test_multichannel(self, bands):
+        image = _image((600, 500, 3))
+        np.testing.assert_array_equal(apply_row_bands(np.sqrt, np.abs(image)), np.sqrt(np.abs(image)))
+
+    def test_bands_run_on_workers(self, bands):
+        names = set()
+
+        def record(a):
+            names.add(threading.current_thread().name)
+            return a + 1
+
+        apply_row_bands(record, _image())
+        assert threading.current_thread().name in names
+        assert any(name.startswith("phos-band") for name in names)
+
+    def test_no_nested_bands_in_workers(self, bands):
+        """列帶 worker 內的逐點函數整幅計算"""
+        inner = row_banded(lambda a: a * 2)
+        calls = []
+
+        def outer(a):
+            calls.append(a.shape[0])
+            return inner(a)
+
+        np.testing.assert_array_equal(apply_row_bands(outer, _image()), _image() * 2)
+        assert sum(calls) == SHAPE[0]
+
+    @pytest.mark.parametrize("shape", [(64, 64), ()])
+    def test_small_or_scalar_runs_directly(self, bands, shape):
+        calls = []
+        x = np.asarray(_image(shape))
+        apply_row_bands(lambda a: calls.append(a.shape) or a, x)
+        assert calls == [shape]
+
+    def test_single_worker_runs_directly(self):
+        previous = set_band_workers(1)
+        try:
+            calls = []
+            apply_row_bands(lambda a: calls.append(a.shape) or a, _image())
+            assert calls == [SHAPE]
+        finally:
+            set_band_workers(previous)
+
+    def test_serial_context(self, bands):
+        calls = []
+        with serial_row_bands():
+            apply_row_bands(lambda a: calls.append(a.shape) or a, _image())
+        assert calls == [SHAPE]
+
+    def test_misaligned_output(self, bands):
+        with pytest.raises(ValueError, match="列帶"):
+            apply_row_bands(lambda a: a.sum(axis=0), _image())
+
+    def test_worker_exception_propagates(self, bands):
+        def fail_late(a):
+            if not getattr(rb._local, 'serial', False):
+                return a
+            raise RuntimeError("band failed")
+
+        with pytest.raises(RuntimeError, match="band failed"):
+            apply_row_bands(fail_late, _image())
+
+    def test_set_band_workers(self):
+        previous = set_band_workers(3)
+        try:
+            assert get_band_workers() == 3
+            assert set_band_workers(0) == 3
+            assert get_band_workers() == 1
+        finally:
+            set_band_workers(previous)
+
+
+class TestPipelineStages:
+    """測試管線逐點階段以列帶執行時結果不變"""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @pytest.mark.parametrize("name", sorted(KERNELS))
+    def test_pointwise_numpy(self, bands, name, dtype):
+        rng = np.random.default_rng(0)
+        kernel = KERNELS[name]
+        kwargs = {key: _image(dtype=dtype, seed=i) for i, key in enumerate(kernel.arrays)}
+        if 'sign' in kwargs:
+            kwargs['sign'] = rng.choice([-1, 1], SHAPE)
+        kwargs.update({key: SCALARS[key] for key in kernel.scalars})
+        with pointwise_backend('numpy'):
+            result = pointwise(name, **kwargs)
+        expected = kernel.reference(**kwargs)
+        assert result.dtype == expected.dtype
+        np.testing.assert_array_equal(result, expected)
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_hd_curve_lut(self, bands, dtype):
+        exposure = np.abs(_image(dtype=dtype)) * 40.0  # 含查表上限外的精確尾段
+        hd_params = get_film_profile("Portra400").hd_curve_params
+        np.testing.assert_array_equal(
+            apply_hd_curve_lut(exposure, hd_params), _direct(apply_hd_curve_lut, exposure, hd_params)
+        )
+
+    def test_srgb_decode(self, bands):
+        image = np.abs(_image((600, 500, 3))) % 1.0
+        np.testing.assert_array_equal(srgb_to_linear(image), _direct(srgb_to_linear, image))
+
+    def test_reinhard(self, bands):
+        lux = np.abs(_image())
+        np.testing.assert_array_equal(
+            apply_reinhard_to_channel(lux, 2.2, color_mode=True),
+            _direct(apply_reinhard_to_channel, lux, 2.2, color_mode=True),
+        )
+
+
+class TestThreadBudgetIntegration:
+    """測試與執行緒預算、並行通道的整合"""
+
+    # phos_core 延遲導入 modules.row_bands；其他測試可能已從 sys.modules 移除並重新載入
+    @staticmethod
+    def _row_bands():
+        return importlib.import_module('modules.row_bands')
+
+    def test_configure_sets_band_workers(self):
+        from phos_core import configure_threads, get_thread_budget
+
+        previous = get_thread_budget()
+        try:
+            plan = configure_threads(5)
+            assert plan.band_workers == 5
+            assert self._row_bands().get_band_workers() == 5
+        finally:
+            configure_threads(previous.budget, previous.role)
+
+    def test_parallel_channels_do_not_band(self):
+        from phos_core import map_channels
+
+        local = self._row_bands()._local
+        flags = map_channels(lambda _: getattr(local, 'serial', False), range(3), parallel=True)
+        assert flags == [True, True, True]
+        assert not getattr(local, 'serial', False)
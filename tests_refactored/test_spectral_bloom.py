@@ -0,0 +1,138 @@
+"""
+測試 modules.spectral_bloom 模組
+
+測試範圍：
+    1. cluster_psfs: PSF 聚類（群集數依容差自動決定）
+    2. 連續光譜 Bloom: 能量守恆、聚類 vs 逐 bin 精確積分、窄帶退化為 RGB 模式
+"""
+
+import pytest
+import numpy as np
+from dataclasses import replace
+
+from film_models import BloomParams, WavelengthBloomParams
+from modules.performance_modes import fast_path
+from modules.psf_utils import create_dual_kernel_psf
+from modules.spectral_bloom import cluster_psfs, get_spectral_bloom_plan
+from modules.wavelength_effects import apply_wavelength_bloom
+
+
+# ==================== Fixtures ====================
+
+@pytest.fixture
+def rgb_image():
+    """RGB 測試圖像（100×100，中心高光點）"""
+    img = np.zeros((100, 100), dtype=np.float32)
+    img[45:55, 45:55] = 1.0
+    return img, img.copy(), img.copy()
+
+
+@pytest.fixture
+def basic_bloom_params():
+    """基礎 Bloom 參數"""
+    return BloomParams(mode="physical", threshold=0.7, scattering_ratio=0.1)
+
+
+@pytest.fixture
+def wavelength_bloom_params():
+    """RGB 模式波長依賴 Bloom 參數"""
+    return WavelengthBloomParams(
+        enabled=True,
+        iso_value=400,
+        mie_lookup_path="data/mie_lookup_table_v3.npz",
+    )
+
+
+# ==================== 測試 PSF 聚類 ====================
+
+class TestPSFClustering:
+    """測試 cluster_psfs（相近 PSF 合併為代表核）"""
+    
+    @staticmethod
+    def _family(sigmas, radius=20):
+        return [create_dual_kernel_psf(s, 2 * s, 0.9, radius=radius) for s in sigmas]
+    
+    def test_identical_psfs_single_cluster(self):
+        """完全相同的 PSF 聚為一群，代表核即原 PSF"""
+        psfs = self._family([4.0] * 5)
+        clusters = cluster_psfs(psfs, tolerance=0.0)
+        assert clusters.n_clusters == 1
+        np.testing.assert_allclose(clusters.kernels[0], psfs[0], atol=1e-7)
+    
+    def test_cluster_count_follows_tolerance(self):
+        """群集數依容差自動決定：容差越小群集越多，且誤差不超過容差"""
+        psfs = self._family(np.linspace(2.0, 6.0, 17))
+        counts = []
+        for tolerance in (0.5, 0.1, 0.02, 0.0):
+            clusters = cluster_psfs(psfs, tolerance=tolerance)
+            assert clusters.max_error <= tolerance + 1e-9
+            counts.append(clusters.n_clusters)
+        assert counts == sorted(counts)
+        assert counts[0] < counts[-1] == 17
+    
+    def test_separated_families_not_merged(self):
+        """寬度差異大的兩組 PSF 不會被合併"""
+        psfs = self._family([2.0, 2.05, 8.0, 8.1])
+        clusters = cluster_psfs(psfs, tolerance=0.05)
+        assert clusters.n_clusters == 2
+        assert clusters.labels[0] == clusters.labels[1] != clusters.labels[2] == clusters.labels[3]
+    
+    def test_kernels_normalized_and_weighted(self):
+        """代表核 ∑=1，且偏向權重較大的成員"""
+        psfs = self._family([3.0, 3.5])
+        clusters = cluster_psfs(psfs, weights=[1.0, 0.0], tolerance=2.0)
+        assert abs(float(clusters.kernels[0].sum()) - 1.0) < 1e-5
+        np.testing.assert_allclose(clusters.kernels[0], psfs[0], atol=1e-7)
+    
+    def test_invalid_inputs(self):
+        with pytest.raises(ValueError):
+            cluster_psfs([])
+        with pytest.raises(ValueError):
+            cluster_psfs(self._family([2.0, 3.0]), weights=[1.0])
+
+
+# ==================== 連續光譜 Bloom ====================
+
+@pytest.fixture
+def spectral_bloom_params():
+    """連續光譜 Bloom 參數"""
+    return WavelengthBloomParams(
+        enabled=True,
+        iso_value=400,
+        mie_lookup_path="data/mie_lookup_table_v3.npz",
+        spectral_mode="spectral",
+    )
+
+
+def test_spectral_bloom_plan_energy_conservation(spectral_bloom_params):
+    """散射移出的能量全部分回 RGB（混合矩陣對群集與接收通道求和 = 移出能量）"""
+    plan = get_spectral_bloom_plan(spectral_bloom_params)
+    assert len(plan.wavelengths) == 31
+    np.testing.assert_allclose(plan.mixing.sum(axis=(0, 1)), plan.removed, rtol=1e-12)
+    assert plan.max_error <= spectral_bloom_params.psf_cluster_tolerance
+    # v3 查表的 σ/κ/ρ 在可見光範圍幾乎不變 → 聚為極少數代表核
+    assert len(plan.kernels) <= 3
+
+
+def test_spectral_bloom_clustered_matches_exact(rgb_image, spectral_bloom_params, basic_bloom_params):
+    """聚類結果與逐 bin 精確積分一致（誤差 ≤ 容差 × 散射能量）"""
+    clustered = apply_wavelength_bloom(*rgb_image, spectral_bloom_params, basic_bloom_params)
+    with fast_path('psf_clustering', False):
+        exact = apply_wavelength_bloom(*rgb_image, spectral_bloom_params, basic_bloom_params)
+    for a, b in zip(clustered, exact):
+        assert np.abs(a - b).max() < 1e-4
+
+
+def test_spectral_bloom_narrow_band_matches_rgb(rgb_image, wavelength_bloom_params, basic_bloom_params):
+    """通道帶寬趨近 0 時，連續光譜模式退化為 RGB 三波長模式"""
+    narrow = replace(wavelength_bloom_params, spectral_mode="spectral", channel_bandwidth_nm=5.0)
+    rgb = apply_wavelength_bloom(*rgb_image, wavelength_bloom_params, basic_bloom_params)
+    spectral = apply_wavelength_bloom(*rgb_image, narrow, basic_bloom_params)
+    for a, b in zip(rgb, spectral):
+        assert np.abs(a - b).max() < 5e-3
+
+
+def test_spectral_mode_validation():
+    """無效的 spectral_mode 應被拒絕"""
+    with pytest.raises(AssertionError, match="spectral_mode"):
+        WavelengthBloomParams(spectral_mode="hyperspectral")
@@ -0,0 +1,302 @@
+"""
+階段剖析器測試（PerformanceMonitor.stage / optical_processing profiler hook）
+
+測試範圍：
+1. PerformanceMonitor 階段記錄（wall / CPU / 記憶體配置）
+2. optical_processing 的階段邊界與輸出不變性
+3. BatchResult.profile 與 UI 表格格式化
+4. Chrome trace_event 匯出
+"""
+
+import io
+import json
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from phos_core import (
+    PerformanceMonitor,
+    profile_stage,
+    trace_events_from_profile,
+    trace_span,
+    write_chrome_trace,
+)
+from phos_batch import BatchProcessor, BatchResult, batch_trace_events, create_zip_archive
+from film_models import get_film_profile
+from modules.optical_core import spectral_response
+from Phos import optical_processing
+from ui_components import format_stage_profile
+
+
+@pytest.fixture
+def smooth_image():
+    """平滑漸層圖像（避免隨機雜訊導致自適應 bloom 半徑過小）"""
+    x = np.linspace(0, 255, 160, dtype=np.float32)
+    y = np.linspace(0, 255, 120, dtype=np.float32)
+    xx, yy = np.meshgrid(x, y)
+    return np.stack([xx, yy, (xx + yy) / 2], axis=2).astype(np.uint8)
+
+
+# ==================== PerformanceMonitor ====================
+
+class TestPerformanceMonitorStages:
+    """測試階段剖析記錄"""
+
+    def test_stage_records_wall_cpu_and_allocation(self):
+        monitor = PerformanceMonitor()
+        with monitor.stage("alloc"):
+            data = np.ones((512, 512), dtype=np.float32)
+        monitor.close()
+
+        report = monitor.to_dict()
+        assert [s['name'] for s in report['stages']] == ["alloc"]
+        stage = report['stages'][0]
+        assert stage['wall_ms'] >= 0
+        assert stage['cpu_ms'] >= 0
+        assert stage['allocated_bytes'] >= data.nbytes
+        assert stage['retained_bytes'] >= data.nbytes
+        assert report['peak_allocated_bytes'] == stage['allocated_bytes']
+
+    def test_monitor_stops_tracemalloc_it_started(self):
+        assert not tracemalloc.is_tracing()
+        with PerformanceMonitor() as monitor:
+            with monitor.stage("noop"):
+                pass
+            assert tracemalloc.is_tracing()
+        assert not tracemalloc.is_tracing()
+
+    def test_track_memory_disabled(self):
+        monitor = PerformanceMonitor(track_memory=False)
+        with monitor.stage("noop"):
+            pass
+        report = monitor.to_dict()
+        assert 'allocated_bytes' not in report['stages'][0]
+        assert report['peak_allocated_bytes'] is None
+        assert not tracemalloc.is_tracing()
+
+    def test_repeated_stage_accumulates_in_timings(self):
+        monitor = PerformanceMonitor(track_memory=False)
+        for _ in range(3):
+            with monitor.stage("repeat"):
+                pass
+        assert len(monitor.stages) == 3
+        assert monitor.timings["repeat"] == pytest.approx(
+            sum(s['wall_ms'] for s in monitor.stages) / 1000.0
+        )
+        assert "repeat" in monitor.get_report()
+
+    def test_nested_stages_from_worker_threads(self):
+        """外層階段開啟期間（含其他執行緒）進入的階段為巢狀：各自記錄記憶體，不計入總計"""
+        monitor = PerformanceMonitor()
+        with monitor.stage("channels"):
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                def work(_):
+                    with monitor.stage("combine"):
+                        return np.ones((256, 256), dtype=np.float32).sum()
+                list(executor.map(work, range(3)))
+        monitor.close()
+
+        report = monitor.to_dict()
+        outer = [s for s in report['stages'] if s['name'] == "channels"]
+        nested = [s for s in report['stages'] if s['name'] == "combine"]
+        assert len(outer) == 1 and len(nested) == 3
+        assert all(s['parent'] == "channels" for s in nested)
+        assert all(s['allocated_bytes'] >= 256 * 256 * 4 for s in nested)
+        assert outer[0]['allocated_bytes'] >= max(s['allocated_bytes'] for s in nested)
+        assert report['total_wall_ms'] == pytest.approx(outer[0]['wall_ms'])
+        assert set(monitor.timings) == {"channels"}
+
+    def test_profile_stage_without_monitor_is_noop(self):
+        with profile_stage(None, "anything"):
+            pass
+
+
+# ==================== optical_processing hook ====================
+
+class TestOpticalProcessingProfiler:
+    """測試 optical_processing 的階段剖析掛鉤"""
+
+    @pytest.mark.parametrize("film_name, expected", [
+        ("Portra400", ["grain", "wavelength_bloom", "halation_r", "halation_g", "halation_b",
+                       "combine", "tone_mapping", "encode"]),
+        ("Cinestill800T_MediumPhysics", ["grain", "wavelength_bloom", "halation_r", "halation_g",
+                                         "halation_b", "combine", "tone_mapping", "encode"]),
+    ])
+    def test_stage_boundaries(self, smooth_image, film_name, expected):
+        film = get_film_profile(film_name)
+        responses = spectral_response(smooth_image, film)
+
+        with PerformanceMonitor() as monitor:
+            optical_processing(*responses, film, "默認", "filmic", profiler=monitor)
+
+        names = [s['name'] for s in monitor.to_dict()['stages']]
+        for name in expected:
+            assert name in names
+        assert names[-1] == "encode"
+
+    def test_profiled_output_matches_unprofiled(self, smooth_image):
+        film = get_film_profile("Portra400")
+        responses = spectral_response(smooth_image, film)
+
+        np.random.seed(0)
+        plain = optical_processing(*responses, film, "默認", "filmic")
+        np.random.seed(0)
+        with PerformanceMonitor() as monitor:
+            profiled = optical_processing(*responses, film, "默認", "filmic", profiler=monitor)
+
+        np.testing.assert_array_equal(plain, profiled)
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_channel_stages_report_memory(self, smooth_image, parallel):
+        """bloom / halation 等通道階段在順序與並行模式下都記錄各自的記憶體配置"""
+        film = get_film_profile("Portra400")
+        responses = spectral_response(smooth_image, film)
+
+        with PerformanceMonitor() as monitor:
+            optical_processing(*responses, film, "默認", "filmic", profiler=monitor,
+                               parallel_channels=parallel)
+
+        stages = monitor.to_dict()['stages']
+        halation = [s for s in stages if s['name'].startswith("halation_")]
+        assert len(halation) == 3
+        assert all(s['allocated_bytes'] > 0 for s in halation)
+        assert next(s for s in stages if s['name'] == "wavelength_bloom")['allocated_bytes'] > 0
+
+        if parallel:
+            assert all(s['parent'] == "channels" for s in halation)
+        else:
+            assert "channels" not in {s['name'] for s in stages}
+            assert all(s.get('parent') is None for s in halation)
+            assert "halation_r" in monitor.timings
+
+
+# ==================== Batch / UI ====================
+
+class TestBatchAndUIProfile:
+    """測試批量結果附加剖析報告與 UI 格式化"""
+
+    @staticmethod
+    def _encoded_file(image: np.ndarray, name: str = "test.png") -> io.BytesIO:
+        ok, buf = cv2.imencode(".png", image)
+        assert ok
+        f = io.BytesIO(buf.tobytes())
+        f.name = name
+        return f
+
+    @staticmethod
+    def _process(image_array, film_profile, settings):
+        with profile_stage(settings.get('profiler'), "work"):
+            return image_array[::-1].copy()
+
+    def test_batch_result_has_profile_when_enabled(self, smooth_image):
+        processor = BatchProcessor(profile_stages=True)
+        result = processor.process_single_image(
+            self._encoded_file(smooth_image), None, self._process, {}
+        )
+        assert result.success
+        assert [s['name'] for s in result.profile['stages']] == ["decode", "work"]
+
+    def test_batch_memory_tracking_is_opt_in(self, smooth_image):
+        timed = BatchProcessor(profile_stages=True).process_single_image(
+            self._encoded_file(smooth_image), None, self._process, {}
+        )
+        assert all('allocated_bytes' not in s for s in timed.profile['stages'])
+
+        traced = BatchProcessor(profile_stages=True, profile_memory=True).process_single_image(
+            self._encoded_file(smooth_image), None, self._process, {}
+        )
+        assert all('allocated_bytes' in s for s in traced.profile['stages'])
+        assert not tracemalloc.is_tracing()
+
+    def test_batch_result_profile_disabled_by_default(self, smooth_image):
+        processor = BatchProcessor()
+        result = processor.process_single_image(
+            self._encoded_file(smooth_image), None, self._process, {}
+        )
+        assert result.success
+        assert result.profile is None
+        assert BatchResult(filename="x", success=False).profile is None
+
+    def test_format_stage_profile(self):
+        monitor = PerformanceMonitor()
+        with monitor.stage("grain"):
+            np.zeros(1024)
+        monitor.close()
+
+        table = format_stage_profile(monitor.to_dict())
+        assert "| grain |" in table
+        assert "總計" in table
+        assert format_stage_profile({'stages': []}) == "無效能數據"
+
+
+# ==================== Chrome trace 匯出 ====================
+
+class TestChromeTrace:
+    """測試 Chrome trace_event 匯出"""
+
+    def test_trace_events_per_stage_and_image(self):
+        monitor = PerformanceMonitor(track_memory=False, label="a.jpg")
+        with monitor.stage("grain"):
+            pass
+        with monitor.stage("encode"):
+            pass
+
+        events = monitor.to_trace_events()
+        stage_events = [e for e in events if e['cat'] == 'stage']
+        image_events = [e for e in events if e['cat'] == 'image']
+
+        assert [e['name'] for e in stage_events] == ["grain", "encode"]
+        assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+        assert len(image_events) == 1
+        image = image_events[0]
+        assert image['name'] == "a.jpg"
+        assert image['ts'] <= stage_events[0]['ts']
+        assert image['ts'] + image['dur'] >= stage_events[-1]['ts'] + stage_events[-1]['dur'] - 1e-3
+
+    def test_empty_profile_has_no_events(self):
+        assert trace_events_from_profile({'stages': []}) == []
+
+    def test_write_chrome_trace(self, tmp_path):
+        monitor = PerformanceMonitor(track_memory=False)
+        with monitor.stage("grain"):
+            pass
+        events = monitor.to_trace_events()
+        with trace_span(events, "jpeg_encode", image="a.jpg"):
+            pass
+
+        path = write_chrome_trace(events, tmp_path / "trace.json")
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+
+        names = {e['name'] for e in trace['traceEvents']}
+        assert {"grain", "render", "jpeg_encode", "process_name", "thread_name"} <= names
+        timestamps = [e['ts'] for e in trace['traceEvents'] if e['ph'] == 'X']
+        assert timestamps == sorted(timestamps)
+
+    def test_trace_span_without_events_is_noop(self):
+        with trace_span(None, "noop"):
+            pass
+
+    def test_batch_trace_keeps_worker_threads(self, smooth_image):
+        processor = BatchProcessor(profile_stages=True)
+        files = [TestBatchAndUIProfile._encoded_file(smooth_image, f"{i}.png") for i in range(4)]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(
+                lambda f: processor.process_single_image(f, None, TestBatchAndUIProfile._process, {}),
+                files
+            ))
+
+        events = batch_trace_events(results)
+        image_events = [e for e in events if e['cat'] == 'image']
+        assert sorted(e['name'] for e in image_events) == ["0.png", "1.png", "2.png", "3.png"]
+        for image in image_events:
+            stages = [e for e in events if e['cat'] == 'stage' and e['args']['image'] == image['name']]
+            assert {(e['pid'], e['tid']) for e in stages} == {(image['pid'], image['tid'])}
+
+        create_zip_archive(results, "Portra400", trace_events=events)
+        encode_events = [e for e in events if e['name'] == "jpg_encode"]
+        assert len(encode_events) == 4
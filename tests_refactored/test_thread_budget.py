@@ -0,0 +1,193 @@
+"""
+執行緒預算測試（phos_core.configure_threads / plan_thread_budget / plan_batch_workers）
+
+測試範圍：
+1. 核心預算偵測（PHOS_THREADS）與分配
+2. configure_threads 設定 OpenCV 執行緒與通道執行器大小
+3. 批次 worker 行程的預算分配與初始化
+4. 剖析報告 / Chrome trace / UI 表格中的執行緒設定
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+from phos_core import (
+    CHANNEL_WORKERS,
+    PerformanceMonitor,
+    configure_threads,
+    detect_core_budget,
+    get_channel_executor,
+    get_thread_budget,
+    init_batch_worker,
+    map_channels,
+    plan_batch_workers,
+    plan_thread_budget,
+    thread_settings,
+    trace_events_from_profile,
+)
+from phos_batch import batch_worker_context
+from ui_components import format_stage_profile
+
+
+@pytest.fixture
+def restore_budget():
+    """測試後還原本行程的執行緒分配"""
+    previous = get_thread_budget()
+    yield
+    configure_threads(previous.budget, previous.role)
+
+
+# ==================== 預算偵測與分配 ====================
+
+class TestPlan:
+    """測試核心預算的偵測與分配"""
+
+    def test_detect_from_env(self, monkeypatch):
+        monkeypatch.setenv("PHOS_THREADS", "6")
+        assert detect_core_budget() == 6
+
+    def test_detect_default(self, monkeypatch):
+        monkeypatch.delenv("PHOS_THREADS", raising=False)
+        assert detect_core_budget() >= 1
+
+    @pytest.mark.parametrize("value", ["0", "-2", "many"])
+    def test_detect_invalid(self, monkeypatch, value):
+        monkeypatch.setenv("PHOS_THREADS", value)
+        with pytest.raises(ValueError, match="PHOS_THREADS"):
+            detect_core_budget()
+
+    @pytest.mark.parametrize("budget, channels, inner", [
+        (1, 1, 1), (2, 2, 1), (3, 3, 1), (4, 3, 1), (8, 3, 2), (16, 3, 5),
+    ])
+    def test_split(self, budget, channels, inner):
+        plan = plan_thread_budget(budget)
+        assert plan.channel_workers == channels
+        assert plan.channel_inner_threads == inner
+        # 並行通道區段外使用整個預算
+        assert plan.cv2_threads == plan.blas_threads == plan.kernel_threads == budget
+
+    @pytest.mark.parametrize("budget", range(1, 33))
+    def test_never_oversubscribes(self, budget):
+        """通道 worker 同時使用內部執行緒池時總數不超過預算"""
+        plan = plan_thread_budget(budget)
+        assert plan.channel_workers <= CHANNEL_WORKERS
+        assert plan.channel_workers * plan.channel_inner_threads <= budget
+
+    @pytest.mark.parametrize("max_workers, jobs, budget, expected", [
+        (4, 10, 8, (4, 2)),
+        (None, 10, 8, (8, 1)),
+        (None, 2, 8, (2, 4)),
+        (4, 10, 2, (2, 1)),
+        (4, 0, 8, (1, 8)),
+        (4, 10, 1, (1, 1)),
+    ])
+    def test_batch_workers(self, max_workers, jobs, budget, expected):
+        assert plan_batch_workers(max_workers, jobs, budget=budget) == expected
+
+
+# ==================== 套用設定 ====================
+
+class TestConfigure:
+    """測試 configure_threads 套用設定"""
+
+    def test_sets_opencv_threads(self, restore_budget):
+        plan = configure_threads(8)
+        assert cv2.getNumThreads() == plan.cv2_threads == 8
+        assert get_thread_budget() is plan
+
+    def test_sequential_channels_keep_full_budget(self, restore_budget):
+        """循序通道與通道區段外使用整個預算；並行通道區段內才分割"""
+        configure_threads(8)
+        assert map_channels(lambda _: cv2.getNumThreads(), range(3), parallel=False) == [8] * 3
+        assert map_channels(lambda _: cv2.getNumThreads(), range(3), parallel=True) == [2] * 3
+        assert cv2.getNumThreads() == 8
+
+    def test_sequential_render_keeps_full_budget(self, restore_budget, monkeypatch):
+        """循序渲染的所有階段（含通道鏈）都以整個預算的 OpenCV 執行緒執行"""
+        import Phos
+        from film_models import get_film_profile
+        from modules.optical_core import spectral_response
+
+        configure_threads(6)
+        seen = []
+        film = get_film_profile("Portra400")
+        image = np.random.default_rng(0).integers(0, 256, (64, 80, 3), dtype=np.uint8)
+
+        real_blur = cv2.GaussianBlur
+
+        def recording_blur(*args, **kwargs):
+            seen.append(cv2.getNumThreads())
+            return real_blur(*args, **kwargs)
+
+        monkeypatch.setattr(cv2, "GaussianBlur", recording_blur)
+        Phos.optical_processing(*spectral_response(image, film), film, "默認", "filmic",
+                                parallel_channels=False)
+        assert seen and set(seen) == {6}
+        assert cv2.getNumThreads() == 6
+
+    def test_resizes_channel_executor(self, restore_budget):
+        configure_threads(1)
+        small = get_channel_executor()
+        assert small._max_workers == 1
+        configure_threads(6)
+        assert get_channel_executor() is not small
+        assert get_channel_executor()._max_workers == 3
+
+    def test_single_core_runs_channels_sequentially(self, restore_budget, monkeypatch):
+        """預算只有一個通道 worker 時預設循序執行（parallel=True 仍使用執行器）"""
+        import threading
+
+        monkeypatch.delenv("PHOS_PARALLEL_CHANNELS", raising=False)
+        configure_threads(1)
+        caller = threading.current_thread().name
+        assert map_channels(lambda _: threading.current_thread().name, range(3)) == [caller] * 3
+        names = map_channels(lambda _: threading.current_thread().name, range(3), parallel=True)
+        assert all(name.startswith("phos-channel") for name in names)
+
+    def test_settings(self, restore_budget):
+        configure_threads(4)
+        settings = thread_settings()
+        assert settings['budget'] == 4
+        assert settings['role'] == "process"
+        assert settings['channel_workers'] == 3
+        assert settings['blas_method'] in ("threadpoolctl", "env")
+
+    def test_batch_worker_initializer(self):
+        """worker 行程以分配的預算初始化，不影響父行程"""
+        parent = thread_settings()
+        with ProcessPoolExecutor(max_workers=1, mp_context=batch_worker_context(),
+                                 initializer=init_batch_worker, initargs=(2,)) as pool:
+            settings = pool.submit(thread_settings).result()
+        assert settings['role'] == "batch_worker"
+        assert settings['budget'] == 2
+        assert settings['channel_workers'] == 2
+        assert settings['cv2_threads'] == 2
+        assert settings['channel_inner_threads'] == 1
+        assert thread_settings() == parent
+
+
+# ==================== 剖析輸出 ====================
+
+class TestProfileOutput:
+    """測試剖析報告中的執行緒設定"""
+
+    def _profile(self):
+        with PerformanceMonitor(track_memory=False, label="img") as monitor:
+            with monitor.stage("grain"):
+                np.ones((8, 8)).sum()
+        return monitor.to_dict()
+
+    def test_to_dict(self):
+        assert self._profile()['threads'] == thread_settings()
+
+    def test_trace_image_span(self):
+        events = trace_events_from_profile(self._profile())
+        image = next(e for e in events if e['cat'] == "image")
+        assert image['args']['threads']['budget'] == get_thread_budget().budget
+
+    def test_ui_table(self):
+        text = format_stage_profile(self._profile())
+        assert f"執行緒預算 {get_thread_budget().budget} 核" in text
@@ -0,0 +1,472 @@
+"""
+精度閘門：快速路徑 vs 精確參考實作
+
+每個快速路徑（查表、近似模糊、降解析度、低精度緩衝等）都在
+modules.performance_modes 註冊一個開關。本工具在固定影像語料上，
+分別以「開關關閉（精確參考）」與「開關開啟（候選快速路徑）」執行：
+
+1. 受影響階段本身 → 逐階段最大絕對誤差
+2. 完整渲染（固定亂數種子）→ PSNR、CIEDE2000 最大 / 平均值
+
+任一指標超出該快速路徑設定的容差即判定失敗，CLI 結束碼為 1，
+供快速路徑預設啟用前的把關。
+
+語料：test_outputs/input_*.png（8 張 400×400 色卡 / 漸層 / 天空場景）
+     + 含高光點的合成場景（tools.benchmark_suite.make_test_scene）
+
+用法：
+    python tools/accuracy_gate.py                       # 檢查所有已註冊快速路徑
+    python tools/accuracy_gate.py --fast-path input_lut --films Portra400 NC200
+    python tools/accuracy_gate.py --output test_outputs/accuracy_gate.json
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# 添加專案根目錄到路徑
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from color_utils import delta_e_ciede2000, srgb_to_lab
+from modules.optical_core import spectral_response
+from modules.hd_curve import HD_CURVE_LUT
+from modules.image_io import REDUCED_DECODE, decode_standardized
+from modules.image_processing import apply_hd_curve
+from modules.performance_modes import fast_path, list_fast_paths
+from modules.pointwise import POINTWISE_BACKENDS, POINTWISE_FUSED, available_backends, pointwise_backend
+from modules.tone_mapping import apply_filmic
+from modules.wavelength_effects import apply_wavelength_bloom
+from tools.benchmark_suite import _load_pipeline, make_test_scene
+
+
+CORPUS_DIR = PROJECT_ROOT / "test_outputs"
+RENDER_SEED = 1234
+# 互易律失效階段的曝光時間（秒；1 秒時不作用）
+RECIPROCITY_EXPOSURE = 30.0
+
+
+# ============================================================
+# 指標
+# ============================================================
+
+def psnr(reference: np.ndarray, candidate: np.ndarray, peak: float = 255.0) -> float:
+    """
+    峰值訊噪比（dB），完全相同時為 inf
+
+    Args:
+        reference: 參考影像
+        candidate: 候選影像（同形狀）
+        peak: 像素峰值（uint8 為 255）
+    """
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    if mse == 0:
+        return float('inf')
+    return float(10.0 * np.log10(peak ** 2 / mse))
+
+
+def delta_e_bgr(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """
+    兩張 uint8 BGR 影像的逐像素 CIEDE2000
+
+    Returns:
+        np.ndarray: ΔE00 (H, W)
+    """
+    lab_ref = srgb_to_lab(reference[..., ::-1].astype(np.float64) / 255.0)
+    lab_cand = srgb_to_lab(candidate[..., ::-1].astype(np.float64) / 255.0)
+    return delta_e_ciede2000(lab_ref, lab_cand)
+
+
+def stage_max_abs(reference, candidate) -> float:
+    """
+    階段輸出的最大絕對誤差（支援陣列或陣列 tuple，None 項略過）
+    """
+    if isinstance(reference, np.ndarray):
+        reference, candidate = (reference,), (candidate,)
+    errors = [
+        float(np.max(np.abs(r.astype(np.float64) - c.astype(np.float64))))
+        for r, c in zip(reference, candidate) if r is not None
+    ]
+    return max(errors) if errors else 0.0
+
+
+# ============================================================
+# 閘門設定
+# ============================================================
+
+@dataclass(frozen=True)
+class Tolerance:
+    """快速路徑容差（None 表示不檢查該項）"""
+    psnr_min: Optional[float] = 50.0
+    delta_e_max: Optional[float] = 1.0
+    delta_e_mean: Optional[float] = 0.1
+    stage_max_abs: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class AccuracyGate:
+    """
+    單一快速路徑的精度閘門
+
+    Attributes:
+        fast_path: performance_modes 中的開關名稱
+        stage: 受影響的階段名稱（對應 PerformanceMonitor 階段）
+        stage_fn: (image_bgr_uint8, film) -> 階段輸出（陣列或陣列 tuple）
+        tolerance: 容差
+        films: 檢查的膠片
+        full_render: 是否比較完整渲染（False 時僅檢查階段誤差，渲染指標記為 None）
+        render_input: (image_bgr_uint8) -> 完整渲染的輸入（None = 語料影像本身）；
+            快速路徑作用於渲染之前（例如解碼）時使用
+        backend: 快速路徑側使用的逐點運算後端（None = 目前選擇）；
+            後端未安裝時閘門記為略過
+    """
+    fast_path: str
+    stage: str
+    stage_fn: Callable
+    tolerance: Tolerance = field(default_factory=Tolerance)
+    films: Tuple[str, ...] = ("Portra400", "Cinestill800T_MediumPhysics", "Portra400_MediumPhysics_Mie")
+    full_render: bool = True
+    render_input: Optional[Callable] = None
+    backend: Optional[str] = None
+
+
+def wavelength_bloom_stage(image: np.ndarray, film) -> Tuple[np.ndarray, ...]:
+    """光譜響應 → 波長依賴 Bloom（wavelength_bloom 階段）"""
+    response_r, response_g, response_b, _ = spectral_response(image, film)
+    return apply_wavelength_bloom(response_r, response_g, response_b,
+                                  film.wavelength_bloom_params, film.bloom_params)
+
+
+def tone_mapping_stage(image: np.ndarray, film) -> Tuple[Optional[np.ndarray], ...]:
+    """光譜響應 → Filmic tone mapping（tone_mapping 階段，逐點核心 'filmic_curve'）"""
+    return apply_filmic(*spectral_response(image, film), film)
+
+
+def reciprocity_stage(image: np.ndarray, film) -> np.ndarray:
+    """
+    光譜響應 → 互易律失效（reciprocity 階段，長曝光；逐點核心 'scale_clip' / 'scale_clip_channels'）
+
+    與 optical_processing 相同：彩色為 (H, W, 3) 堆疊，黑白為 (H, W, 1) 後取回 2-D。
+    """
+    from reciprocity_failure import apply_reciprocity_failure
+
+    response_r, response_g, response_b, response_total = spectral_response(image, film)
+    params = dataclasses.replace(film.reciprocity_params, enabled=True)
+    if film.color_type == "color":
+        rgb_stack = np.stack([response_r, response_g, response_b], axis=2)
+        return apply_reciprocity_failure(rgb_stack, RECIPROCITY_EXPOSURE, params)
+    return apply_reciprocity_failure(response_total[:, :, np.newaxis], RECIPROCITY_EXPOSURE, params)[:, :, 0]
+
+
+def hd_curve_stage(image: np.ndarray, film) -> np.ndarray:
+    """光譜響應（全色）→ H&D 曲線（hd_curve 階段）"""
+    response_total = spectral_response(image, film)[3]
+    return apply_hd_curve(response_total, film.hd_curve_params)
+
+
+def reduced_decode_input(image: np.ndarray) -> np.ndarray:
+    """
+    語料影像放大 4 倍並編碼為 JPEG，再解碼並標準化回原短邊（decode 階段）
+
+    放大後短邊為目標尺寸的 4 倍，啟用快速路徑時以 1/4 DCT 縮放解碼。
+    """
+    height, width = image.shape[:2]
+    large = cv2.resize(image, (width * 4, height * 4), interpolation=cv2.INTER_CUBIC)
+    ok, encoded = cv2.imencode(".jpg", large, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok, "JPEG 編碼失敗"
+    return decode_standardized(encoded, target=min(height, width))[0]
+
+
+def reduced_decode_stage(image: np.ndarray, film) -> np.ndarray:
+    """解碼 → 標準化 → 光譜響應（全色），誤差以線性光度計"""
+    return spectral_response(reduced_decode_input(image), film)[3]
+
+
+GATES: Dict[str, AccuracyGate] = {
+    'input_lut': AccuracyGate(
+        fast_path='input_lut',
+        stage='spectral_response',
+        stage_fn=spectral_response,
+        # 重排運算順序僅造成 float32 捨入差，完整渲染至多翻轉個別像素 1 個 uint8 階
+        tolerance=Tolerance(psnr_min=60.0, delta_e_max=1.0, delta_e_mean=0.01, stage_max_abs=1e-5),
+    ),
+    'psf_clustering': AccuracyGate(
+        fast_path='psf_clustering',
+        stage='wavelength_bloom',
+        stage_fn=wavelength_bloom_stage,
+        # 代表核與成員 PSF 的 L1 距離 ≤ psf_cluster_tolerance，誤差上限為 容差 × 散射能量
+        tolerance=Tolerance(psnr_min=50.0, delta_e_max=1.0, delta_e_mean=0.05, stage_max_abs=1e-3),
+        films=("Portra400_MediumPhysics_Spectral",),
+    ),
+    HD_CURVE_LUT: AccuracyGate(
+        fast_path=HD_CURVE_LUT,
+        stage='hd_curve',
+        stage_fn=hd_curve_stage,
+        # 平滑區段插值誤差 < 1e-7，toe_end / 密度裁切折點附近 ~1e-4（透射率）
+        tolerance=Tolerance(stage_max_abs=5e-4),
+        # 僅黑白膠片啟用 H&D 曲線；黑白完整渲染目前在 artistic BloomParams
+        # 驗證（radius ≥ 5）失敗，故只比較階段輸出
+        films=("HP5Plus400", "TriX400", "FP4Plus125"),
+        full_render=False,
+    ),
+    # 逐點運算後端：每個非 numpy 後端各自與 numpy 參考實作比較（未安裝者略過）。
+    # 融合後端僅改變浮點運算順序（numba / numexpr 以 float32 計算中間值），逐點誤差為 ulp 等級
+    **{
+        f"{POINTWISE_FUSED}[{backend}]": AccuracyGate(
+            fast_path=POINTWISE_FUSED,
+            stage='tone_mapping',
+            stage_fn=tone_mapping_stage,
+            tolerance=Tolerance(psnr_min=60.0, delta_e_max=1.0, delta_e_mean=0.01, stage_max_abs=1e-5),
+            backend=backend,
+        )
+        for backend in POINTWISE_BACKENDS if backend != 'numpy'
+    },
+    # 互易律失效僅在長曝光時作用（預設渲染的曝光時間為 1 秒），故只比較階段輸出；
+    # 黑白膠片走 (H, W, 1) 單通道路徑
+    **{
+        f"{POINTWISE_FUSED}[{backend}]:reciprocity": AccuracyGate(
+            fast_path=POINTWISE_FUSED,
+            stage='reciprocity',
+            stage_fn=reciprocity_stage,
+            tolerance=Tolerance(stage_max_abs=1e-5),
+            films=("Portra400", "HP5Plus400", "TriX400"),
+            full_render=False,
+            backend=backend,
+        )
+        for backend in POINTWISE_BACKENDS if backend != 'numpy'
+    },
+    REDUCED_DECODE: AccuracyGate(
+        fast_path=REDUCED_DECODE,
+        stage='decode',
+        stage_fn=reduced_decode_stage,
+        render_input=reduced_decode_input,
+        # DCT 縮放與 INTER_AREA 的差異集中在高頻邊緣（色卡邊界、合成高光點），
+        # 實測 PSNR ≥ 55 dB、ΔE00 最大 ~1.8、平均 ≤ 0.18；平坦色塊為 0
+        tolerance=Tolerance(psnr_min=50.0, delta_e_max=2.5, delta_e_mean=0.25, stage_max_abs=0.03),
+        films=("Portra400", "Cinestill800T_MediumPhysics"),
+    ),
+}
+
+
+# ============================================================
+# 語料與渲染
+# ============================================================
+
+def load_corpus(include_synthetic: bool = True) -> List[Tuple[str, np.ndarray]]:
+    """
+    載入固定影像語料
+
+    Returns:
+        List[Tuple[str, np.ndarray]]: [(名稱, BGR uint8), ...]
+    """
+    corpus = []
+    for path in sorted(CORPUS_DIR.glob("input_*.png")):
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is not None:
+            corpus.append((path.stem[len("input_"):], image))
+    if include_synthetic:
+        corpus.append(("synthetic_highlights", make_test_scene(480, 320, seed=0)))
+    return corpus
+
+
+def render(image: np.ndarray, film_name: str, seed: int = RENDER_SEED) -> np.ndarray:
+    """
+    以固定亂數種子執行完整渲染（spectral_response → optical_processing）
+
+    Returns:
+        np.ndarray: 輸出 BGR uint8
+    """
+    optical_processing, _, _, get_film_profile = _load_pipeline()
+    film = get_film_profile(film_name)
+    np.random.seed(seed)
+    return optical_processing(*spectral_response(image, film), film, "默認", "filmic")
+
+
+def compare_outputs(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """
+    比較兩張 uint8 BGR 渲染結果
+
+    Returns:
+        dict: {'psnr', 'delta_e_max', 'delta_e_mean'}
+    """
+    delta_e = delta_e_bgr(reference, candidate)
+    return {
+        'psnr': psnr(reference, candidate),
+        'delta_e_max': float(delta_e.max()),
+        'delta_e_mean': float(delta_e.mean()),
+    }
+
+
+def check_tolerance(metrics: dict, tolerance: Tolerance) -> List[str]:
+    """
+    檢查指標是否在容差內
+
+    Returns:
+        List[str]: 超出容差的描述（空列表表示通過）
+    """
+    violations = []
+    if metrics.get('psnr') is None:  # 僅階段閘門
+        metrics = {**metrics, 'psnr': float('inf'), 'delta_e_max': 0.0, 'delta_e_mean': 0.0}
+    if tolerance.psnr_min is not None and metrics['psnr'] < tolerance.psnr_min:
+        violations.append(f"PSNR {metrics['psnr']:.2f} dB < {tolerance.psnr_min:.2f} dB")
+    if tolerance.delta_e_max is not None and metrics['delta_e_max'] > tolerance.delta_e_max:
+        violations.append(f"ΔE00 最大值 {metrics['delta_e_max']:.4f} > {tolerance.delta_e_max}")
+    if tolerance.delta_e_mean is not None and metrics['delta_e_mean'] > tolerance.delta_e_mean:
+        violations.append(f"ΔE00 平均值 {metrics['delta_e_mean']:.4f} > {tolerance.delta_e_mean}")
+    if (tolerance.stage_max_abs is not None and metrics.get('stage_max_abs') is not None
+            and metrics['stage_max_abs'] > tolerance.stage_max_abs):
+        violations.append(
+            f"階段 {metrics['stage']} 最大絕對誤差 {metrics['stage_max_abs']:.3g} > {tolerance.stage_max_abs:.3g}"
+        )
+    return violations
+
+
+def candidate_backend(backend: Optional[str]):
+    """快速路徑側的逐點運算後端（None = 維持目前選擇）"""
+    return pointwise_backend(backend) if backend is not None else nullcontext()
+
+
+def run_gate(gate: AccuracyGate, corpus: Optional[Sequence[Tuple[str, np.ndarray]]] = None,
+             films: Optional[Sequence[str]] = None) -> dict:
+    """
+    在語料上比較精確參考與快速路徑
+
+    Args:
+        gate: 閘門設定
+        corpus: 影像語料（預設 load_corpus()）
+        films: 覆寫檢查的膠片
+
+    Returns:
+        dict: {'fast_path', 'backend', 'stage', 'tolerance', 'passed', 'skipped', 'results': [
+            {'image', 'film', 'psnr', 'delta_e_max', 'delta_e_mean', 'stage', 'stage_max_abs',
+             'violations'}, ...]}
+            指定的後端未安裝時 'skipped' 為原因字串、'passed' 為 None、'results' 為空
+    """
+    from film_models import get_film_profile
+
+    report = {
+        'fast_path': gate.fast_path,
+        'backend': gate.backend,
+        'stage': gate.stage,
+        'tolerance': asdict(gate.tolerance),
+    }
+    if gate.backend is not None and gate.backend not in available_backends():
+        return {**report, 'passed': None, 'skipped': f"後端 {gate.backend} 未安裝", 'results': []}
+
+    corpus = load_corpus() if corpus is None else corpus
+    render_input = gate.render_input or (lambda image: image)
+    results = []
+    for film_name in (films or gate.films):
+        film = get_film_profile(film_name)
+        for image_name, image in corpus:
+            with fast_path(gate.fast_path, False):
+                stage_ref = gate.stage_fn(image, film)
+                render_ref = render(render_input(image), film_name) if gate.full_render else None
+            with fast_path(gate.fast_path, True), candidate_backend(gate.backend):
+                stage_fast = gate.stage_fn(image, film)
+                render_fast = render(render_input(image), film_name) if gate.full_render else None
+
+            if gate.full_render:
+                metrics = compare_outputs(render_ref, render_fast)
+            else:
+                metrics = {'psnr': None, 'delta_e_max': None, 'delta_e_mean': None}
+            metrics.update({'stage': gate.stage, 'stage_max_abs': stage_max_abs(stage_ref, stage_fast)})
+            violations = check_tolerance(metrics, gate.tolerance)
+            results.append({'image': image_name, 'film': film_name, **metrics, 'violations': violations})
+
+    return {
+        **report,
+        'passed': all(not r['violations'] for r in results),
+        'skipped': None,
+        'results': results,
+    }
+
+
+def format_gate_report(report: dict) -> str:
+    """將閘門結果格式化為文字表格"""
+    name = report['fast_path'] + (f"[{report['backend']}]" if report.get('backend') else "")
+    if report.get('skipped'):
+        return f"[{name}] 階段 {report['stage']}: ⏭️ 略過（{report['skipped']}）"
+    status = "✅ 通過" if report['passed'] else "❌ 失敗"
+    lines = [
+        f"[{name}] 階段 {report['stage']}: {status}",
+        f"{'影像':<24} {'膠片':<30} {'PSNR dB':>9} {'ΔE00 max':>9} {'ΔE00 mean':>10} {'階段 max abs':>13}",
+    ]
+    for r in report['results']:
+        mark = "❌" if r['violations'] else "  "
+        if r['psnr'] is None:
+            render_cols = f"{'-':>9} {'-':>9} {'-':>10}"
+        else:
+            render_cols = f"{r['psnr']:>9.2f} {r['delta_e_max']:>9.4f} {r['delta_e_mean']:>10.5f}"
+        lines.append(
+            f"{r['image']:<24} {r['film']:<30} {render_cols} {r['stage_max_abs']:>13.3g} {mark}"
+        )
+        for violation in r['violations']:
+            lines.append(f"    - {violation}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def select_gates(names: Sequence[str]) -> List[str]:
+    """
+    解析閘門名稱：閘門名稱本身，或快速路徑名稱（展開為該快速路徑的所有閘門）
+
+    Returns:
+        List[str]: GATES 的鍵（保持順序、不重複）
+    """
+    selected = []
+    for name in names:
+        for key in sorted(GATES):
+            if (key == name or GATES[key].fast_path == name) and key not in selected:
+                selected.append(key)
+    return selected
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 快速路徑精度閘門")
+    parser.add_argument('--fast-path', nargs='+',
+                        help="檢查的快速路徑或閘門（預設全部；pointwise_fused 含所有後端）")
+    parser.add_argument('--films', nargs='+', help="覆寫檢查的膠片")
+    parser.add_argument('--no-synthetic', action='store_true', help="不加入合成高光場景")
+    parser.add_argument('--output', help="JSON 報告輸出路徑")
+    args = parser.parse_args(argv)
+
+    requested = args.fast_path or sorted(GATES)
+    unknown = [n for n in requested if not select_gates([n])]
+    if unknown:
+        parser.error(f"未定義精度閘門的快速路徑: {', '.join(unknown)}. 可用: {', '.join(sorted(GATES))}")
+    names = select_gates(requested)
+
+    ungated = sorted(set(list_fast_paths()) - {gate.fast_path for gate in GATES.values()})
+    if ungated:
+        print(f"⚠️  以下快速路徑尚未定義精度閘門: {', '.join(ungated)}")
+
+    corpus = load_corpus(include_synthetic=not args.no_synthetic)
+    reports = []
+    for name in names:
+        report = run_gate(GATES[name], corpus, films=args.films)
+        print(format_gate_report(report) + "\n")
+        reports.append(report)
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(reports, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    # 略過的閘門（後端未安裝）不視為失敗，也不視為通過
+    return 0 if all(r['passed'] is not False for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""
+效能基準測試套件（完整管線 + 各階段）
+
+以 phos_core.PerformanceMonitor 剖析完整處理管線（decode → spectral_response →
+optical_processing 各階段 → JPEG encode），涵蓋：
+- 解析度：1 / 6 / 13.5 / 24 / 50 MP（3:2 比例）
+- 代表膠片：經驗公式（artistic）、MediumPhysics、_Mie、黑白
+- UI 三種處理模式：經驗公式（快速）/ 物理模式（快速）/ 物理完整（光譜）
+
+結果寫入帶 schema 版本的 JSON（格式延續 test_outputs/performance_baseline_v041.json），
+並提供 compare 指令比較兩次執行、標記超過門檻的效能退化。
+
+注意：為了精確控制解析度，基準測試不經過 standardize()（其會將短邊固定為
+STANDARD_IMAGE_SIZE），直接以目標尺寸的合成場景進入管線。
+
+用法：
+    python tools/benchmark_suite.py run                      # 完整矩陣（耗時）
+    python tools/benchmark_suite.py run --quick              # 1 MP、單次，快速檢查
+    python tools/benchmark_suite.py run --megapixels 1 6 --tiers physical --repeat 5
+    python tools/benchmark_suite.py compare base.json new.json --threshold 0.10
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+# 添加專案根目錄到路徑
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from phos_core import PerformanceMonitor, profile_stage, thread_settings
+
+
+# ============================================================
+# 常數與測試矩陣
+# ============================================================
+
+SCHEMA_VERSION = 2
+
+RESOLUTIONS_MP = (1.0, 6.0, 13.5, 24.0, 50.0)
+ASPECT_RATIO = 1.5  # 3:2
+
+# UI 處理模式（ui_components.render_sidebar 的 processing_quality）
+QUALITY_TIERS = {
+    'empirical': "經驗公式（快速）",
+    'physical': "物理模式（快速）",
+    'spectral': "物理完整（光譜）",
+}
+
+# 效能狀態門檻（ms / MP）
+TARGET_MS_PER_MP = 500.0
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "test_outputs" / "benchmarks"
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """單一基準測試配置（處理模式 × 膠片）"""
+    tier: str
+    film_name: str
+    category: str
+    description: str
+    film_spectra_name: str = 'Portra400'
+
+    @property
+    def use_film_spectra(self) -> bool:
+        return self.tier == 'spectral'
+
+
+BENCHMARK_CASES = (
+    BenchmarkCase('empirical', 'NC200', 'artistic', "經驗公式, 彩色"),
+    BenchmarkCase('empirical', 'HP5Plus400', 'bw', "經驗公式, 黑白"),
+    BenchmarkCase('physical', 'Cinestill800T_MediumPhysics', 'medium_physics', "MediumPhysics (強 Halation)"),
+    BenchmarkCase('physical', 'Portra400_MediumPhysics_Mie', 'mie', "Physics+Mie"),
+    BenchmarkCase('spectral', 'Portra400', 'artistic', "31 通道光譜, 彩色", film_spectra_name='Portra400'),
+    BenchmarkCase('spectral', 'HP5Plus400', 'bw', "31 通道光譜, 黑白", film_spectra_name='HP5Plus400'),
+)
+
+
+# ============================================================
+# 合成測試場景
+# ============================================================
+
+def resolution_for_megapixels(megapixels: float, aspect: float = ASPECT_RATIO) -> tuple:
+    """
+    計算指定百萬像素數的 (width, height)，尺寸取偶數
+
+    Args:
+        megapixels: 目標百萬像素數
+        aspect: 寬高比（寬 / 高）
+
+    Returns:
+        (width, height)
+    """
+    height = int(round(np.sqrt(megapixels * 1e6 / aspect) / 2)) * 2
+    width = int(round(height * aspect / 2)) * 2
+    return max(width, 2), max(height, 2)
+
+
+def make_test_scene(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """
+    生成確定性的合成場景（BGR uint8）
+
+    低頻漸層 + 色彩變化 + 高光點（觸發 bloom / halation），
+    在 1/8 解析度生成後放大，避免 50 MP 時的大量浮點暫存。
+
+    Args:
+        width, height: 輸出尺寸
+        seed: 隨機種子
+
+    Returns:
+        np.ndarray: (height, width, 3) uint8
+    """
+    rng = np.random.default_rng(seed)
+    small_w, small_h = max(width // 8, 8), max(height // 8, 8)
+    yy, xx = np.mgrid[0:small_h, 0:small_w].astype(np.float32)
+    xx /= small_w
+    yy /= small_h
+
+    b = 0.35 + 0.30 * np.sin(2.0 * np.pi * xx) * np.cos(np.pi * yy)
+    g = 0.25 + 0.50 * yy
+    r = 0.20 + 0.60 * xx * (1.0 - 0.5 * yy)
+    small = np.stack([b, g, r], axis=2)
+    small += rng.normal(0.0, 0.02, small.shape).astype(np.float32)
+    small = (np.clip(small, 0.0, 1.0) * 255).astype(np.uint8)
+
+    scene = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    # 高光點（接近飽和的光源）
+    radius = max(min(width, height) // 60, 2)
+    for _ in range(12):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        cv2.circle(scene, center, radius, (250, 250, 255), thickness=-1, lineType=cv2.LINE_AA)
+    return scene
+
+
+# ============================================================
+# 執行基準測試
+# ============================================================
+
+def _load_pipeline():
+    """延遲導入主程序管線（Phos.py 於 bare mode 下可導入）"""
+    from Phos import optical_processing, adjust_grain_intensity
+    from modules.optical_core import spectral_response
+    from film_models import get_film_profile
+    return optical_processing, adjust_grain_intensity, spectral_response, get_film_profile
+
+
+def run_pipeline_once(jpeg_bytes: np.ndarray, case: BenchmarkCase,
+                      grain_style: str = "默認", tone_style: str = "filmic",
+                      track_memory: bool = False, label: Optional[str] = None) -> dict:
+    """
+    執行一次完整管線並回傳階段剖析報告
+
+    Args:
+        jpeg_bytes: 已編碼的輸入 JPEG（uint8 一維陣列）
+        case: 基準測試配置
+        grain_style: 顆粒風格
+        tone_style: Tone mapping 風格
+        track_memory: 是否以 tracemalloc 記錄各階段配置量
+        label: 報告標籤
+
+    Returns:
+        dict: PerformanceMonitor.to_dict()
+    """
+    optical_processing, adjust_grain_intensity, spectral_response, get_film_profile = _load_pipeline()
+
+    with PerformanceMonitor(track_memory=track_memory, label=label) as monitor:
+        with profile_stage(monitor, "decode"):
+            image = cv2.imdecode(jpeg_bytes, cv2.IMREAD_COLOR)
+
+        film = adjust_grain_intensity(get_film_profile(case.film_name), grain_style)
+
+        with profile_stage(monitor, "spectral_response"):
+            responses = spectral_response(image, film)
+
+        final_image = optical_processing(
+            *responses, film, grain_style, tone_style,
+            use_film_spectra=case.use_film_spectra,
+            film_spectra_name=case.film_spectra_name,
+            profiler=monitor
+        )
+
+        with profile_stage(monitor, "jpeg_encode"):
+            cv2.imencode('.jpg', final_image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+
+    return monitor.to_dict()
+
+
+def _status(ms_per_mp: float) -> str:
+    return "✅ 良好" if ms_per_mp <= TARGET_MS_PER_MP else "⚠️ 偏慢"
+
+
+def benchmark_case(case: BenchmarkCase, megapixels: float, repeat: int = 3,
+                   warmup: bool = True, track_memory: bool = False) -> dict:
+    """
+    對單一配置 × 解析度執行多次並彙整各階段統計
+
+    Args:
+        case: 基準測試配置
+        megapixels: 目標百萬像素數
+        repeat: 重複次數
+        warmup: 是否先以小尺寸暖機（載入 Mie 查表、PSF 快取等）
+        track_memory: 是否記錄各階段記憶體配置
+
+    Returns:
+        dict: 單筆 benchmark 結果（與 v0.4.1 基準格式相容並擴充）
+    """
+    width, height = resolution_for_megapixels(megapixels)
+    entry = {
+        'key': benchmark_key(case.tier, case.film_name, width, height),
+        'film_name': case.film_name,
+        'tier': case.tier,
+        'tier_label': QUALITY_TIERS[case.tier],
+        'category': case.category,
+        'description': case.description,
+        'resolution': {'width': width, 'height': height},
+        'megapixels': width * height / 1e6,
+        'repeat': repeat,
+    }
+
+    try:
+        if warmup:
+            small = make_test_scene(384, 256)
+            run_pipeline_once(cv2.imencode('.jpg', small)[1], case)
+
+        scene = make_test_scene(width, height)
+        jpeg_bytes = cv2.imencode('.jpg', scene, [cv2.IMWRITE_JPEG_QUALITY, 95])[1]
+        del scene
+
+        runs = [
+            run_pipeline_once(jpeg_bytes, case, track_memory=track_memory, label=entry['key'])
+            for _ in range(repeat)
+        ]
+    except Exception as e:
+        entry.update({'stages': {}, 'total_time_ms': None, 'time_per_megapixel_ms': None,
+                      'status': "❌ 失敗", 'error': f"{type(e).__name__}: {e}"})
+        return entry
+
+    stage_names = []
+    for run in runs:
+        for stage in run['stages']:
+            if stage['name'] not in stage_names:
+                stage_names.append(stage['name'])
+
+    stages = {}
+    for name in stage_names:
+        wall = [sum(s['wall_ms'] for s in run['stages'] if s['name'] == name) for run in runs]
+        cpu = [sum(s['cpu_ms'] for s in run['stages'] if s['name'] == name) for run in runs]
+        stats = {'time_ms': float(np.mean(wall)), 'std_ms': float(np.std(wall)),
+                 'cpu_ms': float(np.mean(cpu))}
+        allocated = [s['allocated_bytes'] for run in runs for s in run['stages']
+                     if s['name'] == name and 'allocated_bytes' in s]
+        if allocated:
+            stats['allocated_mb'] = max(allocated) / 1024 / 1024
+        stages[name] = stats
+
+    totals = [run['total_wall_ms'] for run in runs]
+    total_ms = float(np.mean(totals))
+    ms_per_mp = total_ms / entry['megapixels']
+    entry.update({
+        'stages': stages,
+        'total_time_ms': total_ms,
+        'total_std_ms': float(np.std(totals)),
+        'time_per_megapixel_ms': ms_per_mp,
+        'status': _status(ms_per_mp),
+    })
+    return entry
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_benchmarks(megapixels: Sequence[float] = RESOLUTIONS_MP,
+                   tiers: Optional[Sequence[str]] = None,
+                   films: Optional[Sequence[str]] = None,
+                   repeat: int = 3, warmup: bool = True, track_memory: bool = False,
+                   verbose: bool = True) -> dict:
+    """
+    執行基準測試矩陣
+
+    Args:
+        megapixels: 解析度列表（MP）
+        tiers: 處理模式篩選（None = 全部）
+        films: 膠片篩選（None = 全部）
+        repeat: 每個配置的重複次數
+        warmup: 是否暖機
+        track_memory: 是否記錄各階段記憶體配置
+        verbose: 是否輸出進度
+
+    Returns:
+        dict: {'metadata': {...}, 'benchmarks': [...]}
+    """
+    cases = [c for c in BENCHMARK_CASES
+             if (tiers is None or c.tier in tiers) and (films is None or c.film_name in films)]
+    if not cases:
+        raise ValueError(f"沒有符合條件的基準配置（tiers={tiers}, films={films}）")
+
+    now = datetime.now()
+    report = {
+        'metadata': {
+            'schema_version': SCHEMA_VERSION,
+            'version': _git_commit(),
+            'timestamp': now.isoformat(),
+            'test_date': now.strftime("%Y-%m-%d"),
+            'platform': sys.platform,
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'opencv': cv2.__version__,
+            'cpu_count': os.cpu_count(),
+            'threads': thread_settings(),
+            'repeat': repeat,
+        },
+        'benchmarks': [],
+    }
+
+    for mp in megapixels:
+        for case in cases:
+            entry = benchmark_case(case, mp, repeat=repeat, warmup=warmup, track_memory=track_memory)
+            report['benchmarks'].append(entry)
+            if verbose:
+                total = entry['total_time_ms']
+                timing = f"{total:9.1f} ms  ({entry['time_per_megapixel_ms']:.1f} ms/MP)" if total else entry['error']
+                print(f"  {entry['key']:<52} {timing}  {entry['status']}")
+    return report
+
+
+def save_report(report: dict, output: Optional[Path] = None) -> Path:
+    """
+    寫出基準測試 JSON（預設 test_outputs/benchmarks/benchmark_<commit>_<時間>.json）
+
+    Args:
+        report: run_benchmarks() 的結果
+        output: 輸出路徑（可選）
+
+    Returns:
+        Path: 輸出路徑
+    """
+    if output is None:
+        stamp = datetime.fromisoformat(report['metadata']['timestamp']).strftime("%Y%m%d_%H%M%S")
+        output = DEFAULT_OUTPUT_DIR / f"benchmark_{report['metadata']['version']}_{stamp}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return output
+
+
+# ============================================================
+# 比較兩次執行
+# ============================================================
+
+def benchmark_key(tier: str, film_name: str, width: int, height: int) -> str:
+    """基準項目的比對鍵（處理模式 / 膠片 / 解析度）"""
+    return f"{tier}/{film_name}/{width}x{height}"
+
+
+def _entry_key(entry: dict) -> str:
+    if 'key' in entry:
+        return entry['key']
+    # v0.4.1 基準格式沒有 tier，以 physics_mode 代替
+    res = entry['resolution']
+    return benchmark_key(entry.get('physics_mode', '-'), entry['film_name'], res['width'], res['height'])
+
+
+def compare_reports(baseline: dict, candidate: dict, threshold: float = 0.10,
+                    min_time_ms: float = 5.0) -> List[dict]:
+    """
+    比較兩份基準測試結果
+
+    對共同的基準項目比較總時間與各階段時間；相對變化超過 threshold
+    且基準時間 ≥ min_time_ms（避免雜訊主導極短階段）時標記為退化。
+
+    Args:
+        baseline: 基準結果
+        candidate: 待比較結果
+        threshold: 退化門檻（相對變化，0.10 = 慢 10%）
+        min_time_ms: 參與判定的最短基準時間（ms）
+
+    Returns:
+        List[dict]: 每列 {'key', 'metric', 'baseline_ms', 'candidate_ms', 'change', 'regression'}
+    """
+    base_entries = {_entry_key(e): e for e in baseline.get('benchmarks', [])}
+    rows = []
+    for entry in candidate.get('benchmarks', []):
+        key = _entry_key(entry)
+        base = base_entries.get(key)
+        if base is None or base.get('total_time_ms') is None or entry.get('total_time_ms') is None:
+            continue
+
+        metrics = [('total', base['total_time_ms'], entry['total_time_ms'])]
+        for name, stats in entry.get('stages', {}).items():
+            if name in base.get('stages', {}):
+                metrics.append((name, base['stages'][name]['time_ms'], stats['time_ms']))
+
+        for metric, base_ms, cand_ms in metrics:
+            change = (cand_ms - base_ms) / base_ms if base_ms > 0 else 0.0
+            rows.append({
+                'key': key,
+                'metric': metric,
+                'baseline_ms': base_ms,
+                'candidate_ms': cand_ms,
+                'change': change,
+                'regression': base_ms >= min_time_ms and change > threshold,
+            })
+    return rows
+
+
+def format_comparison(rows: List[dict], threshold: float) -> str:
+    """將比較結果格式化為文字表格"""
+    if not rows:
+        return "沒有可比較的基準項目"
+
+    lines = [f"{'項目':<52} {'階段':<26} {'基準 ms':>10} {'新 ms':>10} {'變化':>8}"]
+    for row in rows:
+        flag = "  ❌ 退化" if row['regression'] else ""
+        lines.append(
+            f"{row['key']:<52} {row['metric']:<26} {row['baseline_ms']:>10.1f} "
+            f"{row['candidate_ms']:>10.1f} {row['change'] * 100:>+7.1f}%{flag}"
+        )
+    regressions = sum(r['regression'] for r in rows)
+    lines.append(f"\n退化（> {threshold * 100:.0f}%）: {regressions} / {len(rows)}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 效能基準測試套件")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="執行基準測試並寫出 JSON")
+    run_parser.add_argument('--megapixels', type=float, nargs='+', default=list(RESOLUTIONS_MP),
+                            help="解析度列表（MP），預設 1 6 13.5 24 50")
+    run_parser.add_argument('--tiers', nargs='+', choices=list(QUALITY_TIERS), help="處理模式篩選")
+    run_parser.add_argument('--films', nargs='+', help="膠片篩選")
+    run_parser.add_argument('--repeat', type=int, default=3, help="每個配置的重複次數")
+    run_parser.add_argument('--no-warmup', action='store_true', help="跳過暖機")
+    run_parser.add_argument('--track-memory', action='store_true', help="記錄各階段記憶體配置（較慢）")
+    run_parser.add_argument('--quick', action='store_true', help="快速檢查：1 MP、單次")
+    run_parser.add_argument('--output', type=Path, help="輸出 JSON 路徑")
+
+    compare_parser = subparsers.add_parser('compare', help="比較兩次基準測試")
+    compare_parser.add_argument('baseline', type=Path)
+    compare_parser.add_argument('candidate', type=Path)
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help="退化門檻（預設 0.10 = 10%%）")
+    compare_parser.add_argument('--min-time-ms', type=float, default=5.0, help="參與判定的最短階段時間")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        megapixels = [1.0] if args.quick else args.megapixels
+        repeat = 1 if args.quick else args.repeat
+        print("=" * 70)
+        print("  Phos 效能基準測試")
+        print("=" * 70)
+        report = run_benchmarks(megapixels, tiers=args.tiers, films=args.films, repeat=repeat,
+                                warmup=not args.no_warmup, track_memory=args.track_memory)
+        path = save_report(report, args.output)
+        print(f"\n結果已寫入: {path}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+    rows = compare_reports(baseline, candidate, threshold=args.threshold, min_time_ms=args.min_time_ms)
+    print(format_comparison(rows, args.threshold))
+    return 1 if any(r['regression'] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
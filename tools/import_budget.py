@@ -0,0 +1,183 @@
+"""
+導入時間預算檢查（python -X importtime）
+
+以全新子行程執行 `python -X importtime -c "import <module>"`，解析 stderr：
+- 累計導入時間（多次執行取最小值，降低冷快取與排程雜訊）
+- 自身耗時最高的模組（定位退化來源）
+- 已載入模組集合（檢查 UI / 重量級依賴未被核心路徑拉入）
+
+核心模組（phos_core、modules、film_models、phos_batch）不得導入
+streamlit、PIL、scipy：這些只在 UI 或編碼時於函數內延遲導入，
+CLI 與批次 worker 冷啟動因此只需 numpy + OpenCV。
+
+用法：
+    python tools/import_budget.py                  # 檢查所有預算（超出時結束碼為 1）
+    python tools/import_budget.py --module phos_core --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 添加專案根目錄到路徑
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+# ============================================================
+# 預算設定
+# ============================================================
+
+UI_ONLY_MODULES = ('streamlit', 'PIL', 'scipy')
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    """
+    單一模組的導入預算
+
+    Attributes:
+        cumulative_ms: 累計導入時間上限（含 numpy 等依賴）
+        forbidden: 不得被導入的頂層套件
+    """
+    cumulative_ms: float
+    forbidden: Tuple[str, ...] = UI_ONLY_MODULES
+
+
+# 2026-10 量測（numpy 約 95 ms，OpenCV 約 10-30 ms）：phos_core 約 165 ms，
+# 移除頂層 streamlit 導入前約 500 ms；預算約留 2 倍餘裕
+IMPORT_BUDGETS: Dict[str, ImportBudget] = {
+    'film_models': ImportBudget(cumulative_ms=250.0),
+    'modules': ImportBudget(cumulative_ms=300.0),
+    'phos_core': ImportBudget(cumulative_ms=350.0),
+    'phos_batch': ImportBudget(cumulative_ms=350.0),
+}
+
+
+# ============================================================
+# 量測
+# ============================================================
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    解析 -X importtime 輸出
+
+    Returns:
+        List[Tuple[str, int, int]]: [(模組名稱, 自身 µs, 累計 µs), ...]（依導入完成順序）
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表頭
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return entries
+
+
+def measure_import(module: str, runs: int = 3) -> dict:
+    """
+    在全新子行程中量測模組導入時間
+
+    Args:
+        module: 模組名稱
+        runs: 執行次數（累計時間取最小值）
+
+    Returns:
+        dict: {'module', 'cumulative_ms', 'runs_ms', 'loaded', 'top_self'}
+            loaded: 已載入的模組名稱（排序）
+            top_self: [(模組名稱, 自身 ms), ...]（依自身耗時遞減）
+
+    Raises:
+        RuntimeError: 導入失敗
+    """
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get('PYTHONPATH')]))}
+    runs_ms, best = [], None
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+            raise RuntimeError(f"導入 {module} 失敗: {tail[0]}")
+        entries = parse_importtime(proc.stderr)
+        cumulative = next((cum for name, _, cum in reversed(entries) if name == module), None)
+        if cumulative is None:
+            raise RuntimeError(f"importtime 輸出中找不到 {module}")
+        runs_ms.append(cumulative / 1000.0)
+        if best is None or runs_ms[-1] <= min(runs_ms):
+            best = entries
+
+    top_self = sorted(((name, self_us / 1000.0) for name, self_us, _ in best), key=lambda e: -e[1])
+    return {
+        'module': module,
+        'cumulative_ms': min(runs_ms),
+        'runs_ms': runs_ms,
+        'loaded': sorted({name for name, _, _ in best}),
+        'top_self': top_self,
+    }
+
+
+def check_import_budget(report: dict, budget: ImportBudget) -> List[str]:
+    """
+    檢查導入量測是否在預算內
+
+    Returns:
+        List[str]: 違規描述（空列表表示通過）
+    """
+    violations = []
+    if report['cumulative_ms'] > budget.cumulative_ms:
+        violations.append(
+            f"{report['module']} 導入 {report['cumulative_ms']:.1f} ms > 預算 {budget.cumulative_ms:.1f} ms"
+        )
+    loaded_packages = {name.split('.')[0] for name in report['loaded']}
+    for package in budget.forbidden:
+        if package in loaded_packages:
+            violations.append(f"{report['module']} 導入了 {package}（應在使用處延遲導入）")
+    return violations
+
+
+def format_import_report(report: dict, top: int = 10) -> str:
+    """將量測結果格式化為文字"""
+    runs = ", ".join(f"{ms:.1f}" for ms in report['runs_ms'])
+    lines = [f"{report['module']}: {report['cumulative_ms']:.1f} ms（各次: {runs}）"]
+    for name, self_ms in report['top_self'][:top]:
+        lines.append(f"    {self_ms:>8.2f} ms  {name}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 導入時間預算檢查")
+    parser.add_argument('--module', nargs='+', help="量測的模組（預設所有已設定預算的模組）")
+    parser.add_argument('--runs', type=int, default=3, help="每個模組的執行次數")
+    parser.add_argument('--top', type=int, default=10, help="列出自身耗時最高的模組數")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.module or sorted(IMPORT_BUDGETS):
+        report = measure_import(module, runs=args.runs)
+        print(format_import_report(report, top=args.top))
+        budget = IMPORT_BUDGETS.get(module)
+        if budget is not None:
+            violations = check_import_budget(report, budget)
+            for violation in violations:
+                print(f"  ❌ {violation}")
+            if not violations:
+                print(f"  ✅ 預算內（{budget.cumulative_ms:.0f} ms）")
+            failed = failed or bool(violations)
+        print()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
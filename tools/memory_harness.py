@@ -0,0 +1,292 @@
+"""
+峰值記憶體量測工具（tracemalloc + RSS 取樣，逐階段歸因）
+
+以 tools/benchmark_suite 的完整管線執行單次渲染：
+- tracemalloc：由 PerformanceMonitor 逐階段記錄峰值配置量 / 留存量 / 絕對追蹤峰值
+- RSS：背景執行緒以固定間隔取樣行程常駐記憶體，依時間戳歸因到各階段
+  （涵蓋 OpenCV / FFT 等不經過 tracemalloc 的原生配置）
+
+並提供預算斷言，供測試捕捉記憶體退化，例如：
+
+    report = measure_render("Portra400_MediumPhysics_Mie", 13.5)
+    assert_memory_budget(report, peak_mb=6000, stages={'wavelength_bloom': 1500})
+
+用法：
+    python tools/memory_harness.py --film Portra400_MediumPhysics_Mie --megapixels 13.5
+    python tools/memory_harness.py --film Portra400 --tier spectral --megapixels 6 --budget-mb 8000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.benchmark_suite import (
+    BENCHMARK_CASES,
+    BenchmarkCase,
+    QUALITY_TIERS,
+    make_test_scene,
+    resolution_for_megapixels,
+    run_pipeline_once,
+)
+
+try:
+    import psutil
+except ImportError:  # psutil 為開發依賴，缺少時僅停用 RSS 取樣
+    psutil = None
+
+
+MB = 1024 * 1024
+
+
+# ============================================================
+# RSS 取樣
+# ============================================================
+
+class RSSSampler:
+    """
+    背景 RSS 取樣器
+
+    以 `with RSSSampler(interval=0.01) as sampler:` 包住待測程式碼，
+    結束後 `sampler.samples` 為 [(epoch µs, rss bytes), ...]。
+    psutil 不可用時不取樣（samples 為空）。
+
+    Args:
+        interval: 取樣間隔（秒）
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._process = psutil.Process(os.getpid()) if psutil is not None else None
+
+    def _sample(self):
+        self.samples.append((time.time_ns() / 1000.0, self._process.memory_info().rss))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if self._process is None:
+            warnings.warn("psutil 未安裝，停用 RSS 取樣（僅保留 tracemalloc 量測）")
+            return self
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+    @property
+    def baseline_bytes(self) -> Optional[int]:
+        return self.samples[0][1] if self.samples else None
+
+    @property
+    def peak_bytes(self) -> Optional[int]:
+        return max(rss for _, rss in self.samples) if self.samples else None
+
+
+# ============================================================
+# 量測與歸因
+# ============================================================
+
+def attribute_memory(profile: dict, samples: Sequence[tuple] = ()) -> dict:
+    """
+    將 tracemalloc 與 RSS 取樣歸因到各階段
+
+    Args:
+        profile: PerformanceMonitor.to_dict()（需 track_memory=True）
+        samples: RSSSampler.samples
+
+    Returns:
+        dict: {
+            'stages': {name: {'peak_alloc_mb', 'retained_mb', 'traced_peak_mb', 'rss_peak_mb'}},
+            'peak_traced_mb': float,      # 整個渲染的 tracemalloc 絕對峰值
+            'peak_rss_mb': float | None,  # 整個渲染的 RSS 峰值
+            'rss_baseline_mb': float | None,
+            'peak_stage': str | None      # 絕對追蹤峰值所在階段
+        }
+    """
+    stages = {}
+    for stage in profile.get('stages', []):
+        if 'allocated_bytes' not in stage:
+            continue
+        start = stage['start_us']
+        end = start + stage['wall_ms'] * 1000.0
+        in_stage = [rss for ts, rss in samples if start <= ts <= end]
+
+        stats = stages.setdefault(stage['name'], {
+            'peak_alloc_mb': 0.0, 'retained_mb': 0.0, 'traced_peak_mb': 0.0, 'rss_peak_mb': None,
+        })
+        stats['peak_alloc_mb'] = max(stats['peak_alloc_mb'], stage['allocated_bytes'] / MB)
+        stats['retained_mb'] += stage['retained_bytes'] / MB
+        stats['traced_peak_mb'] = max(stats['traced_peak_mb'], stage['peak_traced_bytes'] / MB)
+        if in_stage:
+            stats['rss_peak_mb'] = max(stats['rss_peak_mb'] or 0.0, max(in_stage) / MB)
+
+    peak_stage = max(stages, key=lambda n: stages[n]['traced_peak_mb']) if stages else None
+    return {
+        'stages': stages,
+        'peak_traced_mb': stages[peak_stage]['traced_peak_mb'] if peak_stage else 0.0,
+        'peak_rss_mb': max(rss for _, rss in samples) / MB if samples else None,
+        'rss_baseline_mb': samples[0][1] / MB if samples else None,
+        'peak_stage': peak_stage,
+    }
+
+
+def _find_case(film_name: str, tier: Optional[str] = None) -> BenchmarkCase:
+    for case in BENCHMARK_CASES:
+        if case.film_name == film_name and (tier is None or case.tier == tier):
+            return case
+    # 不在基準矩陣中的膠片：依模式建立臨時配置
+    tier = tier or ('physical' if film_name.endswith(('_Mie', '_MediumPhysics')) else 'empirical')
+    if tier not in QUALITY_TIERS:
+        raise ValueError(f"未知的處理模式: {tier}. 可用模式: {', '.join(QUALITY_TIERS)}")
+    return BenchmarkCase(tier, film_name, 'custom', film_name)
+
+
+def measure_render(film_name: str, megapixels: float, tier: Optional[str] = None,
+                   sample_interval: float = 0.01, seed: int = 0) -> dict:
+    """
+    量測單次完整渲染的峰值與留存記憶體
+
+    Args:
+        film_name: 膠片名稱
+        megapixels: 輸入解析度（MP）
+        tier: 處理模式（'empirical' / 'physical' / 'spectral'，預設依膠片推斷）
+        sample_interval: RSS 取樣間隔（秒）
+        seed: 合成場景種子
+
+    Returns:
+        dict: attribute_memory() 的結果，另含 'film_name', 'tier', 'resolution', 'megapixels'
+    """
+    case = _find_case(film_name, tier)
+    width, height = resolution_for_megapixels(megapixels)
+    jpeg_bytes = cv2.imencode('.jpg', make_test_scene(width, height, seed=seed),
+                              [cv2.IMWRITE_JPEG_QUALITY, 95])[1]
+
+    with RSSSampler(interval=sample_interval) as sampler:
+        profile = run_pipeline_once(jpeg_bytes, case, track_memory=True)
+
+    report = attribute_memory(profile, sampler.samples)
+    report.update({
+        'film_name': case.film_name,
+        'tier': case.tier,
+        'resolution': {'width': width, 'height': height},
+        'megapixels': width * height / 1e6,
+    })
+    return report
+
+
+# ============================================================
+# 預算斷言
+# ============================================================
+
+def check_memory_budget(report: dict, peak_mb: Optional[float] = None,
+                        rss_mb: Optional[float] = None,
+                        stages: Optional[Dict[str, float]] = None) -> List[str]:
+    """
+    檢查量測結果是否符合記憶體預算
+
+    Args:
+        report: measure_render() 的結果
+        peak_mb: 整體 tracemalloc 峰值預算（MB）
+        rss_mb: 整體 RSS 峰值預算（MB，RSS 不可用時略過）
+        stages: 各階段峰值配置預算 {stage: MB}
+
+    Returns:
+        List[str]: 超出預算的描述（空列表表示通過）
+    """
+    violations = []
+    if peak_mb is not None and report['peak_traced_mb'] > peak_mb:
+        violations.append(
+            f"整體追蹤峰值 {report['peak_traced_mb']:.1f} MB 超出預算 {peak_mb:.1f} MB"
+            f"（峰值階段: {report['peak_stage']}）"
+        )
+    if rss_mb is not None and report['peak_rss_mb'] is not None and report['peak_rss_mb'] > rss_mb:
+        violations.append(f"RSS 峰值 {report['peak_rss_mb']:.1f} MB 超出預算 {rss_mb:.1f} MB")
+    for name, budget in (stages or {}).items():
+        if name not in report['stages']:
+            violations.append(f"階段 {name} 未執行，無法檢查預算")
+            continue
+        used = report['stages'][name]['peak_alloc_mb']
+        if used > budget:
+            violations.append(f"階段 {name} 峰值配置 {used:.1f} MB 超出預算 {budget:.1f} MB")
+    return violations
+
+
+def assert_memory_budget(report: dict, peak_mb: Optional[float] = None,
+                         rss_mb: Optional[float] = None,
+                         stages: Optional[Dict[str, float]] = None):
+    """
+    斷言量測結果符合記憶體預算（供 pytest 使用）
+
+    Raises:
+        AssertionError: 任一預算超出時，訊息列出所有超出項目
+    """
+    violations = check_memory_budget(report, peak_mb=peak_mb, rss_mb=rss_mb, stages=stages)
+    assert not violations, (
+        f"{report['film_name']} ({report['tier']}, {report['megapixels']:.1f} MP) 記憶體預算超出：\n  "
+        + "\n  ".join(violations)
+    )
+
+
+def format_memory_report(report: dict) -> str:
+    """將量測結果格式化為文字表格"""
+    lines = [
+        f"{report['film_name']} ({report['tier']}) @ {report['resolution']['width']}x"
+        f"{report['resolution']['height']} ({report['megapixels']:.1f} MP)",
+        f"{'階段':<26} {'峰值配置 MB':>12} {'留存 MB':>10} {'追蹤峰值 MB':>12} {'RSS 峰值 MB':>12}",
+    ]
+    for name, stats in report['stages'].items():
+        rss = f"{stats['rss_peak_mb']:.1f}" if stats['rss_peak_mb'] is not None else "-"
+        lines.append(
+            f"{name:<26} {stats['peak_alloc_mb']:>12.1f} {stats['retained_mb']:>10.1f} "
+            f"{stats['traced_peak_mb']:>12.1f} {rss:>12}"
+        )
+    lines.append(f"\n整體追蹤峰值: {report['peak_traced_mb']:.1f} MB（{report['peak_stage']}）")
+    if report['peak_rss_mb'] is not None:
+        lines.append(f"RSS 峰值: {report['peak_rss_mb']:.1f} MB（起點 {report['rss_baseline_mb']:.1f} MB）")
+    return "\n".join(lines)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 峰值記憶體量測工具")
+    parser.add_argument('--film', default="Portra400_MediumPhysics_Mie", help="膠片名稱")
+    parser.add_argument('--tier', choices=list(QUALITY_TIERS), help="處理模式（預設依膠片推斷）")
+    parser.add_argument('--megapixels', type=float, default=13.5, help="輸入解析度（MP）")
+    parser.add_argument('--budget-mb', type=float, help="整體追蹤峰值預算（MB），超出時結束碼為 1")
+    parser.add_argument('--rss-budget-mb', type=float, help="RSS 峰值預算（MB）")
+    args = parser.parse_args(argv)
+
+    report = measure_render(args.film, args.megapixels, tier=args.tier)
+    print(format_memory_report(report))
+
+    violations = check_memory_budget(report, peak_mb=args.budget_mb, rss_mb=args.rss_budget_mb)
+    for violation in violations:
+        print(f"❌ {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+渲染服務負載測試（phos_service 的本機 HTTP 客戶端）
+
+以 asyncio 客戶端對渲染服務發出並行請求：
+- 提交：POST /jobs（429 時依 Retry-After 等待後重試，計入被拒次數）
+- 輪詢：GET /jobs/<id> 直到完成 / 失敗（記錄最後看到的階段）
+- 取回：GET /jobs/<id>/result
+
+請求由 --unique 張不同的合成場景循環組成，重複的請求應由服務去重或由渲染快取直接返回。
+未指定 --url 時於本行程啟動服務（隨機埠，使用暫存渲染快取目錄，結束時關閉）。
+
+回報端到端延遲（p50 / p95 / 最大）、吞吐量、429 次數、去重 / 快取命中數與失敗數。
+
+用法：
+    python tools/service_load_test.py                                  # 本行程服務，8 個請求
+    python tools/service_load_test.py --requests 32 --unique 4 --concurrency 16 --queue-size 4
+    python tools/service_load_test.py --url http://127.0.0.1:8765 --output test_outputs/service_load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, urlsplit
+
+import cv2
+import numpy as np
+
+# 添加專案根目錄到路徑
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from tools.benchmark_suite import make_test_scene, resolution_for_megapixels
+
+
+# ============================================================
+# HTTP 客戶端
+# ============================================================
+
+async def http_request(host: str, port: int, method: str, path: str,
+                       body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+    """
+    發出一個 HTTP/1.1 請求（Connection: close）
+
+    Args:
+        host, port: 服務位址
+        method: HTTP 方法
+        path: 路徑（含查詢字串）
+        body: 請求本體
+
+    Returns:
+        (狀態碼, 標頭（小寫鍵）, 本體)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        payload = await reader.readexactly(length) if length else b""
+        return status, headers, payload
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+# ============================================================
+# 負載測試
+# ============================================================
+
+@dataclass
+class RequestResult:
+    """單一請求的結果"""
+    index: int
+    status: str = "pending"  # done / failed / rejected
+    job_id: Optional[str] = None
+    latency_s: float = 0.0
+    rejections: int = 0  # 429 次數
+    deduplicated: bool = False
+    cached: bool = False
+    stages_seen: List[str] = field(default_factory=list)
+    result_bytes: int = 0
+    error: Optional[str] = None
+
+
+def make_inputs(unique: int, megapixels: float) -> List[bytes]:
+    """生成 unique 張不同的合成場景 JPEG"""
+    width, height = resolution_for_megapixels(megapixels)
+    inputs = []
+    for seed in range(unique):
+        ok, encoded = cv2.imencode('.jpg', make_test_scene(width, height, seed=seed),
+                                   [cv2.IMWRITE_JPEG_QUALITY, 92])
+        inputs.append(encoded.tobytes())
+    return inputs
+
+
+async def run_request(index: int, host: str, port: int, data: bytes, query: str,
+                      poll_interval: float, max_rejections: int) -> RequestResult:
+    """提交、輪詢並取回一個請求"""
+    result = RequestResult(index)
+    start = time.perf_counter()
+    try:
+        while True:
+            status, headers, body = await http_request(host, port, "POST", f"/jobs?{query}", data)
+            if status != 429:
+                break
+            result.rejections += 1
+            if result.rejections > max_rejections:
+                result.status = "rejected"
+                result.error = json.loads(body).get('error')
+                return result
+            await asyncio.sleep(min(float(headers.get('retry-after', 1)), poll_interval * 20))
+        info = json.loads(body)
+        if status not in (200, 202):
+            result.status = "failed"
+            result.error = info.get('error')
+            return result
+        result.job_id = info['job_id']
+        result.deduplicated = info.get('deduplicated', False)
+
+        while info['status'] not in ("done", "failed"):
+            await asyncio.sleep(poll_interval)
+            status, _, body = await http_request(host, port, "GET", f"/jobs/{result.job_id}")
+            info = json.loads(body)
+            if info.get('stage') and info['stage'] not in result.stages_seen:
+                result.stages_seen.append(info['stage'])
+        result.cached = info.get('cached', False)
+        if info['status'] == "failed":
+            result.status = "failed"
+            result.error = info.get('error')
+            return result
+
+        status, headers, body = await http_request(host, port, "GET", f"/jobs/{result.job_id}/result")
+        if status != 200 or headers.get('content-type') != "image/jpeg":
+            result.status = "failed"
+            result.error = f"取回結果失敗: HTTP {status}"
+            return result
+        result.result_bytes = len(body)
+        result.status = "done"
+        return result
+    except (OSError, asyncio.IncompleteReadError, ValueError, KeyError) as e:
+        result.status = "failed"
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    finally:
+        result.latency_s = time.perf_counter() - start
+
+
+async def run_load_test(url: str, inputs: Sequence[bytes], requests: int, concurrency: int,
+                        film: str = "Portra400", seed: Optional[int] = 0,
+                        poll_interval: float = 0.5, max_rejections: int = 100) -> dict:
+    """
+    對服務執行負載測試
+
+    Args:
+        url: 服務位址（http://host:port）
+        inputs: 輸入圖像（依請求序號循環使用）
+        requests: 請求總數
+        concurrency: 同時進行的請求數
+        film: 胶片類型
+        seed: 隨機種子（None = 不指定）
+        poll_interval: 狀態輪詢間隔（秒）
+        max_rejections: 單一請求可接受的 429 次數上限
+
+    Returns:
+        dict: 負載測試報告
+    """
+    address = urlsplit(url)
+    host, port = address.hostname, address.port or 80
+    query = f"film={quote(film)}" + (f"&seed={seed}" if seed is not None else "")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(index: int) -> RequestResult:
+        async with semaphore:
+            return await run_request(index, host, port, inputs[index % len(inputs)], query,
+                                     poll_interval, max_rejections)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    _, _, health = await http_request(host, port, "GET", "/health")
+    return summarize(results, wall, json.loads(health))
+
+
+def summarize(results: Sequence[RequestResult], wall_s: float, health: Optional[dict] = None) -> dict:
+    """
+    彙整負載測試結果
+
+    Returns:
+        dict: {'requests', 'completed', 'failed', 'rejected', 'rejections', 'deduplicated',
+               'cached', 'wall_s', 'throughput_rps', 'latency_s': {'p50', 'p95', 'max'},
+               'service': /health 回應, 'results': [...]}
+    """
+    latencies = np.array([r.latency_s for r in results if r.status == "done"])
+    percentiles = {
+        'p50': float(np.percentile(latencies, 50)) if latencies.size else None,
+        'p95': float(np.percentile(latencies, 95)) if latencies.size else None,
+        'max': float(latencies.max()) if latencies.size else None,
+    }
+    completed = sum(r.status == "done" for r in results)
+    return {
+        'requests': len(results),
+        'completed': completed,
+        'failed': sum(r.status == "failed" for r in results),
+        'rejected': sum(r.status == "rejected" for r in results),
+        'rejections': sum(r.rejections for r in results),
+        'deduplicated': sum(r.deduplicated for r in results),
+        'cached': sum(r.cached for r in results),
+        'wall_s': wall_s,
+        'throughput_rps': completed / wall_s if wall_s > 0 else 0.0,
+        'latency_s': percentiles,
+        'service': health,
+        'results': [asdict(r) for r in results],
+    }
+
+
+def format_load_report(report: dict) -> str:
+    """格式化負載測試報告"""
+    latency = report['latency_s']
+
+    def seconds(value):
+        return f"{value:.2f}s" if value is not None else "-"
+
+    lines = [
+        "=== 渲染服務負載測試 ===",
+        f"請求: {report['requests']}  完成: {report['completed']}  失敗: {report['failed']}"
+        f"  放棄（429 過多）: {report['rejected']}",
+        f"429 回應: {report['rejections']}  去重: {report['deduplicated']}  快取命中: {report['cached']}",
+        f"總時間: {report['wall_s']:.2f}s  吞吐量: {report['throughput_rps']:.3f} 請求/秒",
+        f"延遲: p50 {seconds(latency['p50'])} · p95 {seconds(latency['p95'])} · 最大 {seconds(latency['max'])}",
+    ]
+    if report.get('service'):
+        lines.append(f"服務: {json.dumps(report['service'], ensure_ascii=False)}")
+    for result in report['results']:
+        if result['error']:
+            lines.append(f"  ❌ #{result['index']}: {result['error']}")
+    return "\n".join(lines)
+
+
+async def _run_with_local_service(args, inputs: Sequence[bytes]) -> dict:
+    from phos_service import RenderService, serve
+
+    started = asyncio.get_running_loop().create_future()
+    service = RenderService(workers=args.workers, queue_size=args.queue_size)
+    server_task = asyncio.create_task(
+        serve("127.0.0.1", 0, service, ready=lambda server: started.set_result(server.sockets[0].getsockname()))
+    )
+    try:
+        host, port = await asyncio.wait_for(asyncio.shield(started), timeout=120)
+        return await run_load_test(f"http://{host}:{port}", inputs, args.requests, args.concurrency,
+                                   args.film, args.seed, args.poll_interval, args.max_rejections)
+    finally:
+        server_task.cancel()
+        await asyncio.gather(server_task, return_exceptions=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Phos 渲染服務負載測試")
+    parser.add_argument('--url', help="服務位址（預設於本行程啟動服務）")
+    parser.add_argument('--requests', type=int, default=8, help="請求總數")
+    parser.add_argument('--unique', type=int, default=4, help="不同輸入圖像數（其餘為重複請求）")
+    parser.add_argument('--concurrency', type=int, default=8, help="同時進行的請求數")
+    parser.add_argument('--megapixels', type=float, default=1.0, help="輸入解析度（MP）")
+    parser.add_argument('--film', default="Portra400", help="膠片名稱")
+    parser.add_argument('--seed', type=int, default=0, help="隨機種子")
+    parser.add_argument('--poll-interval', type=float, default=0.5, help="狀態輪詢間隔（秒）")
+    parser.add_argument('--max-rejections', type=int, default=100, help="單一請求的 429 次數上限")
+    parser.add_argument('--workers', type=int, default=None, help="本行程服務的並行渲染數")
+    parser.add_argument('--queue-size', type=int, default=8, help="本行程服務的佇列上限")
+    parser.add_argument('--output', help="寫入 JSON 報告")
+    args = parser.parse_args(argv)
+
+    inputs = make_inputs(max(args.unique, 1), args.megapixels)
+    if args.url:
+        report = asyncio.run(run_load_test(args.url, inputs, args.requests, args.concurrency, args.film,
+                                           args.seed, args.poll_interval, args.max_rejections))
+    else:
+        # 本行程服務使用暫存渲染快取，結果不受先前執行影響
+        from phos_cache import RENDER_CACHE_DIR_ENV
+
+        with tempfile.TemporaryDirectory(prefix="phos_render_cache_") as cache_dir:
+            os.environ.setdefault(RENDER_CACHE_DIR_ENV, cache_dir)
+            report = asyncio.run(_run_with_local_service(args, inputs))
+
+    print(format_load_report(report))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report['failed'] == 0 and report['rejected'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
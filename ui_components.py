@@ -11,10 +11,8 @@ Phos UI Components - Streamlit 界面組件
 """
 
 import streamlit as st  # type: ignore
-import cv2  # type: ignore
 import time
-import io
-from PIL import Image
+import json
 from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 
@@ -26,8 +24,11 @@ from phos_batch import (
     create_zip_archive,
     generate_zip_filename,
     validate_batch_size,
-    estimate_processing_time
+    estimate_processing_time,
+    batch_trace_events
 )
+from phos_core import build_chrome_trace, trace_events_from_profile
+from phos_output import get_output_service, new_render_id
 
 
 # ==================== CSS 樣式 ====================
@@ -358,11 +359,14 @@ def render_sidebar() -> Dict[str, Any]:
             - processing_mode: str
             - film_type: str
             - grain_style: str
+            - seed: int | None（固定顆粒種子；None = 每次渲染不同）
             - tone_style: str
             - physics_mode: PhysicsMode
             - physics_params: dict
             - uploaded_image: UploadedFile | None
             - uploaded_images: List[UploadedFile] | None
+            - profile_stages: bool（階段剖析，預設關閉）
+            - profile_memory: bool（剖析時以 tracemalloc 追蹤記憶體，預設關閉）
     """
     with st.sidebar:
         # 應用標題
@@ -573,16 +577,16 @@ def render_sidebar() -> Dict[str, Any]:
         )
         
         # 顯示選中底片的詳細資訊
-        film_profiles = film_models.create_film_profiles()
-        film_profile = film_profiles.get(film_type)
-        if film_profile:
-            display_name = film_profile.display_name or film_profile.name
-            brand = film_profile.brand or "Unknown"
-            film_type_label = film_profile.film_type or ("🎨 彩色負片" if film_profile.color_type == "color" else "⚫ 黑白負片")
-            iso = film_profile.iso_rating or "ISO 400"
-            description = film_profile.description or "No description available."
-            features = film_profile.features or []
-            best_for = film_profile.best_for or "General photography"
+        # 僅讀取靜態元數據索引，不建構胶片配置
+        film_info = film_models.FILM_CATALOG.get(film_type)
+        if film_info:
+            display_name = film_info.display_name or film_info.name
+            brand = film_info.brand or "Unknown"
+            film_type_label = film_info.film_type or ("🎨 彩色負片" if film_info.color_type == "color" else "⚫ 黑白負片")
+            iso = film_info.iso_rating or "ISO 400"
+            description = film_info.description or "No description available."
+            features = film_info.features or []
+            best_for = film_info.best_for or "General photography"
             
             st.markdown(f"""
             <div style='background: linear-gradient(135deg, rgba(26, 31, 46, 0.8), rgba(26, 31, 46, 0.5)); 
@@ -657,6 +661,16 @@ def render_sidebar() -> Dict[str, Any]:
             index=default_grain_index,
             help="選擇胶片的顆粒度",
         )
+
+        # 顆粒種子：未固定時每次渲染的顆粒樣式不同，不使用渲染快取
+        fix_seed = st.checkbox(
+            "🎲 固定顆粒種子",
+            value=False,
+            help="固定後相同照片與設定的顆粒樣式可重現，並重用渲染快取"
+        )
+        seed = None
+        if fix_seed:
+            seed = int(st.number_input("種子", min_value=0, max_value=2**32 - 1, value=0, step=1))
         
         # 曲線映射選擇（根據預設決定 index）
         tone_options = ["filmic", "reinhard"]
@@ -712,6 +726,20 @@ def render_sidebar() -> Dict[str, Any]:
         # 物理模式設定（傳入 processing_quality、film_type 和 illuminant_choice）
         physics_mode, physics_params = _render_physics_settings(processing_quality, film_type, illuminant_choice)
         
+        # 診斷選項：剖析與 tracemalloc 會拖慢處理，僅在需要階段分解 / trace 時開啟
+        with st.expander("🩺 診斷", expanded=False):
+            profile_stages = st.checkbox(
+                "⏱️ 階段剖析",
+                value=False,
+                help="記錄各處理階段耗時，提供階段耗時分解與 Chrome Trace 下載（略增開銷，且不使用渲染快取）"
+            )
+            profile_memory = st.checkbox(
+                "🧠 追蹤各階段記憶體",
+                value=False,
+                disabled=not profile_stages,
+                help="以 tracemalloc 記錄各階段的配置量與峰值（明顯拖慢處理）"
+            )
+        
         st.divider()
         
         # 文件上傳器
@@ -721,11 +749,14 @@ def render_sidebar() -> Dict[str, Any]:
         'processing_mode': processing_mode,
         'film_type': film_type,
         'grain_style': grain_style,
+        'seed': seed,
         'tone_style': tone_style,
         'physics_mode': physics_mode,
         'physics_params': physics_params,
         'uploaded_image': uploaded_image,
-        'uploaded_images': uploaded_images
+        'uploaded_images': uploaded_images,
+        'profile_stages': profile_stages,
+        'profile_memory': profile_stages and profile_memory
     }
 
 
@@ -1021,62 +1052,121 @@ def _render_file_uploaders(processing_mode: str) -> Tuple[Optional[Any], Optiona
 
 # ==================== 結果顯示 ====================
 
-def render_single_image_result(film_image: np.ndarray, process_time: float,
+def format_stage_profile(profile: Dict[str, Any]) -> str:
+    """
+    將階段剖析報告（PerformanceMonitor.to_dict()）格式化為 Markdown 表格
+    
+    Args:
+        profile: 階段剖析報告
+        
+    Returns:
+        str: Markdown 表格（依執行順序列出各階段）
+    """
+    stages = profile.get('stages', [])
+    if not stages:
+        return "無效能數據"
+    
+    total_wall = profile.get('total_wall_ms', 0.0)
+    lines = [
+        "| 階段 | Wall (ms) | CPU (ms) | 佔比 | 配置記憶體 (MB) |",
+        "|---|---:|---:|---:|---:|",
+    ]
+    for stage in stages:
+        share = stage['wall_ms'] / total_wall * 100 if total_wall > 0 else 0.0
+        allocated = stage.get('allocated_bytes')
+        allocated_str = f"{allocated / 1024 / 1024:.1f}" if allocated is not None else "-"
+        # 巢狀階段（如並行通道鏈中的階段）縮排顯示，其時間已含於上層階段
+        name = f"↳ {stage['name']}" if 'parent' in stage else stage['name']
+        lines.append(
+            f"| {name} | {stage['wall_ms']:.1f} | {stage['cpu_ms']:.1f} "
+            f"| {share:.1f}% | {allocated_str} |"
+        )
+    lines.append(
+        f"| **總計** | **{total_wall:.1f}** | **{profile.get('total_cpu_ms', 0.0):.1f}** | 100% | |"
+    )
+    threads = profile.get('threads')
+    if threads:
+        lines.append("")
+        lines.append(
+            f"執行緒預算 {threads['budget']} 核（{threads['role']}）· 通道 worker {threads['channel_workers']}"
+            f" · OpenCV {threads['cv2_threads']} · BLAS {threads['blas_threads']}（{threads['blas_method']}）"
+            f" · numba/numexpr {threads['kernel_threads']} · 列帶 {threads.get('band_workers', 1)}"
+            f" · 並行通道內 {threads.get('channel_inner_threads', threads['cv2_threads'])}"
+        )
+    return "\n".join(lines)
+
+
+def render_single_image_result(film_image: Optional[np.ndarray], process_time: float,
                                physics_mode: PhysicsMode, output_path: str, 
-                               original_image: np.ndarray = None):
+                               original_image: np.ndarray = None,
+                               profile: Optional[Dict[str, Any]] = None,
+                               render_id: Optional[str] = None,
+                               original_size: Optional[Tuple[int, int]] = None):
     """
     顯示單張圖片處理結果（左右對比顯示 + 詳細統計）
     
+    結果只編碼一次 JPEG（背景執行緒，見 phos_output.OutputService），
+    檔案大小與下載共用同一份位元組；畫面顯示縮小的 JPEG 預覽。
+    統計數據取自編碼結果，因此渲染快取命中時（film_image 為 None，
+    編碼結果已以 render_id 加入服務）無需圖像陣列。
+    
     Args:
-        film_image: 處理後的圖像（BGR 格式）
+        film_image: 處理後的圖像（BGR 格式；None 表示使用服務中 render_id 的既有結果）
         process_time: 處理時間（秒）
         physics_mode: 使用的物理模式
         output_path: 輸出檔案名稱
-        original_image: 原始圖像（BGR 格式，可選）
+        original_image: 原始圖像（BGR 格式，可選；可為顯示尺寸的縮小副本）
+        profile: 階段剖析報告（PerformanceMonitor.to_dict()，可選）
+        render_id: 渲染 ID（相同 ID 重用已快取的編碼結果；None 時產生新 ID）
+        original_size: 原始圖像的 (寬, 高)（original_image 為縮小副本時提供）
     """
-    # 轉換 BGR 到 RGB
-    film_rgb = cv2.cvtColor(film_image, cv2.COLOR_BGR2RGB)
+    # 先排入 JPEG 編碼，繪製原圖與統計時於背景執行
+    trace_events = trace_events_from_profile(profile) if profile is not None else None
+    output_service = get_output_service()
+    render_id = render_id or new_render_id()
+    if film_image is not None:
+        output_service.submit(render_id, film_image, trace_events, original=original_image)
+    output = output_service.get(render_id)
     
     # 如果有原始圖片，顯示左右對比
-    if original_image is not None:
-        original_rgb = cv2.cvtColor(original_image, cv2.COLOR_BGR2RGB)
-        
+    if output.original_preview is not None:
         # 創建兩列布局
         col1, col2 = st.columns(2, gap="medium")
         
         with col1:
             st.markdown("### 📸 原始照片")
-            st.image(original_rgb, channels="RGB", width="stretch")
+            st.image(output.original_preview, width="stretch")
             
             # 原始圖像統計
-            orig_h, orig_w = original_rgb.shape[:2]
-            orig_size_mb = (original_rgb.nbytes / 1024 / 1024)
+            orig_w, orig_h = original_size or (original_image.shape[1], original_image.shape[0])
+            orig_mean = output.original_mean
+            orig_size_mb = (orig_w * orig_h * 3 / 1024 / 1024)
             with st.expander("📊 原始圖像資訊", expanded=False):
                 st.markdown(f"""
                 - **解析度**: {orig_w} × {orig_h} px
                 - **總像素**: {orig_w * orig_h:,} px
                 - **記憶體大小**: {orig_size_mb:.2f} MB
-                - **平均亮度**: {original_rgb.mean():.1f} / 255
+                - **平均亮度**: {orig_mean:.1f} / 255
                 """)
         
         with col2:
             st.markdown("### 🎞️ 底片效果")
-            st.image(film_rgb, channels="RGB", width="stretch")
+            st.image(output.preview, width="stretch")
             
             # 處理後圖像統計
-            film_h, film_w = film_rgb.shape[:2]
-            film_size_mb = (film_rgb.nbytes / 1024 / 1024)
+            film_w, film_h = output.width, output.height
+            film_size_mb = (film_w * film_h * 3 / 1024 / 1024)
             with st.expander("📊 處理後圖像資訊", expanded=False):
                 st.markdown(f"""
                 - **解析度**: {film_w} × {film_h} px
                 - **總像素**: {film_w * film_h:,} px
                 - **記憶體大小**: {film_size_mb:.2f} MB
-                - **平均亮度**: {film_rgb.mean():.1f} / 255
-                - **亮度變化**: {((film_rgb.mean() - original_rgb.mean()) / original_rgb.mean() * 100):+.1f}%
+                - **平均亮度**: {output.mean:.1f} / 255
+                - **亮度變化**: {((output.mean - orig_mean) / orig_mean * 100):+.1f}%
                 """)
     else:
         # 無原始圖片時，單獨顯示結果（向後相容）
-        st.image(film_rgb, channels="RGB", width=800)
+        st.image(output.preview, width=800)
     
     # 顯示處理統計（美化版本）
     st.markdown("""
@@ -1112,8 +1202,8 @@ def render_single_image_result(film_image: np.ndarray, process_time: float,
         """, unsafe_allow_html=True)
     
     with stat_col3:
-        if original_image is not None:
-            file_size_kb = len(cv2.imencode('.jpg', film_image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1]) / 1024
+        if output.original_preview is not None:
+            file_size_kb = output.size_kb
             st.markdown(f"""
             <div style='background: rgba(26, 31, 46, 0.8); padding: 1rem; border-radius: 10px; text-align: center; border: 1px solid rgba(102, 187, 106, 0.2);'>
                 <p style='color: #66BB6A; font-size: 0.8rem; margin: 0 0 0.25rem 0; font-weight: 600;'>💾 檔案大小</p>
@@ -1128,19 +1218,29 @@ def render_single_image_result(film_image: np.ndarray, process_time: float,
             </div>
             """, unsafe_allow_html=True)
     
-    # 下載按鈕
-    film_pil = Image.fromarray(film_rgb)
-    buf = io.BytesIO()
-    film_pil.save(buf, format="JPEG", quality=95)
-    byte_im = buf.getvalue()
+    # 階段耗時分解
+    if profile is not None:
+        with st.expander("⏱️ 階段耗時分解", expanded=False):
+            st.markdown(format_stage_profile(profile))
     
+    # 下載按鈕（全解析度 JPEG）
     st.download_button(
         label="📥 下載高清圖像",
-        data=byte_im,
+        data=output.data,
         file_name=output_path,
-        mime="image/jpeg",
+        mime=output.mime,
         use_container_width=True
     )
+    
+    # Chrome trace（Perfetto / chrome://tracing）
+    if trace_events:
+        st.download_button(
+            label="📈 下載 Chrome Trace (JSON)",
+            data=json.dumps(build_chrome_trace(trace_events)),
+            file_name=output_path.rsplit('.', 1)[0] + "_trace.json",
+            mime="application/json",
+            use_container_width=True
+        )
 
 
 def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
@@ -1153,7 +1253,7 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
     Args:
         uploaded_images: 上傳的圖片列表
         film_type: 底片類型
-        settings: 處理設定
+        settings: 處理設定（profile_stages / profile_memory 啟用階段剖析）
         standardize_func: 標準化函數
         spectral_response_func: 光譜響應函數
         optical_processing_func: 光學處理函數
@@ -1164,7 +1264,9 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
     if st.button("🚀 開始批量處理", type="primary", use_container_width=True):
         try:
             # 初始化批量處理器
-            batch_processor = BatchProcessor(max_workers=4)
+            batch_processor = BatchProcessor(max_workers=4,
+                                             profile_stages=settings.get('profile_stages', False),
+                                             profile_memory=settings.get('profile_memory', False))
             
             # 獲取胶片配置
             film = get_cached_film_profile_func(film_type)
@@ -1191,7 +1293,8 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
                     use_film_spectra=proc_settings.get('use_film_spectra', False),
                     film_spectra_name=proc_settings.get('film_spectra_name', 'Portra400'),
                     film_illuminant=proc_settings.get('film_illuminant', 'flat'),
-                    exposure_time=proc_settings.get('exposure_time', 1.0)
+                    exposure_time=proc_settings.get('exposure_time', 1.0),
+                    profiler=proc_settings.get('profiler')
                 )
 
                 return result
@@ -1247,9 +1350,12 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
                     if result.success and preview_idx < preview_count:
                         col = cols[preview_idx % 3]
                         with col:
-                            result_rgb = cv2.cvtColor(result.image_data, cv2.COLOR_BGR2RGB)
-                            st.image(result_rgb, caption=result.filename, width=200)
+                            # worker 產生的 JPEG 縮圖（與 ZIP 內容相同的通道順序）
+                            st.image(result.thumbnail, caption=result.filename, width=200)
                             st.caption(f"⏱️ {result.processing_time:.2f}s")
+                            if result.profile is not None:
+                                with st.expander("階段耗時", expanded=False):
+                                    st.markdown(format_stage_profile(result.profile))
                         preview_idx += 1
                 
                 if success_count > preview_count:
@@ -1257,8 +1363,10 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
                 
                 # ZIP 下載
                 st.subheader("📦 下載處理結果")
+                trace_events = batch_trace_events(results)
                 with st.spinner("正在生成 ZIP 檔案..."):
-                    zip_data = create_zip_archive(results, film_name=film_type, output_format="jpg", quality=95)
+                    zip_data = create_zip_archive(results, film_name=film_type, output_format="jpg", quality=95,
+                                                  trace_events=trace_events)
                     zip_filename = generate_zip_filename(film_type)
                 
                 st.download_button(
@@ -1269,6 +1377,15 @@ def render_batch_processing_ui(uploaded_images: List[Any], film_type: str,
                     use_container_width=True
                 )
                 
+                if trace_events:
+                    st.download_button(
+                        label="📈 下載批量 Chrome Trace (JSON)",
+                        data=json.dumps(build_chrome_trace(trace_events)),
+                        file_name=zip_filename.rsplit('.', 1)[0] + "_trace.json",
+                        mime="application/json",
+                        use_container_width=True
+                    )
+                
                 # 失敗列表
                 if fail_count > 0:
                     with st.expander(f"⚠️ {fail_count} 張照片處理失敗", expanded=False):